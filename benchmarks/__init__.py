@@ -0,0 +1,226 @@
+"""Microbenchmarks for voicekey's hot paths, with stored baselines.
+
+Run from the repo root:
+
+    python -m benchmarks run                 # print results
+    python -m benchmarks run --save          # refresh baselines.json
+    python -m benchmarks compare             # fail if anything regressed
+
+Benchmarks register themselves with @benchmark. A benchmark function does
+its setup, then either returns the operation to time or yields it (code
+after the yield runs as teardown). `per` is how many units of work one call
+of the operation performs, so results read as time per block, per chunk,
+per session and so on. Everything runs on synthetic data with the harness
+fakes installed, so no audio hardware or macOS frameworks are needed.
+"""
+
+import functools
+import importlib
+import inspect
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+BASELINES = Path(__file__).with_name("baselines.json")
+DEFAULT_THRESHOLD = 0.25  # fail when best-of-rounds time grows by more than 25%
+
+MODULES = (
+    "benchmarks.bench_recorder",
+    "benchmarks.bench_provider",
+    "benchmarks.bench_payload",
+    "benchmarks.bench_timestretch",
+    "benchmarks.bench_worker",
+    "benchmarks.bench_history",
+    "benchmarks.bench_archive",
+    "benchmarks.bench_vocab",
+    "benchmarks.bench_display",
+    "benchmarks.bench_stats",
+    "benchmarks.bench_flight",
+    "benchmarks.bench_startup",
+)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable
+    unit: str
+    per: int
+
+
+@dataclass
+class Result:
+    name: str
+    unit: str
+    best_ns: float    # per unit, fastest round
+    median_ns: float  # per unit, median round
+    rounds: int
+    loops: int        # operation calls per round
+
+    def to_dict(self) -> dict:
+        return {
+            "unit": self.unit,
+            "best_ns": round(self.best_ns, 1),
+            "median_ns": round(self.median_ns, 1),
+            "rounds": self.rounds,
+            "loops": self.loops,
+        }
+
+
+REGISTRY: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, unit: str = "op", per: int | str = 1, params: dict | None = None):
+    """Register a benchmark under `name`.
+
+    With `params` ({"arg": (v1, v2, ...)}), one benchmark is registered per
+    value; `name` is formatted with it and the value passed as a keyword.
+    `per` may name that argument when its value is the unit count.
+    """
+
+    def decorator(func):
+        if not params:
+            REGISTRY[name] = Benchmark(name, func, unit, per)
+            return func
+        (arg, values), = params.items()
+        for value in values:
+            label = name.format(**{arg: value})
+            count = value if per == arg else per
+            REGISTRY[label] = Benchmark(label, functools.partial(func, **{arg: value}), unit, count)
+        return func
+
+    return decorator
+
+
+def load() -> dict[str, Benchmark]:
+    """Install the headless fakes and import every benchmark module."""
+    from voicekey.harness import platform as headless
+
+    headless.install()
+    for module in MODULES:
+        importlib.import_module(module)
+    return REGISTRY
+
+
+def time_op(op: Callable[[], object], rounds: int, min_round: float) -> tuple[list[float], int]:
+    """Per-call nanoseconds for each round, and calls per round.
+
+    Calls per round are doubled until one round takes at least `min_round`
+    seconds, so timer resolution and loop overhead stay negligible.
+    """
+    op()  # warm-up
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_round * 1e9 or loops >= 1 << 20:
+            break
+        loops *= 2
+    times = [elapsed / loops]
+    for _ in range(rounds - 1):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        times.append((time.perf_counter_ns() - start) / loops)
+    return times, loops
+
+
+def run_one(bench: Benchmark, rounds: int = 5, min_round: float = 0.05) -> Result:
+    made = bench.func()
+    if inspect.isgenerator(made):
+        op = next(made)
+        try:
+            times, loops = time_op(op, rounds, min_round)
+        finally:
+            next(made, None)  # run teardown
+    else:
+        times, loops = time_op(made, rounds, min_round)
+    return Result(
+        name=bench.name,
+        unit=bench.unit,
+        best_ns=min(times) / bench.per,
+        median_ns=statistics.median(times) / bench.per,
+        rounds=rounds,
+        loops=loops,
+    )
+
+
+def run(pattern: str = "", rounds: int = 5, min_round: float = 0.05,
+        report: Callable[[Result], None] | None = None) -> dict[str, Result]:
+    """Run every registered benchmark whose name contains `pattern`."""
+    results = {}
+    for name, bench in load().items():
+        if pattern in name:
+            results[name] = run_one(bench, rounds, min_round)
+            if report:
+                report(results[name])
+    return results
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def to_json(results: dict[str, Result]) -> dict:
+    return {
+        "environment": environment(),
+        "benchmarks": {name: r.to_dict() for name, r in sorted(results.items())},
+    }
+
+
+def read(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write(path: Path, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_ns: float | None
+    current_ns: float | None
+
+    @property
+    def change(self) -> float | None:
+        """Relative change in best time (+0.10 = 10% slower)."""
+        if not self.baseline_ns or self.current_ns is None:
+            return None
+        return self.current_ns / self.baseline_ns - 1.0
+
+    def regressed(self, threshold: float) -> bool:
+        return self.change is not None and self.change > threshold
+
+
+def compare(baseline: dict, current: dict) -> list[Comparison]:
+    """Pair up benchmarks from two result files (as written by to_json)."""
+    old, new = baseline["benchmarks"], current["benchmarks"]
+    return [
+        Comparison(
+            name,
+            old[name]["best_ns"] if name in old else None,
+            new[name]["best_ns"] if name in new else None,
+        )
+        for name in sorted(old.keys() | new.keys())
+    ]
+
+
+def format_ns(ns: float) -> str:
+    for scale, suffix in ((1e9, "s"), (1e6, "ms"), (1e3, "µs")):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {suffix}"
+    return f"{ns:.0f} ns"
@@ -0,0 +1,115 @@
+"""python -m benchmarks {list,run,compare}"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from . import (
+    BASELINES,
+    DEFAULT_THRESHOLD,
+    compare,
+    environment,
+    format_ns,
+    load,
+    read,
+    run,
+    to_json,
+    write,
+)
+
+
+def _print_result(result) -> None:
+    print(f"{result.name:<40}{format_ns(result.best_ns):>12}{format_ns(result.median_ns):>12}"
+          f"  per {result.unit}")
+
+
+def _run(args) -> dict:
+    print(f"{'benchmark':<40}{'best':>12}{'median':>12}")
+    rounds, min_round = (3, 0.01) if args.quick else (args.rounds, args.min_round)
+    return to_json(run(args.filter, rounds, min_round, report=_print_result))
+
+
+def cmd_list(args) -> int:
+    for name, bench in load().items():
+        print(f"{name:<40}per {bench.unit}")
+    return 0
+
+
+def cmd_run(args) -> int:
+    data = _run(args)
+    if args.output:
+        write(Path(args.output), data)
+    if args.save:
+        if args.filter and BASELINES.exists():
+            merged = read(BASELINES)
+            merged["environment"] = data["environment"]
+            merged["benchmarks"].update(data["benchmarks"])
+            data = merged
+        write(BASELINES, data)
+        print(f"\nSaved baselines to {BASELINES}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    baseline = read(Path(args.baseline))
+    current = read(Path(args.current)) if args.current else _run(args)
+    if args.filter:
+        baseline["benchmarks"] = {k: v for k, v in baseline["benchmarks"].items() if args.filter in k}
+
+    if baseline.get("environment", {}).get("machine") != environment()["machine"]:
+        print("\nwarning: baseline was recorded on a different machine type", file=sys.stderr)
+
+    print(f"\n{'benchmark':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = []
+    for c in compare(baseline, current):
+        if c.change is None:
+            status = "new" if c.baseline_ns is None else "missing"
+            change = ""
+        else:
+            status = "REGRESSED" if c.regressed(args.threshold) else ""
+            change = f"{c.change:+.1%}"
+        old = format_ns(c.baseline_ns) if c.baseline_ns else "-"
+        new = format_ns(c.current_ns) if c.current_ns is not None else "-"
+        print(f"{c.name:<40}{old:>12}{new:>12}{change:>10}  {status}")
+        if c.regressed(args.threshold):
+            regressions.append(c.name)
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List registered benchmarks").set_defaults(func=cmd_list)
+
+    def add_run_options(p):
+        p.add_argument("-k", "--filter", default="", help="Only benchmarks whose name contains this")
+        p.add_argument("--rounds", type=int, default=5)
+        p.add_argument("--min-round", type=float, default=0.05, help="Seconds per timed round")
+        p.add_argument("--quick", action="store_true", help="Fewer, shorter rounds (smoke test)")
+
+    p = sub.add_parser("run", help="Run benchmarks")
+    add_run_options(p)
+    p.add_argument("--output", help="Write results as JSON")
+    p.add_argument("--save", action="store_true", help=f"Store results as the baseline ({BASELINES.name})")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="Run (or load) results and compare with the baseline")
+    add_run_options(p)
+    p.add_argument("--baseline", default=str(BASELINES))
+    p.add_argument("--current", help="Compare this results file instead of running")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="Allowed slowdown before failing (0.25 = 25%%)")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
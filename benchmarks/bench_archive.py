@@ -0,0 +1,122 @@
+"""Audio archive: codec cost and ratio, write throughput, mmap reads.
+
+Part of the suite (`python -m benchmarks run -k archive`, compress and
+decompress per second of audio); for the full report run
+
+    python -m benchmarks.bench_archive
+
+which compares the archive codec against plain zlib and lzma on synthetic
+speech, appends a few thousand sessions through the writer thread, then
+times listing the index and decoding single sessions from the mapping.
+"""
+
+import lzma
+import shutil
+import statistics
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks import benchmark
+from voicekey.archive import Archive, compress, decompress
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness.audio import synth_speech
+
+SESSIONS = 3000
+SESSION_SECONDS = 5.0
+
+
+def _blocks(seconds: float, seed: int = 0) -> list[np.ndarray]:
+    speech = synth_speech(seconds, seed=seed)
+    return np.array_split(speech, max(1, len(speech) // 480))  # as the recorder delivers it
+
+
+@benchmark("archive.compress", unit="audio second", per=10)
+def bench_compress():
+    blocks = _blocks(10.0)
+    return lambda: compress(blocks)
+
+
+@benchmark("archive.decompress", unit="audio second", per=10)
+def bench_decompress():
+    data, samples = compress(_blocks(10.0))
+    return lambda: decompress(data, samples)
+
+
+def _codecs(speech: np.ndarray) -> None:
+    raw = speech.tobytes()
+    blocks = np.array_split(speech, len(speech) // 480)
+    seconds = len(speech) / SAMPLE_RATE
+    cases = [
+        ("zlib -6 (raw samples)", lambda: zlib.compress(raw, 6)),
+        ("lzma -6 (raw samples)", lambda: lzma.compress(raw, preset=6)),
+        ("delta + byte planes, zlib -1", lambda: compress(blocks, level=1)[0]),
+        ("delta + byte planes, zlib -6", lambda: compress(blocks)[0]),
+    ]
+    print(f"codec on {seconds:.0f} s of synthetic speech")
+    print(f"  {'codec':<32}{'size':>8}{'ms per audio s':>16}")
+    for label, func in cases:
+        start = time.perf_counter()
+        size = len(func())
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<32}{size / len(raw):>8.1%}{elapsed / seconds * 1e3:>16.2f}")
+    data, samples = compress(blocks)
+    start = time.perf_counter()
+    decompress(data, samples)
+    print(f"  decode: {(time.perf_counter() - start) / seconds * 1e3:.2f} ms per audio s")
+
+
+def main() -> None:
+    _codecs(synth_speech(60.0, seed=3))
+
+    tmp = Path(tempfile.mkdtemp(prefix="vk-archive-"))
+    try:
+        store = Archive(tmp, max_bytes=1 << 40, max_days=0)
+        sessions = [synth_speech(SESSION_SECONDS, seed=i) for i in range(8)]
+        add_us = []
+        start = time.perf_counter()
+        for i in range(SESSIONS):
+            t = time.perf_counter()
+            store.add(sessions[i % 8], f"session {i} " * 8, "bench",
+                      latency_ms=300, created_at=1.7e9 + i)
+            add_us.append((time.perf_counter() - t) * 1e6)
+            if i % 100 == 99:
+                store.flush()  # a day's dictation arrives far slower than the writer's pace
+        store.flush()
+        written = time.perf_counter() - start
+        store.close()
+        burst = Archive(tmp / "burst", max_bytes=1 << 40, max_days=0)
+        for i in range(SESSIONS):
+            burst.add(sessions[i % 8], "burst")
+        queued = SESSIONS - burst.dropped
+        burst.close()
+        audio_s = SESSIONS * SESSION_SECONDS
+        print(f"\n{SESSIONS} sessions of {SESSION_SECONDS:.0f} s ({audio_s / 3600:.1f} h of audio)")
+        print(f"  written in {written:.1f} s ({audio_s / written:.0f}x real time), "
+              f"{store.nbytes() / 1e6:.0f} MB on disk")
+        print(f"  add() p50 {statistics.median(add_us):.1f} µs, max {max(add_us):.0f} µs")
+        print(f"  all at once: {queued} queued ({queued * sessions[0].nbytes / 1e6:.0f} MB), "
+              f"{SESSIONS - queued} dropped")
+
+        start = time.perf_counter()
+        entries = store.entries()
+        listed = time.perf_counter() - start
+        start = time.perf_counter()
+        recent = store.entries(since=1.7e9 + SESSIONS - 100)
+        filtered = time.perf_counter() - start
+        print(f"  list all {len(entries)}: {listed * 1e3:.1f} ms; last {len(recent)}: {filtered * 1e3:.1f} ms")
+        times = []
+        for entry in entries[::max(1, len(entries) // 50)]:
+            t = time.perf_counter()
+            entry.wav()
+            times.append((time.perf_counter() - t) * 1e3)
+        print(f"  decode one session to WAV: p50 {statistics.median(times):.2f} ms")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Terminal UI hot paths: meter frames and streaming transcript updates."""
+
+import io
+
+from rich.console import Console
+
+from benchmarks import benchmark
+from voicekey import display
+from voicekey.display import AudioMeter, StreamingDisplay
+
+
+def _offscreen_console() -> Console:
+    return Console(file=io.StringIO(), force_terminal=True, width=100, color_system="truecolor")
+
+
+@benchmark("display.meter_render", unit="frame", per=20)
+def bench_meter_render():
+    """One frame per level step, from silence to clipping."""
+    meter = AudioMeter()
+    meter._start_time = 0.0
+    levels = [i / 19 for i in range(20)]
+
+    def op():
+        for level in levels:
+            meter.update_level(level)
+            meter._render()
+
+    return op
+
+
+@benchmark("display.stream_append[{chunks} chunks]", unit="chunk", per="chunks",
+           params={"chunks": (20, 200)})
+def bench_stream_append(chunks: int):
+    """A whole streamed dictation: start, `chunks` deltas, finish."""
+    real_console = display.console
+    display.console = _offscreen_console()
+    words = [("word%d " % (i % 50)) for i in range(chunks)]
+
+    def op():
+        stream = StreamingDisplay()
+        stream.start()
+        for word in words:
+            stream.append(word)
+        stream.finish()
+        display.console.file.seek(0)
+        display.console.file.truncate()
+
+    try:
+        yield op
+    finally:
+        display.console = real_console
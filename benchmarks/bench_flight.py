@@ -0,0 +1,70 @@
+"""Flight recorder per-block overhead and memory ceiling.
+
+Part of the suite (`python -m benchmarks run -k flight`); for the full
+five-minute report run `python -m benchmarks.bench_flight`.
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks import benchmark
+from voicekey.constants import SAMPLE_RATE
+from voicekey.flight import FlightRecorder
+
+BLOCK = 512          # samples per PortAudio callback at 24 kHz (~21 ms)
+MINUTES = 5
+
+
+def _speechlike_blocks(n: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    t = np.arange(BLOCK * n) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)  # ~3 syllables/s
+    signal = envelope * (3000 * np.sin(2 * np.pi * 180 * t) + rng.normal(0, 400, t.size))
+    return list(signal.astype(np.int16).reshape(n, BLOCK, 1))
+
+
+def bench_record_audio(level: int, blocks: list[np.ndarray], max_bytes: int) -> tuple[float, int]:
+    """(µs per block, bytes held) for one long session at a compression level."""
+    rec = FlightRecorder(max_sessions=5, max_bytes=max_bytes, compress_level=level)
+    rec.begin_session()
+    start = time.perf_counter()
+    for block in blocks:
+        rec.record_audio(block)
+    per_block = (time.perf_counter() - start) / len(blocks) * 1e6
+    rec.end_session()
+    return per_block, rec.nbytes
+
+
+@benchmark("flight.record_audio[level={level}]", unit="block", per=100,
+           params={"level": (0, 1, 6)})
+def bench_record_audio_block(level: int):
+    blocks = _speechlike_blocks(100)
+    rec = FlightRecorder(max_sessions=5, max_bytes=64 << 20, compress_level=level)
+
+    def op():
+        rec.begin_session()
+        for block in blocks:
+            rec.record_audio(block)
+        rec.end_session()
+
+    return op
+
+
+def main() -> None:
+    n = MINUTES * 60 * SAMPLE_RATE // BLOCK
+    blocks = _speechlike_blocks(n)
+    ceiling = 8 << 20
+    budget_us = BLOCK / SAMPLE_RATE * 1e6
+    print(f"{MINUTES} min of audio, {n} blocks of {BLOCK} samples ({budget_us:.0f} µs real time each)")
+    for level in (0, 1, 6):
+        per_block, held = bench_record_audio(level, blocks, ceiling)
+        assert held <= ceiling
+        print(
+            f"  compress_level={level}: {per_block:6.1f} µs/block "
+            f"({per_block / budget_us:.2%} of real time), {held / (1 << 20):5.2f} MiB held"
+        )
+
+
+if __name__ == "__main__":
+    main()
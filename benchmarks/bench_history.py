@@ -0,0 +1,153 @@
+"""Dictation history: insert throughput and query latency on a large store.
+
+Part of the suite (`python -m benchmarks run -k history`); for the full
+report run
+
+    python -m benchmarks.bench_history
+
+which fills stores of 100k and more entries and times inserts through the
+batching writer against one commit per entry, then searches for rare,
+common and prefix terms, and a deep page.
+"""
+
+import atexit
+import functools
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import benchmark
+from voicekey.history import History
+
+ENTRIES = 100_000
+BATCH = 1000
+_WORDS = (
+    "the a to and of meeting budget please send email note call tomorrow review draft update "
+    "project team client schedule thursday friday report numbers follow up about with for "
+    "reminder invoice design launch feedback question answer idea list order"
+).split()
+RARE = "xylophone"  # in roughly one entry per thousand
+
+
+def _texts(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(n):
+        words = rng.choices(_WORDS, k=rng.randint(6, 30))
+        if i % 1000 == 7:
+            words.insert(rng.randrange(len(words)), RARE)
+        texts.append(" ".join(words).capitalize() + ".")
+    return texts
+
+
+def _filled(n: int) -> tuple[History, Path]:
+    tmp = Path(tempfile.mkdtemp(prefix="vk-history-"))
+    store = History(tmp / "history.db")
+    for i, text in enumerate(_texts(n)):
+        store.add(text, 3.0, "bench", created_at=1.7e9 + i)
+    store.flush()
+    return store, tmp
+
+
+@benchmark("history.add[batched]", unit="entry", per=BATCH)
+def bench_add():
+    tmp = Path(tempfile.mkdtemp(prefix="vk-history-"))
+    store = History(tmp / "history.db")
+    texts = _texts(BATCH)
+
+    def op():
+        for text in texts:
+            store.add(text, 3.0, "bench")
+        store.flush()
+
+    yield op
+    store.close()
+    shutil.rmtree(tmp)
+
+
+@functools.cache
+def _shared_store() -> History:
+    """One filled store for all the search benchmarks (filling takes seconds)."""
+    store, tmp = _filled(ENTRIES)
+    atexit.register(shutil.rmtree, tmp, True)
+    atexit.register(store.close)
+    return store
+
+
+@benchmark("history.search[{query}]", unit="query", params={"query": (RARE, "budget review", "thur")})
+def bench_search(query: str):
+    store = _shared_store()
+    return lambda: store.search(query, limit=20)
+
+
+def _per_entry_commits(texts: list[str], path: Path) -> float:
+    store = History(path)
+    conn = store._connect()
+    start = time.perf_counter()
+    for text in texts:
+        with conn:
+            conn.execute("INSERT INTO entries (created_at, text, audio_seconds, model) "
+                         "VALUES (?, ?, 3.0, 'bench')", (time.time(), text))
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def _query_ms(func, repeat: int = 50) -> tuple[float, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e3)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)]
+
+
+def main() -> None:
+    texts = _texts(10_000, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        per_entry = _per_entry_commits(texts, Path(tmp) / "a.db")
+        store = History(Path(tmp) / "b.db")
+        start = time.perf_counter()
+        for text in texts:
+            store.add(text)
+        queued = time.perf_counter() - start
+        store.flush()
+        batched = time.perf_counter() - start
+        batches = store.batches
+        store.close()
+    print(f"insert {len(texts)} entries")
+    print(f"  commit per entry   {len(texts) / per_entry:>9.0f} entries/s")
+    print(f"  batched writer     {len(texts) / batched:>9.0f} entries/s ({batches} commits), "
+          f"add() {queued / len(texts) * 1e6:.1f} µs each")
+
+    for n in (ENTRIES, 3 * ENTRIES):
+        start = time.perf_counter()
+        store, tmp = _filled(n)
+        fill = time.perf_counter() - start
+        size = sum(p.stat().st_size for p in tmp.iterdir()) / 1e6
+        middle = n // 2
+        print(f"\n{n:,} entries ({size:.0f} MB, filled in {fill:.1f} s)")
+        print(f"  {'query':<28}{'hits':>8}{'p50':>10}{'p95':>10}")
+        cases = [
+            (f"rare word ({RARE})", lambda: store.search(RARE)),
+            ("two common words", lambda: store.search("budget review")),
+            ("prefix (thur*)", lambda: store.search("thur")),
+            ("common, deep page", lambda: store.search("budget", before=middle)),
+            ("recent", lambda: store.recent()),
+            ("get by id", lambda: store.get(middle)),
+        ]
+        for label, func in cases:
+            hits = func()
+            p50, p95 = _query_ms(func)
+            count = len(hits) if isinstance(hits, list) else 1
+            print(f"  {label:<28}{count:>8}{p50:>8.2f}ms{p95:>8.2f}ms")
+        store.close()
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
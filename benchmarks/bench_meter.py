@@ -0,0 +1,52 @@
+"""CPU spent per second of recording: audio callbacks, level updates and the meter.
+
+Drives App through the headless harness at real-time speed with the meter
+drawing to an off-screen terminal, and reports process CPU time between
+hotkey press and the end of the audio. Run from the repo root:
+
+    python -m benchmarks.bench_meter
+"""
+
+import io
+import time
+
+from rich.console import Console
+
+from voicekey.harness import platform
+
+SECONDS = 5.0
+RUNS = 3
+
+
+def cpu_per_recording_second(seconds: float = SECONDS, display_mode: str = "rich") -> float:
+    """Milliseconds of CPU per second of recording (best of RUNS)."""
+    platform.install()
+    from voicekey import display
+    from voicekey.harness import Harness, fake_sounddevice
+    from voicekey.harness.audio import synth_speech
+    from voicekey.mockserver import ServerConfig
+
+    display.console = Console(file=io.StringIO(), force_terminal=True, width=100)
+    audio = synth_speech(seconds)
+    best = float("inf")
+    server = ServerConfig(latency=0, chunk_delay=0)
+    with Harness(server=server, speed=1.0, cfg={"display": display_mode}) as harness:
+        for _ in range(RUNS):
+            fake_sounddevice.play(audio, speed=1.0, blocksize=512)
+            cpu = time.process_time()
+            harness.app.on_hotkey_press()
+            fake_sounddevice.wait_finished(seconds * 3)
+            cpu = time.process_time() - cpu
+            harness.app.on_hotkey_release()
+            harness.app.wait_idle()
+            best = min(best, cpu / seconds * 1000)
+    return best
+
+
+def main() -> None:
+    print(f"recording: {cpu_per_recording_second():.1f} ms CPU per second of audio "
+          f"(best of {RUNS} × {SECONDS:.0f} s, meter drawing off-screen)")
+
+
+if __name__ == "__main__":
+    main()
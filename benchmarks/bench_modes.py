@@ -0,0 +1,62 @@
+"""Startup time, idle CPU and recording CPU for each display backend.
+
+Each mode runs in a fresh interpreter so import costs are real. (httpx
+imports Rich itself for its own CLI when Rich is installed, so "rich ui"
+reports whether voicekey's Rich display was loaded.) Run from the repo root:
+
+    python -m benchmarks.bench_modes
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+MODES = ("rich", "log")
+IDLE_SECONDS = 2.0
+
+
+def measure(mode: str) -> dict:
+    from voicekey.harness import platform
+
+    platform.install()
+    start = time.perf_counter()
+    from voicekey import config
+    from voicekey.app import App
+
+    App(cfg=dict(config.DEFAULTS, display=mode, flight_sessions=0), api_key="sk", persist_stats=False)
+    startup = time.perf_counter() - start
+    display_loaded = "voicekey.display" in sys.modules
+
+    cpu = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    idle = (time.process_time() - cpu) / IDLE_SECONDS
+
+    from benchmarks.bench_meter import cpu_per_recording_second
+
+    return {
+        "mode": mode,
+        "startup_ms": startup * 1000,
+        "rich_display_imported": display_loaded,
+        "idle_cpu_ms_per_s": idle * 1000,
+        "recording_cpu_ms_per_s": cpu_per_recording_second(3.0, display_mode=mode),
+    }
+
+
+def main() -> None:
+    print(f"{'mode':<6}{'startup':>10}{'rich ui':>9}{'idle cpu':>12}{'recording cpu':>16}")
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_modes", "--child", mode],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:<6}{r['startup_ms']:>8.0f}ms{'loaded' if r['rich_display_imported'] else 'no':>9}"
+              f"{r['idle_cpu_ms_per_s']:>8.2f}ms/s{r['recording_cpu_ms_per_s']:>12.1f}ms/s")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        print(json.dumps(measure(sys.argv[2])))
+    else:
+        main()
@@ -0,0 +1,137 @@
+"""Upload cost of long recordings: peak memory and release → first byte on the wire.
+
+Compares the old path (concatenate the blocks, encode into a BytesIO, let
+httpx frame `files=`) with a WavPayload streamed through MultipartBody.
+Each run happens in a fresh process so peak RSS isn't shared, and posts to
+a local sink that timestamps the first body byte it receives. Part of the
+suite (`python -m benchmarks run -k payload`); for the full report run
+
+    python -m benchmarks.bench_payload
+"""
+
+import io
+import resource
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks import benchmark
+from voicekey.constants import CHANNELS, SAMPLE_RATE
+from voicekey.wav import WavPayload
+
+BLOCK = 512
+MINUTES = (1, 10, 30)
+VARIANTS = ("copy", "payload")
+
+
+def _blocks(seconds: float) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    n = int(seconds * SAMPLE_RATE) // BLOCK
+    return [rng.integers(-3000, 3000, (BLOCK, 1), dtype=np.int16) for _ in range(n)]
+
+
+def _copying_stop(blocks: list[np.ndarray]) -> bytes:
+    """Recorder.stop() before WavPayload: concatenate, then BytesIO."""
+    audio = np.concatenate(blocks)
+    data_size = len(audio) * 2
+    buf = io.BytesIO()
+    buf.write(b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVEfmt ")
+    buf.write(struct.pack("<IHHIIHH", 16, 1, CHANNELS, SAMPLE_RATE, SAMPLE_RATE * CHANNELS * 2,
+                          CHANNELS * 2, 16))
+    buf.write(b"data" + struct.pack("<I", data_size))
+    buf.write(audio.tobytes())
+    return buf.getvalue()
+
+
+class _Sink:
+    """Minimal HTTP server: reads a Content-Length body, notes when it started, replies 200."""
+
+    def __init__(self):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.first_byte: float | None = None
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self) -> None:
+        conn, _ = self.sock.accept()
+        buf = bytearray(1 << 16)
+        head = b""
+        while b"\r\n\r\n" not in head:
+            head += conn.recv(4096)
+        head, _, rest = head.partition(b"\r\n\r\n")
+        if rest:
+            self.first_byte = time.perf_counter()
+        length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:"))
+        remaining = length - len(rest)
+        while remaining > 0:
+            n = conn.recv_into(buf)
+            if self.first_byte is None:
+                self.first_byte = time.perf_counter()
+            remaining -= n
+        conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        conn.close()
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def child(variant: str, seconds: float) -> None:
+    """Run one upload and print: extra peak RSS (MiB), release → first byte (ms), total (ms)."""
+    import httpx
+
+    from voicekey.providers.multipart import MultipartBody
+
+    blocks = _blocks(seconds)
+    sink = _Sink()
+    client = httpx.Client(timeout=120)
+    fields = {"model": "bench", "response_format": "text", "stream": "true"}
+    before = _peak_rss_mib()
+
+    released = time.perf_counter()
+    if variant == "copy":
+        wav = _copying_stop(blocks)
+        client.post(sink.url, files={"file": ("audio.wav", wav, "audio/wav")}, data=fields)
+    else:
+        body = MultipartBody(fields, "file", "audio.wav", WavPayload(blocks), "audio/wav")
+        client.post(sink.url, content=body, headers=body.headers)
+    done = time.perf_counter()
+    print(_peak_rss_mib() - before, (sink.first_byte - released) * 1000, (done - released) * 1000)
+
+
+@benchmark("payload.chunks[{seconds}s]", unit="recording", params={"seconds": (30, 300)})
+def bench_chunks(seconds: int):
+    """Wrap the blocks and walk every chunk, as the HTTP client does."""
+    blocks = _blocks(seconds)
+
+    def op():
+        for _ in WavPayload(blocks):
+            pass
+
+    return op
+
+
+def main() -> None:
+    print(f"{'recording':<12}{'path':<10}{'extra peak RSS':>16}{'release→first byte':>22}{'upload':>12}")
+    for minutes in MINUTES:
+        for variant in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_payload", "--child", variant, str(minutes * 60)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            rss, first, total = map(float, out.split())
+            print(f"{minutes:>3} min{'':<5}{variant:<10}{rss:>12.1f} MiB{first:>19.1f} ms{total:>9.0f} ms")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], float(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,102 @@
+"""The SSE loop in OpenAIProvider.transcribe, against an in-memory response,
+the SSE decoder on its own, and the rate limiter wrapped around every call."""
+
+import json
+
+from benchmarks import benchmark
+from voicekey.harness.audio import encode_wav, synth_speech
+from voicekey.providers import openai
+from voicekey.providers.ratelimit import Failure, RateLimiter
+from voicekey.providers.sse import SSEDecoder
+
+
+class _Response:
+    is_error = False
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        yield from self._body.decode().splitlines()
+
+    def iter_bytes(self):
+        # Network-sized reads that split events (and UTF-8 sequences) at arbitrary points.
+        for i in range(0, len(self._body), 1400):
+            yield self._body[i:i + 1400]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _Client:
+    def __init__(self, body: bytes, **kwargs):
+        self._body = body
+
+    def stream(self, method, url, **kwargs):
+        return _Response(self._body)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def sse_body(chunks: int) -> bytes:
+    words = ("Let's ", "ship ", "the ", "naïve ", "café ", "update ", "on ", "Friday. ")
+    events = [f"data: {json.dumps({'type': 'transcript.text.delta', 'text': words[i % len(words)]})}\n\n"
+              for i in range(chunks)]
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode()
+
+
+@benchmark("provider.sse[{chunks} chunks]", unit="chunk", per="chunks",
+           params={"chunks": (20, 200, 2000)})
+def bench_sse(chunks: int):
+    body = sse_body(chunks)
+    real_client = openai.httpx.Client
+    openai.httpx.Client = lambda **kwargs: _Client(body, **kwargs)
+    provider = openai.OpenAIProvider()
+    wav = encode_wav(synth_speech(0.1))
+
+    def op():
+        received = []
+        provider.transcribe(wav, "sk-bench", on_chunk=received.append)
+
+    try:
+        yield op
+    finally:
+        openai.httpx.Client = real_client
+
+
+@benchmark("sse.decode[{events} events]", unit="event", per="events",
+           params={"events": (10_000, 100_000)})
+def bench_sse_decode(events: int):
+    body = sse_body(events)
+    chunks = [body[i:i + 1400] for i in range(0, len(body), 1400)]
+
+    def op():
+        decoder = SSEDecoder()
+        for chunk in chunks:
+            decoder.feed(chunk)
+
+    return op
+
+
+@benchmark("provider.ratelimit_call", unit="call")
+def bench_ratelimit_call():
+    limiter = RateLimiter(rate=1e9, max_concurrency=8)
+
+    def op():
+        limiter.call(lambda: None, lambda e: Failure(retryable=False))
+
+    return op
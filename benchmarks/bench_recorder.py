@@ -0,0 +1,49 @@
+"""Recorder hot paths: the PortAudio callback and WAV encoding."""
+
+import numpy as np
+
+from benchmarks import benchmark
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness.audio import synth_speech
+from voicekey.recorder import Recorder
+
+CALLBACKS = 50  # blocks per timed call; frames are reset between calls
+
+
+def _blocks(blocksize: int, count: int) -> list[np.ndarray]:
+    audio = synth_speech(blocksize * count / SAMPLE_RATE)
+    return list(audio[: blocksize * count].reshape(count, blocksize, 1))
+
+
+@benchmark("recorder.callback[block={blocksize}]", unit="block", per=CALLBACKS,
+           params={"blocksize": (256, 512, 1024)})
+def bench_callback(blocksize: int):
+    blocks = _blocks(blocksize, CALLBACKS)
+    recorder = Recorder()
+    callback = recorder._callback
+
+    def op():
+        recorder._frames = []
+        for block in blocks:
+            callback(block, blocksize, None, None)
+
+    return op
+
+
+@benchmark("recorder.encode_wav[{seconds}s]", unit="recording", params={"seconds": (5, 30, 300)})
+def bench_encode_wav(seconds: int):
+    audio = synth_speech(seconds).reshape(-1, 1)
+    return lambda: Recorder._encode_wav(audio)
+
+
+@benchmark("recorder.stop[30s]", unit="recording")
+def bench_stop():
+    """Concatenate 30 s of 512-sample blocks and encode, as at hotkey release."""
+    blocks = _blocks(512, 30 * SAMPLE_RATE // 512)
+    recorder = Recorder()
+
+    def op():
+        recorder._frames = list(blocks)
+        return recorder.stop()
+
+    return op
@@ -0,0 +1,61 @@
+"""Wall time of fresh interpreters running `voicekey config` and creating the app.
+
+app_init is what runs before the menu bar appears; app_warm adds the
+background warm-up (with the headless fakes standing in for PortAudio and
+AppKit, whose own import cost is therefore not included).
+
+Part of the suite (`python -m benchmarks run -k startup`); for a standalone
+report run `python -m benchmarks.bench_startup`. For a per-import breakdown
+use `voicekey --profile-startup config`.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import benchmark
+
+SCRIPTS = {
+    "python": "pass",
+    "config_cmd": "from voicekey.cli import main; main(['config'])",
+    "app_init": (
+        "from voicekey import config\n"
+        "from voicekey.app import App\n"
+        "App(cfg=dict(config.DEFAULTS, display='null'), api_key='sk', persist_stats=False)"
+    ),
+    "app_warm": (
+        "from voicekey.harness import platform; platform.install()\n"
+        "from voicekey import config\n"
+        "from voicekey.app import App\n"
+        "App(cfg=dict(config.DEFAULTS, display='null'), api_key='sk', persist_stats=False).warm_up()"
+    ),
+}
+
+
+def _runner(script: str):
+    home = tempfile.mkdtemp(prefix="voicekey-bench-")
+    env = dict(os.environ, HOME=home, PYTHONPATH=os.pathsep.join(sys.path))
+    cmd = [sys.executable, "-c", script]
+    return lambda: subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+@benchmark("startup.{name}", unit="process", params={"name": tuple(SCRIPTS)})
+def bench_startup(name: str):
+    return _runner(SCRIPTS[name])
+
+
+def main(runs: int = 10) -> None:
+    for name, script in SCRIPTS.items():
+        run = _runner(script)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        print(f"{name:<12}{min(times) * 1000:8.1f} ms (best of {runs})")
+
+
+if __name__ == "__main__":
+    main()
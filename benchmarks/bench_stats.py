@@ -0,0 +1,52 @@
+"""Overhead of per-stage session timing.
+
+Part of the suite (`python -m benchmarks run -k stats`); for a standalone
+report run `python -m benchmarks.bench_stats`.
+"""
+
+import time
+
+from benchmarks import benchmark
+from voicekey import metrics
+
+SESSIONS = 20_000
+
+
+def _session(stats: metrics.StageStats) -> None:
+    session = metrics.SessionTimer()
+    session.mark("press")
+    session.mark("release")
+    session.mark("encode_done")
+    session.mark("connected")
+    session.mark("request_sent")
+    for _ in range(20):  # typical number of SSE deltas
+        session.mark_once("first_delta")
+        session.mark("last_delta")
+    session.mark("paste_done")
+    session.mark("clipboard_restored")
+    stats.add(session)
+
+
+@benchmark("stats.session", unit="session")
+def bench_session():
+    """Marks + histogram aggregation for one dictation."""
+    stats = metrics.StageStats()
+    return lambda: _session(stats)
+
+
+def bench_session_overhead() -> float:
+    """Nanoseconds spent per dictation on marks + histogram aggregation."""
+    stats = metrics.StageStats()
+    start = time.perf_counter_ns()
+    for _ in range(SESSIONS):
+        _session(stats)
+    return (time.perf_counter_ns() - start) / SESSIONS
+
+
+def main() -> None:
+    per_session = bench_session_overhead()
+    print(f"stage timing: {per_session / 1000:.1f} µs per session ({SESSIONS} sessions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Streaming transcript display under thousands of small deltas.
+
+Feeds an in-memory SSE response through OpenAIProvider.transcribe with
+StreamingDisplay.append as on_chunk, drawing to an off-screen terminal, and
+reports how fast the read loop consumed events, how long finish() took to
+settle, and total CPU. Run from the repo root:
+
+    python -m benchmarks.bench_stream
+"""
+
+import io
+import time
+
+from rich.console import Console
+
+from benchmarks.bench_provider import _Client, sse_body
+from voicekey import display
+from voicekey.providers import openai
+
+DELTAS = (500, 2000, 5000)
+
+
+def stream(deltas: int) -> dict[str, float]:
+    body = sse_body(deltas)
+    real_client, real_console = openai.httpx.Client, display.console
+    openai.httpx.Client = lambda **kwargs: _Client(body)
+    display.console = Console(file=io.StringIO(), force_terminal=True, width=100)
+    try:
+        provider = openai.OpenAIProvider()
+        view = display.StreamingDisplay()
+        cpu = time.process_time()
+        start = time.perf_counter()
+        view.start()
+        provider.transcribe(b"RIFF", "sk-bench", on_chunk=view.append)
+        read_done = time.perf_counter()
+        view.finish()
+        end = time.perf_counter()
+        cpu = time.process_time() - cpu
+    finally:
+        openai.httpx.Client, display.console = real_client, real_console
+    return {
+        "read_loop_s": read_done - start,
+        "deltas_per_s": deltas / (read_done - start),
+        "finish_s": end - read_done,
+        "cpu_s": cpu,
+    }
+
+
+def main() -> None:
+    print(f"{'deltas':>8}{'read loop':>12}{'deltas/s':>12}{'finish':>10}{'cpu':>10}")
+    for n in DELTAS:
+        r = stream(n)
+        print(f"{n:>8}{r['read_loop_s'] * 1000:>10.1f}ms{r['deltas_per_s']:>12.0f}"
+              f"{r['finish_s'] * 1000:>8.1f}ms{r['cpu_s'] * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
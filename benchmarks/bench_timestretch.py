@@ -0,0 +1,54 @@
+"""Time compression: CPU per second of audio, and transcripts at each speed.
+
+Part of the suite (`python -m benchmarks run -k timestretch`); for the
+speed-factor comparison run
+
+    python -m benchmarks.bench_timestretch
+
+which dictates tone-coded words through the headless harness at each
+`speedup` and has the mock server's "tones" engine transcribe them, with
+and without the speech-rate cap.
+"""
+
+import random
+
+from benchmarks import benchmark
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness.audio import synth_speech
+from voicekey.timestretch import DEFAULT_MAX_RATE, compress
+
+SECONDS = 10
+SPEEDS = (1.0, 1.2, 1.35, 1.5, 2.0, 2.5)
+
+
+@benchmark("timestretch.compress[speed={speed}]", unit="second of audio", per=SECONDS,
+           params={"speed": (1.25, 1.5)})
+def bench_compress(speed: float):
+    audio = synth_speech(SECONDS)
+    return lambda: compress(audio, speed)
+
+
+def main() -> None:
+    from voicekey.harness import Harness
+    from voicekey.harness.tones import VOCABULARY, synth_words
+    from voicekey.mockserver import ServerConfig
+
+    words = random.Random(0).choices(VOCABULARY, k=60)
+    audio = synth_words(words)
+    seconds = len(audio) / SAMPLE_RATE
+    server = ServerConfig(latency=0, chunk_delay=0, engine="tones")
+    print(f"{len(words)} tone-coded words, {seconds:.1f} s of audio")
+    print(f"{'speedup':>8}{'cap':>8}{'uploaded':>12}{'words right':>14}")
+    for speed in SPEEDS:
+        for cap in (0.0, DEFAULT_MAX_RATE):
+            if speed == 1.0 and cap:
+                continue
+            with Harness(server=server, cfg={"speedup": speed, "speedup_max_rate": cap}) as harness:
+                heard = harness.run_session(audio).split()
+                uploaded = harness.server.stats.bytes_received / (2 * SAMPLE_RATE)
+            right = sum(a == b for a, b in zip(heard, words))
+            print(f"{speed:>8.2f}{cap or '-':>8}{uploaded:>10.1f} s{right:>8}/{len(words)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Custom vocabulary: compile time and rewrite throughput on large dictionaries.
+
+Part of the suite (`python -m benchmarks run -k vocab`, rewriting a long
+transcript with 50k entries, whole and as streamed deltas); for the full
+report run
+
+    python -m benchmarks.bench_vocab
+
+which compiles 5k–200k-entry dictionaries and compares the token trie with
+one regex alternation of every entry, the usual way to do this with `re`.
+"""
+
+import random
+import re
+import time
+
+from benchmarks import benchmark
+from voicekey.vocab import Rewriter, Vocabulary
+
+ENTRIES = 50_000
+TRANSCRIPT_WORDS = 10_000
+_SYLLABLES = "ka lo mi nex tra vor zen qui dal fen ro sa tek lu bri mon pax gor hel vi".split()
+_COMMON = (
+    "the a to and of meeting budget please send email note call tomorrow review draft update "
+    "project team client schedule thursday friday report numbers follow up about with for "
+    "we should ship deploy on it this next week so I think that is"
+).split()
+
+
+def _entries(n: int, seed: int = 0) -> list[tuple[str, str]]:
+    """Misheard product and people names: one to three made-up words each."""
+    rng = random.Random(seed)
+    entries = {}
+    while len(entries) < n:
+        words = ["".join(rng.choices(_SYLLABLES, k=rng.randint(2, 3))) for _ in range(rng.randint(1, 3))]
+        source = " ".join(words)
+        entries[source] = "".join(w.capitalize() for w in words)
+    return list(entries.items())
+
+
+def _transcript(entries: list[tuple[str, str]], words: int, seed: int = 0) -> str:
+    """Everyday words with a vocabulary entry every 50 words or so."""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < words:
+        if rng.random() < 0.02:
+            out.append(rng.choice(entries)[0])
+        else:
+            out.append(rng.choice(_COMMON))
+        if rng.random() < 0.08:
+            out[-1] += rng.choice(".,")
+    return " ".join(out)
+
+
+def _deltas(text: str, seed: int = 0) -> list[str]:
+    """Split like a streamed transcript: pieces of 1–3 words, breaking anywhere."""
+    rng = random.Random(seed)
+    pieces, start = [], 0
+    while start < len(text):
+        end = min(len(text), start + rng.randint(3, 20))
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def _regex(entries: list[tuple[str, str]]):
+    lookup = {source.casefold(): replacement for source, replacement in entries}
+    alternation = "|".join(re.escape(s) for s in sorted(lookup, key=len, reverse=True))
+    pattern = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+    return lambda text: pattern.sub(lambda m: lookup[m[0].casefold()], text)
+
+
+@benchmark("vocab.apply[50k entries]", unit="word", per=TRANSCRIPT_WORDS)
+def bench_apply():
+    entries = _entries(ENTRIES)
+    vocab = Vocabulary(entries)
+    text = _transcript(entries, TRANSCRIPT_WORDS)
+    return lambda: vocab.apply(text)
+
+
+@benchmark("vocab.stream[50k entries]", unit="word", per=TRANSCRIPT_WORDS)
+def bench_stream():
+    entries = _entries(ENTRIES)
+    vocab = Vocabulary(entries)
+    deltas = _deltas(_transcript(entries, TRANSCRIPT_WORDS))
+
+    def op():
+        rewriter = Rewriter(vocab)
+        for delta in deltas:
+            rewriter.feed(delta)
+        rewriter.finish()
+
+    return op
+
+
+def _best_ms(func, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e3
+
+
+def main() -> None:
+    print(f"transcript of {TRANSCRIPT_WORDS:,} words")
+    print(f"  {'entries':>8}{'compile':>10}{'apply':>10}{'stream':>10}{'regex compile':>15}{'regex sub':>11}")
+    for n in (5_000, ENTRIES, 200_000):
+        entries = _entries(n)
+        text = _transcript(entries, TRANSCRIPT_WORDS)
+        deltas = _deltas(text)
+        start = time.perf_counter()
+        vocab = Vocabulary(entries)
+        compile_ms = (time.perf_counter() - start) * 1e3
+
+        def stream():
+            rewriter = Rewriter(vocab)
+            return "".join(rewriter.feed(d) for d in deltas) + rewriter.finish()
+
+        apply_ms = _best_ms(lambda: vocab.apply(text))
+        stream_ms = _best_ms(stream)
+        assert stream() == vocab.apply(text)
+        if n <= ENTRIES:
+            start = time.perf_counter()
+            sub = _regex(entries)
+            regex_compile = f"{(time.perf_counter() - start) * 1e3:.0f} ms"
+            regex_sub = f"{_best_ms(lambda: sub(text), repeat=1):.0f} ms"
+        else:
+            regex_compile = regex_sub = "—"
+        print(f"  {n:>8,}{compile_ms:>7.0f} ms{apply_ms:>7.1f} ms{stream_ms:>7.1f} ms"
+              f"{regex_compile:>15}{regex_sub:>11}")
+
+    entries = _entries(ENTRIES)
+    vocab = Vocabulary(entries)
+    sentence = _transcript(entries, 40, seed=1)
+    per = _best_ms(lambda: [vocab.apply(sentence) for _ in range(1000)]) / 1000
+    print(f"\na 40-word dictation with {ENTRIES:,} entries: {per * 1e3:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
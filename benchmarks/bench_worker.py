@@ -0,0 +1,126 @@
+"""Audio worker: tap responsiveness and dropped audio under main-process load.
+
+Part of the suite (`python -m benchmarks run -k worker`, the ring's cost per
+audio block); for the comparison run
+
+    python -m benchmarks.bench_worker
+
+which dictates through the headless harness in real time, in-process and
+with `audio_worker`, while the main process is kept busy. A probe thread
+stands in for the event tap: it asks to wake every 10 ms and records how
+late it actually runs. Dropped audio is what the fake PortAudio stream had
+to discard because the callback fell more than its latency behind.
+"""
+
+import statistics
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from benchmarks import benchmark
+from voicekey.constants import SAMPLE_RATE
+from voicekey.worker import _DATA_OFFSET, RING_SECONDS, _Ring
+
+SECONDS = 4.0
+TAP_INTERVAL = 0.010
+LOADS = ("idle", "python threads", "GIL stalls")
+
+
+@benchmark("worker.ring[write+read]", unit="block")
+def bench_ring():
+    capacity = RING_SECONDS * SAMPLE_RATE
+    shm = shared_memory.SharedMemory(create=True, size=_DATA_OFFSET + capacity * 2)
+    ring = _Ring(shm, capacity)
+    block = np.zeros((480, 1), dtype=np.int16)
+
+    def op():
+        pos = ring.written
+        ring.write(block)
+        ring.read(pos, ring.written)
+
+    yield op
+    ring.samples = None
+    shm.close()
+    shm.unlink()
+
+
+def _load(kind: str, stop: threading.Event) -> list[threading.Thread]:
+    """Keep the main process busy the way a loaded UI thread would."""
+
+    def spin():  # pure Python: gives up the GIL every switch interval
+        while not stop.is_set():
+            sum(i * i for i in range(10_000))
+
+    def stall():  # one long C call: holds the GIL for ~250 ms at a time
+        data = list(np.random.default_rng(0).random(400_000))
+        while not stop.is_set():
+            sorted(data)
+            stop.wait(0.2)
+
+    targets = {"idle": [], "python threads": [spin, spin], "GIL stalls": [stall]}[kind]
+    threads = [threading.Thread(target=t, daemon=True) for t in targets]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def _probe(stop: threading.Event, lateness: list[float]) -> None:
+    due = time.perf_counter() + TAP_INTERVAL
+    while not stop.is_set():
+        time.sleep(max(0.0, due - time.perf_counter()))
+        now = time.perf_counter()
+        lateness.append(now - due)
+        due = max(due + TAP_INTERVAL, now)
+
+
+def run(worker: bool, load: str) -> dict:
+    from voicekey.harness import Harness, fake_sounddevice
+    from voicekey.harness.audio import synth_speech
+    from voicekey.mockserver import ServerConfig
+
+    audio = synth_speech(SECONDS)
+    server = ServerConfig(latency=0.2, chunk_delay=0.02)
+    with Harness(server=server, speed=1.0, cfg={"audio_worker": worker}) as harness:
+        harness.run_session(audio[:SAMPLE_RATE // 10])  # warm-up: imports, connection
+        stop = threading.Event()
+        lateness: list[float] = []
+        probe = threading.Thread(target=_probe, args=(stop, lateness))
+        probe.start()
+        threads = _load(load, stop) + [probe]
+        start = time.perf_counter()
+        text = harness.run_session(audio)
+        wall = time.perf_counter() - start
+        stop.set()
+        for t in threads:
+            t.join()
+        stats = harness.worker.stats()["device"] if worker else dict(fake_sounddevice.stats)
+    lateness.sort()
+    return {
+        "tap_p50": statistics.median(lateness) * 1e3,
+        "tap_p99": lateness[int(len(lateness) * 0.99)] * 1e3,
+        "tap_max": lateness[-1] * 1e3,
+        "dropped_ms": stats["dropped_frames"] / SAMPLE_RATE * 1e3,
+        "overflows": stats["overflows"],
+        "session_s": wall,
+        "ok": text == server.transcript.strip(),
+    }
+
+
+def main() -> None:
+    print(f"{SECONDS:.0f} s real-time dictation; tap probe every {TAP_INTERVAL * 1e3:.0f} ms")
+    print(f"{'load':<16}{'mode':<12}{'tap p50':>9}{'p99':>9}{'max':>9}"
+          f"{'dropped':>11}{'overflows':>11}{'session':>10}")
+    for load in LOADS:
+        for worker in (False, True):
+            r = run(worker, load)
+            mode = "worker" if worker else "in-process"
+            flag = "" if r["ok"] else "  (wrong transcript)"
+            print(f"{load:<16}{mode:<12}{r['tap_p50']:>7.2f}ms{r['tap_p99']:>7.1f}ms"
+                  f"{r['tap_max']:>7.1f}ms{r['dropped_ms']:>9.0f}ms{r['overflows']:>11}"
+                  f"{r['session_s']:>9.2f}s{flag}")
+
+
+if __name__ == "__main__":
+    main()
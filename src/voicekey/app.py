@@ -3,16 +3,22 @@
 import enum
 import sys
 import threading
+from typing import TYPE_CHECKING
 
 import click
-import Quartz
 
-from . import auth, config
-from .display import AudioMeter, StreamingDisplay, console, print_banner
-from .hotkey import HotkeyListener
-from .inserter import insert_text
-from .providers import get_provider
-from .recorder import Recorder
+from . import auth, config, flight, metrics, ui
+from .constants import CHANNELS, SAMPLE_RATE
+from .providers import PROVIDER_KEYS, from_config
+from .startup import profiler
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    from .archive import Archive
+    from .history import History
+    from .hotkey import TapStats
+    from .recorder import Recorder
+    from .vocab import Vocabulary
 
 
 class State(enum.Enum):
@@ -23,118 +29,464 @@ class State(enum.Enum):
 
 
 class App:
-    def __init__(self):
+    """Dictation state machine.
+
+    The keyword arguments replace the real config, Keychain lookup, audio
+    backend, provider, paste function, history store, audio archive and
+    custom vocabulary (used by replay and tests); anything left as None is
+    created normally. The display backend comes from the `display` config
+    value. With persist_stats=False nothing is written to
+    ~/.config/voicekey/stats.json, history and audio are only kept in a
+    History or Archive passed in, and the default vocabulary file isn't read.
+
+    The recorder (numpy, PortAudio), provider (httpx) and paste function
+    (AppKit) are created on first use; warm_up() loads them ahead of time.
+    """
+
+    def __init__(
+        self,
+        cfg: dict | None = None,
+        api_key: str | None = None,
+        recorder: "Recorder | None" = None,
+        provider=None,
+        inserter=None,
+        persist_stats: bool = True,
+        history: "History | None" = None,
+        archive: "Archive | None" = None,
+        vocabulary: "Vocabulary | None" = None,
+    ):
         self.state = State.IDLE
-        self.cfg = config.load()
-        self.api_key = auth.get_api_key()
-        self.recorder = Recorder()
+        self.cfg = cfg if cfg is not None else config.load()
+        self.api_key = api_key if api_key is not None else auth.get_api_key()
         self.overlay = None  # set after import
+        self.hotkey_stats: "TapStats | None" = None  # set once the listener exists
+        self._persist_stats = persist_stats
+        stages = metrics.load().get("stages", {}) if persist_stats else {}
+        self.stage_stats = metrics.StageStats.from_dict(stages)
+        self.flight = flight.FlightRecorder(
+            max_sessions=int(self.cfg.get("flight_sessions", 5)),
+            max_bytes=int(float(self.cfg.get("flight_max_mb", 8)) * (1 << 20)),
+            compress_level=int(self.cfg.get("flight_compress_level", 1)),
+        )
+        self._session: metrics.SessionTimer | None = None
         self._lock = threading.Lock()
-        self._meter = AudioMeter()
-        self._meter_updater: threading.Thread | None = None
-        self._provider = get_provider(self.cfg.get("provider", "openai"))
+        # Press and release can come from the hotkey dispatcher and the daemon's
+        # RPC threads; each runs whole so a release can't stop the recorder
+        # before its press has started it.
+        self._hotkey_lock = threading.Lock()
+        self.ui = ui.get_display(self.cfg.get("display", "auto"))
+        self._meter = self.ui.meter()
+        self._transcriber: threading.Thread | None = None
+        self._load_lock = threading.RLock()  # the worker is loaded from inside other loads
+        self._worker = None
+        self._recorder = self._attach(recorder) if recorder is not None else None
+        self._provider = provider
+        self._owns_provider = provider is None
+        self._insert = inserter
+        self._history = history
+        self._archive = archive
+        self._vocabulary = vocabulary
+        self.last_text = ""   # outcome of the most recent dictation
+        self.last_error = ""
+        self.memory = None    # memprofile.MemoryProfiler with `memory_profile`
+        if self.cfg.get("memory_profile", False):
+            from .memprofile import MemoryProfiler
+            self.memory = MemoryProfiler(MemoryProfiler.default_path() if persist_stats else None)
 
-    def on_hotkey_press(self):
-        """Called on main thread when Option held past debounce."""
-        with self._lock:
-            if self.state != State.IDLE:
-                return
-            self.state = State.RECORDING
+    @property
+    def recorder(self) -> "Recorder":
+        return self._load("_recorder", self._new_recorder)
 
-        self.recorder.start()
-        if self.overlay:
-            self.overlay.show()
+    @property
+    def provider(self):
+        return self._load("_provider", self._new_provider)
 
-        self._meter.start()
-        self._meter_updater = threading.Thread(target=self._poll_levels, daemon=True)
-        self._meter_updater.start()
+    @property
+    def worker(self):
+        """The audio worker process (started on first use; only with `audio_worker`)."""
+        def start():
+            from .worker import AudioWorker
+            return AudioWorker(self.cfg)
 
-    def _poll_levels(self):
-        """Poll recorder RMS and feed it to the audio meter display."""
-        import time
-        while self.state == State.RECORDING:
-            self._meter.update_level(self.recorder.rms)
-            time.sleep(0.05)
+        return self._load("_worker", start)
 
-    def on_hotkey_release(self):
-        """Called on main thread when Option released."""
-        with self._lock:
-            if self.state != State.RECORDING:
-                return
-            self.state = State.TRANSCRIBING
+    @property
+    def inserter(self):
+        def default():
+            from .inserter import insert_text
+            return insert_text
+
+        return self._load("_insert", default)
+
+    @property
+    def history(self) -> "History | None":
+        """Where pasted transcripts are kept (None when `history` is off)."""
+        if not self.cfg.get("history", True) or (self._history is None and not self._persist_stats):
+            return None
+
+        def default():
+            from .history import History
+            return History()
+
+        return self._load("_history", default)
+
+    @property
+    def archive(self) -> "Archive | None":
+        """Where recordings are archived (None unless `archive` is on)."""
+        if not self.cfg.get("archive", False) or (self._archive is None and not self._persist_stats):
+            return None
+
+        def default():
+            from .archive import Archive
+            return Archive(
+                max_bytes=int(float(self.cfg.get("archive_max_mb", 1024)) * (1 << 20)),
+                max_days=float(self.cfg.get("archive_max_days", 30)),
+            )
+
+        return self._load("_archive", default)
 
-        self._meter.stop()
-        wav_data = self.recorder.stop()
-        if self.overlay:
-            self.overlay.hide()
+    @property
+    def vocabulary(self) -> "Vocabulary":
+        """Replacements applied to transcripts (empty without a vocabulary file)."""
+        def default():
+            from . import vocab
 
-        if not wav_data:
-            console.print("  [dim]No audio captured.[/]")
+            path = self.cfg.get("vocabulary", "")
+            if not path and not self._persist_stats:
+                return vocab.Vocabulary()
+            try:
+                return vocab.Vocabulary.from_file(path or vocab.default_path())
+            except FileNotFoundError:
+                if path:
+                    self.ui.print(f"  [red]Vocabulary file not found:[/] {path}")
+                return vocab.Vocabulary.missing(path or vocab.default_path())
+            except (OSError, ValueError) as e:
+                self.ui.print(f"  [red]Vocabulary not loaded:[/] {e}")
+                return vocab.Vocabulary()
+
+        return self._load("_vocabulary", default)
+
+    def warm_up(self) -> None:
+        """Import and create the lazily loaded pieces now rather than on first dictation."""
+        with profiler.phase("warm-up (background)"):
+            _ = self.recorder
+            _ = self.provider
+            _ = self.inserter
+            _ = self.vocabulary
+
+    def reload_config(self) -> list[str]:
+        """Re-read the config file and return the keys whose values changed.
+
+        A provider created by the app is rebuilt on next use when any of
+        PROVIDER_KEYS changes, and a new `input_device` applies from the next
+        recording. The vocabulary is recompiled when `vocabulary` or the file
+        itself changed. The hotkey and display are only read at startup.
+        """
+        new = config.load()
+        changed = sorted(k for k in new.keys() | self.cfg.keys() if new.get(k) != self.cfg.get(k))
+        self.cfg = new
+        if "input_device" in changed and hasattr(self._recorder, "device"):
+            self._recorder.device = new.get("input_device", "")
+        if self._worker is not None:
+            self._worker.reload(new)
+        vocabulary = self._vocabulary
+        if vocabulary is not None and ("vocabulary" in changed or vocabulary.stale()):
+            with self._load_lock:
+                self._vocabulary = None
+        if self._owns_provider and set(PROVIDER_KEYS) & set(changed):
+            with self._load_lock:
+                old, self._provider = self._provider, None
+            if old is not None and hasattr(old, "close"):
+                old.close()
+        return changed
+
+    def _load(self, attr: str, factory):
+        value = getattr(self, attr)
+        if value is None:
+            with self._load_lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = factory()
+                    setattr(self, attr, value)
+        return value
+
+    def _new_recorder(self) -> "Recorder":
+        if self.cfg.get("audio_worker"):
+            from .worker import RemoteRecorder
+            return self._attach(RemoteRecorder(self.worker))
+        from . import devices
+        from .recorder import Recorder
+
+        return self._attach(Recorder(devices.manager(), self.cfg.get("input_device", "")))
+
+    def _new_provider(self):
+        if self.cfg.get("audio_worker"):
+            from .worker import RemoteProvider
+            return RemoteProvider(self.worker)
+        return from_config(self.cfg)
+
+    def close(self) -> None:
+        """Stop the audio worker, if one was started, and finish writing history."""
+        if self._worker is not None:
+            self._worker.close()
+        if self._history is not None:
+            self._history.close()
+        if self._archive is not None:
+            self._archive.close()
+
+    def _attach(self, recorder: "Recorder") -> "Recorder":
+        if self.flight.enabled:
+            recorder.on_frame = self.flight.record_audio
+        recorder.on_level = self._meter.update_level
+        return recorder
+
+    def on_hotkey_press(self) -> bool:
+        """Called on the hotkey dispatch thread when Option held past debounce.
+
+        Returns False (and does nothing) unless the app was idle.
+        """
+        session = metrics.SessionTimer()
+        session.mark("press")
+        with self._hotkey_lock:
             with self._lock:
-                self.state = State.IDLE
-            return
+                if self.state != State.IDLE:
+                    return False
+                self.state = State.RECORDING
+                self._session = session
+                self.last_text = self.last_error = ""
+
+            self.flight.begin_session()
+            self.flight.record(flight.HOTKEY, b"press")
+            self.recorder.start()
+            if self.overlay:
+                self.overlay.show()
+
+            self._meter.start()
+            return True
+
+    def on_hotkey_release(self) -> bool:
+        """Called on the hotkey dispatch thread when Option released.
 
-        t = threading.Thread(target=self._transcribe_and_insert, args=(wav_data,))
-        t.daemon = True
-        t.start()
+        Returns False (and does nothing) unless a recording was in progress.
+        """
+        with self._hotkey_lock:
+            with self._lock:
+                if self.state != State.RECORDING:
+                    return False
+                self.state = State.TRANSCRIBING
+                session = self._session or metrics.SessionTimer()
+                self._session = None
+            session.mark("release")
+            self.flight.record(flight.HOTKEY, b"release")
+
+            self._meter.stop()
+            wav_data = self.recorder.stop()
+            session.mark("encode_done")
+            if self.recorder.first_frame_at is not None:
+                session.marks["first_audio"] = self.recorder.first_frame_at
+            if self.overlay:
+                self.overlay.hide()
+
+            if not wav_data:
+                self.ui.print("  [dim]No audio captured.[/]")
+                self.flight.end_session()
+                with self._lock:
+                    self.state = State.IDLE
+                self._save_stats()
+                return True
+
+            t = threading.Thread(target=self._transcribe_and_insert, args=(wav_data, session))
+            t.daemon = True
+            self._transcriber = t
+            t.start()
+            return True
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until the in-flight transcription (if any) finishes."""
+        with self._hotkey_lock:  # a release still starting its thread
+            t = self._transcriber
+        if t is not None:
+            t.join(timeout)
+        with self._lock:
+            return self.state == State.IDLE
+
+    def transcribe_wav(self, wav_data: bytes, model: str = "", language: str | None = None) -> str:
+        """Transcribe WAV bytes with the configured provider; nothing is pasted."""
+        text = self.provider.transcribe(
+            wav_data,
+            self.api_key,
+            model=model or self.cfg.get("model", "gpt-4o-mini-transcribe"),
+            language=self.cfg.get("language", "") if language is None else language,
+        )
+        return self.vocabulary.apply(text.strip())
+
+    def dump_flight(self):
+        """Write the flight recorder's sessions to disk and return the path."""
+        return self.flight.dump()
+
+    def _transcribe_and_insert(self, wav_data: bytes, session: metrics.SessionTimer):
+        from .vocab import Rewriter
+        from .wav import HEADER_SIZE, WavPayload
+
+        stream_display = self.ui.stream()
+        vocabulary = self.vocabulary
+        rewriter = Rewriter(vocabulary)
+
+        def on_chunk(delta: str) -> None:
+            session.mark_once("first_delta")
+            session.mark("last_delta")
+            self.flight.record_text(flight.SSE, delta)
+            stream_display.append(rewriter.feed(delta))
 
-    def _transcribe_and_insert(self, wav_data: bytes):
-        stream_display = StreamingDisplay()
         try:
             stream_display.start()
-            text = self._provider.transcribe(
+            audio_seconds = max(0, len(wav_data) - HEADER_SIZE) / (2 * SAMPLE_RATE * CHANNELS)
+            recording = wav_data
+            wav_data = self._speed_up(wav_data)
+            text = self.provider.transcribe(
                 wav_data,
                 self.api_key,
                 model=self.cfg.get("model", "gpt-4o-mini-transcribe"),
                 language=self.cfg.get("language", ""),
-                on_chunk=stream_display.append,
+                on_chunk=on_chunk,
+                on_stage=session.mark,
             )
+            stream_display.append(rewriter.finish())
             stream_display.finish()
 
-            text = text.strip()
+            model_text = text.strip()
+            text = vocabulary.apply(model_text)
+            self.last_text = text
             if not text:
-                console.print("  [dim](empty transcription)[/]")
+                self.ui.print("  [dim](empty transcription)[/]")
                 return
 
             with self._lock:
                 self.state = State.INSERTING
-            insert_text(text)
+            self.inserter(text, on_stage=session.mark)
+            self.flight.record_text(flight.INSERT, text)
+            if self.history is not None:
+                self.history.add(text, audio_seconds, self.cfg.get("model", ""))
+            # Only recordings made in this process; with audio_worker the audio stays there.
+            if self.archive is not None and isinstance(recording, WavPayload):
+                marks = session.marks
+                latency = (marks["last_delta"] - marks["release"]) // 1_000_000 \
+                    if "last_delta" in marks and "release" in marks else 0
+                # The model's own words, so re-transcriptions are compared like for like.
+                self.archive.add(recording, model_text, self.cfg.get("model", ""), latency)
 
         except Exception as e:
             stream_display.finish()
-            console.print(f"  [red]Error:[/] {e}")
+            self.last_error = str(e)
+            self.flight.record_text(flight.ERROR, str(e))
+            self.ui.print(f"  [red]Error:[/] {e}")
         finally:
+            # Close this session before the next press can begin another one.
+            self.flight.end_session()
+            self.stage_stats.add(session)
             with self._lock:
                 self.state = State.IDLE
+            self._save_stats()
+            tracer.flush()
+            if self.memory is not None:
+                self.ui.print(f"  [dim]{self.memory.session_end().summary()}[/]")
+
+    def _speed_up(self, wav_data):
+        """Time-compress a recording per the `speedup` settings before upload."""
+        speed = float(self.cfg.get("speedup", 1.0))
+        if speed <= 1.0:
+            return wav_data
+        from . import timestretch
+        from .wav import WavPayload
+
+        if not isinstance(wav_data, WavPayload):
+            return wav_data
+        with tracer.span("time_compress"):
+            return timestretch.speed_up(
+                wav_data, speed,
+                float(self.cfg.get("speedup_max_rate", timestretch.DEFAULT_MAX_RATE)),
+            )
+
+    def _save_stats(self):
+        """Persist stage and listener stats for `voicekey stats` (off the tap thread)."""
+        if not self._persist_stats:
+            return
+        try:
+            metrics.save_section("stages", self.stage_stats.to_dict())
+            if self.hotkey_stats is not None:
+                metrics.save_section("hotkey", self.hotkey_stats.to_dict())
+        except OSError:
+            pass
 
 
-def run():
+def run(trace: bool = False):
     """Launch the app with menu bar icon and hotkey listener."""
-    api_key = auth.get_api_key()
+    with profiler.phase("keychain"):
+        api_key = auth.get_api_key()
     if not api_key:
         click.echo("No API key found. Run `voicekey setup` first.")
         sys.exit(1)
 
-    app = App()
+    with profiler.phase("config + app"):
+        app = App(api_key=api_key)
+
+    with profiler.phase("permissions"):
+        from . import permissions
+        acc_ok = permissions.is_accessibility_trusted()
+        mic_ok = permissions.check_microphone()
+
+    with profiler.phase("banner"):
+        app.ui.banner(app.cfg, accessibility=acc_ok, microphone=mic_ok)
+    if trace:
+        path = tracer.enable()
+        app.ui.print(f"  [dim]Tracing to {path}[/]")
+
+    with profiler.phase("overlay"):
+        from .overlay import Overlay
+        app.overlay = Overlay()
+
+    with profiler.phase("event tap"):
+        install_hotkey(app)
+
+    with profiler.phase("control socket"):
+        control = _serve_control_socket(app)
+
+    with profiler.phase("menu bar"):
+        from .menubar import create_menubar_app
+        menubar = create_menubar_app(app, on_ready=lambda: _warm_up_in_background(app))
+
+    if profiler.enabled:
+        click.echo(profiler.report(), err=True)
+    app.ui.print()
+    try:
+        menubar.run()
+    finally:
+        if control is not None:
+            control.on_shutdown = None  # the run loop has already stopped
+            control.close()
+
 
-    from . import permissions
-    acc_ok = permissions.is_accessibility_trusted()
-    mic_ok = permissions.check_microphone()
+def install_hotkey(app: App):
+    """Create the hotkey event tap and add it to this thread's run loop.
 
-    print_banner(app.cfg, accessibility=acc_ok, microphone=mic_ok)
+    Exits with a hint when Accessibility permission is missing.
+    """
+    import Quartz
 
-    from .overlay import Overlay
-    app.overlay = Overlay()
+    from .hotkey import HotkeyListener, TapStats
 
     listener = HotkeyListener(
         on_press=app.on_hotkey_press,
         on_release=app.on_hotkey_release,
         hotkey=app.cfg.get("hotkey", "option"),
+        on_flags=app.flight.record_key,
     )
+    listener.stats = TapStats.from_dict(metrics.load().get("hotkey", {}))
+    app.hotkey_stats = listener.stats
 
     tap = listener.create_tap()
     if tap is None:
-        console.print(
+        app.ui.print(
             "\n  [red]✗[/] Failed to create event tap.\n"
             "  [dim]Grant Accessibility permission:[/]\n"
             "  System Settings → Privacy & Security → Accessibility\n"
@@ -148,9 +500,35 @@ def run():
         source,
         Quartz.kCFRunLoopCommonModes,
     )
+    return listener
+
+
+def _warm_up_in_background(app: App) -> None:
+    """Load audio, HTTP and paste modules once the menu bar is up."""
+
+    def work():
+        app.warm_up()
+        if profiler.enabled:
+            click.echo(profiler.report(phases=["warm-up (background)"]), err=True)
+
+    threading.Thread(target=work, name="warm-up", daemon=True).start()
+
+
+def _serve_control_socket(app: App):
+    """Answer `voicekey ctl` and `voicekey flight dump` while the menu bar app runs.
+
+    Returns the Daemon, or None when `voicekey serve` already holds the socket.
+    """
+    from .daemon import Daemon
+
+    def quit_app():
+        import rumps
+        from PyObjCTools import AppHelper
 
-    from .menubar import create_menubar_app
-    menubar = create_menubar_app(app)
+        AppHelper.callAfter(rumps.quit_application)
 
-    console.print()
-    menubar.run()
+    try:
+        return Daemon(app, on_shutdown=quit_app).start()
+    except (RuntimeError, OSError) as e:
+        app.ui.print(f"  [dim]No control socket: {e}[/]")
+        return None
@@ -0,0 +1,442 @@
+"""Opt-in archive of dictation audio, for re-transcribing with other models.
+
+Sessions are appended to segment files under ~/.config/voicekey/archive/.
+Each segment is a pair of files:
+
+    NNNNNN.vka   b"VKAR" u16 version, u16 channels, u32 sample rate, then
+                 records: compressed audio, transcript (UTF-8), model (UTF-8)
+    NNNNNN.idx   one fixed-size INDEX record per session (see INDEX_DTYPE)
+
+A record's data is written before its index entry, so a crash leaves at
+worst unindexed bytes at the end of a segment, never an entry pointing at
+missing audio. Readers memory-map both files: the index is a numpy view
+and audio is decompressed straight from the mapping.
+
+Audio is lossless: each second of int16 samples is delta-coded and split
+into high and low byte planes before zlib. That gets speech to about two
+thirds of its size; zlib on the raw samples only gets it to seven eighths.
+
+Appends run on a writer thread; at most MAX_QUEUED_BYTES of recordings wait
+for it, and sessions beyond that are dropped (and counted) rather than held.
+Retention deletes whole segments, oldest first, once the archive is over
+`max_bytes` or a segment's newest session is older than `max_days`.
+"""
+
+import difflib
+import mmap
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .constants import CHANNELS, CONFIG_DIR, SAMPLE_RATE
+from .wav import WavPayload, wav_header
+
+MAGIC = b"VKAR"
+VERSION = 1
+HEADER_SIZE = 12
+SEGMENT_BYTES = 32 << 20   # start a new segment past this size (at most)
+MAX_QUEUED_BYTES = 64 << 20
+FRAME_SAMPLES = SAMPLE_RATE  # delta/byte-split unit
+COMPRESS_LEVEL = 6
+CODEC_DELTA_ZLIB = 1
+
+INDEX_DTYPE = np.dtype([
+    ("created_at", "<f8"),    # time.time() at release
+    ("offset", "<u8"),        # of the record in the .vka file
+    ("audio_bytes", "<u4"),   # compressed
+    ("samples", "<u4"),
+    ("text_bytes", "<u4"),
+    ("latency_ms", "<u4"),    # release → last transcript delta (0 = unknown)
+    ("model_bytes", "<u2"),
+    ("codec", "<u2"),
+])
+_SEGMENT = re.compile(r"^(\d{6})\.vka$")
+
+
+def default_root() -> Path:
+    return Path(CONFIG_DIR).expanduser() / "archive"
+
+
+def parse_since(value: str, now: float | None = None) -> float:
+    """time.time() for "30m", "12h", "7d" ago, or the start of a "YYYY-MM-DD" date."""
+    now = time.time() if now is None else now
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([mhd])", value.strip())
+    if m:
+        return now - float(m.group(1)) * {"m": 60, "h": 3600, "d": 86400}[m.group(2)]
+    try:
+        return time.mktime(time.strptime(value.strip(), "%Y-%m-%d"))
+    except ValueError:
+        raise ValueError(f"expected e.g. 7d, 12h, 30m or 2026-01-31, not {value!r}") from None
+
+
+# ── Codec ───────────────────────────────────────────────────────────
+
+
+def _encode_frames(blocks: Iterator[np.ndarray]) -> Iterator[bytes]:
+    """Delta-coded, byte-split frames of FRAME_SAMPLES (the last may be shorter)."""
+    pending: list[np.ndarray] = []
+    count = 0
+    last = np.int16(0)
+
+    def frame(samples: np.ndarray) -> bytes:
+        nonlocal last
+        delta = np.diff(samples, prepend=last)  # int16 arithmetic wraps, and so does the decoder
+        last = samples[-1]
+        planes = delta.view(np.uint8).reshape(-1, 2)  # little-endian: [low, high]
+        return planes[:, 1].tobytes() + planes[:, 0].tobytes()
+
+    for block in blocks:
+        block = block.reshape(-1).astype("<i2", copy=False)
+        pending.append(block)
+        count += len(block)
+        while count >= FRAME_SAMPLES:
+            joined = np.concatenate(pending)
+            yield frame(joined[:FRAME_SAMPLES])
+            rest = joined[FRAME_SAMPLES:]
+            pending, count = ([rest] if len(rest) else []), len(rest)
+    if count:
+        yield frame(np.concatenate(pending))
+
+
+def compress(blocks: Iterator[np.ndarray], level: int = COMPRESS_LEVEL) -> tuple[bytes, int]:
+    """Compressed audio and its sample count, one frame in memory at a time."""
+    z = zlib.compressobj(level)
+    out = []
+    samples = 0
+    for frame in _encode_frames(blocks):
+        samples += len(frame) // 2
+        out.append(z.compress(frame))
+    out.append(z.flush())
+    return b"".join(out), samples
+
+
+def decompress(data, samples: int) -> np.ndarray:
+    raw = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+    out = np.empty(samples, dtype="<i2")
+    planes = out.view(np.uint8).reshape(-1, 2)
+    last = np.int16(0)
+    for start in range(0, samples, FRAME_SAMPLES):
+        n = min(FRAME_SAMPLES, samples - start)
+        frame = raw[2 * start:2 * (start + n)]
+        planes[start:start + n, 1] = frame[:n]
+        planes[start:start + n, 0] = frame[n:]
+        chunk = out[start:start + n]
+        chunk[:1] += last
+        np.cumsum(chunk, out=chunk)
+        last = chunk[-1]
+    return out
+
+
+# ── Reading ─────────────────────────────────────────────────────────
+
+
+@dataclass
+class Entry:
+    key: str              # "segment:index", stable until retention removes it
+    created_at: float
+    samples: int
+    audio_bytes: int      # compressed size
+    latency_ms: int
+    text: str
+    model: str
+    _segment: "_Segment" = field(repr=False)
+    _offset: int = field(repr=False)
+
+    @property
+    def seconds(self) -> float:
+        return self.samples / (self._segment.rate * self._segment.channels)
+
+    def audio(self) -> np.ndarray:
+        """The recording as int16 samples."""
+        view = memoryview(self._segment.data)[self._offset:self._offset + self.audio_bytes]
+        return decompress(view, self.samples)
+
+    def wav(self) -> bytes:
+        audio = self.audio()
+        return wav_header(audio.nbytes, self._segment.rate, self._segment.channels) + audio.tobytes()
+
+
+class _Segment:
+    def __init__(self, number: int, data_path: Path, index_path: Path):
+        self.number = number
+        with open(data_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.channels, self.rate = np.frombuffer(
+            self.data[:HEADER_SIZE], dtype=[("m", "S4"), ("v", "<u2"), ("c", "<u2"), ("r", "<u4")])[0]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{data_path} isn't a voicekey archive segment")
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._index_map = None
+        size = index_path.stat().st_size if index_path.exists() else 0
+        count = size // INDEX_DTYPE.itemsize  # ignore a torn final record
+        if count:
+            with open(index_path, "rb") as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index = np.frombuffer(self._index_map, dtype=INDEX_DTYPE, count=count)
+            end = index["offset"] + index["audio_bytes"] + index["text_bytes"] + index["model_bytes"]
+            self.index = index[end <= len(self.data)]
+
+    def entries(self, since: float | None = None, until: float | None = None) -> Iterator[Entry]:
+        data = self.data
+        created = self.index["created_at"]
+        keep = np.ones(len(created), dtype=bool)
+        if since is not None:
+            keep &= created >= since
+        if until is not None:
+            keep &= created < until
+        for i in np.flatnonzero(keep):
+            rec = self.index[i]
+            offset = int(rec["offset"])
+            text_at = offset + int(rec["audio_bytes"])
+            model_at = text_at + int(rec["text_bytes"])
+            yield Entry(
+                key=f"{self.number}:{i}",
+                created_at=float(rec["created_at"]),
+                samples=int(rec["samples"]),
+                audio_bytes=int(rec["audio_bytes"]),
+                latency_ms=int(rec["latency_ms"]),
+                text=data[text_at:model_at].decode("utf-8", "replace"),
+                model=data[model_at:model_at + int(rec["model_bytes"])].decode("utf-8", "replace"),
+                _segment=self,
+                _offset=offset,
+            )
+
+
+class Archive:
+    """The archive under `root`: appends through a writer thread, reads via mmap.
+
+    Args:
+        root: Directory holding the segment files.
+        max_bytes: Delete the oldest segments while the archive is bigger.
+        max_days: Delete segments whose newest session is older (0 = keep).
+    """
+
+    def __init__(self, root: str | Path | None = None, max_bytes: int = 1 << 30,
+                 max_days: float = 30.0):
+        self.root = Path(root) if root is not None else default_root()
+        self.max_bytes = max_bytes
+        self.max_days = max_days
+        # Retention deletes whole segments, so keep each to a fraction of the limit.
+        self.segment_bytes = min(SEGMENT_BYTES, max_bytes // 4)
+        self.dropped = 0       # sessions not archived because the writer was behind
+        self.write_errors = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._queued_bytes = 0
+        self._queued_lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+
+    # ── Writing ─────────────────────────────────────────────────────
+
+    def add(self, audio: "WavPayload | np.ndarray", text: str, model: str = "",
+            latency_ms: int = 0, created_at: float | None = None) -> bool:
+        """Queue a session for archiving; False if it was dropped to bound memory."""
+        if isinstance(audio, WavPayload):
+            blocks, nbytes = audio.blocks, audio.nbytes
+        else:
+            blocks, nbytes = [np.asarray(audio)], np.asarray(audio).nbytes
+        with self._queued_lock:
+            if self._queued_bytes + nbytes > MAX_QUEUED_BYTES:
+                self.dropped += 1
+                return False
+            self._queued_bytes += nbytes
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="voicekey-archive",
+                                                daemon=True)
+                self._writer.start()
+        created = time.time() if created_at is None else created_at
+        self._queue.put((blocks, nbytes, text, model, latency_ms, created))
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued so far is on disk."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        with self._queued_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def _write_loop(self) -> None:
+        self._enforce_retention()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            blocks, nbytes, *record = item
+            try:
+                self._append(blocks, *record)
+            except OSError:
+                self.write_errors += 1  # best-effort; never break dictation
+            finally:
+                with self._queued_lock:
+                    self._queued_bytes -= nbytes
+            self._enforce_retention()
+
+    def _append(self, blocks, text: str, model: str, latency_ms: int, created_at: float) -> None:
+        audio, samples = compress(iter(blocks))
+        text_b, model_b = text.encode(), model.encode()[:0xFFFF]
+        number, data_path, index_path = self._current_segment()
+        with open(data_path, "ab") as f:
+            offset = f.tell()
+            f.write(audio)
+            f.write(text_b)
+            f.write(model_b)
+        rec = np.array([(created_at, offset, len(audio), samples, len(text_b),
+                         min(max(0, latency_ms), 0xFFFFFFFF), len(model_b), CODEC_DELTA_ZLIB)],
+                       dtype=INDEX_DTYPE)
+        with open(index_path, "ab") as f:
+            f.write(rec.tobytes())
+
+    def _current_segment(self) -> tuple[int, Path, Path]:
+        numbers = self._segment_numbers()
+        number = numbers[-1] if numbers else 0
+        data_path = self.root / f"{number:06d}.vka"
+        if not numbers or data_path.stat().st_size >= self.segment_bytes:
+            number += 1
+            data_path = self.root / f"{number:06d}.vka"
+            self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+            header = np.array([(MAGIC, VERSION, CHANNELS, SAMPLE_RATE)],
+                              dtype=[("m", "S4"), ("v", "<u2"), ("c", "<u2"), ("r", "<u4")])
+            fd = os.open(data_path, os.O_CREAT | os.O_WRONLY | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(header.tobytes())
+        return number, data_path, data_path.with_suffix(".idx")
+
+    def _enforce_retention(self) -> None:
+        numbers = self._segment_numbers()
+        sizes = {n: self._segment_bytes(n) for n in numbers}
+        total = sum(sizes.values())
+        cutoff = time.time() - self.max_days * 86400 if self.max_days > 0 else None
+        for n in numbers:
+            expired = cutoff is not None and self._newest(n) < cutoff
+            if not expired and total <= self.max_bytes:
+                break
+            for suffix in (".vka", ".idx"):
+                (self.root / f"{n:06d}{suffix}").unlink(missing_ok=True)
+            total -= sizes[n]
+
+    def _segment_numbers(self) -> list[int]:
+        if not self.root.is_dir():
+            return []
+        return sorted(int(m.group(1)) for p in self.root.iterdir() if (m := _SEGMENT.match(p.name)))
+
+    def _segment_bytes(self, number: int) -> int:
+        return sum((self.root / f"{number:06d}{s}").stat().st_size
+                   for s in (".vka", ".idx") if (self.root / f"{number:06d}{s}").exists())
+
+    def _newest(self, number: int) -> float:
+        path = self.root / f"{number:06d}.idx"
+        size = path.stat().st_size if path.exists() else 0
+        if size < INDEX_DTYPE.itemsize:
+            return (self.root / f"{number:06d}.vka").stat().st_mtime
+        with open(path, "rb") as f:
+            f.seek((size // INDEX_DTYPE.itemsize - 1) * INDEX_DTYPE.itemsize)
+            return float(np.frombuffer(f.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)["created_at"][0])
+
+    # ── Reading ─────────────────────────────────────────────────────
+
+    def entries(self, since: float | None = None, until: float | None = None) -> list[Entry]:
+        """Archived sessions, oldest first, optionally within [since, until)."""
+        out = []
+        for number in self._segment_numbers():
+            try:
+                segment = _Segment(number, self.root / f"{number:06d}.vka",
+                                   self.root / f"{number:06d}.idx")
+            except (OSError, ValueError):
+                continue  # deleted by retention meanwhile, or not ours
+            out.extend(segment.entries(since, until))
+        return out
+
+    def nbytes(self) -> int:
+        return sum(self._segment_bytes(n) for n in self._segment_numbers())
+
+
+# ── Re-transcription ────────────────────────────────────────────────
+
+
+@dataclass
+class Comparison:
+    entry: Entry
+    text: str = ""
+    latency_ms: float = 0.0
+    error: str = ""
+
+    @property
+    def changed_words(self) -> int:
+        return word_diff(self.entry.text, self.text)[0]
+
+    @property
+    def word_error_rate(self) -> float:
+        """Word edits from the archived transcript to this one, per archived word."""
+        return self.changed_words / max(1, len(self.entry.text.split()))
+
+
+def word_diff(old: str, new: str) -> tuple[int, str]:
+    """Word edits between two transcripts, and `new` marked up as [-removed-]{+added+}."""
+    a, b = old.split(), new.split()
+    edits = 0
+    out = []
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(a=a, b=b, autojunk=False).get_opcodes():
+        if op == "equal":
+            out.extend(a[i1:i2])
+            continue
+        edits += max(i2 - i1, j2 - j1)
+        if i2 > i1:
+            out.append("[-" + " ".join(a[i1:i2]) + "-]")
+        if j2 > j1:
+            out.append("{+" + " ".join(b[j1:j2]) + "+}")
+    return edits, " ".join(out)
+
+
+def retranscribe(
+    entries: list[Entry],
+    provider,
+    api_key: str,
+    model: str = "",
+    language: str = "",
+    concurrency: int = 4,
+    on_result: Callable[[Comparison], None] | None = None,
+) -> list[Comparison]:
+    """Send archived sessions through `provider`, up to `concurrency` at a time.
+
+    Audio is decompressed just before each request, so memory holds at most
+    `concurrency` recordings. Results come back in archive order;
+    `on_result` sees each one as it finishes, one call at a time.
+    """
+    lock = threading.Lock()
+    kwargs = {"model": model} if model else {}
+
+    def one(entry: Entry) -> Comparison:
+        result = Comparison(entry)
+        try:
+            wav = entry.wav()
+            start = time.perf_counter()
+            result.text = provider.transcribe(wav, api_key, language=language, **kwargs).strip()
+            result.latency_ms = (time.perf_counter() - start) * 1e3
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+        if on_result is not None:
+            with lock:
+                on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="retranscribe") as pool:
+        return list(pool.map(one, entries))
@@ -1,19 +1,27 @@
-"""API key storage via macOS Keychain (keyring)."""
+"""API key storage via macOS Keychain (keyring).
 
-import keyring
+keyring is imported on first use: it is slow to import and most CLI
+commands never touch the Keychain.
+"""
 
 from .constants import KEYCHAIN_SERVICE, KEYCHAIN_USERNAME
 
 
 def get_api_key() -> str | None:
+    import keyring
+
     return keyring.get_password(KEYCHAIN_SERVICE, KEYCHAIN_USERNAME)
 
 
 def set_api_key(key: str) -> None:
+    import keyring
+
     keyring.set_password(KEYCHAIN_SERVICE, KEYCHAIN_USERNAME, key)
 
 
 def delete_api_key() -> None:
+    import keyring
+
     try:
         keyring.delete_password(KEYCHAIN_SERVICE, KEYCHAIN_USERNAME)
     except keyring.errors.PasswordDeleteError:
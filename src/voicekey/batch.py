@@ -0,0 +1,235 @@
+"""Batch transcription of recorded audio files (`voicekey transcribe`).
+
+Files are read from disk one segment at a time: a WAV longer than
+`max_seconds` (or MAX_SEGMENT_BYTES) is split into consecutive segments,
+each re-wrapped as its own WAV and sent through the configured provider.
+At most concurrency + 1 segments are held in memory at once, so a long backlog or a multi-hour
+recording costs no more RAM than a few short clips. Results are reported
+per file, in completion order, as soon as all of a file's segments are done.
+"""
+
+import glob
+import io
+import threading
+import time
+import wave
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+AUDIO_SUFFIXES = (".wav",)
+DEFAULT_SEGMENT_SECONDS = 300.0
+MAX_SEGMENT_BYTES = 24 << 20  # OpenAI rejects uploads over 25 MB, whatever the duration
+
+
+@dataclass
+class Segment:
+    path: Path
+    index: int
+    start: float  # seconds into the file
+    end: float
+    wav: bytes
+
+
+@dataclass
+class FileResult:
+    path: str
+    text: str = ""
+    audio_seconds: float = 0.0
+    segments: list[dict] = field(default_factory=list)  # start, end, text, error per segment
+    error: str = ""
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "text": self.text,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "segments": self.segments,
+            "error": self.error,
+        }
+
+
+@dataclass
+class BatchReport:
+    files: int = 0
+    failed: int = 0
+    segments: int = 0
+    audio_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def realtime_factor(self) -> float:
+        """Seconds of audio transcribed per second of wall time."""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def format(self) -> str:
+        return (
+            f"{self.files} files ({self.failed} failed), {self.segments} segments, "
+            f"{self.audio_seconds / 60:.1f} min of audio in {self.wall_seconds:.1f} s "
+            f"({self.realtime_factor:.1f}x real time)"
+        )
+
+
+def expand_inputs(items: list[str]) -> list[Path]:
+    """Files, directories (searched recursively for audio) and glob patterns, deduplicated."""
+    paths: list[Path] = []
+    for item in items:
+        path = Path(item).expanduser()
+        if path.is_dir():
+            paths.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in AUDIO_SUFFIXES))
+        elif path.exists():
+            paths.append(path)
+        else:
+            paths.extend(sorted(Path(p) for p in glob.glob(str(path), recursive=True)
+                                if Path(p).is_file()))
+    seen = set()
+    return [p for p in paths if not (p.resolve() in seen or seen.add(p.resolve()))]
+
+
+def open_segments(path: Path, max_seconds: float = DEFAULT_SEGMENT_SECONDS) -> tuple[int, Iterator[Segment]]:
+    """Number of segments in a WAV and a generator reading them lazily.
+
+    Raises wave.Error, EOFError or OSError if the file can't be read as PCM WAV.
+    The generator raises OSError("truncated audio") once the data runs out
+    before the header's frame count, after yielding whatever was there.
+    """
+    wf = wave.open(str(path), "rb")
+    try:
+        rate = wf.getframerate()
+        total = wf.getnframes()
+        frame_bytes = wf.getsampwidth() * wf.getnchannels()
+        per_segment = max(1, min(int(max_seconds * rate), MAX_SEGMENT_BYTES // frame_bytes))
+        count = -(-total // per_segment)
+    except BaseException:
+        wf.close()
+        raise
+
+    def read() -> Iterator[Segment]:
+        with wf:
+            for index in range(count):
+                expected = min(per_segment, total - index * per_segment)
+                raw = wf.readframes(expected)
+                frames = len(raw) // frame_bytes
+                start = index * per_segment / rate
+                if frames:
+                    yield Segment(path, index, start, start + frames / rate, _encode(wf, raw))
+                if frames < expected:  # readframes doesn't raise on a cut-off file
+                    raise OSError("truncated audio")
+
+    return count, read()
+
+
+def _encode(source: wave.Wave_read, raw: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(source.getnchannels())
+        out.setsampwidth(source.getsampwidth())
+        out.setframerate(source.getframerate())
+        out.writeframes(raw)
+    return buf.getvalue()
+
+
+class _Pending:
+    """Segments of one file collected until the last one finishes."""
+
+    def __init__(self, path: Path, count: int):
+        self.result = FileResult(str(path))
+        self.parts: list[dict | None] = [None] * count
+        self.remaining = count
+
+
+def transcribe_files(
+    paths: list[Path],
+    provider,
+    api_key: str,
+    model: str = "",
+    language: str = "",
+    concurrency: int = 4,
+    max_seconds: float = DEFAULT_SEGMENT_SECONDS,
+    on_result: Callable[[FileResult], None] | None = None,
+) -> BatchReport:
+    """Transcribe `paths` with up to `concurrency` requests in flight.
+
+    `provider` is shared by all workers, so a pooling provider reuses its
+    connections. `on_result` is called once per file, from one thread at a
+    time, as soon as the file is finished.
+    """
+    report = BatchReport()
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(concurrency + 1)  # one segment read ahead of the workers
+
+    def finish(result: FileResult) -> None:
+        with lock:
+            report.files += 1
+            report.failed += bool(result.error)
+            report.audio_seconds += result.audio_seconds
+            if on_result:
+                on_result(result)
+
+    def done(pending: _Pending) -> None:
+        parts = pending.parts
+        result = pending.result
+        result.segments = parts
+        result.text = " ".join(p["text"] for p in parts if p["text"])
+        result.audio_seconds = sum(p["end"] - p["start"] for p in parts)
+        result.error = next((p["error"] for p in parts if p["error"]), "")
+        finish(result)
+
+    def one(pending: _Pending, segment: Segment) -> None:
+        part = {"start": round(segment.start, 3), "end": round(segment.end, 3), "text": "", "error": ""}
+        try:
+            if segment.end > segment.start:  # a truncated file runs out before its header says
+                kwargs = {"model": model} if model else {}
+                part["text"] = provider.transcribe(segment.wav, api_key, language=language,
+                                                   **kwargs).strip()
+        except Exception as e:
+            part["error"] = str(e) or type(e).__name__
+        finally:
+            slots.release()
+        with lock:
+            report.segments += 1
+            pending.parts[segment.index] = part
+            pending.remaining -= 1
+            last = pending.remaining == 0
+        if last:
+            done(pending)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="transcribe") as pool:
+        for path in paths:
+            if path.suffix.lower() not in AUDIO_SUFFIXES:
+                finish(FileResult(str(path), error="not a WAV file"))
+                continue
+            try:
+                count, segments = open_segments(path, max_seconds)
+            except (OSError, EOFError, wave.Error) as e:
+                finish(FileResult(str(path), error=f"can't read audio: {e}"))
+                continue
+            if count == 0:
+                finish(FileResult(str(path)))
+                continue
+            pending = _Pending(path, count)
+            submitted = 0
+            try:
+                while submitted < count:
+                    slots.acquire()  # before reading, so memory stays bounded
+                    try:
+                        segment = next(segments)
+                    except BaseException:
+                        slots.release()
+                        raise
+                    pool.submit(one, pending, segment)
+                    submitted += 1
+            except OSError as e:
+                # The segments already submitted still finish and report.
+                error = {"start": 0.0, "end": 0.0, "text": "", "error": f"can't read audio: {e}"}
+                with lock:
+                    for i in range(submitted, count):
+                        pending.parts[i] = dict(error)
+                    pending.remaining -= count - submitted
+                    last = pending.remaining == 0
+                if last:
+                    done(pending)
+    report.wall_seconds = time.perf_counter() - start
+    return report
@@ -1,17 +1,33 @@
 """Click CLI: start, setup, config subcommands."""
 
+import sys
+
+from .startup import profiler
+
+if "--profile-startup" in sys.argv[1:]:
+    profiler.enable()  # before anything else is imported
+
 import click
 
-from . import auth, config
+from . import auth, config, metrics
 
 
 @click.group(invoke_without_command=True)
+@click.option("--trace", is_flag=True, help="Write a Perfetto/chrome://tracing trace of this run.")
+@click.option("--profile-startup", is_flag=True,
+              help="Print per-phase and per-import startup timings.")
 @click.pass_context
-def main(ctx):
+def main(ctx, trace, profile_startup):
     """voicekey — voice dictation for macOS."""
+    if profile_startup:
+        profiler.enable()  # no-op if already enabled from sys.argv above
+        profiler.checkpoint()
+        if ctx.invoked_subcommand is not None:
+            ctx.call_on_close(lambda: click.echo(profiler.report(), err=True))
     if ctx.invoked_subcommand is None:
-        from .app import run
-        run()
+        with profiler.phase("import app"):
+            from .app import run
+        run(trace=trace)
 
 
 @main.command()
@@ -55,6 +71,735 @@ def config_cmd(key, value):
     click.echo(f"Set {key} = {value!r}")
 
 
+@main.command()
+@click.option("--reset", is_flag=True, help="Clear all recorded stats.")
+def stats(reset):
+    """Show latency stats recorded by previous runs."""
+    if reset:
+        metrics.reset()
+        click.echo("Stats cleared.")
+        return
+    data = metrics.load()
+    if not data:
+        click.echo("No stats recorded yet. Run `voicekey` and dictate first.")
+        return
+    stages = data.get("stages")
+    if stages:
+        _print_stage_stats(stages)
+    hotkey = data.get("hotkey")
+    if hotkey:
+        if stages:
+            click.echo()
+        _print_hotkey_stats(hotkey)
+
+
+@main.command()
+def devices():
+    """List audio input devices and which one dictation will use."""
+    from . import devices as devices_mod
+    from .constants import CHANNELS, SAMPLE_RATE
+
+    manager = devices_mod.manager()
+    inputs = manager.inputs()
+    if not inputs:
+        click.echo("No audio input devices found.")
+        return
+    preferred = config.load().get("input_device", "")
+    chosen = manager.resolve(preferred, SAMPLE_RATE, CHANNELS)
+    for d in inputs:
+        mark = "*" if d == chosen else " "
+        note = " (system default)" if d.default else ""
+        click.echo(f"{mark} {d.name}{note}: {d.channels} ch, {d.samplerate:.0f} Hz, "
+                   f"{d.low_latency * 1e3:.0f}–{d.high_latency * 1e3:.0f} ms latency")
+    if preferred and preferred.casefold() not in chosen.name.casefold():
+        click.echo(f"\ninput_device {preferred!r} isn't available; using the system default.")
+
+
+@main.command()
+@click.option("--refresh", is_flag=True, help="Rescan installed plugins instead of using the cache.")
+def providers(refresh):
+    """List transcription providers, built in and from installed plugins."""
+    from . import providers as providers_mod
+    from .providers.plugins import discover
+
+    found = discover(refresh)
+    configured = config.load().get("provider", "openai")
+    for name, info in sorted(providers_mod.available().items()):
+        mark = "*" if name == configured else " "
+        source = "built in" if name in providers_mod.BUILTIN else info.module
+        streaming = ", streaming input" if info.streaming_input else ""
+        click.echo(f"{mark} {name}: {'/'.join(info.formats)}, {info.sample_rate} Hz{streaming} ({source})")
+        if info.description:
+            click.echo(f"    {info.description}")
+    for error in found.errors:
+        click.echo(f"Skipped {error}", err=True)
+    click.echo(f"\nPlugins {'read from cache' if found.cached else 'scanned'}: "
+               f"{len(found.providers)} found.", err=True)
+
+
+@main.command()
+@click.argument("text", required=False)
+def vocab(text):
+    """Check the vocabulary file and show what it does to TEXT (or stdin)."""
+    from . import vocab as vocab_mod
+
+    path = config.load().get("vocabulary", "") or vocab_mod.default_path()
+    try:
+        vocabulary = vocab_mod.Vocabulary.from_file(path)
+    except FileNotFoundError:
+        click.echo(f"No vocabulary file at {path}.", err=True)
+        raise SystemExit(1)
+    except ValueError as e:
+        click.echo(str(e), err=True)
+        raise SystemExit(1)
+    click.echo(f"{path}: {vocabulary.size} entries, compiled in "
+               f"{vocabulary.compile_seconds * 1e3:.0f} ms", err=True)
+    if text is None and not sys.stdin.isatty():
+        text = sys.stdin.read()
+    if text is not None:
+        click.echo(vocabulary.apply(text))
+
+
+@main.group()
+def history():
+    """Search and re-insert past dictations."""
+
+
+@history.command("search")
+@click.argument("query", nargs=-1)
+@click.option("-n", "--limit", type=click.IntRange(min=1), default=20, show_default=True,
+              help="Entries per page.")
+@click.option("--before", type=int, default=None, help="Only entries older than this id (the next page).")
+def history_search(query, limit, before):
+    """Find dictations containing every word of QUERY, newest first (no QUERY: most recent)."""
+    import shlex
+    import time
+
+    from .history import History
+
+    store = History()
+    entries = store.search(" ".join(query), limit + 1, before)
+    if not entries:
+        click.echo("No matching dictations." if query or before else "No dictations in history yet.")
+        return
+    for entry in entries[:limit]:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.created_at))
+        line = " ".join((entry.snippet or entry.text).split())
+        click.echo(f"{entry.id:>7}  {when}  {line[:90] + '…' if len(line) > 90 else line}")
+    if len(entries) > limit:
+        args = shlex.join(query)
+        click.echo(f"\nNext page: voicekey history search {args + ' ' if args else ''}"
+                   f"--before {entries[limit - 1].id}")
+
+
+@history.command("show")
+@click.argument("entry_id", type=int)
+def history_show(entry_id):
+    """Print one dictation in full."""
+    import time
+
+    from .history import History
+
+    entry = History().get(entry_id)
+    if entry is None:
+        click.echo(f"No dictation with id {entry_id}.", err=True)
+        raise SystemExit(1)
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.created_at))
+    click.echo(f"#{entry.id}  {when}  {entry.audio_seconds:.1f}s audio  {entry.model}\n")
+    click.echo(entry.text)
+
+
+@history.command("reinsert")
+@click.argument("entry_id", type=int)
+@click.option("--delay", default=2.0, show_default=True,
+              help="Seconds to wait first, to switch to the window it should go into.")
+def history_reinsert(entry_id, delay):
+    """Paste a past dictation into the frontmost app."""
+    import time
+
+    from .history import History
+
+    entry = History().get(entry_id)
+    if entry is None:
+        click.echo(f"No dictation with id {entry_id}.", err=True)
+        raise SystemExit(1)
+    if delay > 0:
+        click.echo(f"Pasting #{entry.id} in {delay:g} s…", err=True)
+        time.sleep(delay)
+    from .inserter import insert_text
+    insert_text(entry.text)
+
+
+@main.group()
+def archive():
+    """List and re-transcribe archived recordings (see the `archive` setting)."""
+
+
+def _archived(keys, since, last):
+    from . import archive as archive_mod
+
+    try:
+        since_ts = archive_mod.parse_since(since) if since else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--since")
+    entries = archive_mod.Archive().entries(since=since_ts)
+    if keys:
+        wanted = set(keys)
+        entries = [e for e in entries if e.key in wanted]
+    return entries[-last:] if last else entries
+
+
+@archive.command("list")
+@click.option("--since", default=None, help="Only recordings from the last 7d / 12h / 30m, or since a date.")
+@click.option("--last", type=int, default=20, show_default=True, help="Newest N (0 = all).")
+def archive_list(since, last):
+    """Show archived recordings, oldest first."""
+    import time
+
+    from . import archive as archive_mod
+
+    entries = _archived((), since, last)
+    if not entries:
+        click.echo("No archived recordings.")
+        return
+    for e in entries:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(e.created_at))
+        text = " ".join(e.text.split())
+        click.echo(f"{e.key:>9}  {when}  {e.seconds:6.1f}s  {e.latency_ms:>6} ms  {e.model:<24} "
+                   f"{text[:60] + '…' if len(text) > 60 else text}")
+    total = archive_mod.Archive().nbytes()
+    click.echo(f"\n{len(entries)} shown; archive is {total / (1 << 20):.1f} MB on disk")
+
+
+@archive.command("retranscribe")
+@click.argument("keys", nargs=-1)
+@click.option("--since", default=None, help="Only recordings from the last 7d / 12h / 30m, or since a date.")
+@click.option("--last", type=int, default=0, help="Only the newest N.")
+@click.option("--provider", "provider_name", default=None, help="Provider to use (default: configured provider).")
+@click.option("--model", default="", help="Model to use (default: configured model).")
+@click.option("--api-base", default=None, help="Base URL of an OpenAI-compatible API.")
+@click.option("--language", default=None, help="Language code (default: configured language).")
+@click.option("-j", "--concurrency", type=click.IntRange(min=1), default=4, show_default=True,
+              help="Requests in flight at once.")
+@click.option("--all", "show_all", is_flag=True, help="Also print sessions whose transcript didn't change.")
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Also write results as JSON lines.")
+def archive_retranscribe(keys, since, last, provider_name, model, api_base, language, concurrency,
+                         show_all, json_path):
+    """Re-transcribe archived recordings (KEYS from `archive list`) and diff the transcripts."""
+    import json
+    import statistics
+
+    from .archive import retranscribe, word_diff
+    from .providers import from_config
+
+    entries = _archived(keys, since, last)
+    if not entries:
+        click.echo("No archived recordings match.", err=True)
+        raise SystemExit(1)
+    api_key = auth.get_api_key()
+    if not api_key:
+        click.echo("No API key found. Run `voicekey setup` first.", err=True)
+        raise SystemExit(1)
+    cfg = config.load()
+    overrides = {"provider": provider_name, "api_base": api_base, "model": model or None}
+    cfg.update({k: v for k, v in overrides.items() if v is not None})
+    try:
+        provider = from_config(cfg)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--provider")
+    out = open(json_path, "w") if json_path else None
+
+    def on_result(r) -> None:
+        edits, diff = word_diff(r.entry.text, r.text)
+        if out is not None:
+            out.write(json.dumps({
+                "key": r.entry.key, "seconds": round(r.entry.seconds, 3),
+                "archived": {"model": r.entry.model, "text": r.entry.text, "latency_ms": r.entry.latency_ms},
+                "new": {"model": cfg.get("model", ""), "text": r.text,
+                        "latency_ms": round(r.latency_ms, 1), "error": r.error},
+                "word_edits": edits,
+            }) + "\n")
+        if r.error:
+            click.echo(f"{r.entry.key:>9}  error: {r.error}", err=True)
+        elif edits or show_all:
+            click.echo(f"{r.entry.key:>9}  {r.entry.latency_ms:>6} → {r.latency_ms:>6.0f} ms  "
+                       f"{r.word_error_rate:6.1%}  {diff}")
+
+    try:
+        results = retranscribe(entries, provider, api_key, model=cfg.get("model", ""),
+                               language=cfg.get("language", "") if language is None else language,
+                               concurrency=concurrency, on_result=on_result)
+    finally:
+        if out is not None:
+            out.close()
+    ok = [r for r in results if not r.error]
+    if ok:
+        words = sum(len(r.entry.text.split()) for r in ok)
+        edits = sum(r.changed_words for r in ok)
+        old = [r.entry.latency_ms for r in ok if r.entry.latency_ms]
+        click.echo(f"\n{len(ok)} recordings with {cfg.get('model', '')}: "
+                   f"{sum(not r.changed_words for r in ok)} identical, "
+                   f"{edits} of {words} words changed ({edits / max(1, words):.1%})")
+        click.echo(f"latency p50: archived {statistics.median(old) if old else 0:.0f} ms, "
+                   f"now {statistics.median(r.latency_ms for r in ok):.0f} ms")
+    if len(ok) < len(results):
+        click.echo(f"{len(results) - len(ok)} failed", err=True)
+        raise SystemExit(1)
+
+
+@main.group()
+def flight():
+    """Save and replay the flight recorder's recent sessions."""
+
+
+@flight.command("dump")
+def flight_dump():
+    """Ask the running voicekey to save its flight recording."""
+    click.echo(f"Flight recording saved to {_ctl_call('dump_flight')['path']}")
+
+
+@flight.command("replay")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--session", "index", type=int, default=None, help="Replay only this session (0 = oldest).")
+@click.option("--speed", type=float, default=0.0, show_default=True,
+              help="1 = original timing, 0 = as fast as possible.")
+@click.option("--live", is_flag=True,
+              help="Transcribe the replayed audio with the configured provider "
+                   "instead of feeding back the recorded response.")
+def flight_replay(path, index, speed, live):
+    """Replay a flight recording through the app with fake audio and paste.
+
+    The current config and vocabulary are applied, so a mismatch means the
+    app would now paste something different from what it did then.
+    """
+    from . import flight as flight_mod
+    from . import vocab as vocab_mod
+    from .replay import replay_session
+
+    sessions = flight_mod.load(path)
+    if not sessions:
+        click.echo("Recording contains no sessions.")
+        return
+    cfg = config.load()
+    vocab_path = cfg.get("vocabulary", "") or vocab_mod.default_path()
+    try:
+        vocabulary = vocab_mod.Vocabulary.from_file(vocab_path)
+    except FileNotFoundError:
+        if cfg.get("vocabulary"):
+            click.echo(f"No vocabulary file at {vocab_path}.", err=True)
+            raise SystemExit(1)
+        vocabulary = vocab_mod.Vocabulary()
+    except ValueError as e:
+        click.echo(str(e), err=True)
+        raise SystemExit(1)
+    provider, api_key = None, ""
+    if live:
+        from .providers import from_config
+
+        api_key = auth.get_api_key()
+        if not api_key:
+            click.echo("No API key found. Run `voicekey setup` first.", err=True)
+            raise SystemExit(1)
+        try:
+            provider = from_config(cfg)
+        except ValueError as e:
+            click.echo(str(e), err=True)
+            raise SystemExit(1)
+    click.echo(f"Replaying with {cfg.get('provider', 'openai') if live else 'the recorded responses'}, "
+               f"{vocabulary.size} vocabulary entries.", err=True)
+    indices = range(len(sessions)) if index is None else [index]
+    mismatches = 0
+    for i in indices:
+        result = replay_session(sessions[i], index=i, speed=speed, cfg=cfg, vocabulary=vocabulary,
+                                provider=provider, api_key=api_key)
+        status = "ok" if result.matches else "MISMATCH"
+        note = " (audio truncated)" if result.truncated else ""
+        click.echo(f"session {i}: {result.audio_seconds:.1f}s audio, {status}{note}")
+        if not result.matches:
+            mismatches += 1
+            click.echo(f"  recorded: {result.recorded!r}")
+            click.echo(f"  replayed: {result.replayed!r}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("-j", "--concurrency", type=click.IntRange(min=1), default=4, show_default=True,
+              help="Requests in flight at once.")
+@click.option("--format", "fmt", type=click.Choice(["jsonl", "text"]), default="jsonl", show_default=True)
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Write results here instead of stdout.")
+@click.option("--max-seconds", type=click.FloatRange(min=1.0), default=300.0, show_default=True,
+              help="Split files longer than this into segments.")
+@click.option("--model", default="", help="Model to use (default: configured model).")
+@click.option("--language", default=None, help="Language code (default: configured language).")
+def transcribe(inputs, concurrency, fmt, output, max_seconds, model, language):
+    """Transcribe WAV files, directories or glob patterns."""
+    import json
+    import time
+
+    from .batch import expand_inputs, transcribe_files
+    from .providers import from_config
+
+    paths = expand_inputs(inputs)
+    if not paths:
+        click.echo("No audio files found.", err=True)
+        raise SystemExit(1)
+    api_key = auth.get_api_key()
+    if not api_key:
+        click.echo("No API key found. Run `voicekey setup` first.", err=True)
+        raise SystemExit(1)
+    cfg = config.load()
+    provider = from_config(cfg)
+
+    out = open(output, "w") if output else sys.stdout
+    progress = sys.stderr.isatty()
+    done = [0, 0.0]  # files, audio seconds
+    start = time.perf_counter()
+
+    def on_result(result) -> None:
+        if fmt == "jsonl":
+            out.write(json.dumps(result.to_dict()) + "\n")
+        elif not result.error:
+            out.write(f"{result.path}: {result.text}\n")
+        out.flush()
+        if result.error:
+            click.echo(f"{result.path}: {result.error}", err=True)
+        done[0] += 1
+        done[1] += result.audio_seconds
+        if progress:
+            elapsed = time.perf_counter() - start
+            click.echo(f"\r{done[0]}/{len(paths)} files, {done[1] / elapsed:.1f}x real time ",
+                       nl=False, err=True)
+
+    try:
+        report = transcribe_files(
+            paths,
+            provider,
+            api_key,
+            model=model or cfg.get("model", ""),
+            language=cfg.get("language", "") if language is None else language,
+            concurrency=concurrency,
+            max_seconds=max_seconds,
+            on_result=on_result,
+        )
+    finally:
+        if output:
+            out.close()
+    if progress:
+        click.echo(err=True)
+    click.echo(report.format(), err=True)
+    limiter = getattr(provider, "limiter", None)
+    if limiter is not None and limiter.stats.throttled:
+        snap = limiter.snapshot()
+        click.echo(f"rate limited {snap['throttled']} times, {snap['retries']} retries, "
+                   f"concurrency settled at {snap['concurrency_limit']:g}", err=True)
+    if report.failed:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False),
+              help="Control socket path (default ~/.config/voicekey/voicekey.sock).")
+@click.option("--hotkey/--no-hotkey", default=True, show_default=True,
+              help="Also listen for the dictation hotkey.")
+def serve(socket_path, hotkey):
+    """Run resident, controlled over a local socket (see `voicekey ctl`)."""
+    from .daemon import serve as serve_daemon
+
+    serve_daemon(socket_path, hotkey=hotkey)
+
+
+@main.group()
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False),
+              help="Control socket path (default ~/.config/voicekey/voicekey.sock).")
+@click.pass_context
+def ctl(ctx, socket_path):
+    """Control a running voicekey (`voicekey serve` or the menu bar app)."""
+    ctx.obj = socket_path
+
+
+def _ctl_call(method: str, **params):
+    from .client import Client, RPCError
+
+    try:
+        with Client(click.get_current_context().obj) as client:
+            return client.call(method, **params)
+    except RPCError as e:
+        click.echo(f"Error: {e.message}", err=True)
+        raise SystemExit(1)
+    except OSError:
+        click.echo("voicekey doesn't appear to be running.", err=True)
+        raise SystemExit(1)
+
+
+@ctl.command("ping")
+def ctl_ping():
+    """Check the daemon is up."""
+    result = _ctl_call("ping")
+    click.echo(f"voicekey serve pid {result['pid']}, up {result['uptime_seconds']:.0f} s")
+
+
+@ctl.command("start")
+def ctl_start():
+    """Start recording."""
+    _ctl_call("start_recording")
+
+
+@ctl.command("stop")
+@click.option("--no-wait", is_flag=True, help="Return without waiting for the transcript.")
+def ctl_stop(no_wait):
+    """Stop recording and print the transcript."""
+    result = _ctl_call("stop_recording", wait=not no_wait)
+    if result.get("error"):
+        click.echo(f"Error: {result['error']}", err=True)
+        raise SystemExit(1)
+    if result.get("text"):
+        click.echo(result["text"])
+
+
+@ctl.command("transcribe")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--model", default="", help="Model to use (default: configured model).")
+@click.option("--language", default=None, help="Language code (default: configured language).")
+def ctl_transcribe(paths, model, language):
+    """Transcribe WAV files with the daemon's warm client."""
+    import os
+
+    for path in paths:
+        result = _ctl_call("transcribe_file", path=os.path.abspath(path), model=model, language=language)
+        click.echo(result["text"])
+
+
+@ctl.command("stats")
+def ctl_stats():
+    """Show the daemon's latency stats since it started."""
+    result = _ctl_call("stats")
+    click.echo(f"state: {result['state']}, up {result['uptime_seconds']:.0f} s")
+    for name, s in result["stages"].items():
+        click.echo(f"  {name:<18}n={s['count']:<6}p50 {s['p50']:7.2f} ms  p90 {s['p90']:7.2f} ms  "
+                   f"p99 {s['p99']:7.2f} ms  max {s['max']:7.2f} ms")
+    limits = result.get("provider")
+    if limits:
+        click.echo(f"provider: {limits['requests']} requests, {limits['throttled']} throttled, "
+                   f"{limits['retries']} retries, concurrency limit {limits['concurrency_limit']:g}")
+
+
+@ctl.command("reload")
+def ctl_reload():
+    """Re-read config.toml."""
+    changed = _ctl_call("reload_config")["changed"]
+    click.echo(f"Reloaded; changed: {', '.join(changed)}" if changed else "Reloaded; nothing changed.")
+
+
+@ctl.command("dump")
+def ctl_dump():
+    """Save the daemon's flight recording."""
+    click.echo(f"Flight recording saved to {_ctl_call('dump_flight')['path']}")
+
+
+@ctl.command("shutdown")
+def ctl_shutdown():
+    """Stop the daemon."""
+    _ctl_call("shutdown")
+
+
+@main.command()
+@click.argument("wavs", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option("--sessions", default=20, show_default=True, help="Dictations to run.")
+@click.option("--speed", default=0.0, show_default=True,
+              help="Audio playback speed (1 = real time, 0 = as fast as possible).")
+@click.option("--latency", default=0.2, show_default=True, help="Server delay before first delta (s).")
+@click.option("--chunk-delay", default=0.02, show_default=True, help="Server delay between deltas (s).")
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Also write the report as JSON.")
+def harness(wavs, sessions, speed, latency, chunk_delay, json_path):
+    """Benchmark the full pipeline headlessly against a local stand-in server."""
+    import json
+
+    from .harness import run_benchmark
+    from .harness.audio import load_wav, synth_speech
+    from .mockserver import ServerConfig
+
+    clips = [load_wav(p) for p in wavs] or [synth_speech(3.0)]
+    report = run_benchmark(
+        clips,
+        sessions=sessions,
+        speed=speed,
+        server=ServerConfig(latency=latency, chunk_delay=chunk_delay),
+    )
+    click.echo(report.format())
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    if report.failures:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option("--sessions", default=4000, show_default=True, help="Dictations to run after warm-up.")
+@click.option("--seconds", default=1.0, show_default=True, help="Length of each clip (s).")
+@click.option("--tracemalloc", "trace_memory", is_flag=True,
+              help="Trace allocations and report growth by subsystem (much slower).")
+@click.option("--max-rss-growth", default=20.0, show_default=True, help="Allowed RSS growth (MB).")
+@click.option("--max-rss-slope", default=1.0, show_default=True,
+              help="Allowed RSS trend over the second half (MB per 1000 sessions).")
+@click.option("--max-extra-threads", default=4, show_default=True)
+@click.option("--max-extra-fds", default=8, show_default=True)
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Also write the report as JSON.")
+def soak(sessions, seconds, trace_memory, max_rss_growth, max_rss_slope, max_extra_threads,
+         max_extra_fds, json_path):
+    """Run thousands of headless dictations and check RSS, threads and fds stay bounded."""
+    import json
+
+    from .harness.soak import Limits, run_soak
+
+    limits = Limits(max_rss_growth, max_rss_slope, max_extra_threads, max_extra_fds)
+    report = run_soak(
+        sessions=sessions,
+        seconds=seconds,
+        limits=limits,
+        trace_memory=trace_memory,
+        on_sample=lambda s: click.echo(
+            f"  {s.session:>6}  {s.seconds:7.1f} s  rss {s.rss_mb:6.1f} MB  "
+            f"threads {s.threads}  fds {s.fds}", err=True),
+    )
+    click.echo(report.format())
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    if report.violations:
+        raise SystemExit(1)
+
+
+@main.command("hotkey-stress")
+@click.option("--seeds", default=20, show_default=True, help="Runs, with seeds 0..N-1 (or from --seed).")
+@click.option("--seed", "first_seed", default=0, show_default=True, help="First seed (replays a failure).")
+@click.option("--events", default=10_000, show_default=True, help="Flag-change events per run.")
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Also write the reports as JSON.")
+def hotkey_stress(seeds, first_seed, events, json_path):
+    """Check the hotkey listener and app state machine under random interleavings."""
+    import json
+
+    from .harness.hotkey_stress import run_stress
+
+    reports = []
+    for seed in range(first_seed, first_seed + seeds):
+        reports.append(run_stress(seed, events))
+        click.echo(reports[-1].format())
+    total = sum(r.events for r in reports)
+    seconds = sum(r.wall_seconds for r in reports)
+    failed = [r.seed for r in reports if r.violations]
+    click.echo(f"\n{total} events in {seconds:.2f} s ({total / max(seconds, 1e-9):,.0f} events/s); "
+               + (f"FAILED seeds: {', '.join(map(str, failed))}" if failed else "all invariants held"))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump([r.to_dict() for r in reports], f, indent=2)
+    if failed:
+        raise SystemExit(1)
+
+
+@main.command("mock-server")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8000, show_default=True)
+@click.option("--latency", default="0.2", show_default=True,
+              help='Delay before the first delta: seconds or "uniform:LO:HI", '
+                   '"normal:MEAN:SD", "lognormal:MEDIAN:SIGMA", "exp:MEAN".')
+@click.option("--chunk-delay", default="0.02", show_default=True, help="Delay between deltas (same syntax).")
+@click.option("--words-per-chunk", default=1, show_default=True)
+@click.option("--transcript", default="", help="Fixed transcript (default: derived from the audio).")
+@click.option("--engine", type=click.Choice(["hash", "tones"]), default="hash", show_default=True,
+              help="How transcripts are derived from audio: hashed, or decoded from tone-coded words.")
+@click.option("--error-429", default=0.0, show_default=True, help="Fraction of requests rejected with 429.")
+@click.option("--error-500", default=0.0, show_default=True, help="Fraction of requests failing with 500.")
+@click.option("--stall", default=0.0, show_default=True, help="Fraction of streams that stall.")
+@click.option("--stall-seconds", default=10.0, show_default=True)
+@click.option("--retry-after", default=1.0, show_default=True, help="Retry-After sent with 429s.")
+@click.option("--max-rps", default=0.0, show_default=True,
+              help="Reject requests above this rate with 429 (0 = no ceiling).")
+@click.option("--seed", default=0, show_default=True)
+def mock_server(host, port, **options):
+    """Serve a local OpenAI-compatible transcription stand-in."""
+    from .mockserver import MockServer, ServerConfig
+
+    try:
+        server_config = ServerConfig(**options)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    server = MockServer(server_config, host=host, port=port)
+    click.echo(f"Serving on {server.url} (set api_base to this); Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        click.echo(f"\n{server.stats.to_dict()}")
+
+
+@main.command()
+@click.argument("corpus", nargs=-1, type=click.Path(exists=True))
+@click.option("--url", default="http://127.0.0.1:8000/v1", show_default=True, help="API root to load.")
+@click.option("--requests", "n_requests", default=200, show_default=True)
+@click.option("--concurrency", default=8, show_default=True)
+@click.option("--model", default="", help="Model to request (default: provider default).")
+@click.option("--api-key", default="sk-loadgen", show_default=True)
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Also write the report as JSON.")
+def loadgen(corpus, url, n_requests, concurrency, model, api_key, json_path):
+    """Replay WAV files (or synthetic speech) concurrently and report latency."""
+    import json
+    from pathlib import Path
+
+    from .harness.audio import encode_wav, synth_speech
+    from .loadgen import run_load
+    from .mockserver import wav_seconds
+
+    paths = []
+    for item in map(Path, corpus):
+        paths.extend(sorted(item.rglob("*.wav")) if item.is_dir() else [item])
+    clips = [p.read_bytes() for p in paths]
+    if not clips:
+        clips = [encode_wav(synth_speech(s, seed=s)) for s in (2, 4, 8)]
+    report = run_load(url, [(c, wav_seconds(c)) for c in clips], n_requests, concurrency,
+                      api_key=api_key, model=model)
+    click.echo(report.format())
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+
+def _format_hist(label: str, hist: metrics.Histogram) -> str:
+    return (
+        f"  {label:<18}n={hist.count:<6}"
+        f"p50 {hist.percentile(50) / 1000:7.2f} ms  "
+        f"p90 {hist.percentile(90) / 1000:7.2f} ms  "
+        f"p99 {hist.percentile(99) / 1000:7.2f} ms  "
+        f"max {hist.max / 1000:7.2f} ms"
+    )
+
+
+def _print_stage_stats(section: dict) -> None:
+    stats = metrics.StageStats.from_dict(section)
+    click.echo("Dictation stages")
+    for name, hist in stats.hists.items():
+        if hist.count:
+            click.echo(_format_hist(name, hist))
+
+
+def _print_hotkey_stats(section: dict) -> None:
+    click.echo("Hotkey event tap")
+    click.echo(_format_hist("tap callback", metrics.Histogram.from_dict(section.get("callback_us", {}))))
+    click.echo(_format_hist("handlers", metrics.Histogram.from_dict(section.get("handler_us", {}))))
+    click.echo(
+        f"  {'tap disabled':<18}{section.get('disabled_by_timeout', 0)} by timeout, "
+        f"{section.get('disabled_by_user_input', 0)} by user input"
+    )
+    click.echo(f"  {'over budget':<18}{section.get('over_budget', 0)} callbacks")
+    slow = f"{section.get('slow_handlers', 0)} handlers"
+    if section.get("last_slow"):
+        slow += f" (last: {section['last_slow']})"
+    click.echo(f"  {'slow':<18}{slow}")
+
+
 def _prompt_api_key():
     key = click.prompt("API key", hide_input=True)
     key = key.strip()
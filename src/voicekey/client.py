@@ -0,0 +1,137 @@
+"""Thin client for the `voicekey serve` control socket.
+
+Standard library only, so scripts and other tools can drive a running
+daemon without paying for voicekey's own imports:
+
+    python -m voicekey.client stop_recording
+    python -m voicekey.client transcribe_file path=/tmp/note.wav
+
+The protocol is JSON-RPC 2.0 with one JSON object per line.
+"""
+
+import itertools
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+from .constants import CONFIG_DIR, SOCKET_FILE
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+APP_ERROR = -32000  # the method ran and failed (busy, provider error, ...)
+
+MAX_LINE = 1 << 20  # longest request or response line accepted
+
+
+def default_socket_path() -> Path:
+    return Path(CONFIG_DIR).expanduser() / SOCKET_FILE
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Client:
+    """One connection to the daemon; calls are sent one at a time.
+
+    Args:
+        path: Socket path (default ~/.config/voicekey/voicekey.sock).
+        timeout: Seconds to wait for a reply; stop_recording waits for the
+            transcription, so this is generous by default.
+    """
+
+    def __init__(self, path: str | Path | None = None, timeout: float = 120.0):
+        self.path = Path(path) if path is not None else default_socket_path()
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._file = None
+        self._ids = itertools.count(1)
+
+    def connect(self) -> "Client":
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(str(self.path))
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+            self._file = sock.makefile("rb")
+        return self
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+    def __enter__(self) -> "Client":
+        return self.connect()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def call(self, method: str, **params):
+        """Invoke `method` and return its result; raises RPCError on failure."""
+        self.connect()
+        request_id = next(self._ids)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        self._sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self._file.readline(MAX_LINE)
+        if not line:
+            self.close()
+            raise ConnectionError("voicekey closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise RPCError(error.get("code", APP_ERROR), error.get("message", ""))
+        return response.get("result")
+
+
+def _parse_param(item: str) -> tuple[str, object]:
+    key, sep, raw = item.partition("=")
+    if not sep:
+        raise ValueError(f"expected key=value, got {item!r}")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw  # bare strings don't need quoting
+    return key, value
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if not args or args[0] in ("-h", "--help"):
+        print("usage: python -m voicekey.client METHOD [key=value ...]", file=sys.stderr)
+        return 2
+    try:
+        params = dict(map(_parse_param, args[1:]))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args[0] == "transcribe_file" and "path" in params:
+        params["path"] = os.path.abspath(params["path"])  # the daemon has its own cwd
+    try:
+        with Client(os.environ.get("VOICEKEY_SOCKET")) as client:
+            result = client.call(args[0], **params)
+    except RPCError as e:
+        print(f"error {e.code}: {e.message}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"voicekey serve doesn't appear to be running ({e})", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
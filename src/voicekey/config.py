@@ -3,8 +3,6 @@
 import tomllib
 from pathlib import Path
 
-import tomli_w
-
 from .constants import CONFIG_DIR, CONFIG_FILE, DEFAULT_MODEL, DEFAULT_PROVIDER
 
 DEFAULTS = {
@@ -12,6 +10,24 @@ DEFAULTS = {
     "model": DEFAULT_MODEL,
     "hotkey": "option",  # "option", "left_option", "right_option"
     "language": "",      # empty = auto-detect
+    "api_base": "",      # empty = provider default; set for OpenAI-compatible servers
+    "input_device": "",  # microphone name (or part of it); empty = system default
+    "flight_sessions": 5,        # sessions kept by the flight recorder (0 = off)
+    "flight_max_mb": 8,          # flight recorder memory ceiling
+    "flight_compress_level": 1,  # zlib level per audio block (0 = raw)
+    "display": "auto",           # "auto" (Rich on a terminal, else log lines), "rich", "log", "null"
+    "rate_limit_rps": 0,         # client-side cap on requests per second (0 = none)
+    "max_concurrency": 8,        # requests in flight at once; lowered while throttled
+    "retry_budget": 30,          # seconds a request may spend retrying 429s/5xx
+    "speedup": 1.0,              # play recordings this much faster before upload (1.0 = off)
+    "speedup_max_rate": 8.0,     # ...but never past this many syllables/s (0 = no cap)
+    "history": True,             # keep pasted transcripts for `voicekey history`
+    "vocabulary": "",            # replacements file (see vocab.py); empty = ~/.config/voicekey/vocabulary.txt
+    "archive": False,            # also keep the audio, for `voicekey archive retranscribe`
+    "archive_max_mb": 1024,      # archive size limit; oldest recordings go first
+    "archive_max_days": 30,      # ...and recordings older than this (0 = no age limit)
+    "audio_worker": False,       # capture, encode and upload in a separate process (read at startup)
+    "memory_profile": False,     # tracemalloc report after each dictation (slow; read at startup)
 }
 
 
@@ -33,5 +49,7 @@ def load() -> dict:
 def save(cfg: dict) -> None:
     path = _config_path()
     path.parent.mkdir(parents=True, exist_ok=True)
+    import tomli_w
+
     with open(path, "wb") as f:
         tomli_w.dump(cfg, f)
@@ -16,6 +16,11 @@ FLAG_COMMAND = 0x00100000  # kCGEventFlagMaskCommand
 # Hotkey debounce (seconds) — prevents accidental triggers from typing special chars
 DEBOUNCE_SECONDS = 0.2
 
+# Event-tap latency budgets (seconds). macOS disables a tap whose callback is
+# too slow, so anything over these is counted and reported by `voicekey stats`.
+TAP_CALLBACK_BUDGET = 0.002   # the CGEvent tap callback itself
+HOTKEY_HANDLER_BUDGET = 0.05  # on_press / on_release handlers (run off the tap)
+
 # Audio recording settings
 SAMPLE_RATE = 24000  # 24kHz — matches OpenAI's preferred input
 CHANNELS = 1         # Mono
@@ -30,6 +35,9 @@ DEFAULT_PROVIDER = "openai"
 PASTE_DELAY = 0.05       # Delay before simulating Cmd+V
 RESTORE_DELAY = 0.10     # Delay before restoring clipboard
 
+# Trace ring buffer size (events kept in memory between flushes)
+TRACE_BUFFER_EVENTS = 50_000
+
 # Keychain service name
 KEYCHAIN_SERVICE = "voicekey"
 KEYCHAIN_USERNAME = "api-key"
@@ -37,3 +45,8 @@ KEYCHAIN_USERNAME = "api-key"
 # Config file location
 CONFIG_DIR = "~/.config/voicekey"
 CONFIG_FILE = "config.toml"
+STATS_FILE = "stats.json"
+HISTORY_FILE = "history.db"  # dictation history (see history.py)
+VOCABULARY_FILE = "vocabulary.txt"  # custom vocabulary (see vocab.py)
+PROVIDER_CACHE_FILE = "providers.json"  # discovered provider plugins (see providers/plugins.py)
+SOCKET_FILE = "voicekey.sock"  # `voicekey serve` control socket
@@ -0,0 +1,305 @@
+"""`voicekey serve`: a resident process with a local control socket.
+
+The daemon keeps one App alive (config, Keychain key, recorder, pooled
+provider client) and answers JSON-RPC 2.0 requests, one JSON object per
+line, on a Unix socket that only the owner can connect to. Other tools drive
+dictation through it without starting Python or reading the Keychain again;
+see client.py for the caller side.
+
+Methods:
+    ping                            pid and uptime
+    start_recording                 begin a dictation (like pressing the hotkey)
+    stop_recording(wait=true)       end it; with wait, returns the transcript
+    transcribe_file(path, model, language)
+                                    transcribe a WAV file, nothing is pasted
+    stats                           state, per-stage latency percentiles, rate limits
+    reload_config                   re-read config.toml, returns changed keys
+    dump_flight                     save the flight recorder, returns the path
+    shutdown                        stop serving
+"""
+
+import inspect
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from .app import App
+from .client import (
+    APP_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    MAX_LINE,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    RPCError,
+    default_socket_path,
+)
+
+
+def _error(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_LINE + 1)
+            if not line:
+                return
+            if len(line) > MAX_LINE:
+                self._send(_error(None, INVALID_REQUEST, "Request too long"))
+                return
+            if line.strip():
+                response = self.server.rpc.handle(line)
+                if response is not None:
+                    self._send(response)
+
+    def _send(self, response: dict) -> None:
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, rpc: "Daemon"):
+        self.rpc = rpc
+        super().__init__(path, _Handler)
+
+
+class Daemon:
+    """JSON-RPC front end for an App.
+
+    Args:
+        app: The App to drive; it should already be warmed up.
+        path: Socket path (default ~/.config/voicekey/voicekey.sock).
+        on_shutdown: Called from a worker thread after a `shutdown` request,
+            e.g. to stop the run loop the hotkey listener lives on.
+    """
+
+    def __init__(self, app: App, path: str | Path | None = None, on_shutdown=None):
+        self.app = app
+        self.path = Path(path) if path is not None else default_socket_path()
+        self.on_shutdown = on_shutdown
+        self.started_at = time.monotonic()
+        self.stopped = threading.Event()
+        self.methods = {
+            "ping": self.ping,
+            "start_recording": self.start_recording,
+            "stop_recording": self.stop_recording,
+            "transcribe_file": self.transcribe_file,
+            "stats": self.stats,
+            "reload_config": self.reload_config,
+            "dump_flight": self.dump_flight,
+            "shutdown": self.shutdown,
+        }
+        self._server: _Server | None = None
+        self._serving = False
+        self._close_lock = threading.Lock()
+        self._closing = False  # a close() has taken the server and is tearing it down
+
+    # ── RPC methods ─────────────────────────────────────────────────
+
+    def ping(self) -> dict:
+        return {"pid": os.getpid(), "uptime_seconds": round(time.monotonic() - self.started_at, 3)}
+
+    def start_recording(self) -> dict:
+        if not self.app.on_hotkey_press():
+            raise RPCError(APP_ERROR, f"Can't start recording while {self.app.state.value}")
+        return {"state": self.app.state.value}
+
+    def stop_recording(self, wait: bool = True, timeout: float = 60.0) -> dict:
+        if not self.app.on_hotkey_release():
+            raise RPCError(APP_ERROR, "Not recording")
+        if wait and not self.app.wait_idle(timeout):
+            raise RPCError(APP_ERROR, f"Transcription still running after {timeout}s")
+        result = {"state": self.app.state.value}
+        if wait:
+            result.update(text=self.app.last_text, error=self.app.last_error)
+        return result
+
+    def transcribe_file(self, path: str, model: str = "", language: str | None = None) -> dict:
+        try:
+            wav = Path(path).read_bytes()
+        except OSError as e:
+            raise RPCError(INVALID_PARAMS, f"Can't read {path}: {e.strerror}")
+        start = time.perf_counter()
+        text = self.app.transcribe_wav(wav, model=model, language=language)
+        return {"text": text, "seconds": round(time.perf_counter() - start, 3)}
+
+    def stats(self) -> dict:
+        hotkey = self.app.hotkey_stats
+        limiter = getattr(self.app.provider, "limiter", None)
+        return {
+            "state": self.app.state.value,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+            "stages": self.app.stage_stats.summary(),
+            "hotkey": hotkey.to_dict() if hotkey is not None else None,
+            "provider": limiter.snapshot() if limiter is not None else None,
+        }
+
+    def reload_config(self) -> dict:
+        return {"changed": self.app.reload_config()}
+
+    def dump_flight(self) -> dict:
+        return {"path": str(self.app.dump_flight())}
+
+    def shutdown(self) -> dict:
+        # Not inline: socketserver.shutdown() waits for this very request.
+        threading.Thread(target=self.close, name="voicekey-shutdown", daemon=True).start()
+        return {"ok": True}
+
+    # ── Dispatch ────────────────────────────────────────────────────
+
+    def handle(self, line: bytes) -> dict | None:
+        """Response for one request line, or None for a notification."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "Parse error")
+        if not isinstance(request, dict):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method_name = request.get("method")
+        params = request.get("params", {})
+        if request.get("jsonrpc") != "2.0" or not isinstance(method_name, str):
+            return _error(request_id, INVALID_REQUEST, "Invalid request")
+
+        method = self.methods.get(method_name)
+        try:
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method_name}")
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params must be an object")
+            try:
+                inspect.signature(method).bind(**params)
+            except TypeError as e:
+                raise RPCError(INVALID_PARAMS, str(e))
+            result = method(**params)
+        except RPCError as e:
+            response = _error(request_id, e.code, e.message)
+        except Exception as e:
+            response = _error(request_id, APP_ERROR, str(e) or type(e).__name__)
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return response if "id" in request else None
+
+    # ── Socket ──────────────────────────────────────────────────────
+
+    def bind(self) -> "Daemon":
+        """Create the socket (mode 0600), replacing a stale one left by a crash."""
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self.path.exists():
+            if _accepting(self.path):
+                raise RuntimeError(f"voicekey is already serving on {self.path}")
+            self.path.unlink()
+        old_umask = os.umask(0o177)  # no window where the socket is group/world accessible
+        try:
+            self._server = _Server(str(self.path), self)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.path, 0o600)
+        return self
+
+    def serve_forever(self) -> None:
+        server = self._server or self.bind()._server
+        self._serving = True
+        server.serve_forever(poll_interval=0.1)
+
+    def start(self) -> "Daemon":
+        """Serve from a background thread."""
+        server = self._server or self.bind()._server
+        self._serving = True
+        # The thread gets this server, not self._server, which close() may already have taken.
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.1},
+                         name="voicekey-rpc", daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving and remove the socket; safe to call more than once.
+
+        A call made while another thread is closing (the `shutdown` RPC)
+        returns once that close has finished.
+        """
+        with self._close_lock:
+            server, self._server = self._server, None
+            closing, self._closing = self._closing, self._closing or server is not None
+        if server is None:
+            if closing:
+                self.stopped.wait()
+            return
+        if self._serving:
+            server.shutdown()
+        server.server_close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            if self.on_shutdown is not None:
+                self.on_shutdown()
+        finally:
+            self.stopped.set()
+
+
+def _accepting(path: Path) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(path: str | Path | None = None, hotkey: bool = True) -> None:
+    """Run the daemon in the foreground until `shutdown` or Ctrl-C / SIGTERM.
+
+    With `hotkey`, the event tap runs too and the main thread spins the
+    CFRunLoop it needs; otherwise dictation is driven only over the socket.
+    """
+    import signal
+    import sys
+
+    import click
+
+    from . import auth
+    from .app import install_hotkey
+
+    api_key = auth.get_api_key()
+    if not api_key:
+        click.echo("No API key found. Run `voicekey setup` first.")
+        sys.exit(1)
+
+    app = App(api_key=api_key)
+    app.warm_up()
+    daemon = Daemon(app, path)
+    try:
+        daemon.bind()
+    except RuntimeError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    app.ui.print(f"  [dim]Listening on {daemon.path}[/]")
+
+    try:
+        if hotkey:
+            import Quartz
+
+            install_hotkey(app)
+            daemon.start()
+            # Short slices so SIGTERM and a `shutdown` request are noticed.
+            while not daemon.stopped.is_set():
+                Quartz.CFRunLoopRunInMode(Quartz.kCFRunLoopDefaultMode, 0.25, False)
+        else:
+            daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        app.close()
@@ -0,0 +1,180 @@
+"""Audio input devices: enumerated once, cached, refreshed when the hardware changes.
+
+PortAudio takes its device list when it initialises and never updates it,
+so a headset plugged in after startup is invisible until PortAudio is
+re-initialised. DeviceManager caches the list with each device's
+capabilities and only re-enumerates after a change signal: CoreAudio's
+device-list listener on macOS, the harness's fake sounddevice in tests, or
+a stream that failed to open (the device it was told about has gone).
+"""
+
+import ctypes
+import ctypes.util
+import sys
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Device:
+    index: int
+    name: str
+    hostapi: int
+    channels: int             # max input channels
+    samplerate: float         # native (default) sample rate
+    low_latency: float        # seconds
+    high_latency: float
+    default: bool = False     # the system default input
+
+
+class DeviceManager:
+    """Cached input devices, with a preferred device chosen by name.
+
+    A stale cache is re-read on the next lookup, which restarts PortAudio:
+    look devices up only while no stream is open (Recorder does so in start()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backend = None        # the sounddevice module the cache came from
+        self._devices: list[Device] | None = None
+        self._supports: dict[tuple[str, int, int], bool] = {}
+        self.refreshes = 0          # times the device list was read
+
+    def invalidate(self) -> None:
+        """Mark the cache stale; the next lookup re-enumerates (safe from any thread)."""
+        self._devices = None
+
+    def inputs(self) -> list[Device]:
+        """Devices with at least one input channel."""
+        with self._lock:
+            return list(self._current())
+
+    def resolve(self, preferred: str = "", samplerate: int | None = None,
+                channels: int = 1) -> Device | None:
+        """The device to record from: `preferred` if present, else the system default.
+
+        `preferred` matches a device name exactly (ignoring case), or else as
+        a substring. A preferred device that can't record `channels` at
+        `samplerate` is skipped. None means no input device at all.
+        """
+        with self._lock:
+            devices = self._current()
+            if preferred:
+                wanted = preferred.casefold()
+                matches = [d for d in devices if d.name.casefold() == wanted] or \
+                          [d for d in devices if wanted in d.name.casefold()]
+                for device in matches:
+                    if samplerate is None or self._can_record(device, samplerate, channels):
+                        return device
+            return next((d for d in devices if d.default), devices[0] if devices else None)
+
+    def _current(self) -> list[Device]:
+        import sounddevice as sd
+
+        if sd is not self._backend:  # first use, or the harness swapped modules
+            self._backend = sd
+            self._devices = None
+            watch(sd, self.invalidate)
+        devices = self._devices
+        if devices is None:
+            devices = self._devices = self._enumerate(sd)
+            self._supports.clear()
+        return devices
+
+    def _enumerate(self, sd) -> list[Device]:
+        if self.refreshes:
+            # PortAudio only reads the device list in Pa_Initialize.
+            terminate, initialize = getattr(sd, "_terminate", None), getattr(sd, "_initialize", None)
+            if terminate is not None and initialize is not None:
+                terminate()
+                initialize()
+        self.refreshes += 1
+        try:
+            default = sd.query_devices(kind="input")["index"]
+        except (sd.PortAudioError, KeyError, ValueError):
+            default = None
+        return [
+            Device(
+                index=info["index"],
+                name=info["name"],
+                hostapi=info["hostapi"],
+                channels=info["max_input_channels"],
+                samplerate=float(info["default_samplerate"]),
+                low_latency=float(info["default_low_input_latency"]),
+                high_latency=float(info["default_high_input_latency"]),
+                default=info["index"] == default,
+            )
+            for info in sd.query_devices()
+            if info["max_input_channels"] > 0
+        ]
+
+    def _can_record(self, device: Device, samplerate: int, channels: int) -> bool:
+        key = (device.name, samplerate, channels)
+        if key not in self._supports:
+            try:
+                self._backend.check_input_settings(
+                    device=device.index, channels=channels, samplerate=samplerate, dtype="int16")
+                self._supports[key] = True
+            except Exception:
+                self._supports[key] = False
+        return self._supports[key]
+
+
+_manager: DeviceManager | None = None
+_manager_lock = threading.Lock()
+
+
+def manager() -> DeviceManager:
+    """The process-wide DeviceManager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = DeviceManager()
+        return _manager
+
+
+def watch(sd, callback) -> bool:
+    """Call `callback` (from any thread) whenever input devices change.
+
+    Returns False when there's no change signal here; the cache is then
+    refreshed only after a stream fails to open.
+    """
+    listen = getattr(sd, "add_device_listener", None)  # the harness's fake sounddevice
+    if listen is not None:
+        listen(callback)
+        return True
+    if sys.platform == "darwin":
+        return _coreaudio_watch(callback)
+    return False
+
+
+# ── CoreAudio ───────────────────────────────────────────────────────
+
+
+class _PropertyAddress(ctypes.Structure):
+    _fields_ = [("selector", ctypes.c_uint32), ("scope", ctypes.c_uint32), ("element", ctypes.c_uint32)]
+
+
+_Listener = ctypes.CFUNCTYPE(ctypes.c_int32, ctypes.c_uint32, ctypes.c_uint32,
+                             ctypes.POINTER(_PropertyAddress), ctypes.c_void_p)
+_SYSTEM_OBJECT = 1
+_listeners: list = []  # CoreAudio holds raw pointers to these; keep them alive
+
+
+def _fourcc(code: str) -> int:
+    return int.from_bytes(code.encode(), "big")
+
+
+def _coreaudio_watch(callback) -> bool:
+    path = ctypes.util.find_library("CoreAudio")
+    if path is None:
+        return False
+    lib = ctypes.CDLL(path)
+    proc = _Listener(lambda object_id, count, addresses, data: callback() or 0)
+    ok = True
+    for selector in ("dev#", "dIn "):  # device list, default input device
+        address = _PropertyAddress(_fourcc(selector), _fourcc("glob"), 0)
+        ok &= lib.AudioObjectAddPropertyListener(_SYSTEM_OBJECT, ctypes.byref(address), proc, None) == 0
+    _listeners.append(proc)
+    return ok
@@ -1,5 +1,6 @@
 """Rich terminal UI — startup banner, audio meter, streaming text."""
 
+import queue
 import sys
 import threading
 import time
@@ -9,6 +10,8 @@ from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 
+from .tracing import tracer
+
 console = Console()
 
 # ── Startup banner ──────────────────────────────────────────────────
@@ -52,15 +55,46 @@ def print_banner(cfg: dict, accessibility: bool, microphone: bool) -> None:
 
 BAR_CHARS = " ░▒▓█"
 BAR_WIDTH = 28
+METER_FPS = 15
+
+_bar_states: list[Text] = []
+
+
+def _bar_state(filled: int) -> Text:
+    """"  ● REC  <bar>  " with `filled` cells lit; all BAR_WIDTH+1 states are built once."""
+    if not _bar_states:
+        for n in range(BAR_WIDTH + 1):
+            text = Text("  ")
+            text.append("●", style="bold red")
+            text.append(" REC  ")
+            for i in range(BAR_WIDTH):
+                if i >= n:
+                    text.append("░", style="dim")
+                elif i < BAR_WIDTH * 0.6:
+                    text.append("█", style="green")
+                elif i < BAR_WIDTH * 0.8:
+                    text.append("█", style="yellow")
+                else:
+                    text.append("█", style="red")
+            text.append("  ")
+            _bar_states.append(text)
+    return _bar_states[filled]
 
 
 class AudioMeter:
-    """Live-updating audio level meter shown while recording."""
+    """Live-updating audio level meter shown while recording.
+
+    Levels are pushed in with update_level() (from the audio callback). The
+    display thread redraws at most METER_FPS times a second, and only when
+    the number of lit cells or the tenths-of-a-second timer has changed.
+    """
 
     def __init__(self):
         self._level: float = 0.0  # 0.0–1.0
+        self._filled: int = 0
         self._start_time: float = 0.0
         self._running = False
+        self._wake = threading.Event()
         self._live: Live | None = None
         self._thread: threading.Thread | None = None
 
@@ -68,11 +102,14 @@ class AudioMeter:
         self._start_time = time.time()
         self._running = True
         self._level = 0.0
+        self._filled = 0
+        self._wake.clear()
         self._thread = threading.Thread(target=self._run_display, daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
         self._running = False
+        self._wake.set()
         if self._thread:
             self._thread.join(timeout=1.0)
             self._thread = None
@@ -80,77 +117,154 @@ class AudioMeter:
     def update_level(self, rms: float) -> None:
         """Update with RMS level (0.0–1.0 normalized)."""
         self._level = min(1.0, rms)
+        filled = int(self._level * BAR_WIDTH)
+        if filled != self._filled:
+            self._filled = filled
+            self._wake.set()
 
-    def _render(self) -> Text:
-        elapsed = time.time() - self._start_time
-        level = self._level
-
-        # Build bar
-        filled = int(level * BAR_WIDTH)
-        bar = ""
-        for i in range(BAR_WIDTH):
-            if i < filled:
-                if i < BAR_WIDTH * 0.6:
-                    bar += f"[green]█[/]"
-                elif i < BAR_WIDTH * 0.8:
-                    bar += f"[yellow]█[/]"
-                else:
-                    bar += f"[red]█[/]"
-            else:
-                bar += f"[dim]░[/]"
+    def _frame_key(self) -> tuple[int, int]:
+        return self._filled, int((time.time() - self._start_time) * 10)
 
-        text = Text.from_markup(
-            f"  [bold red]●[/] REC  {bar}  [dim]{elapsed:5.1f}s[/]"
-        )
+    def _render(self, key: tuple[int, int] | None = None) -> Text:
+        filled, tenths = key or self._frame_key()
+        text = _bar_state(filled).copy()
+        text.append(f"{tenths / 10:5.1f}s", style="dim")
         return text
 
     def _run_display(self) -> None:
-        with Live(self._render(), console=console, refresh_per_second=15, transient=True) as live:
+        key = self._frame_key()
+        interval = 1.0 / METER_FPS
+        with Live(self._render(key), console=console, auto_refresh=False, transient=True) as live:
             self._live = live
+            live.refresh()
+            last_draw = time.monotonic()
             while self._running:
-                live.update(self._render())
-                time.sleep(0.066)  # ~15fps
+                # Sleep until a level change, or the next tick of the timer.
+                self._wake.wait(0.1 - (time.time() - self._start_time) % 0.1)
+                self._wake.clear()
+                if not self._running:
+                    break
+                wait = last_draw + interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                new_key = self._frame_key()
+                if new_key == key:
+                    continue
+                key = new_key
+                with tracer.span("meter_render"):
+                    live.update(self._render(key), refresh=True)
+                last_draw = time.monotonic()
             self._live = None
 
 
 # ── Streaming transcription display ─────────────────────────────────
 
+STREAM_FPS = 15
+STREAM_LINES = 3      # terminal lines of the transcript shown while it streams
+STREAM_KEEP = 4096    # characters of the tail kept for drawing
+
+
 class StreamingDisplay:
-    """Shows transcribed text appearing progressively."""
+    """Shows transcribed text appearing progressively.
+
+    append() only enqueues the delta, so the provider's read loop never
+    waits on rendering. A display thread drains the queue and redraws at
+    most STREAM_FPS times a second. Only the last STREAM_LINES lines are
+    drawn, so a frame costs the same however long the dictation gets; the
+    whole transcript is printed once by finish().
+    """
 
     def __init__(self):
-        self._text = ""
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._parts: list[str] = []
+        self._chars = 0
+        self._tail = ""
+        self._build_lock = threading.Lock()
         self._live: Live | None = None
-        self._done = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def text(self) -> str:
+        """Everything appended so far."""
+        self._drain()
+        return "".join(self._parts)
 
     def start(self) -> None:
-        self._text = ""
-        self._done = False
+        self._queue = queue.SimpleQueue()
+        self._parts = []
+        self._chars = 0
+        self._tail = ""
         self._live = Live(
             self._render(),
             console=console,
-            refresh_per_second=15,
+            auto_refresh=False,
             transient=True,
         )
-        self._live.start()
+        self._live.start(refresh=True)
+        self._thread = threading.Thread(target=self._run_display, daemon=True)
+        self._thread.start()
 
     def append(self, chunk: str) -> None:
-        self._text += chunk
-        if self._live:
-            self._live.update(self._render())
+        self._queue.put(chunk)
 
     def finish(self) -> None:
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout=1.0)
+            self._thread = None
         if self._live:
             self._live.stop()
             self._live = None
-        if self._text.strip():
-            console.print(
-                f"  [green]✓[/] [italic]{self._text.strip()}[/]"
-            )
+        text = self.text.strip()
+        if text:
+            console.print(Text.assemble("  ", ("✓", "green"), " ", (text, "italic")))
+
+    def _drain(self, chunk: str | None = "") -> bool:
+        """Move `chunk` and any queued deltas into the builder.
+
+        Returns False once the finish() sentinel has been reached.
+        """
+        with self._build_lock:
+            while chunk is not None:
+                if chunk:
+                    self._parts.append(chunk)
+                    self._chars += len(chunk)
+                    self._tail += chunk
+                    if len(self._tail) > 2 * STREAM_KEEP:
+                        self._tail = self._tail[-STREAM_KEEP:]
+                try:
+                    chunk = self._queue.get_nowait()
+                except queue.Empty:
+                    return True
+            return False
+
+    def _run_display(self) -> None:
+        interval = 1.0 / STREAM_FPS
+        last_draw = 0.0
+        while True:
+            chunk = self._queue.get()
+            deadline = last_draw + interval
+            while True:  # coalesce deltas until the next frame is due
+                if not self._drain(chunk):
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    chunk = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            with tracer.span("stream_render", chars=self._chars):
+                self._live.update(self._render(), refresh=True)
+            last_draw = time.monotonic()
 
     def _render(self) -> Text:
-        if not self._text:
+        if not self._tail:
             return Text.from_markup("  [dim]⠋ transcribing...[/]")
-        return Text.from_markup(
-            f"  [blue]⟩[/] [italic]{self._text}[/][dim]▍[/]"
-        )
+        budget = max(console.width - 6, 20) * STREAM_LINES
+        tail = self._tail
+        if self._chars > budget:
+            tail = tail[-budget:]
+            cut = tail.find(" ")
+            tail = "…" + (tail[cut:] if 0 <= cut < 20 else tail)
+        return Text.assemble("  ", ("⟩", "blue"), " ", (tail, "italic"), ("▍", "dim"))
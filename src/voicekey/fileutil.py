@@ -0,0 +1,45 @@
+"""Small files under ~/.config/voicekey shared by several processes.
+
+The app, `voicekey serve`, the harness and one-off commands can all write
+the same file at once. `write_atomic` gives each writer its own temporary
+file in the target's directory and renames it into place, so a reader
+sees the old contents or the new, never a mix. `locked` serializes
+read-modify-write cycles with an flock on a sidecar `<name>.lock`; the
+file itself can't carry the lock, because each write replaces it.
+"""
+
+import fcntl
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock for `path` across processes and threads."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path.with_name(path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Replace `path` with `text` through a temporary file of its own."""
+    import tempfile  # ~5 ms, and metrics is imported at startup
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
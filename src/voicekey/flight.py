@@ -0,0 +1,229 @@
+"""Always-on flight recorder of the last few dictation sessions.
+
+Keeps hotkey events, audio blocks (zlib-compressed), streamed transcript
+deltas, insertions and errors for the most recent sessions in memory, under
+a byte ceiling. Hotkey events are both the press/release the app acted on
+and every raw Option flag change before debouncing; raw changes between
+sessions lead in to the next one, so a press that was debounced away or
+ignored still shows up. `dump()` writes them to a compact binary file that
+`voicekey flight replay` can feed back through App.
+
+File layout (little-endian):
+    header   b"VKFR" u16 version, u16 session count, u32 sample rate, u16 channels
+    session  f64 wall-clock start, u32 event count, u8 flags, then events
+    event    u8 kind, u32 offset µs from session start, u32 length, payload
+"""
+
+import collections
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .constants import CHANNELS, CONFIG_DIR, SAMPLE_RATE
+
+MAGIC = b"VKFR"
+VERSION = 1
+
+HOTKEY = 1       # payload: b"press" / b"release"
+AUDIO_RAW = 2    # payload: int16 PCM bytes
+AUDIO_ZLIB = 3   # payload: zlib-compressed int16 PCM bytes
+SSE = 4          # payload: UTF-8 text delta
+INSERT = 5       # payload: UTF-8 inserted text
+ERROR = 6        # payload: UTF-8 error message
+KEY = 7          # payload: b"0x3a down" / b"0x3a up", a raw flag change before debouncing
+
+KEY_LEAD_IN = 32            # raw key events held between sessions
+KEY_LEAD_IN_SECONDS = 10.0  # how far back the next session reaches for them
+
+_HEADER = struct.Struct("<4sHHIH")
+_SESSION = struct.Struct("<dIB")
+_TRUNCATED = 0x01
+_EVENT = struct.Struct("<BII")
+_EVENT_OVERHEAD = _EVENT.size + 48  # struct header + Python tuple/bytes bookkeeping
+
+
+@dataclass
+class Session:
+    started_at: float                  # time.time() at session start
+    events: list = field(default_factory=list)  # (kind, offset_us, payload)
+    nbytes: int = 0
+    truncated: bool = False            # audio dropped to stay under the ceiling
+
+    def audio(self) -> bytes:
+        """All recorded audio as contiguous int16 PCM."""
+        return b"".join(decode_audio(kind, payload) for kind, _, payload in self.events
+                        if kind in (AUDIO_RAW, AUDIO_ZLIB))
+
+
+class FlightRecorder:
+    """Bounded in-memory recorder of the last `max_sessions` sessions.
+
+    Args:
+        max_sessions: Sessions to keep; 0 disables recording entirely.
+        max_bytes: Ceiling on payload memory across all kept sessions.
+        compress_level: zlib level for audio blocks (0 stores raw PCM, which is
+            cheapest per block but uses the byte ceiling up fastest).
+    """
+
+    def __init__(self, max_sessions: int = 5, max_bytes: int = 8 << 20, compress_level: int = 1):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._sessions: collections.deque[Session] = collections.deque()
+        self._current: Session | None = None
+        self._start_ns = 0
+        self._bytes = 0
+        self._keys: collections.deque[tuple[int, bytes]] = collections.deque(maxlen=KEY_LEAD_IN)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_sessions > 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def sessions(self) -> list[Session]:
+        with self._lock:
+            return list(self._sessions)
+
+    def begin_session(self) -> None:
+        """Start a session, beginning at the raw key events that led up to it."""
+        if not self.enabled:
+            return
+        now = time.monotonic_ns()
+        with self._lock:
+            lead_in = [(t, p) for t, p in self._keys if now - t <= KEY_LEAD_IN_SECONDS * 1e9]
+            self._keys.clear()
+            start = lead_in[0][0] if lead_in else now
+            self._current = Session(started_at=time.time() - (now - start) / 1e9)
+            self._start_ns = start
+            self._sessions.append(self._current)
+            while len(self._sessions) > self.max_sessions:
+                self._bytes -= self._sessions.popleft().nbytes
+            for t, payload in lead_in:
+                self._append(self._current, KEY, (t - start) // 1000, payload)
+
+    def end_session(self) -> None:
+        with self._lock:
+            self._current = None
+
+    def record(self, kind: int, payload: bytes) -> None:
+        session = self._current
+        if session is None:
+            return
+        offset = (time.monotonic_ns() - self._start_ns) // 1000
+        size = len(payload) + _EVENT_OVERHEAD
+        with self._lock:
+            if session is not self._current:
+                return
+            self._evict_for(size)
+            if kind in (AUDIO_RAW, AUDIO_ZLIB) and self._bytes + size > self.max_bytes:
+                session.truncated = True
+                return
+            self._append(session, kind, offset, payload)
+
+    def record_key(self, keycode: int, down: bool) -> None:
+        """Record a raw hotkey flag change (called from the event tap, before debouncing)."""
+        if not self.enabled:
+            return
+        now = time.monotonic_ns()
+        payload = b"%#x %s" % (keycode, b"down" if down else b"up")
+        with self._lock:
+            if self._current is None:
+                self._keys.append((now, payload))
+            else:
+                self._append(self._current, KEY, (now - self._start_ns) // 1000, payload)
+
+    def record_audio(self, block) -> None:
+        """Record one audio callback block (int16 ndarray)."""
+        if self._current is None:
+            return
+        raw = block.tobytes()
+        if self.compress_level > 0:
+            self.record(AUDIO_ZLIB, zlib.compress(raw, self.compress_level))
+        else:
+            self.record(AUDIO_RAW, raw)
+
+    def record_text(self, kind: int, text: str) -> None:
+        if self._current is not None:
+            self.record(kind, text.encode("utf-8"))
+
+    def _append(self, session: Session, kind: int, offset: int, payload: bytes) -> None:
+        # Caller holds _lock.
+        size = len(payload) + _EVENT_OVERHEAD
+        self._evict_for(size)
+        session.events.append((kind, offset, payload))
+        session.nbytes += size
+        self._bytes += size
+
+    def _pending_keys(self) -> Session | None:
+        """Raw key events since the last session, as a session of their own."""
+        now = time.monotonic_ns()
+        with self._lock:
+            keys = list(self._keys)
+        if not keys:
+            return None
+        start = keys[0][0]
+        return Session(started_at=time.time() - (now - start) / 1e9,
+                       events=[(KEY, (t - start) // 1000, p) for t, p in keys])
+
+    def _evict_for(self, size: int) -> None:
+        # Drop whole finished sessions (oldest first) to make room.
+        while self._bytes + size > self.max_bytes and len(self._sessions) > 1:
+            if self._sessions[0] is self._current:
+                break
+            self._bytes -= self._sessions.popleft().nbytes
+
+    def dump(self, path: Path | None = None) -> Path:
+        """Write all kept sessions to `path` (default: ~/.config/voicekey/flight/)."""
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = Path(CONFIG_DIR).expanduser() / "flight" / f"flight-{stamp}.vkfr"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sessions = self.sessions()
+        pending = self._pending_keys()
+        if pending is not None:  # e.g. a press that never started a session
+            sessions.append(pending)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(sessions), SAMPLE_RATE, CHANNELS))
+            for session in sessions:
+                events = list(session.events)
+                flags = _TRUNCATED if session.truncated else 0
+                f.write(_SESSION.pack(session.started_at, len(events), flags))
+                for kind, offset, payload in events:
+                    f.write(_EVENT.pack(kind, offset, len(payload)))
+                    f.write(payload)
+        return path
+
+
+def load(path: Path) -> list[Session]:
+    """Read a dump written by FlightRecorder.dump()."""
+    data = Path(path).read_bytes()
+    magic, version, count, _rate, _channels = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a voicekey flight recording")
+    if version != VERSION:
+        raise ValueError(f"Unsupported flight recording version {version}")
+    pos = _HEADER.size
+    sessions = []
+    for _ in range(count):
+        started_at, nevents, flags = _SESSION.unpack_from(data, pos)
+        pos += _SESSION.size
+        session = Session(started_at=started_at, truncated=bool(flags & _TRUNCATED))
+        for _ in range(nevents):
+            kind, offset, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            session.events.append((kind, offset, data[pos:pos + length]))
+            pos += length
+        sessions.append(session)
+    return sessions
+
+
+def decode_audio(kind: int, payload: bytes) -> bytes:
+    """PCM bytes for an AUDIO_RAW or AUDIO_ZLIB payload."""
+    return zlib.decompress(payload) if kind == AUDIO_ZLIB else payload
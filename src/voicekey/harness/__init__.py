@@ -0,0 +1,223 @@
+"""Headless end-to-end harness: fake mic → App → local stand-in server → fake paste.
+
+Drives App.on_hotkey_press / on_hotkey_release directly, plays audio through
+the fake sounddevice stream, transcribes against mockserver.MockServer and
+captures insertions, so the whole pipeline runs without a Mac, a microphone
+or network access.
+"""
+
+import os
+import platform as _platform
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .. import config, metrics
+from ..constants import SAMPLE_RATE
+from ..mockserver import MockServer, ServerConfig
+from . import fake_sounddevice, platform
+
+
+def open_fds() -> int:
+    """File descriptors open in this process."""
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path)) - 1  # less the one listdir used
+        except OSError:
+            continue
+    return 0
+
+
+def thread_count() -> int:
+    """OS threads in this process, including ones Python didn't start."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return threading.active_count()
+
+
+def rss_bytes() -> int:
+    """Current resident set size (falls back to peak RSS where unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class Insertion:
+    text: str
+    at: float  # time.monotonic()
+
+
+class Harness:
+    """Context manager owning a headless App, a MockServer and the fake mic.
+
+    Args:
+        server: Stand-in server behaviour (latency, chunk cadence, transcript).
+        speed: Audio playback speed; 1.0 is real time, 0 is as fast as possible.
+        blocksize: Samples per fake PortAudio callback.
+        cfg: Config overrides applied on top of config.DEFAULTS (the display
+            defaults to "null"). With `audio_worker` the fake mic plays in the
+            worker process.
+        history, archive: Stores for the App (by default nothing is kept).
+    """
+
+    def __init__(self, server: ServerConfig | None = None, speed: float = 0.0,
+                 blocksize: int = 480, cfg: dict | None = None, history=None, archive=None):
+        self.server_config = server or ServerConfig()
+        self.speed = speed
+        self.blocksize = blocksize
+        self.cfg_overrides = cfg or {}
+        self.stores = {"history": history, "archive": archive}
+        self.insertions: list[Insertion] = []
+        self.server: MockServer | None = None
+        self.worker = None
+        self.app = None
+
+    def __enter__(self) -> "Harness":
+        platform.install()
+        from ..app import App
+
+        self.server = MockServer(self.server_config).start()
+        cfg = dict(config.DEFAULTS, flight_sessions=0, display="null", api_base=self.server.url)
+        cfg.update(self.cfg_overrides)
+        kwargs = {}
+        if cfg.get("audio_worker"):
+            from ..worker import AudioWorker, RemoteProvider, RemoteRecorder
+
+            self.worker = AudioWorker(cfg, fake_audio=True)
+            kwargs = {"recorder": RemoteRecorder(self.worker), "provider": RemoteProvider(self.worker)}
+        self.app = App(cfg=cfg, api_key="sk-harness", inserter=self._insert, persist_stats=False,
+                       **self.stores, **kwargs)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.worker is not None:
+            self.worker.close()
+        if self.server is not None:
+            self.server.stop()
+        platform.uninstall()
+
+    def _insert(self, text: str, on_stage=None) -> None:
+        if on_stage:
+            on_stage("paste_done")
+        self.insertions.append(Insertion(text, time.monotonic()))
+        if on_stage:
+            on_stage("clipboard_restored")
+
+    def run_session(self, audio: np.ndarray, timeout: float = 60.0) -> str:
+        """Hold the hotkey for the duration of `audio` and return what was pasted."""
+        before = len(self.insertions)
+        device = self.worker or fake_sounddevice
+        device.play(audio, speed=self.speed, blocksize=self.blocksize)
+        self.app.on_hotkey_press()
+        device.wait_finished(timeout)
+        self.app.on_hotkey_release()
+        self.app.wait_idle(timeout)
+        return "".join(i.text for i in self.insertions[before:])
+
+
+@dataclass
+class Report:
+    sessions: int
+    audio_seconds: float
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_mb: float
+    rss_growth_mb: float
+    failures: int
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+    environment: dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "rss_growth_mb": round(self.rss_growth_mb, 1),
+            "failures": self.failures,
+            "stages": self.stages,
+            "environment": self.environment,
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"sessions        {self.sessions} ({self.failures} failed)",
+            f"audio           {self.audio_seconds:.1f} s",
+            f"wall            {self.wall_seconds:.2f} s",
+            f"cpu             {self.cpu_seconds:.2f} s "
+            f"({self.cpu_seconds / max(self.wall_seconds, 1e-9):.0%} of one core)",
+            f"peak rss        {self.peak_rss_mb:.1f} MB (+{self.rss_growth_mb:.1f} MB during run)",
+            "",
+            f"{'stage (ms)':<18}{'n':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}",
+        ]
+        for name, s in self.stages.items():
+            lines.append(
+                f"{name:<18}{s['count']:>6}{s['p50']:>10.2f}{s['p90']:>10.2f}"
+                f"{s['p99']:>10.2f}{s['max']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+def stage_summary(stats: metrics.StageStats) -> dict[str, dict[str, float]]:
+    """Per-stage count and p50/p90/p99/max in milliseconds."""
+    return stats.summary()
+
+
+def run_benchmark(clips: list[np.ndarray], sessions: int, speed: float = 0.0,
+                  server: ServerConfig | None = None) -> Report:
+    """Run `sessions` dictations cycling through `clips` and report latency/CPU/memory."""
+    server = server or ServerConfig()
+    with Harness(server=server, speed=speed) as harness:
+        harness.run_session(clips[0][: SAMPLE_RATE // 10])  # warm-up, not reported
+        harness.app.stage_stats = metrics.StageStats()
+        expected = server.transcript.strip()
+
+        failures = 0
+        audio_seconds = 0.0
+        rss_start = rss_bytes()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for i in range(sessions):
+            clip = clips[i % len(clips)]
+            audio_seconds += len(clip) / SAMPLE_RATE
+            if harness.run_session(clip) != expected:
+                failures += 1
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        stages = stage_summary(harness.app.stage_stats)
+
+    return Report(
+        sessions=sessions,
+        audio_seconds=audio_seconds,
+        wall_seconds=wall,
+        cpu_seconds=cpu,
+        peak_rss_mb=peak_rss_bytes() / 1e6,
+        rss_growth_mb=(rss_bytes() - rss_start) / 1e6,
+        failures=failures,
+        stages=stages,
+        environment={
+            "python": _platform.python_version(),
+            "platform": _platform.platform(),
+            "speed": str(speed),
+            "latency": server.latency.spec,
+            "chunk_delay": server.chunk_delay.spec,
+        },
+    )
@@ -0,0 +1,54 @@
+"""WAV loading and synthetic speech-like audio for the harness."""
+
+import io
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from ..constants import SAMPLE_RATE
+
+
+def load_wav(path: str | Path) -> np.ndarray:
+    """Read a PCM WAV as mono int16 at SAMPLE_RATE (mixing down / resampling)."""
+    with wave.open(str(path), "rb") as wf:
+        width = wf.getsampwidth()
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    if width == 2:
+        audio = np.frombuffer(raw, dtype="<i2").astype(np.float32)
+    elif width == 1:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) * 256
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 65536
+    else:
+        raise ValueError(f"{path}: unsupported sample width {width}")
+    audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(audio):
+        n = int(round(len(audio) * SAMPLE_RATE / rate))
+        audio = np.interp(np.linspace(0, len(audio) - 1, n), np.arange(len(audio)), audio)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def encode_wav(audio: np.ndarray) -> bytes:
+    """Mono int16 samples as WAV bytes at SAMPLE_RATE."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio.astype(np.int16, copy=False).tobytes())
+    return buf.getvalue()
+
+
+def synth_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """Deterministic speech-like signal: voiced harmonics under a syllable envelope."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 3.5 * t), 0, None) ** 0.5
+    signal = 6000 * envelope * voiced + rng.normal(0, 150, t.size)
+    return np.clip(signal, -32768, 32767).astype(np.int16)
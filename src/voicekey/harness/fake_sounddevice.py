@@ -0,0 +1,213 @@
+"""Stand-in for the `sounddevice` module that plays queued PCM into stream callbacks.
+
+`play()` queues int16 audio; the next InputStream started delivers it in
+`blocksize` blocks from its own thread, paced at `speed` × real time (0 means
+as fast as possible), then sets `finished`.
+
+Like PortAudio, a paced stream only buffers `latency` seconds of input: when
+the callback falls further behind than that (say the GIL was busy), the
+oldest blocks are dropped, counted in `stats`, and the next callback gets a
+status with `input_overflow` set.
+
+`DEVICES` is the hardware. As in PortAudio, `query_devices()` reports the
+list as of the last `_initialize()`, so `add_device()` / `remove_device()`
+(a headset plugged in or pulled out) stay invisible until a refresh; they
+notify `add_device_listener()` callbacks the way CoreAudio would.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class PortAudioError(Exception):
+    pass
+
+
+_source: np.ndarray | None = None
+_speed = 1.0
+_blocksize = 480
+finished = threading.Event()
+stats = {"delivered_frames": 0, "dropped_frames": 0, "overflows": 0}
+
+
+class CallbackFlags:
+    def __init__(self, input_overflow: bool = False):
+        self.input_overflow = input_overflow
+
+    def __bool__(self) -> bool:
+        return self.input_overflow
+
+
+def _device(name: str, index: int = 0, inputs: int = 1, samplerate: float = 24000.0,
+            samplerates: tuple[float, ...] | None = None) -> dict:
+    return {
+        "name": name,
+        "index": index,
+        "hostapi": 0,
+        "max_input_channels": inputs,
+        "max_output_channels": 0 if inputs else 2,
+        "default_samplerate": samplerate,
+        "default_low_input_latency": 0.01,
+        "default_high_input_latency": 0.1,
+        "samplerates": samplerates,  # None = any
+    }
+
+
+DEVICES = [_device("Harness Microphone")]
+_visible = list(DEVICES)  # what PortAudio saw at initialisation
+_listeners: list = []
+initializations = 0
+
+
+def play(samples: np.ndarray, speed: float = 1.0, blocksize: int = 480) -> None:
+    """Queue `samples` (int16, shape (n,) or (n, channels)) for the next stream."""
+    global _source, _speed, _blocksize
+    if samples.ndim == 1:
+        samples = samples.reshape(-1, 1)
+    _source = samples.astype(np.int16, copy=False)
+    _speed = speed
+    _blocksize = blocksize
+    finished.clear()
+    stats.update(delivered_frames=0, dropped_frames=0, overflows=0)
+
+
+def wait_finished(timeout: float | None = None) -> bool:
+    return finished.wait(timeout)
+
+
+def query_devices(device=None, kind=None):
+    if device is not None:
+        if not 0 <= device < len(_visible):
+            raise PortAudioError(f"Error querying device {device}")
+        return _visible[device]
+    if kind == "input":
+        default = next((d for d in _visible if d["max_input_channels"]), None)
+        if default is None:
+            raise PortAudioError("No default input device")
+        return default
+    return list(_visible)
+
+
+def check_input_settings(device=None, channels=None, dtype=None, samplerate=None, **kwargs) -> None:
+    info = query_devices(device, kind="input")
+    if not _present(info) or (channels or 1) > info["max_input_channels"]:
+        raise PortAudioError("Invalid number of channels")
+    if samplerate is not None and info["samplerates"] is not None \
+            and samplerate not in info["samplerates"]:
+        raise PortAudioError("Invalid sample rate")
+
+
+def add_device(name: str, inputs: int = 1, **kwargs) -> None:
+    """Plug in a device (listed after the next `_initialize()`)."""
+    DEVICES.append(_device(name, len(DEVICES), inputs, **kwargs))
+    _notify()
+
+
+def remove_device(name: str) -> None:
+    """Unplug a device: streams can't open on it, even before a refresh."""
+    DEVICES[:] = [d for d in DEVICES if d["name"] != name]
+    _notify()
+
+
+def add_device_listener(callback) -> None:
+    _listeners.append(callback)
+
+
+def reset_devices() -> None:
+    """Back to just the harness microphone, already visible."""
+    DEVICES[:] = [_device("Harness Microphone")]
+    _initialize()
+    _notify()
+
+
+def _notify() -> None:
+    for callback in list(_listeners):
+        callback()
+
+
+def _present(info: dict) -> bool:
+    return any(d["name"] == info["name"] for d in DEVICES)
+
+
+def _initialize() -> None:
+    global _visible, initializations
+    _visible = [dict(d, index=i) for i, d in enumerate(DEVICES)]
+    initializations += 1
+
+
+def _terminate() -> None:
+    pass
+
+
+class InputStream:
+    def __init__(self, samplerate=None, channels=1, dtype="int16", callback=None,
+                 blocksize=0, device=None, **kwargs):
+        info = query_devices(device, kind="input")
+        if not _present(info):
+            raise PortAudioError(f"Error opening InputStream: device {info['name']!r} unavailable")
+        self.device = info
+        self.samplerate = samplerate or 24000
+        self.latency = kwargs.get("latency") if isinstance(kwargs.get("latency"), float) \
+            else info["default_high_input_latency"]
+        self.channels = channels
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        global _source
+        source, _source = _source, None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(source, _speed, _blocksize), name="fake-portaudio", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, source, speed, blocksize) -> None:
+        if source is None:
+            finished.set()
+            return
+        start = time.monotonic()
+        pos = 0
+        overflowed = False
+        while pos < len(source):
+            if self._stop.is_set():
+                break
+            if speed > 0:
+                # Input older than `latency` has been overwritten in the device buffer.
+                oldest = int((time.monotonic() - start - self.latency) * self.samplerate * speed)
+                if oldest > pos:
+                    skip = -(-(oldest - pos) // blocksize) * blocksize
+                    skip = min(skip, len(source) - pos)
+                    stats["dropped_frames"] += skip
+                    stats["overflows"] += 1
+                    pos += skip
+                    overflowed = True
+                    continue
+            block = source[pos:pos + blocksize]
+            if self.callback is not None:
+                self.callback(block, len(block), None, CallbackFlags(overflowed))
+            stats["delivered_frames"] += len(block)
+            overflowed = False
+            pos += len(block)
+            if speed > 0:
+                due = start + pos / self.samplerate / speed
+                delay = due - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+        finished.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
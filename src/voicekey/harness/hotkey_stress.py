@@ -0,0 +1,315 @@
+"""Deterministic stress test for HotkeyListener + App under chosen interleavings.
+
+A seeded scheduler plays every part on one thread: the event tap, the
+debounce timers (on a virtual clock), the hotkey dispatch thread and the
+provider. Each step it picks one of them at random, so an interleaving
+that breaks an invariant can be replayed from its seed. A timer that has
+come due has woken up: as with threading.Timer, cancel() no longer stops
+it, but its callback may run any number of steps later, after the key was
+released or pressed again. Transcription runs on App's own thread, held
+in the fake provider until the scheduler lets it finish and waits for it.
+
+Invariants:
+    pairing    handlers alternate press, release, ...; each press the app
+               accepts is followed by at most one release it accepts
+    stale      no press is queued for a key that isn't held
+    recorder   never started twice, or stopped while stopped
+    flight     every finished session recorded its press and its release
+    stuck      with the key up and everything drained, the app is idle
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .. import config, flight, metrics
+from ..constants import DEBOUNCE_SECONDS, KEYCODE_LEFT_OPTION, KEYCODE_RIGHT_OPTION
+from ..wav import wav_header
+from . import platform
+
+KEYCODE_SHIFT = 0x38
+_PCM = bytes(960)  # 20 ms of silence
+
+# Relative odds of each step when several are possible.
+WEIGHTS = {"tap": 4, "tick": 2, "timer": 3, "handler": 3, "finish": 1}
+
+
+class VirtualClock:
+    """Hands out timers that come due when the scheduler advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timers: list["_Timer"] = []
+
+    def timer(self, interval: float, function, args=()) -> "_Timer":
+        return _Timer(self, interval, function, args)
+
+    def next_deadline(self) -> float | None:
+        pending = [t.deadline for t in self.timers if not t.woken]
+        return min(pending) if pending else None
+
+    def advance(self, to: float) -> None:
+        self.now = max(self.now, to)
+        for t in self.timers:
+            if t.deadline <= self.now:
+                t.woken = True
+
+    def woken(self) -> list["_Timer"]:
+        return [t for t in self.timers if t.woken]
+
+
+class _Timer:
+    def __init__(self, clock: VirtualClock, interval: float, function, args):
+        self.clock = clock
+        self.interval = interval
+        self.function = function
+        self.args = args
+        self.deadline = 0.0
+        self.woken = False
+
+    def start(self) -> None:
+        self.deadline = self.clock.now + self.interval
+        self.clock.timers.append(self)
+
+    def cancel(self) -> None:
+        if not self.woken:  # too late once it has woken, as with threading.Timer
+            self.clock.timers.remove(self)
+
+    def run(self) -> None:
+        self.clock.timers.remove(self)
+        self.function(*self.args)
+
+
+class _Recorder:
+    """Stands in for Recorder: checks start/stop pairing, returns a short WAV or nothing."""
+
+    def __init__(self, check):
+        self.check = check
+        self.recording = False
+        self.empty = False  # the next stop() captured nothing
+        self.device = ""
+        self.first_frame_at = None
+        self.on_frame = None
+        self.on_level = None
+
+    def start(self) -> None:
+        self.check(not self.recording, "recorder started while recording")
+        self.recording = True
+
+    def stop(self) -> bytes:
+        self.check(self.recording, "recorder stopped while stopped")
+        self.recording = False
+        return b"" if self.empty else wav_header(len(_PCM)) + _PCM
+
+
+class _Provider:
+    """Holds each transcription until the scheduler releases it with an outcome."""
+
+    def __init__(self):
+        self.outcome: str | Exception = ""
+        self._go = threading.Semaphore(0)
+
+    def release(self, outcome: str | Exception) -> None:
+        self.outcome = outcome
+        self._go.release()
+
+    def transcribe(self, wav_bytes, api_key, model="", language="", on_chunk=None, on_stage=None) -> str:
+        self._go.acquire()
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        if on_chunk and self.outcome:
+            on_chunk(self.outcome)
+        return self.outcome
+
+
+@dataclass
+class StressReport:
+    seed: int
+    events: int           # flag-change events delivered to the listener
+    steps: int            # scheduler steps, of any kind
+    presses: int          # on_press handlers run / accepted by the app
+    accepted_presses: int
+    releases: int
+    accepted_releases: int
+    inserted: int
+    wall_seconds: float
+    tap_us: metrics.Histogram = field(default_factory=metrics.Histogram)
+    violations: list[str] = field(default_factory=list)
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / max(self.wall_seconds, 1e-9)
+
+    def to_dict(self) -> dict:
+        return {
+            "seed": self.seed,
+            "events": self.events,
+            "steps": self.steps,
+            "presses": self.presses,
+            "accepted_presses": self.accepted_presses,
+            "releases": self.releases,
+            "accepted_releases": self.accepted_releases,
+            "inserted": self.inserted,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "events_per_second": round(self.events_per_second),
+            "tap_us": {"p50": self.tap_us.percentile(50), "p99": self.tap_us.percentile(99)},
+            "violations": self.violations,
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"seed {self.seed}: {self.events} events, {self.steps} steps in {self.wall_seconds:.2f} s "
+            f"({self.events_per_second:,.0f} events/s; tap p50 {self.tap_us.percentile(50)} µs, "
+            f"p99 {self.tap_us.percentile(99)} µs)",
+            f"  presses {self.presses} ({self.accepted_presses} accepted), releases {self.releases} "
+            f"({self.accepted_releases} accepted), {self.inserted} pasted",
+        ]
+        lines += [f"  FAIL: {v}" for v in self.violations]
+        return "\n".join(lines)
+
+
+def random_events(rng: random.Random, n: int) -> list[tuple[float, int, bool]]:
+    """`n` (time, keycode, option flag) events, bunched around the debounce period.
+
+    Gaps are a mix of fast chatter, near-misses either side of DEBOUNCE_SECONDS
+    (where a release and a waking timer race) and proper holds. Shift events
+    and repeated downs or ups are included; the listener must ignore them.
+    """
+    events, now = [], 0.0
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.3:
+            gap = rng.uniform(0, DEBOUNCE_SECONDS / 2)
+        elif kind < 0.7:
+            gap = DEBOUNCE_SECONDS + rng.uniform(-0.01, 0.01)
+        else:
+            gap = rng.uniform(DEBOUNCE_SECONDS, 1.0)
+        now += gap
+        key = rng.random()
+        keycode = (KEYCODE_LEFT_OPTION if key < 0.7 else
+                   KEYCODE_RIGHT_OPTION if key < 0.85 else KEYCODE_SHIFT)
+        events.append((now, keycode, rng.random() < 0.5))
+    return events
+
+
+def run_stress(seed: int = 0, events: int = 10_000, max_violations: int = 20) -> StressReport:
+    """Play `events` random flag changes through a listener and App, checking invariants."""
+    platform.install()
+    try:
+        return _run(seed, events, max_violations)
+    finally:
+        platform.uninstall()
+
+
+def _run(seed: int, n_events: int, max_violations: int) -> StressReport:
+    from ..app import App, State
+    from ..hotkey import HotkeyListener
+
+    rng = random.Random(seed)
+    report = StressReport(seed=seed, events=0, steps=0, presses=0, accepted_presses=0, releases=0,
+                          accepted_releases=0, inserted=0, wall_seconds=0.0)
+
+    def check(ok: bool, message: str) -> None:
+        if not ok and len(report.violations) < max_violations:
+            report.violations.append(f"step {report.steps}: {message}")
+
+    clock = VirtualClock()
+    recorder = _Recorder(check)
+    provider = _Provider()
+    pasted: list[str] = []
+    cfg = dict(config.DEFAULTS, display="null", flight_sessions=n_events, flight_max_mb=64)
+    app = App(cfg=cfg, api_key="sk-stress", recorder=recorder, provider=provider,
+              inserter=lambda text, on_stage=None: pasted.append(text), persist_stats=False)
+
+    accepted: list[str] = []
+    queued: list[tuple] = []
+
+    def on_press():
+        report.presses += 1
+        recorder.empty = rng.random() < 0.1
+        if app.on_hotkey_press():
+            report.accepted_presses += 1
+            check(not accepted or accepted[-1] == "release", "app accepted two presses in a row")
+            accepted.append("press")
+
+    def on_release():
+        report.releases += 1
+        if app.on_hotkey_release():
+            report.accepted_releases += 1
+            check(accepted and accepted[-1] == "press", "app accepted a release without a press")
+            accepted.append("release")
+
+    class SteppedListener(HotkeyListener):
+        """Queues handlers for the scheduler instead of the dispatch thread."""
+
+        def _dispatch(self, handler, name: str) -> None:
+            last = queued[-1][1] if queued else dispatched[-1] if dispatched else "on_release"
+            check(name != last, f"{name} queued twice in a row")
+            if name == "on_press":
+                check(self._option_down, "on_press queued for a key that isn't held")
+            queued.append((handler, name))
+
+    dispatched: list[str] = []
+    listener = SteppedListener(on_press, on_release, timer=clock.timer, on_flags=app.flight.record_key)
+
+    def transcribing() -> bool:
+        with app._lock:
+            return app.state in (State.TRANSCRIBING, State.INSERTING)
+
+    events = random_events(rng, n_events)
+    events.append((events[-1][0] + 1.0 if events else 0.0, KEYCODE_LEFT_OPTION, False))
+    next_event = 0
+    start = time.perf_counter()
+    while True:
+        steps = []
+        upcoming = events[next_event][0] if next_event < len(events) else None
+        if upcoming is not None:
+            steps.append("tap")
+        deadline = clock.next_deadline()
+        if deadline is not None and (upcoming is None or deadline < upcoming):
+            steps.append("tick")
+        if clock.woken():
+            steps.append("timer")
+        if queued:
+            steps.append("handler")
+        if transcribing():
+            steps.append("finish")
+        if not steps:
+            break
+        step = rng.choices(steps, [WEIGHTS[s] for s in steps])[0]
+        report.steps += 1
+
+        if step == "tap":
+            at, keycode, down = events[next_event]
+            next_event += 1
+            clock.advance(at)
+            t0 = time.perf_counter()
+            listener._on_flags_changed(keycode, down)
+            report.tap_us.record(int((time.perf_counter() - t0) * 1e6))
+            report.events += 1
+        elif step == "tick":
+            clock.advance(deadline)
+        elif step == "timer":
+            rng.choice(clock.woken()).run()
+        elif step == "handler":
+            handler, name = queued.pop(0)
+            dispatched.append(name)
+            listener._run_handler(handler, name)
+        else:
+            outcome = rng.random()
+            provider.release(RuntimeError("stress: provider failed") if outcome < 0.05 else
+                             "" if outcome < 0.1 else f"take {report.steps}")
+            app.wait_idle(10.0)
+    report.wall_seconds = time.perf_counter() - start
+
+    check(not listener._option_down, "listener still thinks the key is down")
+    check(app.state == State.IDLE, f"app stuck in {app.state.value} after the key was released")
+    check(not recorder.recording, "recorder still running after the key was released")
+    check(report.accepted_presses == report.accepted_releases,
+          f"{report.accepted_presses} presses accepted but {report.accepted_releases} releases")
+    for i, session in enumerate(app.flight.sessions()):
+        keys = [payload for kind, _, payload in session.events if kind == flight.HOTKEY]
+        check(keys == [b"press", b"release"], f"flight session {i} recorded hotkey events {keys}")
+    report.inserted = len(pasted)
+    return report
@@ -0,0 +1,78 @@
+"""Swap in fake audio and macOS modules so App runs headless (e.g. on Linux CI)."""
+
+import importlib
+import sys
+import types
+
+from . import fake_sounddevice
+
+# pyobjc / rumps modules imported somewhere under voicekey.app
+_MACOS_MODULES = (
+    "Quartz",
+    "AppKit",
+    "Foundation",
+    "ApplicationServices",
+    "CoreFoundation",
+    "PyObjCTools",
+    "PyObjCTools.AppHelper",
+    "rumps",
+)
+
+_saved: dict[str, types.ModuleType | None] = {}
+
+
+class _Unavailable:
+    """Placeholder for any name imported from a missing macOS module."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        raise RuntimeError(f"{self._name} is not available in headless mode")
+
+    def __getattr__(self, attr):
+        return _Unavailable(f"{self._name}.{attr}")
+
+
+def _placeholder_module(name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__getattr__ = lambda attr: _Unavailable(f"{name}.{attr}")
+    module.__path__ = []  # lets submodules like PyObjCTools.AppHelper resolve
+    return module
+
+
+def _swap(name: str, module: types.ModuleType) -> None:
+    if name not in _saved:
+        _saved[name] = sys.modules.get(name)
+    sys.modules[name] = module
+
+
+def install() -> None:
+    """Use the fake sounddevice, and placeholders for macOS modules that can't import.
+
+    Affects the whole process until uninstall() is called.
+    """
+    _swap("sounddevice", fake_sounddevice)
+    recorder = sys.modules.get("voicekey.recorder")
+    if recorder is not None:
+        recorder.sd = fake_sounddevice
+    for name in _MACOS_MODULES:
+        if name in _saved:
+            continue
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            _swap(name, _placeholder_module(name))
+
+
+def uninstall() -> None:
+    """Restore whatever install() replaced."""
+    for name, module in _saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _saved.clear()
+    recorder = sys.modules.get("voicekey.recorder")
+    if recorder is not None and "sounddevice" in sys.modules:
+        recorder.sd = sys.modules["sounddevice"]
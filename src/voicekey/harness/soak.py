@@ -0,0 +1,195 @@
+"""Soak test: thousands of accelerated dictations through App, watching resources.
+
+Runs the headless harness (fake mic, stand-in server, fake paste) with
+history, the audio archive and a vocabulary switched on, samples RSS, OS
+threads and open file descriptors every few sessions, and checks them
+against Limits once warm-up is over:
+
+    growth     the most each may rise above its post-warm-up value
+    rss slope  RSS trend over the second half, in MB per 1000 sessions;
+               catches a slow leak that the growth limit would only
+               catch after a day of dictation
+
+Warm-up covers the one-off costs (imports, the first connection), but
+some bounded caches take longer to fill: SQLite's 2 MB page cache for
+history runs to about 1300 sessions. Run enough sessions that the second
+half starts after that, or the trend reads high.
+
+With `trace_memory` tracemalloc runs from the end of warm-up, and the
+report charges what's still allocated at the end to subsystems (see
+memprofile.CATEGORIES).
+"""
+
+import gc
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from ..mockserver import ServerConfig
+from . import Harness, open_fds, rss_bytes, thread_count
+from .audio import synth_speech
+
+
+@dataclass
+class Limits:
+    rss_growth_mb: float = 20.0
+    rss_slope_mb: float = 1.0     # per 1000 sessions, over the second half
+    extra_threads: int = 4
+    extra_fds: int = 8
+
+
+@dataclass
+class Sample:
+    session: int
+    seconds: float
+    rss_mb: float
+    threads: int
+    fds: int
+
+
+@dataclass
+class SoakReport:
+    sessions: int
+    failures: int
+    wall_seconds: float
+    limits: Limits
+    samples: list[Sample] = field(default_factory=list)
+    violations: list[str] = field(default_factory=list)
+    memory: dict[str, int] = field(default_factory=dict)  # tracemalloc growth by subsystem
+
+    @property
+    def baseline(self) -> Sample:
+        return self.samples[0]
+
+    @property
+    def rss_slope_mb(self) -> float:
+        """Least-squares RSS trend over the second half, MB per 1000 sessions."""
+        half = self.samples[len(self.samples) // 2:]
+        if len(half) < 3 or half[-1].session == half[0].session:
+            return 0.0
+        x = np.array([s.session for s in half], dtype=float)
+        y = np.array([s.rss_mb for s in half])
+        return float(np.polyfit(x, y, 1)[0] * 1000)
+
+    def to_dict(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "failures": self.failures,
+            "wall_seconds": round(self.wall_seconds, 2),
+            "limits": asdict(self.limits),
+            "rss_slope_mb_per_1000": round(self.rss_slope_mb, 3),
+            "violations": self.violations,
+            "memory": self.memory,
+            "samples": [asdict(s) for s in self.samples],
+        }
+
+    def format(self) -> str:
+        base, last = self.baseline, self.samples[-1]
+        most = lambda attr: max(getattr(s, attr) for s in self.samples)  # noqa: E731
+        lines = [
+            f"sessions        {self.sessions} ({self.failures} failed) in {self.wall_seconds:.1f} s "
+            f"({self.sessions / max(self.wall_seconds, 1e-9):.0f}/s)",
+            f"rss             {base.rss_mb:.1f} → {last.rss_mb:.1f} MB, peak {most('rss_mb'):.1f} "
+            f"(limit +{self.limits.rss_growth_mb:g}); trend {self.rss_slope_mb:+.2f} MB per 1000 "
+            f"(limit {self.limits.rss_slope_mb:g})",
+            f"threads         {base.threads} → {last.threads}, peak {most('threads')} "
+            f"(limit +{self.limits.extra_threads})",
+            f"open fds        {base.fds} → {last.fds}, peak {most('fds')} (limit +{self.limits.extra_fds})",
+        ]
+        if self.memory:
+            lines.append("still allocated since warm-up (tracemalloc):")
+            lines += [f"  {name:<12}{size / 1e3:>+10.1f} kB" for name, size in self.memory.items()]
+        lines += [f"FAIL: {v}" for v in self.violations] or ["OK: within limits"]
+        return "\n".join(lines)
+
+
+def run_soak(
+    sessions: int = 4000,
+    seconds: float = 1.0,
+    warmup: int = 50,
+    sample_every: int = 50,
+    limits: Limits | None = None,
+    trace_memory: bool = False,
+    on_sample=None,
+) -> SoakReport:
+    """Dictate `sessions` clips of `seconds` as fast as possible and check resource bounds.
+
+    `on_sample(sample)` is called as each sample is taken (for progress).
+    """
+    from ..archive import Archive
+    from ..history import History
+
+    limits = limits or Limits()
+    server = ServerConfig(latency=0, chunk_delay=0, transcript="")
+    clips = [synth_speech(seconds, seed=i) for i in range(4)]
+    with tempfile.TemporaryDirectory(prefix="voicekey-soak-") as tmp:
+        root = Path(tmp)
+        (root / "vocabulary.txt").write_text("jason => JSON\npost gress => PostgreSQL\n")
+        history = History(root / "history.db")
+        archive = Archive(root / "archive", max_bytes=32 << 20, max_days=0)
+        cfg = {"archive": True, "vocabulary": str(root / "vocabulary.txt"), "flight_sessions": 5}
+        report = SoakReport(sessions=sessions, failures=0, wall_seconds=0.0, limits=limits)
+        profiler = None
+        try:
+            with Harness(server=server, cfg=cfg, history=history, archive=archive) as harness:
+                for i in range(warmup):
+                    harness.run_session(clips[i % len(clips)])
+                harness.insertions.clear()
+                history.flush()
+                archive.flush()
+                if trace_memory:
+                    from ..memprofile import MemoryProfiler
+                    profiler = MemoryProfiler()
+                gc.collect()
+                start = time.perf_counter()
+
+                def sample(done: int) -> None:
+                    s = Sample(done, time.perf_counter() - start, rss_bytes() / 1e6, thread_count(), open_fds())
+                    report.samples.append(s)
+                    if on_sample is not None:
+                        on_sample(s)
+
+                sample(0)
+                for i in range(sessions):
+                    if not harness.run_session(clips[i % len(clips)]):
+                        report.failures += 1
+                    harness.insertions.clear()  # the harness's own record, not the app's
+                    if (i + 1) % sample_every == 0 or i + 1 == sessions:
+                        sample(i + 1)
+                report.wall_seconds = time.perf_counter() - start
+                history.flush()
+                archive.flush()
+                if profiler is not None:
+                    gc.collect()
+                    report.memory = profiler.growth_by_category()
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            history.close()
+            archive.close()
+
+    report.violations = check(report)
+    return report
+
+
+def check(report: SoakReport) -> list[str]:
+    """Each way the samples exceed the report's limits."""
+    limits, base = report.limits, report.baseline
+    out = []
+    peak_rss = max(s.rss_mb for s in report.samples)
+    if peak_rss - base.rss_mb > limits.rss_growth_mb:
+        out.append(f"RSS grew {peak_rss - base.rss_mb:.1f} MB (limit {limits.rss_growth_mb:g})")
+    if report.rss_slope_mb > limits.rss_slope_mb:
+        out.append(f"RSS trending up {report.rss_slope_mb:.2f} MB per 1000 sessions "
+                   f"(limit {limits.rss_slope_mb:g})")
+    for attr, limit, label in (("threads", limits.extra_threads, "threads"),
+                               ("fds", limits.extra_fds, "open file descriptors")):
+        peak = max(getattr(s, attr) for s in report.samples)
+        if peak - getattr(base, attr) > limit:
+            out.append(f"{label} rose from {getattr(base, attr)} to {peak} (limit +{limit})")
+    if report.failures:
+        out.append(f"{report.failures} sessions didn't paste")
+    return out
@@ -0,0 +1,75 @@
+"""Tone-coded speech: a stand-in recogniser for tests that reshape the audio.
+
+The mock server's default transcripts hash the upload, so any change to the
+audio changes every word. Here each word of a small vocabulary is a short
+pure tone at its own frequency, separated by silence, and `recognize()`
+reads words back by finding each burst and its dominant frequency. A
+transform that keeps pitch and keeps words apart (time compression, done
+right) leaves the transcript unchanged; resampling, which shifts every
+frequency, or smearing bursts together does not.
+"""
+
+import io
+import wave
+
+import numpy as np
+
+from ..constants import SAMPLE_RATE
+
+VOCABULARY = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+)
+BASE_HZ = 400.0
+STEP_HZ = 100.0  # word i is a tone at BASE_HZ + i * STEP_HZ
+
+
+def synth_words(words: list[str], word_ms: int = 180, gap_ms: int = 90,
+                rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono int16 audio with one tone burst per word."""
+    n = rate * word_ms // 1000
+    t = np.arange(n) / rate
+    ramp = min(n // 4, rate // 100)
+    envelope = np.ones(n)
+    envelope[:ramp] = np.linspace(0, 1, ramp)
+    envelope[-ramp:] = np.linspace(1, 0, ramp)
+    gap = np.zeros(rate * gap_ms // 1000)
+    parts = [gap]
+    for word in words:
+        freq = BASE_HZ + VOCABULARY.index(word) * STEP_HZ
+        parts += [8000 * envelope * np.sin(2 * np.pi * freq * t), gap]
+    return np.concatenate(parts).astype(np.int16)
+
+
+def recognize(audio: np.ndarray, rate: int = SAMPLE_RATE) -> list[str]:
+    """Words in tone-coded audio ("?" for a burst at no known frequency)."""
+    hop = rate // 200  # 5 ms
+    frames = len(audio) // hop
+    if not frames:
+        return []
+    x = audio[:frames * hop].astype(np.float32)
+    energy = np.sqrt(np.mean(x.reshape(frames, hop) ** 2, axis=1))
+    active = energy > 0.2 * energy.max() if energy.max() > 100 else np.zeros(frames, bool)
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], active.astype(np.int8), [0]])))
+    words = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start < 4:  # under 20 ms: a click, not a word
+            continue
+        burst = x[start * hop:end * hop]
+        spectrum = np.abs(np.fft.rfft(burst * np.hanning(len(burst))))
+        freq = np.fft.rfftfreq(len(burst), 1 / rate)[np.argmax(spectrum)]
+        index = int(round((freq - BASE_HZ) / STEP_HZ))
+        close = 0 <= index < len(VOCABULARY) and abs(freq - BASE_HZ - index * STEP_HZ) < STEP_HZ / 3
+        words.append(VOCABULARY[index] if close else "?")
+    return words
+
+
+def transcribe_wav(wav: bytes) -> str:
+    """`recognize()` on a PCM WAV, as a space-separated transcript ("" if it isn't one)."""
+    try:
+        with wave.open(io.BytesIO(wav), "rb") as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+            rate = wf.getframerate()
+    except (wave.Error, EOFError):
+        return ""
+    return " ".join(recognize(audio, rate))
@@ -0,0 +1,214 @@
+"""Dictation history: every pasted transcript in SQLite, with full-text search.
+
+`add()` only queues the entry. A writer thread inserts whatever has queued
+up in one transaction, so the transcription thread never waits on disk and
+bursts cost one commit rather than one each. The database is in WAL mode,
+so `voicekey history` can read it while the app is writing.
+
+Entries live in `entries`; `entries_fts` is an FTS5 index over their text
+kept in step by triggers. Queries page with `before` (an entry id) rather
+than OFFSET, so deep pages cost the same as the first.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .constants import CONFIG_DIR, HISTORY_FILE
+
+SCHEMA_VERSION = 1
+BATCH_MAX = 512  # entries per transaction at most
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    audio_seconds REAL NOT NULL DEFAULT 0,
+    model TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+@dataclass
+class Entry:
+    id: int
+    created_at: float  # time.time()
+    text: str
+    audio_seconds: float
+    model: str
+    snippet: str = ""  # matching excerpt with [hits] marked (search results only)
+
+
+def default_path() -> Path:
+    return Path(CONFIG_DIR).expanduser() / HISTORY_FILE
+
+
+def match_query(query: str) -> str:
+    """FTS5 query for plain user text: every word must match, the last as a prefix.
+
+    Words are quoted, so punctuation and FTS syntax (AND, NEAR, *, :) are
+    searched for literally instead of raising syntax errors.
+    """
+    words = ['"' + w.replace('"', '""') + '"' for w in query.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+class History:
+    """The history database at `path`.
+
+    Reads use a connection per thread; writes go through a single writer
+    thread started by the first add().
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else default_path()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        self._local = threading.local()
+        self.batches = 0  # transactions committed by the writer
+        self.write_errors = 0
+
+    # ── Writing ─────────────────────────────────────────────────────
+
+    def add(self, text: str, audio_seconds: float = 0.0, model: str = "",
+            created_at: float | None = None) -> None:
+        """Queue an entry; it's written within a batch shortly after."""
+        self._ensure_writer()
+        self._queue.put((time.time() if created_at is None else created_at, text, audio_seconds, model))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued so far is committed."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Write what's queued, then stop the writer."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            atexit.unregister(self.close)
+            self._queue.put(None)
+            writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="voicekey-history",
+                                                    daemon=True)
+                    self._writer.start()
+                    atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                rows, waiters, stop = [], [], False
+                item = self._queue.get()
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        rows.append(item)
+                    if stop or len(rows) >= BATCH_MAX:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if rows:
+                    try:
+                        with conn:
+                            conn.executemany(
+                                "INSERT INTO entries (created_at, text, audio_seconds, model) "
+                                "VALUES (?, ?, ?, ?)", rows)
+                        self.batches += 1
+                    except sqlite3.Error:
+                        self.write_errors += 1  # history is best-effort; never break dictation
+                for waiter in waiters:
+                    waiter.set()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    # ── Reading ─────────────────────────────────────────────────────
+
+    def recent(self, limit: int = 20, before: int | None = None) -> list[Entry]:
+        """Newest entries first; pass the last id seen as `before` for the next page."""
+        rows = self._conn().execute(
+            "SELECT id, created_at, text, audio_seconds, model FROM entries "
+            "WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before if before is not None else 1 << 62, limit),
+        ).fetchall()
+        return [Entry(*row) for row in rows]
+
+    def search(self, query: str, limit: int = 20, before: int | None = None) -> list[Entry]:
+        """Entries whose text matches `query` (see match_query()), newest first."""
+        fts = match_query(query)
+        if not fts:
+            return self.recent(limit, before)
+        rows = self._conn().execute(
+            "SELECT e.id, e.created_at, e.text, e.audio_seconds, e.model, "
+            "snippet(entries_fts, 0, '[', ']', '…', 12) "
+            "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+            "WHERE entries_fts MATCH ? AND entries_fts.rowid < ? "
+            "ORDER BY entries_fts.rowid DESC LIMIT ?",
+            (fts, before if before is not None else 1 << 62, limit),
+        ).fetchall()
+        return [Entry(*row) for row in rows]
+
+    def get(self, entry_id: int) -> Entry | None:
+        row = self._conn().execute(
+            "SELECT id, created_at, text, audio_seconds, model FROM entries WHERE id = ?", (entry_id,)
+        ).fetchone()
+        return Entry(*row) if row else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not self.path.exists():
+            os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))  # transcripts are private
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # a crash can lose the last batch, not corrupt
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            with conn:
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return conn
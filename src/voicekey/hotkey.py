@@ -1,36 +1,101 @@
 """CGEvent tap for Option key press/release detection with debounce."""
 
+import queue
 import threading
 import time
+import traceback
 
 import Quartz
 
 from .constants import (
     DEBOUNCE_SECONDS,
     FLAG_OPTION,
+    HOTKEY_HANDLER_BUDGET,
     KEYCODE_LEFT_OPTION,
     KEYCODE_RIGHT_OPTION,
+    TAP_CALLBACK_BUDGET,
 )
+from .metrics import Histogram
+from .tracing import tracer
+
+
+class TapStats:
+    """Event tap health: callback latency, tap-disabled events, slow handlers."""
+
+    def __init__(self):
+        self.callback_us = Histogram()
+        self.handler_us = Histogram()
+        self.disabled_by_timeout = 0
+        self.disabled_by_user_input = 0
+        self.over_budget = 0      # tap callbacks slower than TAP_CALLBACK_BUDGET
+        self.slow_handlers = 0    # handlers slower than HOTKEY_HANDLER_BUDGET
+        self.last_slow = ""
+
+    def to_dict(self) -> dict:
+        return {
+            "callback_us": self.callback_us.to_dict(),
+            "handler_us": self.handler_us.to_dict(),
+            "disabled_by_timeout": self.disabled_by_timeout,
+            "disabled_by_user_input": self.disabled_by_user_input,
+            "over_budget": self.over_budget,
+            "slow_handlers": self.slow_handlers,
+            "last_slow": self.last_slow,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TapStats":
+        stats = cls()
+        stats.callback_us = Histogram.from_dict(data.get("callback_us", {}))
+        stats.handler_us = Histogram.from_dict(data.get("handler_us", {}))
+        stats.disabled_by_timeout = int(data.get("disabled_by_timeout", 0))
+        stats.disabled_by_user_input = int(data.get("disabled_by_user_input", 0))
+        stats.over_budget = int(data.get("over_budget", 0))
+        stats.slow_handlers = int(data.get("slow_handlers", 0))
+        stats.last_slow = str(data.get("last_slow", ""))
+        return stats
 
 
 class HotkeyListener:
     """Listens for Option key press/release via CGEvent tap.
 
+    on_press/on_release are never run on the tap's run-loop thread: they are
+    queued to a single dispatch thread (so they stay ordered) and timed there.
+
+    The key state is shared by the tap thread and the debounce timer's
+    thread, so it's only touched under `_lock`, and each press gets a
+    generation number: a timer that had already woken up when its key was
+    released (Timer.cancel() can't stop it then) sees a newer generation and
+    does nothing. Handlers are queued under the lock too, so a release is
+    never queued ahead of its press.
+
     Args:
         on_press: Called when Option key is pressed (after debounce).
         on_release: Called when Option key is released.
         hotkey: "option" (either), "left_option", or "right_option".
+        timer: Makes the debounce timer; called like threading.Timer(interval,
+            function, args) (harness.hotkey_stress passes a virtual clock's).
+        on_flags: Called on the tap thread with (keycode, option flag) for
+            every left/right Option flag change, before debouncing and
+            whichever `hotkey` is set (the flight recorder's raw key events).
     """
 
-    def __init__(self, on_press, on_release, hotkey: str = "option"):
+    def __init__(self, on_press, on_release, hotkey: str = "option", timer=threading.Timer,
+                 on_flags=None):
         self.on_press = on_press
         self.on_release = on_release
+        self.on_flags = on_flags
         self.hotkey = hotkey
+        self.stats = TapStats()
 
+        self._lock = threading.Lock()
+        self._timer = timer
         self._option_down = False
         self._debounce_timer: threading.Timer | None = None
         self._confirmed = False  # True after debounce fires
+        self._generation = 0     # bumped on every press and release
         self._tap = None
+        self._handlers: queue.SimpleQueue = queue.SimpleQueue()
+        self._dispatcher: threading.Thread | None = None
 
     def create_tap(self):
         """Create the CGEvent tap. Returns None if Accessibility not granted."""
@@ -59,8 +124,24 @@ class HotkeyListener:
             return keycode in (KEYCODE_LEFT_OPTION, KEYCODE_RIGHT_OPTION)
 
     def _callback(self, proxy, event_type, event, refcon):
+        start = time.perf_counter()
+        try:
+            with tracer.span("tap_callback"):
+                return self._handle_event(event_type, event)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.callback_us.record(elapsed * 1_000_000)
+            if elapsed > TAP_CALLBACK_BUDGET:
+                self.stats.over_budget += 1
+
+    def _handle_event(self, event_type, event):
         # Re-enable tap if it gets disabled (system does this under load)
         if event_type == Quartz.kCGEventTapDisabledByTimeout:
+            self.stats.disabled_by_timeout += 1
+            Quartz.CGEventTapEnable(self._tap, True)
+            return event
+        if event_type == Quartz.kCGEventTapDisabledByUserInput:
+            self.stats.disabled_by_user_input += 1
             Quartz.CGEventTapEnable(self._tap, True)
             return event
 
@@ -68,31 +149,71 @@ class HotkeyListener:
             event, Quartz.kCGKeyboardEventKeycode
         )
         flags = Quartz.CGEventGetFlags(event)
-        option_pressed = bool(flags & FLAG_OPTION)
+        self._on_flags_changed(keycode, bool(flags & FLAG_OPTION))
+        return event
 
+    def _on_flags_changed(self, keycode: int, option_pressed: bool) -> None:
+        if self.on_flags is not None and keycode in (KEYCODE_LEFT_OPTION, KEYCODE_RIGHT_OPTION):
+            self.on_flags(keycode, option_pressed)
         if not self._matches_hotkey(keycode):
-            return event
-
-        if option_pressed and not self._option_down:
-            # Option key down
-            self._option_down = True
-            self._confirmed = False
-            self._debounce_timer = threading.Timer(DEBOUNCE_SECONDS, self._on_debounce)
-            self._debounce_timer.start()
-
-        elif not option_pressed and self._option_down:
-            # Option key up
-            self._option_down = False
-            if self._debounce_timer is not None:
-                self._debounce_timer.cancel()
-                self._debounce_timer = None
-            if self._confirmed:
+            return
+        with self._lock:
+            if option_pressed and not self._option_down:
+                # Option key down
+                self._option_down = True
                 self._confirmed = False
-                self.on_release()
-
-        return event
-
-    def _on_debounce(self):
-        """Called after debounce period — Option was held long enough."""
-        self._confirmed = True
-        self.on_press()
+                self._generation += 1
+                self._debounce_timer = self._timer(
+                    DEBOUNCE_SECONDS, self._on_debounce, (self._generation,)
+                )
+                self._debounce_timer.start()
+
+            elif not option_pressed and self._option_down:
+                # Option key up
+                self._option_down = False
+                self._generation += 1
+                if self._debounce_timer is not None:
+                    self._debounce_timer.cancel()
+                    self._debounce_timer = None
+                if self._confirmed:
+                    self._confirmed = False
+                    self._dispatch(self.on_release, "on_release")
+
+    def _on_debounce(self, generation: int | None = None):
+        """Called after debounce period — Option was held long enough.
+
+        `generation` is the press the timer was started for; None confirms
+        whatever is held now.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # released (and maybe pressed again) since the timer woke
+            self._confirmed = True
+            self._dispatch(self.on_press, "on_press")
+
+    # ── Handler dispatch (off the tap thread) ───────────────────────
+
+    def _dispatch(self, handler, name: str) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(
+                target=self._run_handlers, name="hotkey-dispatch", daemon=True
+            )
+            self._dispatcher.start()
+        self._handlers.put((handler, name))
+
+    def _run_handlers(self) -> None:
+        while True:
+            self._run_handler(*self._handlers.get())
+
+    def _run_handler(self, handler, name: str) -> None:
+        start = time.perf_counter()
+        try:
+            with tracer.span(name):
+                handler()
+        except Exception:
+            traceback.print_exc()
+        elapsed = time.perf_counter() - start
+        self.stats.handler_us.record(elapsed * 1_000_000)
+        if elapsed > HOTKEY_HANDLER_BUDGET:
+            self.stats.slow_handlers += 1
+            self.stats.last_slow = f"{name} took {elapsed * 1000:.0f} ms"
@@ -1,19 +1,30 @@
 """Clipboard save → set text → Cmd+V → restore clipboard."""
 
 import time
+from collections.abc import Callable
 
 import Quartz
 from AppKit import NSPasteboard, NSPasteboardItem
 
 from .constants import FLAG_COMMAND, KEYCODE_V, PASTE_DELAY, RESTORE_DELAY
+from .tracing import tracer
 
 
-def insert_text(text: str) -> None:
-    """Insert text at cursor by pasting and restoring clipboard."""
+def insert_text(text: str, on_stage: Callable[[str], None] | None = None) -> None:
+    """Insert text at cursor by pasting and restoring clipboard.
+
+    on_stage, if given, is called with "paste_done" and "clipboard_restored".
+    """
+    with tracer.span("insert_text", chars=len(text)):
+        _insert_text(text, on_stage)
+
+
+def _insert_text(text: str, on_stage: Callable[[str], None] | None) -> None:
     pb = NSPasteboard.generalPasteboard()
 
     # Save current clipboard contents (all types)
-    saved_items = _save_clipboard(pb)
+    with tracer.span("save_clipboard"):
+        saved_items = _save_clipboard(pb)
 
     # Set clipboard to our text
     pb.clearContents()
@@ -24,12 +35,17 @@ def insert_text(text: str) -> None:
 
     # Simulate Cmd+V
     _simulate_paste()
+    if on_stage:
+        on_stage("paste_done")
 
     # Wait for paste to complete
     time.sleep(RESTORE_DELAY)
 
     # Restore original clipboard
-    _restore_clipboard(pb, saved_items)
+    with tracer.span("restore_clipboard"):
+        _restore_clipboard(pb, saved_items)
+    if on_stage:
+        on_stage("clipboard_restored")
 
 
 def _save_clipboard(pb: NSPasteboard) -> list[dict]:
@@ -0,0 +1,127 @@
+"""Concurrent load generator for OpenAI-compatible transcription endpoints.
+
+Replays a corpus of WAV payloads through OpenAIProvider (the real client
+code path) with a fixed number of workers and reports throughput, latency
+percentiles and errors. Point it at `voicekey mock-server`, at a proxy in
+front of it, or at any compatible API.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import httpx
+
+from .metrics import Histogram
+from .providers.openai import OpenAIProvider
+
+
+@dataclass
+class LoadReport:
+    requests: int
+    concurrency: int
+    wall_seconds: float
+    audio_seconds: float
+    ok: int
+    errors: dict[str, int] = field(default_factory=dict)
+    latency_us: Histogram = field(default_factory=Histogram)
+    first_delta_us: Histogram = field(default_factory=Histogram)
+
+    @property
+    def throughput(self) -> float:
+        """Completed requests per second."""
+        return self.ok / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        def pct(h: Histogram) -> dict:
+            return {f"p{p}": h.percentile(p) / 1000 for p in (50, 90, 99)} | {"max": h.max / 1000}
+
+        return {
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "ok": self.ok,
+            "errors": self.errors,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "requests_per_second": round(self.throughput, 2),
+            "audio_seconds_per_second": round(self.audio_seconds / self.wall_seconds, 2)
+            if self.wall_seconds else 0.0,
+            "latency_ms": pct(self.latency_us),
+            "first_delta_ms": pct(self.first_delta_us),
+        }
+
+    def format(self) -> str:
+        d = self.to_dict()
+        lines = [
+            f"requests        {self.requests} at concurrency {self.concurrency}",
+            f"ok              {self.ok}",
+            f"errors          {', '.join(f'{k}: {v}' for k, v in self.errors.items()) or 'none'}",
+            f"wall            {self.wall_seconds:.2f} s",
+            f"throughput      {d['requests_per_second']} req/s, "
+            f"{d['audio_seconds_per_second']} audio-s/s",
+            "",
+            f"{'(ms)':<16}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}",
+        ]
+        for name in ("latency_ms", "first_delta_ms"):
+            row = d[name]
+            lines.append(
+                f"{name[:-3]:<16}{row['p50']:>10.1f}{row['p90']:>10.1f}{row['p99']:>10.1f}{row['max']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def _error_kind(exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code}"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.TransportError):
+        return "transport"
+    return type(exc).__name__
+
+
+def run_load(
+    url: str,
+    corpus: list[tuple[bytes, float]],
+    requests: int,
+    concurrency: int,
+    api_key: str = "sk-loadgen",
+    model: str = "",
+    provider: OpenAIProvider | None = None,
+) -> LoadReport:
+    """Send `requests` transcriptions cycling through `corpus` ((wav, seconds) pairs)."""
+    provider = provider or OpenAIProvider(base_url=url)
+    report = LoadReport(requests=requests, concurrency=concurrency, wall_seconds=0.0,
+                        audio_seconds=0.0, ok=0)
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        wav, seconds = corpus[i % len(corpus)]
+        first: list[float] = []
+
+        def on_chunk(_delta: str) -> None:
+            if not first:
+                first.append(time.perf_counter())
+
+        start = time.perf_counter()
+        try:
+            kwargs = {"model": model} if model else {}
+            provider.transcribe(wav, api_key, on_chunk=on_chunk, **kwargs)
+        except Exception as e:
+            kind = _error_kind(e)
+            with lock:
+                report.errors[kind] = report.errors.get(kind, 0) + 1
+            return
+        end = time.perf_counter()
+        report.latency_us.record((end - start) * 1e6)
+        if first:
+            report.first_delta_us.record((first[0] - start) * 1e6)
+        with lock:
+            report.ok += 1
+            report.audio_seconds += seconds
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadgen") as pool:
+        list(pool.map(one, range(requests)))
+    report.wall_seconds = time.perf_counter() - start
+    return report
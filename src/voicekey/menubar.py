@@ -3,8 +3,12 @@
 import rumps
 
 
-def create_menubar_app(app) -> rumps.App:
-    """Create a menu bar app with settings and quit."""
+def create_menubar_app(app, on_ready=None) -> rumps.App:
+    """Create a menu bar app with settings and quit.
+
+    `on_ready` is called once on the main thread shortly after the run loop
+    starts, i.e. once the icon is visible.
+    """
 
     menubar = rumps.App("voicekey", title="🎤", quit_button=None)
 
@@ -15,9 +19,27 @@ def create_menubar_app(app) -> rumps.App:
             message="Voice dictation for macOS.\nHold Option to dictate.",
         )
 
+    @rumps.clicked("Save Flight Recording")
+    def save_flight(_):
+        path = app.dump_flight()
+        rumps.notification("voicekey", "Flight recording saved", str(path))
+
+    # Lets Python signal handlers (e.g. SIGINT from Ctrl-C)
+    # run promptly while the Cocoa run loop owns the main thread.
+    menubar._signal_pump = rumps.Timer(lambda _: None, 1)
+    menubar._signal_pump.start()
+
+    if on_ready is not None:
+        def ready(timer):
+            timer.stop()
+            on_ready()
+
+        menubar._ready = rumps.Timer(ready, 0.1)
+        menubar._ready.start()
+
     @rumps.clicked("Quit")
     def quit_app(_):
         rumps.quit_application()
 
-    menubar.menu = ["About", None, "Quit"]
+    menubar.menu = ["About", "Save Flight Recording", None, "Quit"]
     return menubar
@@ -0,0 +1,224 @@
+"""Latency histograms and the persisted stats file (~/.config/voicekey/stats.json)."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from .constants import CONFIG_DIR, STATS_FILE
+from .fileutil import locked, write_atomic
+
+# Log-linear buckets (HDR-style): values below 2**SUB_BITS are exact, above
+# that each power of two is split into 2**(SUB_BITS - 1) equal buckets, so
+# any recorded value is reported within ~6% of its true value.
+SUB_BITS = 5
+_HALF = 1 << (SUB_BITS - 1)
+
+
+def _bucket_index(value: int) -> int:
+    shift = max(0, value.bit_length() - SUB_BITS)
+    return shift * _HALF + (value >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    if index < 2 * _HALF:
+        return index
+    shift = index // _HALF - 1
+    top = index - shift * _HALF
+    return ((top + 1) << shift) - 1
+
+
+class Histogram:
+    """Compact latency histogram over non-negative integers (microseconds)."""
+
+    def __init__(self):
+        self._counts: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        value = max(0, int(value))
+        idx = _bucket_index(value)
+        with self._lock:
+            self._counts[idx] = self._counts.get(idx, 0) + 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, p: float) -> int:
+        """Value at or below which `p` percent of recordings fall."""
+        with self._lock:
+            if not self.count:
+                return 0
+            target = max(1, round(self.count * p / 100.0))
+            seen = 0
+            for idx in sorted(self._counts):
+                seen += self._counts[idx]
+                if seen >= target:
+                    return min(_bucket_upper(idx), self.max)
+            return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "Histogram") -> None:
+        with other._lock:
+            counts = dict(other._counts)
+            count, total, maximum = other.count, other.total, other.max
+        with self._lock:
+            for idx, n in counts.items():
+                self._counts[idx] = self._counts.get(idx, 0) + n
+            self.count += count
+            self.total += total
+            self.max = max(self.max, maximum)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "total": self.total,
+                "max": self.max,
+                "buckets": {str(k): v for k, v in sorted(self._counts.items())},
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        hist = cls()
+        hist.count = int(data.get("count", 0))
+        hist.total = int(data.get("total", 0))
+        hist.max = int(data.get("max", 0))
+        hist._counts = {int(k): int(v) for k, v in data.get("buckets", {}).items()}
+        return hist
+
+
+# ── Per-session stage timing ────────────────────────────────────────
+
+# Stage marks in the order a dictation passes through them.
+STAGES = (
+    "press",
+    "first_audio",
+    "release",
+    "encode_done",
+    "connected",
+    "request_sent",
+    "first_delta",
+    "last_delta",
+    "paste_done",
+    "clipboard_restored",
+)
+
+# Reported intervals: (name, from stage, to stage).
+INTERVALS = (
+    ("stream_open", "press", "first_audio"),
+    ("recording", "press", "release"),
+    ("encode", "release", "encode_done"),
+    ("connect", "encode_done", "connected"),
+    ("upload", "connected", "request_sent"),
+    ("first_delta", "request_sent", "first_delta"),
+    ("streaming", "first_delta", "last_delta"),
+    ("paste", "last_delta", "paste_done"),
+    ("restore", "paste_done", "clipboard_restored"),
+    ("release_to_paste", "release", "paste_done"),
+)
+
+
+class SessionTimer:
+    """Monotonic timestamps for the stages of one dictation."""
+
+    __slots__ = ("marks",)
+
+    def __init__(self):
+        self.marks: dict[str, int] = {}
+
+    def mark(self, stage: str) -> None:
+        """Record `stage` now, overwriting any earlier mark."""
+        self.marks[stage] = time.monotonic_ns()
+
+    def mark_once(self, stage: str) -> None:
+        """Record `stage` now unless it was already recorded."""
+        if stage not in self.marks:
+            self.marks[stage] = time.monotonic_ns()
+
+    def intervals(self) -> dict[str, int]:
+        """Microseconds for every interval whose two stages were both marked."""
+        marks = self.marks
+        out = {}
+        for name, start, end in INTERVALS:
+            if start in marks and end in marks:
+                out[name] = (marks[end] - marks[start]) // 1000
+        return out
+
+
+class StageStats:
+    """One histogram per entry in INTERVALS, aggregated across sessions."""
+
+    def __init__(self):
+        self.hists = {name: Histogram() for name, _, _ in INTERVALS}
+
+    def add(self, session: SessionTimer) -> None:
+        for name, micros in session.intervals().items():
+            self.hists[name].record(micros)
+
+    def to_dict(self) -> dict:
+        return {name: h.to_dict() for name, h in self.hists.items() if h.count}
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per-stage count and p50/p90/p99/max in milliseconds."""
+        return {
+            name: {
+                "count": h.count,
+                "p50": h.percentile(50) / 1000,
+                "p90": h.percentile(90) / 1000,
+                "p99": h.percentile(99) / 1000,
+                "max": h.max / 1000,
+            }
+            for name, h in self.hists.items()
+            if h.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StageStats":
+        stats = cls()
+        for name, hist in data.items():
+            if name in stats.hists:
+                stats.hists[name] = Histogram.from_dict(hist)
+        return stats
+
+
+# ── Persisted stats file ────────────────────────────────────────────
+
+def _stats_path() -> Path:
+    return Path(CONFIG_DIR).expanduser() / STATS_FILE
+
+
+def load() -> dict:
+    """Load all persisted stats sections, or {} if none/corrupt."""
+    path = _stats_path()
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_section(name: str, section: dict) -> None:
+    """Replace one top-level section of the stats file, keeping other writers' sections."""
+    path = _stats_path()
+    with locked(path):
+        data = load()
+        data[name] = section
+        write_atomic(path, json.dumps(data, separators=(",", ":")))
+
+
+def reset() -> None:
+    path = _stats_path()
+    with locked(path):
+        if path.exists():
+            path.unlink()
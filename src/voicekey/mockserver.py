@@ -0,0 +1,337 @@
+"""Local OpenAI-compatible stand-in for /v1/audio/transcriptions.
+
+Streams a transcript back as SSE deltas with configurable latency and chunk
+cadence, can inject 429s, 500s and stalled streams, and can enforce a
+requests-per-second ceiling the way a rate-limited API does. Transcripts are
+deterministic: either a fixed string, or words picked from a small lexicon
+seeded by a hash of the uploaded audio (about 2.5 words per second of WAV
+audio), so the same corpus always produces the same results. The "tones"
+engine instead decodes tone-coded words (harness.tones), for tests that
+change the audio and expect the same words back. Runs entirely
+offline; `voicekey mock-server` serves it on a port.
+"""
+
+import hashlib
+import json
+import math
+import random
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TRANSCRIPT = "The quick brown fox jumps over the lazy dog."
+
+LEXICON = (
+    "the a voice key dictation meeting project update we should ship this "
+    "week please review notes and send them to team before friday thanks "
+    "latency test model transcript server client audio stream request"
+).split()
+
+WORDS_PER_SECOND = 2.5
+
+
+class Distribution:
+    """Random delay spec: "0.2", "uniform:LO:HI", "normal:MEAN:SD",
+    "lognormal:MEDIAN:SIGMA" or "exp:MEAN" (seconds, never negative)."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+    def __init__(self, spec: str | float):
+        self.spec = str(spec)
+        kind, _, rest = self.spec.partition(":")
+        if not rest:
+            kind, rest = "fixed", kind
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown distribution {kind!r} in {self.spec!r}")
+        try:
+            self._params = [float(p) for p in rest.split(":")]
+        except ValueError:
+            raise ValueError(f"Bad distribution parameters in {self.spec!r}") from None
+        expected = {"fixed": 1, "exp": 1}.get(kind, 2)
+        if len(self._params) != expected:
+            raise ValueError(f"{kind} takes {expected} parameter(s): {self.spec!r}")
+        self.kind = kind
+
+    def sample(self, rng: random.Random) -> float:
+        p = self._params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = p[0] * rng.lognormvariate(0.0, p[1])
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self) -> str:
+        return f"Distribution({self.spec!r})"
+
+
+@dataclass
+class ServerConfig:
+    latency: Distribution | str | float = 0.2      # seconds before the first delta
+    chunk_delay: Distribution | str | float = 0.02  # seconds between deltas
+    words_per_chunk: int = 1
+    transcript: str = DEFAULT_TRANSCRIPT           # "" = derive from the audio
+    engine: str = "hash"                           # "tones": decode harness.tones words instead
+    error_429: float = 0.0                         # fraction of requests rejected with 429
+    error_500: float = 0.0                         # fraction failing with 500
+    stall: float = 0.0                             # fraction that stall mid-stream
+    stall_seconds: float = 10.0
+    retry_after: float = 1.0                       # Retry-After sent with injected 429s
+    max_rps: float = 0.0                           # request ceiling; above it 429 (0 = none)
+    seed: int = 0
+
+    def __post_init__(self):
+        if not isinstance(self.latency, Distribution):
+            self.latency = Distribution(self.latency)
+        if not isinstance(self.chunk_delay, Distribution):
+            self.chunk_delay = Distribution(self.chunk_delay)
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    completed: int = 0
+    rejected_429: int = 0
+    failed_500: int = 0
+    stalled: int = 0
+    bytes_received: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def bump(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def to_dict(self) -> dict:
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+
+
+def transcript_for(audio: bytes, words_per_second: float = WORDS_PER_SECOND) -> str:
+    """Deterministic pseudo-transcript for an uploaded audio file."""
+    digest = hashlib.sha256(audio).digest()
+    rng = random.Random(digest)
+    seconds = wav_seconds(audio)
+    count = max(1, round(seconds * words_per_second)) if seconds else 1 + digest[0] % 12
+    words = [rng.choice(LEXICON) for _ in range(count)]
+    return " ".join(words).capitalize() + "."
+
+
+def wav_seconds(audio: bytes) -> float:
+    """Duration of a PCM WAV from its header, or 0.0 if it isn't one."""
+    if len(audio) < 44 or audio[:4] != b"RIFF" or audio[8:12] != b"WAVE":
+        return 0.0
+    channels, rate = struct.unpack_from("<HI", audio, 22)
+    bits = struct.unpack_from("<H", audio, 34)[0]
+    data_size = struct.unpack_from("<I", audio, 40)[0]
+    frame_bytes = channels * bits // 8
+    if not rate or not frame_bytes:
+        return 0.0
+    return min(data_size, len(audio) - 44) / frame_bytes / rate
+
+
+def parse_multipart(body: bytes, content_type: str) -> dict[str, bytes]:
+    """Map form field names to their raw values."""
+    boundary = ""
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary":
+            boundary = value.strip('"')
+    if not boundary:
+        return {}
+    fields = {}
+    for part in body.split(b"--" + boundary.encode())[1:]:
+        if part.startswith(b"--"):
+            break
+        head, _, value = part.partition(b"\r\n\r\n")
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-disposition:"):
+                for item in line.split(b";"):
+                    key, _, name = item.strip().partition(b"=")
+                    if key == b"name":
+                        fields[name.strip(b'"').decode()] = value[:-2] if value.endswith(b"\r\n") else value
+    return fields
+
+
+def _chunks(transcript: str, words_per_chunk: int) -> list[str]:
+    words = transcript.split(" ")
+    n = max(1, words_per_chunk)
+    groups = [" ".join(words[i:i + n]) for i in range(0, len(words), n)]
+    return [g + " " for g in groups[:-1]] + groups[-1:]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stats.to_dict())
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/audio/transcriptions":
+            self.send_error(404)
+            return
+        body = self._read_body()
+        server = self.server
+        stats = server.stats
+        stats.bump("requests")
+        stats.bump("bytes_received", len(body))
+
+        cfg = server.config
+        with server.rng_lock:
+            roll = server.rng.random()
+            latency = cfg.latency.sample(server.rng)
+        wait = server.over_limit()
+        if wait:
+            stats.bump("rejected_429")
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                            {"Retry-After": str(math.ceil(wait)),
+                             "retry-after-ms": str(math.ceil(wait * 1000))})
+            return
+        if roll < cfg.error_429:
+            stats.bump("rejected_429")
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                            {"Retry-After": f"{cfg.retry_after:g}"})
+            return
+        if roll < cfg.error_429 + cfg.error_500:
+            stats.bump("failed_500")
+            self._send_json(500, {"error": {"message": "Injected failure", "type": "server_error"}})
+            return
+        stall = roll < cfg.error_429 + cfg.error_500 + cfg.stall
+
+        fields = parse_multipart(body, self.headers.get("Content-Type", ""))
+        if cfg.engine == "tones":
+            from .harness import tones
+            transcript = tones.transcribe_wav(fields.get("file", body))
+        else:
+            transcript = cfg.transcript or transcript_for(fields.get("file", body))
+        stream = fields.get("stream", b"true") == b"true"
+
+        time.sleep(latency)
+        if not stream:
+            self._send_json(200, {"text": transcript})
+            stats.bump("completed")
+            return
+
+        # Chunked so the connection can be kept alive, like the real API; a
+        # stalled stream is close-delimited so it can just stop mid-way.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        if stall:
+            self.send_header("Connection", "close")
+        else:
+            self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, delta in enumerate(_chunks(transcript, cfg.words_per_chunk)):
+            if i:
+                with server.rng_lock:
+                    delay = cfg.chunk_delay.sample(server.rng)
+                if delay:
+                    time.sleep(delay)
+            if stall:
+                self.wfile.write(f"data: {json.dumps({'text': delta})}\n\n".encode())
+                self.wfile.flush()
+                stats.bump("stalled")
+                time.sleep(cfg.stall_seconds)
+                self.close_connection = True
+                return
+            self._write_chunk(f"data: {json.dumps({'text': delta})}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+        stats.bump("completed")
+
+    def _read_body(self) -> bytes:
+        """The request body, whether sized by Content-Length or sent chunked."""
+        if "chunked" not in self.headers.get("Transfer-Encoding", "").lower():
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        parts = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if size == 0:
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                return b"".join(parts)
+            parts.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded HTTP server; `url` is the API root to use as `api_base`."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, config: ServerConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or ServerConfig()
+        self.stats = ServerStats()
+        self.rng = random.Random(self.config.seed)
+        self.rng_lock = threading.Lock()
+        self._tokens = max(1.0, self.config.max_rps)
+        self._refilled_at = time.monotonic()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def requests(self) -> int:
+        return self.stats.requests
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients hanging up mid-request (e.g. after a 429) are routine here.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def over_limit(self) -> float:
+        """Take a request token; if none is left, seconds until one will be (max_rps)."""
+        rate = self.config.max_rps
+        if rate <= 0:
+            return 0.0
+        with self.rng_lock:
+            now = time.monotonic()
+            self._tokens = min(max(1.0, rate), self._tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / rate
+
+    def start(self) -> "MockServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
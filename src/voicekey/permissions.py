@@ -22,13 +22,13 @@ def prompt_accessibility() -> bool:
 
 
 def check_microphone() -> bool:
-    """Check microphone access by trying to list audio devices."""
+    """Check microphone access by trying to list audio input devices."""
     try:
-        import sounddevice as sd
-        devices = sd.query_devices()
-        # If we can query devices, we likely have permission
+        from . import devices
+        # If we can list inputs, we likely have permission
         # Actual recording will trigger the permission dialog if needed
-        return len(devices) > 0
+        # The list is cached, so the first recording doesn't read it again
+        return len(devices.manager().inputs()) > 0
     except Exception:
         return False
 
@@ -1,9 +1,17 @@
 """Transcription provider abstraction.
 
-To add a new provider:
-1. Create a module in this package (e.g., groq.py)
-2. Implement a class with a `transcribe` method matching the Provider protocol
-3. Register it in PROVIDERS below
+Providers are found by name: the built-in ones below, then any declared
+by installed distributions under the "voicekey.providers" entry-point
+group (see plugins.py). To add a provider:
+1. Implement a class with a `transcribe` method matching the Provider
+   protocol; its constructor takes the keyword options from_config passes.
+2. Describe it with a ProviderInfo in a module that imports nothing heavy.
+3. Add it to BUILTIN below, or declare the ProviderInfo as an entry point
+   in your own package.
+
+Only the provider in use is imported, on first use.
+
+Streaming providers can decode server-sent events with sse.SSEDecoder.
 """
 
 from __future__ import annotations
@@ -11,6 +19,8 @@ from __future__ import annotations
 from collections.abc import Callable
 from typing import Protocol
 
+from .plugins import ProviderInfo, discover
+
 
 class Provider(Protocol):
     """Interface that all transcription providers implement."""
@@ -22,15 +32,19 @@ class Provider(Protocol):
         model: str = "",
         language: str = "",
         on_chunk: Callable[[str], None] | None = None,
+        on_stage: Callable[[str], None] | None = None,
     ) -> str:
         """Transcribe WAV audio and return the full text.
 
         Args:
-            wav_bytes: Raw WAV file bytes.
+            wav_bytes: Raw WAV file bytes, or a wav.WavPayload (len() and
+                iteration give its size and chunks; bytes() makes it contiguous).
             api_key: API key for the provider.
             model: Model identifier (provider-specific).
             language: ISO 639-1 language code, or empty for auto-detect.
             on_chunk: Optional callback invoked with each text delta as it arrives.
+            on_stage: Optional callback invoked with "connected" once a connection
+                is ready to send on, and "request_sent" once the upload is done.
 
         Returns:
             The complete transcribed text.
@@ -38,19 +52,59 @@ class Provider(Protocol):
         ...
 
 
-PROVIDERS: dict[str, type] = {}
+OPENAI = ProviderInfo(
+    "voicekey.providers.openai:OpenAIProvider",
+    description="OpenAI /audio/transcriptions, or any compatible server (api_base)",
+)
+
+# Also declared as entry points in pyproject.toml; listed here so a source
+# checkout that was never installed still has them. A plugin can't replace one.
+BUILTIN: dict[str, ProviderInfo] = {"openai": OPENAI}
+
+PROVIDERS: dict[str, type] = {}  # classes imported so far, by name
+
+
+def available(refresh: bool = False) -> dict[str, ProviderInfo]:
+    """Every provider that can be used, by name, without importing any of them."""
+    return {**discover(refresh).providers, **BUILTIN}
+
+
+def provider_info(name: str) -> ProviderInfo:
+    """What provider `name` can do; installed plugins are only scanned for non-built-in names."""
+    if name in BUILTIN:
+        return BUILTIN[name]
+    providers = available()
+    if name not in providers:
+        raise ValueError(f"Unknown provider: {name!r}. Available: {', '.join(sorted(providers))}")
+    return providers[name]
+
+
+def get_provider(name: str, **options) -> Provider:
+    """Get a provider instance by name, passing `options` to its constructor."""
+    cls = PROVIDERS.get(name)
+    if cls is None:
+        info = provider_info(name)
+        if "wav" not in info.formats:
+            raise ValueError(f"Provider {name!r} doesn't accept WAV audio ({', '.join(info.formats)})")
+        try:
+            cls = info.load()
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Provider {name!r} couldn't be loaded from {info.target}: {e}") from e
+        PROVIDERS[name] = cls
+    return cls(**options)
 
 
-def _load_providers() -> None:
-    from .openai import OpenAIProvider
-    PROVIDERS["openai"] = OpenAIProvider
+# Config keys baked into a provider when it is created.
+PROVIDER_KEYS = ("provider", "api_base", "rate_limit_rps", "max_concurrency", "retry_budget")
 
 
-def get_provider(name: str) -> Provider:
-    """Get a provider instance by name."""
-    if not PROVIDERS:
-        _load_providers()
-    if name not in PROVIDERS:
-        available = ", ".join(sorted(PROVIDERS.keys()))
-        raise ValueError(f"Unknown provider: {name!r}. Available: {available}")
-    return PROVIDERS[name]()
+def from_config(cfg: dict) -> Provider:
+    """The provider named in `cfg`, with its API base and rate-limit settings."""
+    options = {
+        "rate_limit": float(cfg.get("rate_limit_rps", 0)),
+        "max_concurrency": int(cfg.get("max_concurrency", 8)),
+        "retry_budget": float(cfg.get("retry_budget", 30)),
+    }
+    if cfg.get("api_base"):
+        options["base_url"] = cfg["api_base"]
+    return get_provider(cfg.get("provider", "openai"), **options)
@@ -0,0 +1,50 @@
+"""multipart/form-data request bodies streamed from bytes or a WavPayload.
+
+httpx's `files=` framing needs the upload as one object and, for an
+iterable, falls back to chunked transfer encoding. MultipartBody frames the
+form itself, knows its exact length, and yields the file's own chunks, so
+a recording goes to the socket without ever being copied whole.
+"""
+
+import os
+from collections.abc import Iterable, Iterator
+
+
+class MultipartBody:
+    """Form fields plus one file, for `client.stream(..., content=body, headers=body.headers)`.
+
+    Iterable more than once, so a retried request can send it again.
+    """
+
+    def __init__(self, fields: dict[str, str], name: str, filename: str,
+                 content: bytes | Iterable, content_type: str = "application/octet-stream"):
+        self.boundary = os.urandom(16).hex()
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+            for key, value in fields.items()
+        )
+        self._head = head + (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._content = content
+        self.fields = fields
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(len(self)),
+        }
+
+    def __len__(self) -> int:
+        return len(self._head) + len(self._content) + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes | memoryview]:
+        yield self._head
+        if isinstance(self._content, (bytes, bytearray, memoryview)):
+            yield self._content
+        else:
+            yield from self._content
+        yield self._tail
@@ -1,29 +1,79 @@
 """OpenAI transcription provider (gpt-4o-mini-transcribe, gpt-4o-transcribe)."""
 
+import email.utils
 import json
+import math
+import threading
+import time
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
 import httpx
 
 from ..constants import DEFAULT_MODEL, OPENAI_API_BASE
+from ..tracing import tracer
+from .multipart import MultipartBody
+from .ratelimit import Failure, RateLimiter, RetryPolicy
+from .sse import iter_events
+
+if TYPE_CHECKING:
+    from ..wav import WavPayload
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 class OpenAIProvider:
-    """Transcription via OpenAI's /audio/transcriptions endpoint with SSE streaming."""
+    """Transcription via OpenAI's /audio/transcriptions endpoint with SSE streaming.
+
+    One httpx.Client (and its keep-alive connection pool) is shared by all
+    calls on an instance, so later requests skip the TCP/TLS handshake.
+    Calls also share a RateLimiter: 429s, 5xx responses and connection
+    errors are retried with backoff (honouring Retry-After), but only
+    until the first text delta has been passed to on_chunk.
+
+    Args:
+        base_url: API root; point it at any OpenAI-compatible server.
+        rate_limit: Request starts per second (0 = no client-side cap).
+        max_concurrency: Most requests in flight at once; lowered
+            automatically while the server is throttling.
+        max_retries: Retries per call (0 = fail on the first error).
+        retry_budget: Seconds after which a call stops retrying.
+    """
+
+    def __init__(self, base_url: str = OPENAI_API_BASE, rate_limit: float = 0.0,
+                 max_concurrency: int = 8, max_retries: int = 3, retry_budget: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        policy = RetryPolicy(max_attempts=max_retries + 1, budget=retry_budget)
+        self.limiter = RateLimiter(rate_limit, max_concurrency, policy)
+        self._client: httpx.Client | None = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=30.0)
+        return self._client
+
+    def close(self) -> None:
+        """Close pooled connections; the next call opens a new client."""
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
 
     def transcribe(
         self,
-        wav_bytes: bytes,
+        wav_bytes: "bytes | WavPayload",
         api_key: str,
         model: str = DEFAULT_MODEL,
         language: str = "",
         on_chunk: Callable[[str], None] | None = None,
+        on_stage: Callable[[str], None] | None = None,
     ) -> str:
-        url = f"{OPENAI_API_BASE}/audio/transcriptions"
+        url = f"{self.base_url}/audio/transcriptions"
 
-        files = {
-            "file": ("audio.wav", wav_bytes, "audio/wav"),
-        }
         data = {
             "model": model,
             "response_format": "text",
@@ -31,37 +81,99 @@ class OpenAIProvider:
         }
         if language:
             data["language"] = language
+        # Framed here rather than via files=, so a WavPayload streams with a Content-Length.
+        body = MultipartBody(data, "file", "audio.wav", wav_bytes, "audio/wav")
 
         headers = {
             "Authorization": f"Bearer {api_key}",
+            **body.headers,
         }
 
         text_parts = []
+        extensions = {"trace": _stage_tracer(on_stage)} if on_stage else {}
 
-        with httpx.Client(timeout=30.0) as client:
-            with client.stream(
+        def attempt() -> None:
+            with self.client.stream(
                 "POST",
                 url,
                 headers=headers,
-                files=files,
-                data=data,
+                content=body,
+                extensions=extensions,
             ) as response:
+                if response.is_error:
+                    response.read()  # drain it so the connection goes back to the pool
                 response.raise_for_status()
 
-                for line in response.iter_lines():
-                    if not line or not line.startswith("data: "):
-                        continue
-                    payload = line[6:]
-                    if payload == "[DONE]":
+                for event in iter_events(response.iter_bytes()):
+                    if event.done:
                         break
-                    try:
-                        event = json.loads(payload)
-                        delta = event.get("text", "")
+                    with tracer.span("sse_event"):
+                        try:
+                            payload = json.loads(event.data)
+                        except json.JSONDecodeError:
+                            continue
+                        delta = _delta(payload, seen_text=bool(text_parts))
                         if delta:
                             text_parts.append(delta)
                             if on_chunk:
                                 on_chunk(delta)
-                    except json.JSONDecodeError:
-                        continue
 
+        with tracer.span("transcribe", model=model):
+            # Once a delta has reached on_chunk, a retry would repeat text.
+            self.limiter.call(attempt, _classify, can_retry=lambda: not text_parts)
         return "".join(text_parts)
+
+
+def _delta(payload, seen_text: bool) -> str:
+    """The new text in one streamed event.
+
+    OpenAI sends `transcript.text.delta` events carrying `delta`, then a
+    `transcript.text.done` repeating the whole transcript in `text`; some
+    compatible servers send bare `{"text": ...}` deltas.
+    """
+    if not isinstance(payload, dict):
+        return ""
+    if payload.get("type") == "transcript.text.done":
+        return "" if seen_text else payload.get("text") or ""
+    return payload.get("delta") or payload.get("text") or ""
+
+
+def _classify(exc: Exception) -> Failure:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return Failure(
+            retryable=status in RETRY_STATUSES,
+            throttled=status == 429,
+            retry_after=_retry_after(exc.response.headers),
+        )
+    # Timeouts, refused/reset connections and cut-off streams.
+    return Failure(retryable=isinstance(exc, httpx.TransportError))
+
+
+def _retry_after(headers) -> float | None:
+    """Seconds from retry-after-ms or Retry-After (delta-seconds or an HTTP date)."""
+    try:
+        if "retry-after-ms" in headers:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:  # an HTTP date
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _stage_tracer(on_stage: Callable[[str], None]):
+    """httpcore trace hook that maps connection events onto voicekey stages."""
+
+    def trace(event_name: str, info: dict) -> None:
+        if event_name.endswith("send_request_headers.started"):
+            on_stage("connected")
+        elif event_name.endswith("send_request_body.complete"):
+            on_stage("request_sent")
+
+    return trace
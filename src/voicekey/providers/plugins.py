@@ -0,0 +1,156 @@
+"""Provider discovery through the "voicekey.providers" entry-point group.
+
+A distribution adds providers by declaring entry points that name a
+ProviderInfo, kept in a module that's cheap to import:
+
+    [project.entry-points."voicekey.providers"]
+    echo = "voicekey_echo.info:ECHO"
+
+    # voicekey_echo/info.py
+    from voicekey.providers import ProviderInfo
+    ECHO = ProviderInfo("voicekey_echo.provider:EchoProvider", formats=("wav", "flac"))
+
+The implementation module is imported when the provider is first used.
+Scanning installed distributions costs about 30 ms (most of it importing
+importlib.metadata) plus each info module's import, so the result is
+cached in ~/.config/voicekey/providers.json. The cache is keyed on the
+mtimes of the sys.path directories, which change whenever a distribution
+is installed or removed.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from ..constants import CONFIG_DIR, PROVIDER_CACHE_FILE, SAMPLE_RATE
+from ..fileutil import write_atomic
+
+GROUP = "voicekey.providers"
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ProviderInfo:
+    """Where a provider's class lives and what it can do, readable without importing it.
+
+    Args:
+        target: "module:Class" of the implementation, imported on first use.
+        streaming_input: Accepts audio while it's still being recorded.
+        formats: Audio containers it accepts, most preferred first.
+        sample_rate: Input rate it works best with.
+        description: One line for `voicekey providers`.
+    """
+
+    target: str
+    streaming_input: bool = False
+    formats: tuple[str, ...] = ("wav",)
+    sample_rate: int = SAMPLE_RATE
+    description: str = ""
+
+    @property
+    def module(self) -> str:
+        return self.target.partition(":")[0]
+
+    def load(self) -> type:
+        """Import the implementation and return its class."""
+        module, _, name = self.target.partition(":")
+        obj = importlib.import_module(module)
+        for attr in name.split("."):
+            obj = getattr(obj, attr)
+        return obj
+
+
+@dataclass
+class Discovery:
+    providers: dict[str, ProviderInfo]
+    errors: list[str]   # entry points that couldn't be read, and why
+    cached: bool        # read from providers.json rather than scanned
+
+
+_lock = threading.Lock()
+_discovery: Discovery | None = None
+
+
+def cache_path() -> Path:
+    return Path(CONFIG_DIR).expanduser() / PROVIDER_CACHE_FILE
+
+
+def discover(refresh: bool = False) -> Discovery:
+    """Providers declared by installed distributions (not the built-in ones).
+
+    Scanned once per process, and then only when the cache is stale or
+    `refresh` is set.
+    """
+    global _discovery
+    with _lock:
+        if _discovery is not None and not refresh:
+            return _discovery
+        key = _fingerprint()
+        found = None if refresh else _read_cache(key)
+        if found is None:
+            found = _scan()
+            _write_cache(key, found)
+        _discovery = found
+        return found
+
+
+def _fingerprint() -> str:
+    parts = [sys.version, GROUP]
+    for entry in sys.path:
+        try:
+            parts.append(f"{entry}\0{os.stat(entry or '.').st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def _scan() -> Discovery:
+    from importlib.metadata import entry_points
+
+    providers: dict[str, ProviderInfo] = {}
+    errors = []
+    for ep in entry_points(group=GROUP):
+        if ep.name in providers:
+            errors.append(f"{ep.name}: {ep.value} ignored, already provided by {providers[ep.name].target}")
+            continue
+        try:
+            info = ep.load()
+        except Exception as e:
+            errors.append(f"{ep.name}: can't load {ep.value}: {e}")
+            continue
+        if not isinstance(info, ProviderInfo):
+            errors.append(f"{ep.name}: {ep.value} is a {type(info).__name__}, not a ProviderInfo")
+            continue
+        providers[ep.name] = info
+    return Discovery(providers, errors, cached=False)
+
+
+def _read_cache(key: str) -> Discovery | None:
+    try:
+        data = json.loads(cache_path().read_text())
+        if data.get("version") != CACHE_VERSION or data.get("key") != key:
+            return None
+        providers = {name: ProviderInfo(**dict(fields, formats=tuple(fields["formats"])))
+                     for name, fields in data["providers"].items()}
+        return Discovery(providers, list(data.get("errors", [])), cached=True)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(key: str, found: Discovery) -> None:
+    data = {
+        "version": CACHE_VERSION,
+        "key": key,
+        "providers": {name: asdict(info) for name, info in found.providers.items()},
+        "errors": found.errors,
+    }
+    try:
+        # Whole-file replace, so concurrent scans need no lock: the last one wins.
+        write_atomic(cache_path(), json.dumps(data, separators=(",", ":")))
+    except OSError:
+        pass
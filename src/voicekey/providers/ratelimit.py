@@ -0,0 +1,204 @@
+"""Client-side rate limiting and retries shared by a provider's callers.
+
+RateLimiter combines three pieces:
+
+- TokenBucket caps request starts per second (GCRA-style: every caller gets
+  a scheduled start time, so waiters are served in order without polling)
+  and pauses everyone when the server says Retry-After.
+- AIMDLimiter caps requests in flight: +1 per window of successes, halved
+  on a throttle, at most once per round trip.
+- RetryPolicy gives jittered exponential backoff (or the server's
+  Retry-After) within a per-call latency budget.
+
+It knows nothing about HTTP: the provider passes a `classify` function that
+maps an exception to a Failure (retryable? a throttle? Retry-After?).
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+class TokenBucket:
+    """At most `rate` acquisitions per second, with bursts of up to `burst`.
+
+    A rate of 0 means unlimited (pauses still apply).
+    """
+
+    def __init__(self, rate: float = 0.0, burst: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tat = 0.0            # theoretical arrival time of the next request
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Claim the next start slot and return how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._paused_until)
+            if self.rate > 0:
+                interval = 1.0 / self.rate
+                start = max(start, self._tat - (self.burst - 1) * interval)
+                self._tat = max(self._tat, start) + interval
+            return start - now
+
+    def acquire(self) -> float:
+        """Block until a request may start; returns the seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every acquisition for `seconds` (e.g. the server's Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class AIMDLimiter:
+    """Adaptive cap on concurrent requests (additive increase, multiplicative decrease)."""
+
+    def __init__(self, initial: float = 4.0, minimum: float = 1.0, maximum: float = 16.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = min(max(initial, minimum), maximum)
+        self.in_flight = 0
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._last_decrease = float("-inf")
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            return self._clock()
+
+    def release(self, started: float, throttled: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                # Requests started before the last cut saw the old limit; one cut per round trip.
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = self._clock()
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay: float = 0.25  # seconds; doubled per attempt, full jitter
+    max_delay: float = 8.0
+    budget: float = 30.0      # give up rather than sleep past this many seconds since the first try
+
+    def delay(self, attempt: int, retry_after: float | None, rng: random.Random) -> float:
+        """Seconds to wait before retry number `attempt` (0 = first retry)."""
+        backoff = rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        # Retry-After is a floor; the jitter on top keeps everyone it was sent to from
+        # returning at the same instant.
+        return backoff if retry_after is None else retry_after + backoff
+
+
+@dataclass
+class Failure:
+    """How the provider classifies an exception from one attempt."""
+    retryable: bool
+    throttled: bool = False
+    retry_after: float | None = None
+
+
+@dataclass
+class LimiterStats:
+    requests: int = 0
+    throttled: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    wait_seconds: float = 0.0  # total time spent in the token bucket or backing off
+
+
+class RateLimiter:
+    """Token bucket + AIMD concurrency + retries, shared by every call through one provider.
+
+    Args:
+        rate: Request starts per second (0 = unlimited until the server pushes back).
+        max_concurrency: Upper bound for the adaptive in-flight limit.
+        policy: Retry and backoff settings.
+    """
+
+    def __init__(self, rate: float = 0.0, max_concurrency: int = 8,
+                 policy: RetryPolicy | None = None, seed: int | None = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.bucket = TokenBucket(rate, burst=max(1.0, rate), clock=clock, sleep=sleep)
+        self.concurrency = AIMDLimiter(initial=max_concurrency, maximum=max_concurrency, clock=clock)
+        self.policy = policy or RetryPolicy()
+        self.stats = LimiterStats()
+        self._rng = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable[[], object], classify: Callable[[Exception], Failure],
+             can_retry: Callable[[], bool] = lambda: True):
+        """Run `fn` under the limits, retrying failures `classify` marks retryable.
+
+        `can_retry` is consulted before each retry; return False once a retry
+        would no longer be safe (e.g. part of a response was already used).
+        """
+        first_try = self._clock()
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            started = self.concurrency.acquire()
+            self._count(requests=1, wait_seconds=waited)
+            try:
+                result = fn()
+            except Exception as e:
+                failure = classify(e)
+                self.concurrency.release(started, throttled=failure.throttled)
+                if failure.throttled:
+                    self._count(throttled=1)
+                    if failure.retry_after:
+                        self.bucket.pause(failure.retry_after)
+                if not failure.retryable or not can_retry():
+                    raise
+                delay = self.policy.delay(attempt, failure.retry_after, self._rng)
+                if (attempt + 1 >= self.policy.max_attempts
+                        or self._clock() - first_try + delay > self.policy.budget):
+                    self._count(gave_up=1)
+                    raise
+                self._count(retries=1, wait_seconds=delay)
+                self._sleep(delay)
+                attempt += 1
+                continue
+            self.concurrency.release(started)
+            return result
+
+    def _count(self, **amounts) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + amount)
+
+    def snapshot(self) -> dict:
+        """Current limits and counters (for `voicekey ctl stats` and reports)."""
+        with self._lock:
+            stats = dict(self.stats.__dict__)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return {
+            "rate": self.bucket.rate,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            **stats,
+        }
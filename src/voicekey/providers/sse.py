@@ -0,0 +1,114 @@
+"""Incremental server-sent events decoder for streaming providers.
+
+Feed it raw byte chunks exactly as they come off the socket; it returns the
+events completed so far. Chunks may split lines, multi-byte UTF-8 sequences
+or CRLF pairs anywhere. Per the SSE spec, lines end in LF, CRLF or CR;
+consecutive `data:` lines join with "\\n"; `event:`, `id:` and `retry:` are
+tracked; comments and unknown fields are ignored, and an event is dispatched
+at the blank line that ends it. Only complete lines are decoded (a newline
+byte never occurs inside a UTF-8 sequence), and the common single-line event
+costs one split, one slice and one decode.
+"""
+
+from dataclasses import dataclass
+
+DONE = "[DONE]"  # OpenAI's end-of-stream sentinel
+
+
+@dataclass(slots=True)
+class Event:
+    data: str
+    event: str = "message"
+    id: str = ""
+    retry: int | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.data == DONE
+
+
+class SSEDecoder:
+    def __init__(self):
+        self._pending = b""          # an incomplete trailing line
+        self._cr = False             # the last chunk ended in CR; skip an LF that follows
+        self._data: list[bytes] = []
+        self._event = ""
+        self._id = ""
+        self._retry: int | None = None
+
+    def feed(self, chunk: bytes) -> list[Event]:
+        """Events completed by `chunk` (possibly none)."""
+        buf = self._pending + chunk if self._pending else bytes(chunk)
+        if self._cr and buf:
+            # That CR already ended its line; an LF here is the rest of a CRLF.
+            self._cr = False
+            if buf[0] == 0x0A:
+                buf = buf[1:]
+        if b"\r" in buf:
+            self._cr = buf.endswith(b"\r")
+            buf = buf.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        lines = buf.split(b"\n")
+        self._pending = lines.pop()
+        events = []
+        data = self._data
+        for line in lines:
+            if line.startswith(b"data:"):  # the hot path, kept inline
+                data.append(line[6:] if line[5:6] == b" " else line[5:])
+            elif line:
+                self._field(line)
+            elif data:
+                # _dispatch(), inlined: most events are one data line.
+                raw = data[0] if len(data) == 1 else b"\n".join(data)
+                data.clear()
+                events.append(Event(raw.decode("utf-8", "replace"), self._event or "message",
+                                    self._id, self._retry))
+                self._event = ""
+            else:
+                self._event = ""
+        return events
+
+    def close(self) -> list[Event]:
+        """Flush at end of stream.
+
+        Browsers drop an event the stream ends in the middle of; we dispatch
+        it instead, so a server that closes without the final blank line
+        doesn't lose the last piece of a transcript.
+        """
+        pending, self._pending = self._pending, b""
+        self._cr = False
+        if pending:  # never holds a line break: feed() split on all of them
+            self._field(pending)
+        return [self._dispatch()] if self._data else []
+
+    def _field(self, line: bytes) -> None:
+        if line[0] == 0x3A:  # ":" comment
+            return
+        name, _, value = line.partition(b":")
+        if value.startswith(b" "):
+            value = value[1:]
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"event":
+            self._event = value.decode("utf-8", "replace")
+        elif name == b"id":
+            if b"\0" not in value:
+                self._id = value.decode("utf-8", "replace")
+        elif name == b"retry":
+            if value.isdigit():
+                self._retry = int(value)
+
+    def _dispatch(self) -> Event:
+        data = self._data
+        raw = data[0] if len(data) == 1 else b"\n".join(data)
+        data.clear()
+        event = Event(raw.decode("utf-8", "replace"), self._event or "message", self._id, self._retry)
+        self._event = ""
+        return event
+
+
+def iter_events(chunks):
+    """Events from an iterable of byte chunks (e.g. `response.iter_bytes()`)."""
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
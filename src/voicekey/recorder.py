@@ -1,35 +1,70 @@
 """Audio recording via sounddevice (24kHz mono PCM)."""
 
-import io
-import struct
 import threading
+import time
+from typing import TYPE_CHECKING
 
 import numpy as np
 import sounddevice as sd
 
 from .constants import CHANNELS, DTYPE, SAMPLE_RATE
+from .tracing import tracer
+from .wav import WavPayload, wav_header
+
+if TYPE_CHECKING:
+    from .devices import Device, DeviceManager
 
 
 class Recorder:
-    def __init__(self):
+    """Records from `device` (a name, "" for the system default) looked up in `devices`.
+
+    Without a DeviceManager, PortAudio's default input is opened directly.
+    """
+
+    def __init__(self, devices: "DeviceManager | None" = None, device: str = ""):
+        self.devices = devices
+        self.device = device
+        self.input: "Device | None" = None  # what the last start() opened
         self._frames: list[np.ndarray] = []
         self._stream: sd.InputStream | None = None
         self._lock = threading.Lock()
         self._rms: float = 0.0  # current RMS level (0.0–1.0)
+        self.first_frame_at: int | None = None  # time.monotonic_ns() of first callback
+        self.overflows = 0  # callbacks reporting input lost because we were late (all sessions)
+        self.on_frame = None  # optional callable(block) run for every audio block
+        self.on_level = None  # optional callable(rms) run for every audio block
 
     def start(self) -> None:
         with self._lock:
             self._frames = []
-            self._stream = sd.InputStream(
-                samplerate=SAMPLE_RATE,
-                channels=CHANNELS,
-                dtype=DTYPE,
-                callback=self._callback,
-            )
+            self.first_frame_at = None
+            try:
+                self._stream = self._open()
+            except sd.PortAudioError:
+                if self.devices is None:
+                    raise
+                # Unplugged since the device list was read: re-read it and retry once.
+                self.devices.invalidate()
+                self._stream = self._open()
             self._stream.start()
 
-    def stop(self) -> bytes:
-        """Stop recording and return WAV bytes."""
+    def _open(self) -> "sd.InputStream":
+        self.input = None
+        if self.devices is not None:
+            self.input = self.devices.resolve(self.device, SAMPLE_RATE, CHANNELS)
+        return sd.InputStream(
+            samplerate=SAMPLE_RATE,
+            channels=CHANNELS,
+            dtype=DTYPE,
+            callback=self._callback,
+            device=self.input.index if self.input is not None else None,
+        )
+
+    def stop(self) -> WavPayload | bytes:
+        """Stop recording and return the WAV (b"" if nothing was captured).
+
+        The payload references the captured blocks rather than copying them.
+        """
         with self._lock:
             if self._stream is not None:
                 self._stream.stop()
@@ -39,8 +74,8 @@ class Recorder:
             self._frames = []
         if not frames:
             return b""
-        audio = np.concatenate(frames)
-        return self._encode_wav(audio)
+        with tracer.span("encode_wav", frames=len(frames)):
+            return WavPayload(frames)
 
     @property
     def rms(self) -> float:
@@ -48,34 +83,24 @@ class Recorder:
         return self._rms
 
     def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
-        with self._lock:
-            self._frames.append(indata.copy())
-        # Compute RMS normalized to int16 range (32768)
-        rms_raw = np.sqrt(np.mean(indata.astype(np.float32) ** 2)) / 32768.0
-        # Apply mild log scaling for better visual response
-        self._rms = min(1.0, rms_raw * 5.0)
+        with tracer.span("audio_callback"):
+            if self.first_frame_at is None:
+                self.first_frame_at = time.monotonic_ns()
+            if status and status.input_overflow:
+                self.overflows += 1
+            block = indata.copy()
+            with self._lock:
+                self._frames.append(block)
+            if self.on_frame is not None:
+                self.on_frame(block)
+            # Compute RMS normalized to int16 range (32768)
+            rms_raw = np.sqrt(np.mean(indata.astype(np.float32) ** 2)) / 32768.0
+            # Apply mild log scaling for better visual response
+            self._rms = min(1.0, rms_raw * 5.0)
+            if self.on_level is not None:
+                self.on_level(self._rms)
 
     @staticmethod
     def _encode_wav(audio: np.ndarray) -> bytes:
         """Encode int16 numpy array to WAV bytes."""
-        buf = io.BytesIO()
-        num_samples = len(audio)
-        data_size = num_samples * 2  # 16-bit = 2 bytes per sample
-
-        # WAV header
-        buf.write(b"RIFF")
-        buf.write(struct.pack("<I", 36 + data_size))
-        buf.write(b"WAVE")
-        buf.write(b"fmt ")
-        buf.write(struct.pack("<I", 16))          # chunk size
-        buf.write(struct.pack("<H", 1))            # PCM format
-        buf.write(struct.pack("<H", CHANNELS))
-        buf.write(struct.pack("<I", SAMPLE_RATE))
-        buf.write(struct.pack("<I", SAMPLE_RATE * CHANNELS * 2))  # byte rate
-        buf.write(struct.pack("<H", CHANNELS * 2))  # block align
-        buf.write(struct.pack("<H", 16))            # bits per sample
-        buf.write(b"data")
-        buf.write(struct.pack("<I", data_size))
-        buf.write(audio.tobytes())
-
-        return buf.getvalue()
+        return wav_header(audio.nbytes) + audio.astype("<i2", copy=False).tobytes()
@@ -0,0 +1,135 @@
+"""Replay flight-recorder sessions through App with fake audio, provider and paste.
+
+By default the provider feeds back the response recorded in the session,
+so a replay checks what the app does with it (vocabulary, streaming
+rewriter, paste) under the config it's given. With a real provider the
+replayed audio is transcribed again, end to end.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from . import config, flight
+from .app import App
+from .constants import CHANNELS, SAMPLE_RATE
+from .recorder import Recorder
+
+if TYPE_CHECKING:
+    from .vocab import Vocabulary
+
+
+class ReplayRecorder(Recorder):
+    """Recorder whose audio blocks are pushed by the replay driver, not PortAudio."""
+
+    def start(self) -> None:
+        with self._lock:
+            self._frames = []
+            self.first_frame_at = None
+
+    def feed(self, pcm: bytes) -> None:
+        block = np.frombuffer(pcm, dtype=np.int16).reshape(-1, CHANNELS)
+        self._callback(block, len(block), None, None)
+
+
+class ReplayProvider:
+    """Provider that streams back the deltas recorded in the session."""
+
+    def __init__(self, deltas: list[str], error: str = ""):
+        self._deltas = deltas
+        self._error = error
+
+    def transcribe(self, wav_bytes, api_key, model="", language="", on_chunk=None, on_stage=None) -> str:
+        if on_stage:
+            on_stage("connected")
+            on_stage("request_sent")
+        for delta in self._deltas:
+            if on_chunk:
+                on_chunk(delta)
+        if self._error:
+            raise RuntimeError(self._error)
+        return "".join(self._deltas)
+
+
+@dataclass
+class ReplayResult:
+    index: int
+    audio_seconds: float
+    recorded: str   # text inserted in the original session
+    replayed: str   # text inserted during replay
+    truncated: bool
+    live: bool      # transcribed by a provider rather than fed the recorded response
+
+    @property
+    def matches(self) -> bool:
+        return self.recorded == self.replayed
+
+
+def replay_session(
+    session: flight.Session,
+    index: int = 0,
+    speed: float = 0.0,
+    cfg: dict | None = None,
+    vocabulary: "Vocabulary | None" = None,
+    provider=None,
+    api_key: str = "",
+) -> ReplayResult:
+    """Feed one recorded session through a fresh App and capture what it pastes.
+
+    Args:
+        speed: 1.0 reproduces the original timing, 2.0 runs twice as fast,
+            0 replays as fast as possible.
+        cfg: Settings for the app (model, language, speed-up); config.DEFAULTS
+            if not given.
+        vocabulary: Applied to the transcript as in the running app; none if
+            not given.
+        provider: Transcribes the replayed audio, instead of a ReplayProvider
+            feeding back the recorded response.
+    """
+    texts = {kind: [] for kind in (flight.SSE, flight.INSERT, flight.ERROR)}
+    for kind, _, payload in session.events:
+        if kind in texts:
+            texts[kind].append(payload.decode("utf-8"))
+
+    inserted: list[str] = []
+    recorder = ReplayRecorder()
+    live = provider is not None
+    if not live:
+        provider = ReplayProvider(texts[flight.SSE], "".join(texts[flight.ERROR]))
+    app = App(
+        cfg=dict(cfg if cfg is not None else config.DEFAULTS, flight_sessions=0, memory_profile=False),
+        api_key=api_key,
+        recorder=recorder,
+        provider=provider,
+        inserter=lambda text, on_stage=None: inserted.append(text),
+        persist_stats=False,
+        vocabulary=vocabulary,
+    )
+
+    samples = 0
+    start = time.monotonic()
+    for kind, offset_us, payload in session.events:
+        if speed > 0:
+            delay = start + offset_us / 1e6 / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if kind == flight.HOTKEY and payload == b"press":
+            app.on_hotkey_press()
+        elif kind == flight.HOTKEY and payload == b"release":
+            app.on_hotkey_release()
+            app.wait_idle()
+        elif kind in (flight.AUDIO_RAW, flight.AUDIO_ZLIB):
+            pcm = flight.decode_audio(kind, payload)
+            samples += len(pcm) // 2
+            recorder.feed(pcm)
+
+    return ReplayResult(
+        index=index,
+        audio_seconds=samples / CHANNELS / SAMPLE_RATE,
+        recorded="".join(texts[flight.INSERT]),
+        replayed="".join(inserted),
+        truncated=session.truncated,
+        live=live,
+    )
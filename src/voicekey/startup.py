@@ -0,0 +1,156 @@
+"""Startup profiling for `voicekey --profile-startup`.
+
+Once enabled, every module imported through the normal import system is
+timed (self and cumulative, like `python -X importtime`) and attributed to
+the startup phase running on that thread. `phase()` is a no-op context
+manager while disabled, so the call sites cost nothing in normal runs.
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.abc import MetaPathFinder
+
+DEFAULT_PHASE = "cli import"  # imports outside any phase() block
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    phase: str
+    depth: int           # 0 = imported directly by voicekey code in this phase
+    self_ms: float
+    cumulative_ms: float
+
+
+@dataclass
+class PhaseRecord:
+    name: str
+    ms: float
+
+
+class _TimedLoader:
+    """Wraps a loader so exec_module is timed; everything else is delegated."""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        spec = module.__spec__
+        # Put the real loader back so nothing else ever sees the wrapper.
+        spec.loader = module.__loader__ = self._loader
+        self._profiler._exec(self._loader, module)
+
+
+class _TimingFinder(MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.started_at = 0.0
+        self.imports: list[ImportRecord] = []
+        self.phases: list[PhaseRecord] = []
+        self._finder: _TimingFinder | None = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        previous = getattr(self._local, "phase", DEFAULT_PHASE)
+        self._local.phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.phase = previous
+            with self._lock:
+                self.phases.append(PhaseRecord(name, (time.perf_counter() - start) * 1000))
+
+    def checkpoint(self, name: str = DEFAULT_PHASE) -> None:
+        """Record everything from enable() until now as phase `name`."""
+        if self.enabled:
+            with self._lock:
+                self.phases.append(PhaseRecord(name, (time.perf_counter() - self.started_at) * 1000))
+
+    def _exec(self, loader, module) -> None:
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)  # accumulates children's time
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            total = (time.perf_counter() - start) * 1000
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            with self._lock:
+                self.imports.append(ImportRecord(
+                    name=module.__name__,
+                    phase=getattr(self._local, "phase", DEFAULT_PHASE),
+                    depth=len(stack),
+                    self_ms=total - children,
+                    cumulative_ms=total,
+                ))
+
+    def report(self, phases: list[str] | None = None, top: int = 15) -> str:
+        """Per-phase and per-import breakdown (optionally only the named phases)."""
+        with self._lock:
+            recorded = [p for p in self.phases if phases is None or p.name in phases]
+            imports = [i for i in self.imports if phases is None or i.phase in phases]
+        lines = [f"{'phase':<28}{'ms':>9}{'imports ms':>12}"]
+        for p in recorded:
+            import_ms = sum(i.cumulative_ms for i in imports if i.phase == p.name and i.depth == 0)
+            lines.append(f"{p.name:<28}{p.ms:>9.1f}{import_ms:>12.1f}")
+        if phases is None:
+            lines.append(f"{'total since enable':<28}{(time.perf_counter() - self.started_at) * 1000:>9.1f}")
+        roots = sorted((i for i in imports if i.depth == 0), key=lambda i: -i.cumulative_ms)
+        if roots:
+            lines += ["", f"{'slowest imports':<36}{'cumulative':>11}{'self':>8}  phase"]
+            for i in roots[:top]:
+                lines.append(f"{i.name:<36}{i.cumulative_ms:>11.1f}{i.self_ms:>8.1f}  {i.phase}")
+        return "\n".join(lines)
+
+
+profiler = StartupProfiler()
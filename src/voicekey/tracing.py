@@ -0,0 +1,171 @@
+"""Opt-in Trace Event Format spans, viewable in Perfetto or chrome://tracing.
+
+Spans are appended to a bounded in-memory ring from whatever thread produced
+them; a background writer drains the ring to disk when `flush()` is called,
+so the hot paths never touch the file. The output uses the JSON array form
+of the format, which viewers accept even if the closing bracket is missing
+(e.g. after a crash).
+"""
+
+import atexit
+import collections
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .constants import CONFIG_DIR, TRACE_BUFFER_EVENTS
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_args", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict | None):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self._tracer._record("X", self._name, self._start, end - self._start, self._args)
+        return False
+
+
+class Tracer:
+    """Collects complete ("X") and instant ("i") events into a ring buffer."""
+
+    def __init__(self, capacity: int = TRACE_BUFFER_EVENTS):
+        self.enabled = False
+        self.path: Path | None = None
+        self._ring: collections.deque = collections.deque(maxlen=capacity)
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter_ns()
+        self._threads: dict[int, str] = {}
+        self._named: set[int] = set()
+        self._file = None
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
+        self._write_lock = threading.Lock()
+
+    def enable(self, path: Path | None = None) -> Path:
+        """Start collecting spans, writing them to `path` on each flush."""
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = Path(CONFIG_DIR).expanduser() / "traces" / f"trace-{stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        with self._write_lock:
+            self._file = open(path, "w")
+            self._file.write("[\n")
+            self._named.clear()  # a new file needs its own thread names
+        self.enabled = True  # before the writer starts, or it exits straight away
+        self._writer = threading.Thread(target=self._run_writer, name="trace-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+        return path
+
+    def span(self, name: str, **args):
+        """Context manager timing a block as a complete event."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def instant(self, name: str, **args) -> None:
+        if self.enabled:
+            self._record("i", name, time.perf_counter_ns(), 0, args or None)
+
+    def flush(self) -> None:
+        """Ask the writer thread to drain the ring (returns immediately)."""
+        if self.enabled:
+            self._wake.set()
+
+    def close(self) -> None:
+        """Drain remaining events and terminate the JSON array."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._wake.set()
+        writer, self._writer = self._writer, None
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=5.0)  # its last drain may hold events already taken from the ring
+        with self._write_lock:
+            self._write_pending()
+            if self._file is not None:
+                self._file.write(json.dumps(self._meta("process_name", "voicekey", 0)) + "\n]\n")
+                self._file.close()
+                self._file = None
+
+    def _record(self, phase: str, name: str, start_ns: int, dur_ns: int, args: dict | None) -> None:
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self._ring.append((phase, name, tid, start_ns, dur_ns, args))
+
+    def _meta(self, kind: str, name: str, tid: int) -> dict:
+        return {"ph": "M", "name": kind, "pid": self._pid, "tid": tid, "args": {"name": name}}
+
+    def _encode(self, item: tuple) -> dict:
+        phase, name, tid, start_ns, dur_ns, args = item
+        event = {
+            "ph": phase,
+            "name": name,
+            "pid": self._pid,
+            "tid": tid,
+            "ts": (start_ns - self._t0) / 1000,
+        }
+        if phase == "X":
+            event["dur"] = dur_ns / 1000
+        else:
+            event["s"] = "t"
+        if args:
+            event["args"] = args
+        return event
+
+    def _drain(self) -> None:
+        with self._write_lock:
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        """Append new thread names and the ring's events; the caller holds _write_lock."""
+        lines = []
+        for tid, name in list(self._threads.items()):
+            if tid not in self._named:
+                self._named.add(tid)
+                lines.append(json.dumps(self._meta("thread_name", name, tid), separators=(",", ":")))
+        ring = self._ring
+        while True:
+            try:
+                item = ring.popleft()
+            except IndexError:
+                break
+            lines.append(json.dumps(self._encode(item), separators=(",", ":")))
+        if lines and self._file is not None:
+            self._file.write(",\n".join(lines) + ",\n")
+            self._file.flush()
+
+    def _run_writer(self) -> None:
+        while self.enabled:
+            self._wake.wait()
+            self._wake.clear()
+            self._drain()
+
+
+tracer = Tracer()
@@ -0,0 +1,150 @@
+"""Display backends: the Rich terminal UI, plain log lines, or nothing.
+
+App talks to one of these instead of Rich directly. "auto" picks Rich when
+stdout is a terminal and log lines otherwise (e.g. under launchd), so
+daemon deployments never import Rich or start render threads. The Rich
+backend lives in display.py and is only imported when selected.
+"""
+
+import re
+import sys
+import time
+
+BACKENDS = ("auto", "rich", "log", "null")
+
+# Same tag shape Rich's markup parser accepts, so "[Errno 61]" survives.
+_MARKUP_TAG = re.compile(r"\[(?:/|/?[a-z#@][^\[\]]*)\]")
+
+
+def get_display(name: str = "auto"):
+    """Display backend for a `display` config value."""
+    if name == "auto":
+        name = "rich" if _is_tty() else "log"
+    if name == "rich":
+        return RichDisplay()
+    if name == "log":
+        return LogDisplay()
+    if name == "null":
+        return NullDisplay()
+    raise ValueError(f"Unknown display {name!r}. Choose from: {', '.join(BACKENDS)}")
+
+
+def _is_tty() -> bool:
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+class NullMeter:
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def update_level(self, rms: float) -> None:
+        pass
+
+
+class TextStream:
+    """Collects streamed deltas without drawing anything."""
+
+    def __init__(self, on_finish=None):
+        self._parts: list[str] = []
+        self._on_finish = on_finish
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def start(self) -> None:
+        self._parts = []
+
+    def append(self, chunk: str) -> None:
+        self._parts.append(chunk)
+
+    def finish(self) -> None:
+        if self._on_finish is not None:
+            self._on_finish(self.text.strip())
+
+
+class NullDisplay:
+    """Prints nothing (tests, harness, benchmarks)."""
+
+    name = "null"
+
+    def print(self, markup: str = "") -> None:
+        pass
+
+    def banner(self, cfg: dict, accessibility: bool, microphone: bool) -> None:
+        pass
+
+    def meter(self) -> NullMeter:
+        return NullMeter()
+
+    def stream(self) -> TextStream:
+        return TextStream()
+
+
+class LogDisplay(NullDisplay):
+    """Timestamped plain lines on stdout; no meter, no live transcript.
+
+    Transcripts are summarised by length rather than written out, since
+    daemon stdout usually ends up in a log file.
+    """
+
+    name = "log"
+
+    def __init__(self, stream=None):
+        self._out = stream
+
+    def print(self, markup: str = "") -> None:
+        text = _MARKUP_TAG.sub("", markup).strip()
+        if text:
+            self._write(text)
+
+    def banner(self, cfg: dict, accessibility: bool, microphone: bool) -> None:
+        self._write(
+            f"voicekey started: provider={cfg.get('provider', 'openai')} "
+            f"model={cfg.get('model', '')} hotkey={cfg.get('hotkey', 'option')} "
+            f"language={cfg.get('language', '') or 'auto'} "
+            f"accessibility={'granted' if accessibility else 'NOT granted'} "
+            f"microphone={'available' if microphone else 'unavailable'}"
+        )
+
+    def stream(self) -> TextStream:
+        return TextStream(on_finish=self._transcribed)
+
+    def _transcribed(self, text: str) -> None:
+        if text:
+            self._write(f"transcribed {len(text.split())} words")
+
+    def _write(self, line: str) -> None:
+        out = self._out or sys.stdout
+        for part in filter(str.strip, line.splitlines()):
+            out.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {part.strip()}\n")
+        out.flush()
+
+
+class RichDisplay:
+    """Banner, live level meter and streaming transcript in the terminal."""
+
+    name = "rich"
+
+    def __init__(self):
+        from . import display
+
+        self._display = display
+
+    def print(self, markup: str = "") -> None:
+        self._display.console.print(markup)
+
+    def banner(self, cfg: dict, accessibility: bool, microphone: bool) -> None:
+        self._display.print_banner(cfg, accessibility=accessibility, microphone=microphone)
+
+    def meter(self):
+        return self._display.AudioMeter()
+
+    def stream(self):
+        return self._display.StreamingDisplay()
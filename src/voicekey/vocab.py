@@ -0,0 +1,240 @@
+"""Custom vocabulary: fix names and terms the model gets wrong, before pasting.
+
+The vocabulary file (the `vocabulary` setting, by default
+~/.config/voicekey/vocabulary.txt) has one entry per line:
+
+    # comment
+    Kubernetes
+    post gress => PostgreSQL
+    Go Lang => Go
+    gonna => going to
+    um =>
+
+A bare term fixes its casing: any casing of it is pasted as written. With
+`=>` the left side is replaced by the right, and only matches in exactly
+that casing if it has capitals. A lowercase replacement is capitalized
+where the match was ("Gonna" → "Going to"); an empty one deletes the match
+and the space before it.
+
+Entries only match whole words ("ai => AI" leaves "said" alone). A space in
+an entry matches any run of whitespace; punctuation must match as written.
+Where several entries match at one place the longest wins, matches don't
+overlap, and replaced text isn't matched again.
+
+The entries are compiled once into a trie keyed by word token, so applying
+them is one pass over the transcript's tokens: a token that can't start an
+entry costs a dict lookup, whatever the size of the vocabulary. Rewriter
+applies the same pass to streamed deltas, holding back only the tail that
+a later delta could still turn into a match.
+"""
+
+import re
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .constants import CONFIG_DIR, VOCABULARY_FILE
+
+# A token is a word or one punctuation character, with the whitespace before it.
+_TOKEN = re.compile(r"(\s*)(\w+|[^\w\s])")
+_RULES = ""  # trie key for the entries ending at a node (tokens are never empty)
+
+
+@dataclass(frozen=True)
+class _Rule:
+    replacement: str
+    exact: tuple[str, ...] | None  # original-case keys, for case-sensitive entries
+    capitalize: bool               # capitalize the replacement after a capital
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"  # what \w matches
+
+
+def default_path() -> Path:
+    return Path(CONFIG_DIR).expanduser() / VOCABULARY_FILE
+
+
+def _keys(tokens: list[tuple[str, str]], fold: bool = True) -> list[str]:
+    """Trie keys: the first token alone, later ones marked with whether a space precedes."""
+    keys = []
+    for n, (space, word) in enumerate(tokens):
+        word = word.casefold() if fold else word
+        keys.append(" " + word if space and n else word)
+    return keys
+
+
+class Vocabulary:
+    """A compiled set of replacements; see the module docstring for the rules."""
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = ()):
+        self._root: dict = {}
+        self.size = 0
+        self.path: Path | None = None
+        self.mtime = 0.0
+        self.compile_seconds = 0.0
+        start = time.perf_counter()
+        for source, replacement in entries:
+            self.add(source, replacement)
+        self.compile_seconds = time.perf_counter() - start
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "Vocabulary":
+        """Compile the entries in `path`; ValueError names the first bad line."""
+        path = Path(path).expanduser()
+        mtime = path.stat().st_mtime
+        text = path.read_text(encoding="utf-8")
+        start = time.perf_counter()
+        vocab = cls()
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            source, arrow, replacement = line.partition("=>")
+            try:
+                if arrow:
+                    vocab.add(source, replacement.strip())
+                else:
+                    vocab.add(line, line, case_sensitive=False)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+        vocab.compile_seconds = time.perf_counter() - start
+        vocab.path, vocab.mtime = path, mtime
+        return vocab
+
+    @classmethod
+    def missing(cls, path: str | Path) -> "Vocabulary":
+        """An empty vocabulary that goes stale once `path` is created."""
+        vocab = cls()
+        vocab.path = Path(path).expanduser()
+        return vocab
+
+    def add(self, source: str, replacement: str, case_sensitive: bool | None = None) -> None:
+        """Replace `source` with `replacement`; case-sensitive if `source` has capitals."""
+        tokens = _TOKEN.findall(source.strip())
+        if not tokens:
+            raise ValueError("nothing to match before '=>'")
+        if case_sensitive is None:
+            case_sensitive = source != source.casefold()
+        node = self._root
+        for key in _keys(tokens):
+            child = node.get(key)
+            if child is None:
+                child = node[key] = {}
+            node = child
+        rule = _Rule(replacement, tuple(_keys(tokens, fold=False)) if case_sensitive else None,
+                     not case_sensitive and replacement.islower())
+        rules = node.get(_RULES)
+        if rules is None:
+            node[_RULES] = [rule]
+            self.size += 1
+        else:
+            # A later entry for the same words overrides; exact-case ones are tried first.
+            rules = [rule] + [r for r in rules if r.exact != rule.exact]
+            rules.sort(key=lambda r: r.exact is None)
+            node[_RULES] = rules
+
+    def stale(self) -> bool:
+        """True when the file this was read from has changed, appeared or gone."""
+        if self.path is None:
+            return False
+        try:
+            return self.path.stat().st_mtime != self.mtime
+        except OSError:
+            return self.mtime != 0.0
+
+    def apply(self, text: str) -> str:
+        """`text` with every entry replaced."""
+        if not self._root:
+            return text
+        return self._rewrite(text, final=True)[0]
+
+    def _rewrite(self, text: str, final: bool) -> tuple[str, int]:
+        """Rewritten text, and how much of `text` it covers.
+
+        Unless `final`, stops before a trailing word that may continue in the
+        next delta, and before any match that later tokens could lengthen.
+        """
+        root = self._root
+        tokens = list(_TOKEN.finditer(text))
+        available = len(tokens)
+        if not final and tokens and tokens[-1].end() == len(text) and _is_word(tokens[-1][2][-1]):
+            available -= 1  # "Postgre" may still become "PostgreSQL"
+        out = []
+        done = 0  # text[:done] is settled
+        i = 0
+        while i < available:
+            node = root.get(tokens[i][2].casefold())
+            if node is None:
+                i += 1
+                continue
+            best, rule, j = -1, None, i
+            while True:
+                rules = node.get(_RULES)
+                if rules:
+                    found = self._pick(rules, tokens, i, j)
+                    if found is not None:
+                        best, rule = j, found
+                j += 1
+                if j >= available:
+                    if not final and len(node) > (_RULES in node):
+                        return "".join(out) + text[done:tokens[i].start()], tokens[i].start()
+                    break
+                m = tokens[j]
+                word = m[2].casefold()
+                node = node.get(" " + word if m.start(2) > m.start() else word)
+                if node is None:
+                    break
+            if rule is None:
+                i += 1
+                continue
+            first = tokens[i]
+            replacement = rule.replacement
+            if rule.capitalize and first[2][0].isupper():
+                replacement = replacement[0].upper() + replacement[1:]
+            out.append(text[done:first.start(2) if replacement else first.start()])
+            out.append(replacement)
+            done = tokens[best].end()
+            i = best + 1
+        end = len(text) if final else (tokens[available - 1].end() if available else 0)
+        end = max(end, done)
+        out.append(text[done:end])
+        return "".join(out), end
+
+    @staticmethod
+    def _pick(rules: list[_Rule], tokens: list[re.Match], i: int, j: int) -> _Rule | None:
+        exact = None
+        for rule in rules:
+            if rule.exact is None:
+                return rule
+            if exact is None:
+                exact = tuple(_keys([(m[1], m[2]) for m in tokens[i:j + 1]], fold=False))
+            if rule.exact == exact:
+                return rule
+        return None
+
+
+class Rewriter:
+    """Applies a Vocabulary to a transcript arriving as streamed deltas.
+
+    feed() returns the rewritten text that's settled so far; finish()
+    returns the rest. Joined, they equal vocabulary.apply() of the whole.
+    """
+
+    def __init__(self, vocabulary: Vocabulary):
+        self._vocabulary = vocabulary
+        self._pending = ""
+
+    def feed(self, delta: str) -> str:
+        if not self._vocabulary._root:
+            return delta
+        self._pending += delta
+        out, used = self._vocabulary._rewrite(self._pending, final=False)
+        self._pending = self._pending[used:]
+        return out
+
+    def finish(self) -> str:
+        out, _ = self._vocabulary._rewrite(self._pending, final=True)
+        self._pending = ""
+        return out
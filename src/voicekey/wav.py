@@ -0,0 +1,94 @@
+"""WAV payloads that reference the recorder's sample blocks instead of copying them.
+
+At release, Recorder.stop() used to concatenate every block, copy the result
+into a BytesIO and copy that out again, and httpx copied it once more while
+framing the request: four full copies of a recording that may run to tens of
+megabytes. A WavPayload is a 44-byte header plus references to the blocks
+as captured. It knows its length up front (so the request can
+carry a Content-Length) and yields the file in socket-sized chunks, so the
+largest copy made on the way to the wire is one chunk.
+"""
+
+import struct
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+from .constants import CHANNELS, SAMPLE_RATE
+
+HEADER_SIZE = 44
+CHUNK_SIZE = 64 << 10  # bytes per chunk handed to the HTTP client
+
+
+def wav_header(data_size: int, rate: int = SAMPLE_RATE, channels: int = CHANNELS,
+               sample_width: int = 2) -> bytes:
+    """The canonical 44-byte PCM WAV header for `data_size` bytes of samples."""
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, rate, rate * block_align, block_align, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+class WavPayload:
+    """A 16-bit PCM WAV file made of a header and the recorder's sample blocks.
+
+    The blocks (C-contiguous native int16, as Recorder captures them) are
+    referenced, not copied, and must not be modified while the payload is in
+    use. No per-block objects are made up front: a long recording is tens of
+    thousands of blocks. `bytes()` materialises the whole file for callers
+    that need it contiguous.
+    """
+
+    def __init__(self, blocks: Sequence[np.ndarray]):
+        self._blocks = list(blocks)
+        data_size = sum(block.nbytes for block in self._blocks)
+        self.header = wav_header(data_size)
+        self.nbytes = HEADER_SIZE + data_size
+
+    def __len__(self) -> int:
+        return self.nbytes
+
+    @property
+    def blocks(self) -> list[np.ndarray]:
+        """The sample blocks as captured (not copies)."""
+        return self._blocks
+
+    def __bytes__(self) -> bytes:
+        return b"".join([self.header, *self._blocks])
+
+    def samples(self) -> np.ndarray:
+        """All samples as one contiguous int16 array (a copy)."""
+        if not self._blocks:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate([block.reshape(-1) for block in self._blocks])
+
+    def __iter__(self) -> Iterator[bytes | memoryview]:
+        return self.chunks()
+
+    def chunks(self, size: int = CHUNK_SIZE) -> Iterator[bytes | memoryview]:
+        """The file in order, as pieces of about `size` bytes.
+
+        Blocks at least `size` long are passed through as views; runs of
+        smaller blocks (PortAudio delivers a few KB at a time) are joined so
+        the socket sees a few large writes rather than thousands of small ones.
+        """
+        group: list = [self.header]
+        pending = len(self.header)
+        for block in self._blocks:
+            nbytes = block.nbytes
+            if nbytes >= size:
+                if group:
+                    yield b"".join(group)
+                    group, pending = [], 0
+                yield memoryview(block).cast("B")
+                continue
+            group.append(block)
+            pending += nbytes
+            if pending >= size:
+                yield b"".join(group)
+                group, pending = [], 0
+        if group:
+            yield b"".join(group)
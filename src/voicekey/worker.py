@@ -0,0 +1,409 @@
+"""Optional worker process for audio capture, encoding and provider calls.
+
+With `audio_worker = true` the PortAudio callback, WAV assembly, time
+compression and the httpx/SSE loop run in a separate process, so they never
+compete with the event tap, overlay, menu bar and paste for the main
+process's GIL. RemoteRecorder and RemoteProvider stand in for Recorder and a
+provider, so App runs unchanged on top of them.
+
+- Audio goes one way, through shared memory. The worker copies each block
+  into a ring (RING_SECONDS long) and publishes the level, first-frame time
+  and overflow count in its header. The main process polls it POLL_HZ times
+  a second for the level meter and the flight recorder. The recording
+  itself stays in the worker and is never copied back.
+- Control and results go over a pipe. Requests are (id, op, args); the
+  worker answers with any number of ("event", id, kind, value) messages
+  (streamed deltas, stage marks) and then one ("result" | "error", id, value).
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .constants import SAMPLE_RATE
+
+RING_SECONDS = 10
+POLL_HZ = 20
+_HEADER = struct.Struct("<QdqQ")  # samples written, level, first frame (ns, -1 = none), overflows
+_DATA_OFFSET = 64
+
+
+class WorkerError(RuntimeError):
+    """An operation failed in the worker process (with the original error's message)."""
+
+
+class _Ring:
+    """Sample ring in shared memory: one writer (the worker), one reader."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.capacity = capacity
+        self.samples = np.ndarray((capacity,), dtype=np.int16, buffer=shm.buf, offset=_DATA_OFFSET)
+        self.written = 0
+        self.level = 0.0
+        self.first_frame = -1
+        self.overflows = 0
+
+    def header(self) -> tuple[int, float, int, int]:
+        return _HEADER.unpack_from(self.shm.buf, 0)
+
+    def publish(self) -> None:
+        _HEADER.pack_into(self.shm.buf, 0, self.written, self.level, self.first_frame, self.overflows)
+
+    def write(self, block: np.ndarray) -> None:
+        data = block.reshape(-1)[-self.capacity:]
+        start = self.written % self.capacity
+        first = min(len(data), self.capacity - start)
+        self.samples[start:start + first] = data[:first]
+        self.samples[:len(data) - first] = data[first:]
+        # Samples before the count: a reader never sees a position whose data isn't there.
+        self.written += len(data)
+        self.publish()
+
+    def read(self, since: int, until: int) -> tuple[np.ndarray, int]:
+        """Samples [since, until) and how many of them were already overwritten."""
+        missed = max(0, until - since - self.capacity)
+        since += missed
+        index = np.arange(since, until) % self.capacity
+        out = self.samples[index]
+        # The writer may have lapped us while we copied.
+        lapped = max(0, self.header()[0] - self.capacity - since)
+        if lapped:
+            out = out[lapped:]
+        return out, missed + min(lapped, until - since)
+
+
+@dataclass(frozen=True)
+class RemoteRecording:
+    """A recording held in the worker; RemoteProvider.transcribe() sends it by id."""
+    id: int
+    nbytes: int
+
+    def __len__(self) -> int:
+        return self.nbytes
+
+
+class AudioWorker:
+    """Main-process handle on the worker: starts it, and sends it requests.
+
+    Args:
+        cfg: Config the worker builds its provider from (see reload()).
+        fake_audio: Run the worker on the harness's fake sounddevice; play()
+            and wait_finished() then queue and await test audio.
+    """
+
+    def __init__(self, cfg: dict, fake_audio: bool = False):
+        capacity = RING_SECONDS * SAMPLE_RATE
+        self._shm = shared_memory.SharedMemory(create=True, size=_DATA_OFFSET + capacity * 2)
+        self.ring = _Ring(self._shm, capacity)
+        ctx = multiprocessing.get_context("spawn")  # fork is unsafe with AppKit loaded
+        self._conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_serve, args=(child, self._shm.name, capacity, dict(cfg), fake_audio),
+            name="voicekey-worker", daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self._ids = itertools.count(1)
+        self._pending: dict[int, queue.SimpleQueue] = {}
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read, name="voicekey-worker-pipe", daemon=True)
+        self._reader.start()
+        atexit.register(self.close)
+
+    def call(self, op: str, *args, on_event=None, timeout: float | None = None):
+        """Run `op` in the worker and return its result; `on_event(kind, value)` sees its events."""
+        request_id = next(self._ids)
+        replies = queue.SimpleQueue()
+        self._pending[request_id] = replies
+        try:
+            if not self._reader.is_alive():
+                raise WorkerError("audio worker is not running")
+            with self._send_lock:
+                self._conn.send((request_id, op, args))
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    kind, *rest = replies.get(timeout=wait)
+                except queue.Empty:
+                    raise WorkerError(f"audio worker didn't answer {op} within {timeout}s") from None
+                if kind == "event":
+                    if on_event is not None:
+                        on_event(*rest)
+                elif kind == "result":
+                    return rest[0]
+                else:
+                    raise WorkerError(rest[0])
+        except (OSError, EOFError) as e:
+            raise WorkerError(f"audio worker is not running ({e})") from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def reload(self, cfg: dict) -> None:
+        """Hand the worker a new config; it rebuilds its provider if PROVIDER_KEYS changed."""
+        self.call("reload", dict(cfg))
+
+    def play(self, samples: np.ndarray, speed: float = 1.0, blocksize: int = 480) -> None:
+        """Queue test audio for the next recording (fake_audio only)."""
+        self.call("play", samples, speed, blocksize)
+
+    def wait_finished(self, timeout: float | None = None) -> bool:
+        return self.call("wait_finished", timeout)
+
+    def stats(self) -> dict:
+        return self.call("stats")
+
+    def _read(self) -> None:
+        while True:
+            try:
+                kind, request_id, *rest = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            replies = self._pending.get(request_id)
+            if replies is not None:
+                replies.put((kind, *rest))
+        for replies in list(self._pending.values()):
+            replies.put(("error", "audio worker exited"))
+
+    def close(self) -> None:
+        """Stop the worker and free the shared memory (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        try:
+            self.call("shutdown", timeout=2.0)
+        except WorkerError:
+            pass
+        self.process.join(2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        self._conn.close()
+        self.ring.samples = None  # drop the view so the mapping can close
+        self._shm.close()
+        self._shm.unlink()
+
+
+class RemoteRecorder:
+    """Recorder stand-in whose audio is captured in the worker."""
+
+    def __init__(self, worker: AudioWorker):
+        self.worker = worker
+        self.on_frame = None  # optional callable(block) with new samples, POLL_HZ times a second
+        self.on_level = None  # optional callable(rms), as often
+        self.first_frame_at: int | None = None
+        self.missed_samples = 0  # overwritten in the ring before we read them (flight recorder only)
+        self._pos = 0
+        self._stop = threading.Event()
+        self._poller: threading.Thread | None = None
+
+    @property
+    def rms(self) -> float:
+        return self.worker.ring.header()[1]
+
+    @property
+    def overflows(self) -> int:
+        return self.worker.ring.header()[3]
+
+    def start(self) -> None:
+        self.first_frame_at = None
+        self._pos = self.worker.call("start")
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._poll, name="voicekey-ring", daemon=True)
+        self._poller.start()
+
+    def stop(self) -> RemoteRecording | bytes:
+        recording_id, nbytes, end, first_frame = self.worker.call("stop")
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join()
+            self._poller = None
+        self._drain(end)
+        self.first_frame_at = first_frame if first_frame >= 0 else None
+        return RemoteRecording(recording_id, nbytes) if nbytes else b""
+
+    def _poll(self) -> None:
+        while not self._stop.wait(1 / POLL_HZ):
+            self._drain(self.worker.ring.header()[0])
+
+    def _drain(self, until: int) -> None:
+        block, missed = self.worker.ring.read(self._pos, until)
+        self._pos = until
+        self.missed_samples += missed
+        if len(block) and self.on_frame is not None:
+            self.on_frame(block.reshape(-1, 1))
+        if self.on_level is not None:
+            self.on_level(self.rms)
+
+
+class RemoteProvider:
+    """Provider stand-in: the worker's provider does the request."""
+
+    def __init__(self, worker: AudioWorker):
+        self.worker = worker
+
+    def transcribe(self, wav_bytes, api_key, model="", language="", on_chunk=None, on_stage=None) -> str:
+        audio = wav_bytes.id if isinstance(wav_bytes, RemoteRecording) else bytes(wav_bytes)
+
+        def on_event(kind: str, value) -> None:
+            if kind == "chunk" and on_chunk is not None:
+                on_chunk(value)
+            elif kind == "stage" and on_stage is not None:
+                on_stage(value)
+
+        return self.worker.call("transcribe", audio, api_key, model, language, on_event=on_event)
+
+
+# ── Worker process ──────────────────────────────────────────────────
+
+
+def _serve(conn, shm_name: str, capacity: int, cfg: dict, fake_audio: bool) -> None:
+    if fake_audio:
+        from .harness import platform
+        platform.install()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        _Worker(conn, _Ring(shm, capacity), cfg, fake_audio).run()
+    finally:
+        conn.close()
+
+
+class _Worker:
+    def __init__(self, conn, ring: _Ring, cfg: dict, fake_audio: bool):
+        from . import devices
+        from .recorder import Recorder
+
+        self.conn = conn
+        self.ring = ring
+        self.cfg = cfg
+        self.fake_audio = fake_audio
+        self.recorder = Recorder(devices.manager(), cfg.get("input_device", ""))
+        self.recorder.on_frame = ring.write
+        self.recorder.on_level = self._on_level
+        self.recordings: dict[int, object] = {}
+        self._ids = itertools.count(1)
+        self._provider = None
+        self._provider_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    def send(self, *message) -> None:
+        with self._send_lock:
+            self.conn.send(message)
+
+    def run(self) -> None:
+        while True:
+            try:
+                request_id, op, args = self.conn.recv()
+            except (EOFError, OSError):
+                return
+            handler = getattr(self, f"op_{op}", None)
+            if handler is None:
+                self.send("error", request_id, f"unknown operation {op!r}")
+            elif op == "transcribe":  # streams for a while; keep serving start/stop meanwhile
+                threading.Thread(target=self._call, args=(request_id, handler, args), daemon=True).start()
+            else:
+                self._call(request_id, handler, args)
+                if op == "shutdown":
+                    return
+
+    def _call(self, request_id: int, handler, args) -> None:
+        try:
+            value = handler(request_id, *args)
+        except Exception as e:
+            self.send("error", request_id, str(e) or type(e).__name__)
+        else:
+            self.send("result", request_id, value)
+
+    def _on_level(self, rms: float) -> None:
+        ring = self.ring
+        ring.level = rms
+        ring.overflows = self.recorder.overflows
+        if ring.first_frame < 0 and self.recorder.first_frame_at is not None:
+            ring.first_frame = self.recorder.first_frame_at
+        ring.publish()
+
+    @property
+    def provider(self):
+        with self._provider_lock:
+            if self._provider is None:
+                from .providers import from_config
+                self._provider = from_config(self.cfg)
+            return self._provider
+
+    # ── Operations ──────────────────────────────────────────────────
+
+    def op_start(self, request_id: int) -> int:
+        self.ring.first_frame = -1
+        self.ring.publish()
+        self.recorder.start()
+        return self.ring.written
+
+    def op_stop(self, request_id: int) -> tuple[int, int, int, int]:
+        wav = self.recorder.stop()
+        first_frame = self.recorder.first_frame_at
+        if not wav:
+            return 0, 0, self.ring.written, -1
+        recording_id = next(self._ids)
+        self.recordings[recording_id] = wav
+        return recording_id, len(wav), self.ring.written, first_frame if first_frame is not None else -1
+
+    def op_transcribe(self, request_id: int, audio, api_key: str, model: str, language: str) -> str:
+        if isinstance(audio, int):
+            audio = self.recordings.pop(audio)
+            speed = float(self.cfg.get("speedup", 1.0))
+            if speed > 1.0:
+                from . import timestretch
+                audio = timestretch.speed_up(
+                    audio, speed, float(self.cfg.get("speedup_max_rate", timestretch.DEFAULT_MAX_RATE)))
+        kwargs = {"model": model} if model else {}
+        return self.provider.transcribe(
+            audio, api_key, language=language,
+            on_chunk=lambda delta: self.send("event", request_id, "chunk", delta),
+            on_stage=lambda stage: self.send("event", request_id, "stage", stage),
+            **kwargs,
+        )
+
+    def op_reload(self, request_id: int, cfg: dict) -> None:
+        from .providers import PROVIDER_KEYS
+
+        changed = any(cfg.get(k) != self.cfg.get(k) for k in PROVIDER_KEYS)
+        self.cfg = cfg
+        self.recorder.device = cfg.get("input_device", "")
+        if changed:
+            with self._provider_lock:
+                old, self._provider = self._provider, None
+            if old is not None and hasattr(old, "close"):
+                old.close()
+
+    def op_stats(self, request_id: int) -> dict:
+        stats = {"overflows": self.recorder.overflows, "recordings_held": len(self.recordings)}
+        if self.fake_audio:
+            from .harness import fake_sounddevice
+            stats["device"] = dict(fake_sounddevice.stats)
+        return stats
+
+    def op_play(self, request_id: int, samples, speed: float, blocksize: int) -> None:
+        self._fake_device().play(samples, speed=speed, blocksize=blocksize)
+
+    def op_wait_finished(self, request_id: int, timeout: float | None) -> bool:
+        return self._fake_device().wait_finished(timeout)
+
+    def op_shutdown(self, request_id: int) -> None:
+        self.recorder.stop()
+
+    def _fake_device(self):
+        if not self.fake_audio:
+            raise RuntimeError("not running on fake audio")
+        from .harness import fake_sounddevice
+        return fake_sounddevice
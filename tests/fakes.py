@@ -0,0 +1,21 @@
+"""Fake platform modules for exercising macOS-bound code paths in tests."""
+
+import types
+
+
+def make_fake_quartz() -> types.ModuleType:
+    """A minimal stand-in for pyobjc's Quartz module.
+
+    Events are `(keycode, flags)` tuples. Calls to CGEventTapEnable are
+    recorded in `enabled_calls`.
+    """
+    quartz = types.ModuleType("Quartz")
+    quartz.kCGEventTapDisabledByTimeout = 0xFFFFFFFE
+    quartz.kCGEventTapDisabledByUserInput = 0xFFFFFFFF
+    quartz.kCGEventFlagsChanged = 12
+    quartz.kCGKeyboardEventKeycode = 9
+    quartz.enabled_calls = []
+    quartz.CGEventTapEnable = lambda tap, on: quartz.enabled_calls.append((tap, on))
+    quartz.CGEventGetIntegerValueField = lambda event, field: event[0]
+    quartz.CGEventGetFlags = lambda event: event[1]
+    return quartz
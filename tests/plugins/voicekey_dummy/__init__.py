@@ -0,0 +1 @@
+"""Dummy provider plugin for the discovery tests (tests/test_plugins.py)."""
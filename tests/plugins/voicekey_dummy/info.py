@@ -0,0 +1,14 @@
+"""What the dummy plugin declares; importing this must not import provider.py."""
+
+from voicekey.providers import ProviderInfo
+
+ECHO = ProviderInfo(
+    "voicekey_dummy.provider:EchoProvider",
+    streaming_input=True,
+    formats=("wav", "flac"),
+    sample_rate=16000,
+    description="Echoes a fixed transcript",
+)
+FLAC_ONLY = ProviderInfo("voicekey_dummy.provider:EchoProvider", formats=("flac",))
+MISSING = ProviderInfo("voicekey_dummy.gone:Provider")
+NOT_INFO = {"target": "voicekey_dummy.provider:EchoProvider"}
@@ -0,0 +1,12 @@
+"""The dummy plugin's implementation, imported only when it's used."""
+
+
+class EchoProvider:
+    def __init__(self, transcript: str = "dummy transcript", **options):
+        self.transcript = transcript
+        self.options = options
+
+    def transcribe(self, wav_bytes, api_key, model="", language="", on_chunk=None, on_stage=None) -> str:
+        if on_chunk:
+            on_chunk(self.transcript)
+        return self.transcript
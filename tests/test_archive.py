@@ -0,0 +1,163 @@
+"""Tests for the audio archive and `voicekey archive`."""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from voicekey import archive, auth, config
+from voicekey.archive import INDEX_DTYPE, Archive, compress, decompress, parse_since, word_diff
+from voicekey.harness import Harness
+from voicekey.harness.audio import synth_speech
+from voicekey.mockserver import MockServer, ServerConfig
+from voicekey.providers.openai import OpenAIProvider
+
+
+@pytest.fixture
+def server():
+    server = MockServer(ServerConfig(latency=0, chunk_delay=0, transcript="one two")).start()
+    yield server
+    server.stop()
+
+
+def test_codec_is_lossless():
+    speech = synth_speech(2.3)
+    data, samples = compress(np.array_split(speech, 7))  # blocks don't line up with frames
+    assert samples == len(speech)
+    assert len(data) < 0.8 * speech.nbytes
+    np.testing.assert_array_equal(decompress(data, samples), speech)
+
+    extremes = np.random.default_rng(0).choice(np.array([-32768, 32767, 0], dtype=np.int16), 5000)
+    data, samples = compress([extremes])  # deltas overflow int16 and must wrap back
+    np.testing.assert_array_equal(decompress(data, samples), extremes)
+    assert decompress(*compress([])).size == 0
+
+
+def test_entries_round_trip_and_survive_torn_writes(tmp_path):
+    store = Archive(tmp_path)
+    speech = synth_speech(1.5)
+    now = time.time()
+    assert store.add(speech, "first take", "model-a", latency_ms=420, created_at=now - 60)
+    assert store.add(speech[:800], "second", created_at=now)
+    store.flush()
+    first, second = store.entries()
+    assert (first.key, first.text, first.model, first.latency_ms) == ("1:0", "first take", "model-a", 420)
+    assert first.seconds == pytest.approx(1.5)
+    np.testing.assert_array_equal(first.audio(), speech)
+    assert first.wav()[:4] == b"RIFF"
+    assert [e.text for e in store.entries(since=now - 30)] == ["second"]
+
+    # A crash mid-append leaves a partial index record, or one ahead of its data.
+    index = tmp_path / "000001.idx"
+    with open(index, "ab") as f:
+        f.write(b"\0" * (INDEX_DTYPE.itemsize // 2))
+    assert len(store.entries()) == 2
+    data = tmp_path / "000001.vka"
+    os.truncate(data, data.stat().st_size - 3)
+    assert [e.text for e in store.entries()] == ["first take"]
+    store.close()
+    assert oct(data.stat().st_mode & 0o777) == "0o600"
+
+
+def test_retention_by_size_and_age(tmp_path):
+    speech = synth_speech(1.0)
+    store = Archive(tmp_path, max_bytes=200_000, max_days=0)
+    for i in range(40):
+        store.add(speech, f"session {i}", created_at=float(i))
+    store.flush()
+    store.close()
+    entries = store.entries()
+    assert store.nbytes() <= 200_000
+    assert 0 < len(entries) < 40 and entries[-1].text == "session 39"
+    assert len({e.key.split(":")[0] for e in entries}) > 1  # whole segments went, not everything
+
+    old = Archive(tmp_path, max_bytes=1 << 30, max_days=1)
+    old.add(speech, "today")
+    old.flush()
+    old.close()
+    assert [e.text for e in old.entries()] == ["today"]  # the segments from 1970 expired
+
+
+def test_queue_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "MAX_QUEUED_BYTES", 150_000)
+    store = Archive(tmp_path)
+    gate = threading.Event()
+    append = store._append
+    monkeypatch.setattr(store, "_append", lambda *a: gate.wait() and append(*a))
+    speech = synth_speech(1.0)  # 48 kB
+    assert [store.add(speech, str(i)) for i in range(5)] == [True, True, True, False, False]
+    assert store.dropped == 2
+    gate.set()
+    store.flush()
+    assert store.add(speech, "room again")
+    store.close()
+    assert [e.text for e in store.entries()] == ["0", "1", "2", "room again"]
+
+
+def test_sessions_are_archived(tmp_path, monkeypatch):
+    store = Archive(tmp_path)
+    monkeypatch.setattr("voicekey.app.App.archive", property(lambda self: store))
+    speech = synth_speech(1.0)
+    server = ServerConfig(latency=0, chunk_delay=0)
+    with Harness(server=server, cfg={"archive": True}) as harness:
+        harness.run_session(speech)
+    store.flush()
+    (entry,) = store.entries()
+    assert entry.text == server.transcript.strip()
+    np.testing.assert_array_equal(entry.audio(), speech)
+    store.close()
+
+
+def test_retranscribe_and_diff(tmp_path, server):
+    store = Archive(tmp_path)
+    for i, text in enumerate(["one two", "one too many"]):
+        store.add(synth_speech(0.5, seed=i), text)
+    store.close()
+    seen = []
+    results = archive.retranscribe(store.entries(), OpenAIProvider(base_url=server.url), "sk-test",
+                                   concurrency=2, on_result=seen.append)
+    assert [r.text for r in results] == ["one two", "one two"]
+    assert len(seen) == 2 and server.requests == 2
+    assert [r.changed_words for r in results] == [0, 2]
+    assert results[1].word_error_rate == pytest.approx(2 / 3)
+    assert word_diff("one too many", "one two") == (2, "one [-too many-] {+two+}")
+
+
+def test_parse_since():
+    assert parse_since("12h", now=100_000.0) == 100_000.0 - 12 * 3600
+    assert parse_since("2026-01-31") == time.mktime((2026, 1, 31, 0, 0, 0, 0, 0, -1))
+    with pytest.raises(ValueError):
+        parse_since("last week")
+
+
+def test_archive_commands(tmp_path, server, monkeypatch):
+    from voicekey.cli import main
+
+    monkeypatch.setattr(archive, "default_root", lambda: tmp_path)
+    monkeypatch.setattr(auth, "get_api_key", lambda: "sk-test")
+    monkeypatch.setattr(config, "load", lambda: dict(config.DEFAULTS, api_base=server.url))
+    store = Archive(tmp_path)
+    store.add(synth_speech(1.0), "one two", "old-model", latency_ms=300)
+    store.add(synth_speech(1.0, seed=1), "one to", "old-model", latency_ms=500)
+    store.close()
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["archive", "list"])
+    assert result.exit_code == 0, result.output
+    assert "1:1" in result.output and "old-model" in result.output and "2 shown" in result.output
+    assert runner.invoke(main, ["archive", "list", "--since", "soon"]).exit_code == 2
+    assert runner.invoke(main, ["archive", "retranscribe", "-j", "0"]).exit_code == 2
+
+    out = tmp_path / "results.jsonl"
+    result = runner.invoke(main, ["archive", "retranscribe", "--model", "new-model", "--json", str(out)])
+    assert result.exit_code == 0, result.output
+    assert "one [-to-] {+two+}" in result.output
+    assert "1 identical" in result.output
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert {r["key"]: r["word_edits"] for r in records} == {"1:0": 0, "1:1": 1}
+    assert records[0]["new"]["model"] == "new-model"
+    assert records[0]["seconds"] == 1.0
@@ -0,0 +1,127 @@
+"""Tests for batch transcription (`voicekey transcribe`)."""
+
+import io
+import json
+import wave
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from voicekey import auth, config
+from voicekey.batch import expand_inputs, open_segments, transcribe_files
+from voicekey.cli import main
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness.audio import encode_wav, synth_speech
+from voicekey.mockserver import MockServer, ServerConfig
+from voicekey.providers.openai import OpenAIProvider
+
+
+@pytest.fixture
+def server():
+    server = MockServer(ServerConfig(latency=0, chunk_delay=0, transcript="one two")).start()
+    yield server
+    server.stop()
+
+
+def write_wav(path, seconds: float, seed: int = 0):
+    path.write_bytes(encode_wav(synth_speech(seconds, seed=seed)))
+    return path
+
+
+def test_expand_inputs(tmp_path):
+    (tmp_path / "sub").mkdir()
+    a = write_wav(tmp_path / "a.wav", 0.1)
+    b = write_wav(tmp_path / "sub" / "b.WAV", 0.1)
+    (tmp_path / "notes.txt").write_text("x")
+    assert expand_inputs([str(tmp_path)]) == [a, b]
+    assert expand_inputs([str(tmp_path / "*.wav"), str(a)]) == [a]
+    assert expand_inputs([str(tmp_path / "**" / "*.WAV")]) == [b]
+    assert expand_inputs([str(tmp_path / "missing*.wav")]) == []
+
+
+def test_long_file_is_split(tmp_path):
+    path = write_wav(tmp_path / "long.wav", 2.5)
+    count, segments = open_segments(path, max_seconds=1.0)
+    segments = list(segments)
+    assert count == 3
+    assert [(s.start, s.end) for s in segments] == [(0.0, 1.0), (1.0, 2.0), (2.0, 2.5)]
+    joined = b"".join(wave.open(io.BytesIO(s.wav)).readframes(SAMPLE_RATE * 3)
+                      for s in segments)
+    expected = synth_speech(2.5)
+    np.testing.assert_array_equal(np.frombuffer(joined, dtype="<i2"), expected)
+
+
+def test_truncated_file_stops_at_the_end_of_the_data(tmp_path, server):
+    path = write_wav(tmp_path / "cut.wav", 10.0)
+    path.write_bytes(path.read_bytes()[:44 + 2 * SAMPLE_RATE * 10 // 3])
+    count, segments = open_segments(path, max_seconds=1.0)
+    assert count == 10
+    read = []
+    with pytest.raises(OSError, match="truncated audio"):
+        for segment in segments:
+            read.append(segment)
+    assert len(read) == 4 and read[-1].end == pytest.approx(10 / 3, abs=1e-4)
+
+    results = []
+    transcribe_files([path], OpenAIProvider(base_url=server.url), "sk-test",
+                     max_seconds=1.0, on_result=results.append)
+    parts = results[0].segments
+    assert [p["error"] for p in parts[4:]] == ["can't read audio: truncated audio"] * 6
+    assert all(not p.get("error") for p in parts[:4])
+    assert server.requests == 4
+
+
+def test_transcribe_files_against_stand_in(tmp_path, server):
+    paths = [write_wav(tmp_path / f"{i}.wav", 1.0 + i, seed=i) for i in range(3)]
+    results = []
+    report = transcribe_files(paths, OpenAIProvider(base_url=server.url), "sk-test",
+                              concurrency=2, max_seconds=1.0, on_result=results.append)
+    by_path = {r.path: r for r in results}
+    assert by_path[str(paths[2])].text == "one two one two one two"
+    assert len(by_path[str(paths[2])].segments) == 3
+    assert report.files == 3 and report.failed == 0 and report.segments == 6
+    assert report.audio_seconds == pytest.approx(6.0)
+    assert server.requests == 6
+
+
+def test_errors_are_reported_per_file(tmp_path):
+    server = MockServer(ServerConfig(latency=0, chunk_delay=0, error_500=1.0)).start()
+    try:
+        bad = tmp_path / "bad.wav"
+        bad.write_bytes(b"not a wav")
+        paths = [write_wav(tmp_path / "ok.wav", 0.5), bad, tmp_path / "clip.mp3"]
+        results = []
+        report = transcribe_files(paths, OpenAIProvider(base_url=server.url, max_retries=0),
+                                  "sk-test", on_result=results.append)
+    finally:
+        server.stop()
+    errors = {r.path: r.error for r in results}
+    assert "500" in errors[str(paths[0])]
+    assert errors[str(bad)].startswith("can't read audio")
+    assert errors[str(paths[2])] == "not a WAV file"
+    assert report.failed == 3
+
+
+def test_cli_writes_jsonl(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(auth, "get_api_key", lambda: "sk-test")
+    monkeypatch.setattr(config, "load", lambda: dict(config.DEFAULTS, api_base=server.url))
+    write_wav(tmp_path / "a.wav", 0.5)
+    write_wav(tmp_path / "b.wav", 0.5, seed=1)
+    out = tmp_path / "out.jsonl"
+
+    result = CliRunner().invoke(main, ["transcribe", str(tmp_path), "-o", str(out), "-j", "2"])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(r["path"] for r in records) == [str(tmp_path / "a.wav"), str(tmp_path / "b.wav")]
+    assert all(r["text"] == "one two" for r in records)
+
+
+def test_concurrency_must_be_positive(tmp_path):
+    result = CliRunner().invoke(main, ["transcribe", str(tmp_path), "-j", "0"])
+    assert result.exit_code == 2 and "-j" in result.output
+
+
+def test_max_seconds_must_be_at_least_one(tmp_path):
+    result = CliRunner().invoke(main, ["transcribe", str(tmp_path), "--max-seconds", "0"])
+    assert result.exit_code == 2 and "--max-seconds" in result.output
@@ -0,0 +1,75 @@
+"""Tests for the microbenchmark runner and baseline comparison."""
+
+import pytest
+
+import benchmarks
+from benchmarks.__main__ import main
+from voicekey.harness import platform
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _restore_modules():
+    yield
+    platform.uninstall()  # benchmarks.load() installs the headless fakes
+
+
+def _results(**best):
+    return {"environment": {}, "benchmarks": {k: {"best_ns": v} for k, v in best.items()}}
+
+
+class TestRunner:
+    def test_generator_benchmarks_tear_down(self):
+        calls = []
+
+        def bench():
+            calls.append("setup")
+            yield lambda: calls.append("op")
+            calls.append("teardown")
+
+        result = benchmarks.run_one(benchmarks.Benchmark("t", bench, "op", 2), rounds=2, min_round=0)
+        assert calls[0] == "setup" and calls[-1] == "teardown"
+        assert result.rounds == 2
+        assert result.best_ns <= result.median_ns
+
+    def test_params_register_one_benchmark_per_value(self, monkeypatch):
+        monkeypatch.setattr(benchmarks, "REGISTRY", {})
+
+        @benchmarks.benchmark("x[{n}]", unit="item", per="n", params={"n": (10, 20)})
+        def bench(n):
+            return lambda: n
+
+        assert {k: v.per for k, v in benchmarks.REGISTRY.items()} == {"x[10]": 10, "x[20]": 20}
+        assert benchmarks.REGISTRY["x[20]"].func()() == 20
+
+    def test_every_module_registers(self):
+        names = benchmarks.load()
+        for prefix in ("recorder.callback", "recorder.encode_wav", "provider.sse",
+                       "display.meter_render", "display.stream_append"):
+            assert any(n.startswith(prefix) for n in names), prefix
+
+    def test_quick_run_of_real_benchmark(self):
+        results = benchmarks.run("recorder.encode_wav[5s]", rounds=1, min_round=0)
+        assert results["recorder.encode_wav[5s]"].best_ns > 0
+
+
+class TestCompare:
+    def test_change_and_regression(self):
+        (c,) = benchmarks.compare(_results(a=100), _results(a=130))
+        assert round(c.change, 2) == 0.30
+        assert c.regressed(0.25)
+        assert not c.regressed(0.5)
+
+    def test_new_and_missing_never_regress(self):
+        rows = {c.name: c for c in benchmarks.compare(_results(old=1), _results(new=1))}
+        assert rows["old"].current_ns is None and not rows["old"].regressed(0)
+        assert rows["new"].baseline_ns is None and not rows["new"].regressed(0)
+
+    def test_compare_command_exit_status(self, tmp_path, capsys):
+        base, good, bad = tmp_path / "base.json", tmp_path / "good.json", tmp_path / "bad.json"
+        benchmarks.write(base, _results(a=100, b=100))
+        benchmarks.write(good, _results(a=110, b=90))
+        benchmarks.write(bad, _results(a=200, b=100))
+        assert main(["compare", "--baseline", str(base), "--current", str(good)]) == 0
+        assert main(["compare", "--baseline", str(base), "--current", str(bad)]) == 1
+        assert "REGRESSED" in capsys.readouterr().out
+        assert main(["compare", "--baseline", str(base), "--current", str(bad), "--threshold", "1.5"]) == 0
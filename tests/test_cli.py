@@ -92,3 +92,70 @@ def test_setup_new_key(monkeypatch):
     assert result.exit_code == 0
     assert "API key saved" in result.output
     assert stored_keys == ["sk-testkey123"]
+
+
+def test_stats_empty(monkeypatch):
+    """'stats' with nothing recorded says so."""
+    from voicekey import metrics
+    monkeypatch.setattr(metrics, "load", lambda: {})
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["stats"])
+    assert result.exit_code == 0
+    assert "No stats recorded" in result.output
+
+
+def test_stats_shows_hotkey_section(monkeypatch):
+    """'stats' prints tap callback percentiles and disabled counts."""
+    from voicekey import metrics
+    hist = metrics.Histogram()
+    hist.record(1500)
+    monkeypatch.setattr(metrics, "load", lambda: {
+        "hotkey": {
+            "callback_us": hist.to_dict(),
+            "disabled_by_timeout": 3,
+            "slow_handlers": 1,
+            "last_slow": "on_release took 80 ms",
+        },
+    })
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["stats"])
+    assert result.exit_code == 0
+    assert "tap callback" in result.output
+    assert "1.50 ms" in result.output
+    assert "3 by timeout" in result.output
+    assert "on_release took 80 ms" in result.output
+
+
+def test_stats_shows_stage_percentiles(monkeypatch):
+    """'stats' prints p50/p90/p99 for each recorded dictation stage."""
+    from voicekey import metrics
+    stats = metrics.StageStats()
+    session = metrics.SessionTimer()
+    session.marks.update({"release": 0, "encode_done": 2_000_000})
+    stats.add(session)
+    monkeypatch.setattr(metrics, "load", lambda: {"stages": stats.to_dict()})
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["stats"])
+    assert result.exit_code == 0
+    assert "Dictation stages" in result.output
+    assert "encode" in result.output
+    assert "p99" in result.output
+    assert "connect" not in result.output
+
+
+def test_trace_flag_passed_to_run(monkeypatch):
+    """'--trace' with no subcommand starts the app with tracing on."""
+    import sys
+    import types
+    calls = []
+    fake_app = types.ModuleType("voicekey.app")
+    fake_app.run = lambda trace=False: calls.append(trace)
+    monkeypatch.setitem(sys.modules, "voicekey.app", fake_app)
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--trace"])
+    assert result.exit_code == 0
+    assert calls == [True]
@@ -51,4 +51,4 @@ def test_save_then_load_roundtrip(tmp_path, monkeypatch):
     original = {"provider": "openai", "model": "gpt-4o-transcribe", "hotkey": "right_option", "language": "ja"}
     config.save(original)
     loaded = config.load()
-    assert loaded == original
+    assert loaded == {**config.DEFAULTS, **original}
@@ -0,0 +1,194 @@
+"""Tests for the `voicekey serve` control socket and its client."""
+
+import json
+import socket
+import stat
+
+import pytest
+
+from voicekey import config
+from voicekey.client import (
+    APP_ERROR,
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    Client,
+    RPCError,
+)
+from voicekey.daemon import Daemon
+from voicekey.harness import Harness, fake_sounddevice
+from voicekey.harness.audio import encode_wav, synth_speech
+from voicekey.mockserver import ServerConfig
+
+FAST = ServerConfig(latency=0.0, chunk_delay=0.0, transcript="hello over the socket")
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    with Harness(server=FAST) as harness:
+        d = Daemon(harness.app, tmp_path / "vk.sock").start()
+        d.harness = harness
+        yield d
+        d.close()
+
+
+@pytest.fixture
+def client(daemon):
+    with Client(daemon.path, timeout=10) as c:
+        yield c
+
+
+def raw_exchange(path, payload: bytes) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        sock.sendall(payload)
+        return json.loads(sock.makefile("rb").readline())
+
+
+def test_socket_is_owner_only(daemon):
+    assert stat.S_IMODE(daemon.path.stat().st_mode) == 0o600
+
+
+def test_ping(client):
+    assert client.call("ping")["pid"] > 0
+
+
+def test_start_stop_returns_transcript(daemon, client):
+    fake_sounddevice.play(synth_speech(0.3), speed=0)
+    assert client.call("start_recording") == {"state": "recording"}
+    fake_sounddevice.wait_finished(5)
+    result = client.call("stop_recording")
+    assert result == {"state": "idle", "text": "hello over the socket", "error": ""}
+    assert [i.text for i in daemon.harness.insertions] == ["hello over the socket"]
+
+
+def test_start_twice_is_an_error(client):
+    fake_sounddevice.play(synth_speech(0.1), speed=0)
+    client.call("start_recording")
+    with pytest.raises(RPCError) as excinfo:
+        client.call("start_recording")
+    assert excinfo.value.code == APP_ERROR
+    client.call("stop_recording")
+
+
+def test_stop_without_start_is_an_error(client):
+    with pytest.raises(RPCError, match="Not recording"):
+        client.call("stop_recording")
+
+
+def test_transcribe_file(daemon, client, tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(encode_wav(synth_speech(0.5)))
+    assert client.call("transcribe_file", path=str(path))["text"] == "hello over the socket"
+    assert daemon.harness.insertions == []
+
+
+def test_transcribe_missing_file(client, tmp_path):
+    with pytest.raises(RPCError) as excinfo:
+        client.call("transcribe_file", path=str(tmp_path / "nope.wav"))
+    assert excinfo.value.code == INVALID_PARAMS
+
+
+def test_stats_after_dictation(client):
+    fake_sounddevice.play(synth_speech(0.2), speed=0)
+    client.call("start_recording")
+    fake_sounddevice.wait_finished(5)
+    client.call("stop_recording")
+    stats = client.call("stats")
+    assert stats["state"] == "idle"
+    assert stats["stages"]["release_to_paste"]["count"] == 1
+
+
+def test_reload_config_rebuilds_provider(daemon, client, monkeypatch):
+    app = daemon.app
+    before = app.provider
+    monkeypatch.setattr(config, "load", lambda: dict(app.cfg, api_base=app.cfg["api_base"] + "/"))
+    assert client.call("reload_config") == {"changed": ["api_base"]}
+    assert app.provider is not before
+
+
+def test_protocol_errors(client, daemon):
+    with pytest.raises(RPCError) as excinfo:
+        client.call("no_such_method")
+    assert excinfo.value.code == METHOD_NOT_FOUND
+    with pytest.raises(RPCError) as excinfo:
+        client.call("ping", unexpected=1)
+    assert excinfo.value.code == INVALID_PARAMS
+    assert raw_exchange(daemon.path, b"{not json\n")["error"]["code"] == PARSE_ERROR
+
+
+def test_notifications_get_no_reply(daemon):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(daemon.path))
+        sock.sendall(b'{"jsonrpc": "2.0", "method": "ping"}\n'
+                     b'{"jsonrpc": "2.0", "id": 7, "method": "ping"}\n')
+        assert json.loads(sock.makefile("rb").readline())["id"] == 7
+
+
+def test_shutdown_removes_socket(daemon, client):
+    assert client.call("shutdown") == {"ok": True}
+    assert daemon.stopped.wait(5)
+    assert not daemon.path.exists()
+
+
+def test_second_daemon_refuses_live_socket(daemon):
+    with pytest.raises(RuntimeError, match="already serving"):
+        Daemon(daemon.app, daemon.path).bind()
+
+
+def test_stale_socket_is_replaced(daemon, tmp_path):
+    stale = tmp_path / "stale.sock"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(stale))
+    sock.close()  # file left behind, nothing listening
+    other = Daemon(daemon.app, stale).start()
+    try:
+        with Client(stale, timeout=10) as c:
+            assert c.call("ping")
+    finally:
+        other.close()
+
+
+def test_close_right_after_start(daemon, tmp_path):
+    import threading
+
+    for i in range(20):
+        other = Daemon(daemon.app, tmp_path / f"quick{i}.sock").start()
+        closer = threading.Thread(target=other.close)
+        closer.start()
+        closer.join(5)
+        assert not closer.is_alive() and not other.path.exists()
+
+
+def test_close_waits_for_a_close_in_progress(daemon, tmp_path):
+    import threading
+    import time
+
+    finished = []
+    other = Daemon(daemon.app, tmp_path / "other.sock",
+                   on_shutdown=lambda: (time.sleep(0.2), finished.append(1)))
+    serving = threading.Thread(target=other.serve_forever, daemon=True)
+    other.bind()
+    serving.start()
+    with Client(other.path, timeout=10) as c:
+        assert c.call("shutdown") == {"ok": True}
+    serving.join(5)  # returns as soon as the server is shut down
+    other.close()                       # as `voicekey serve --no-hotkey` does next
+    assert finished == [1] and not other.path.exists()
+
+
+def test_flight_dump_asks_over_the_socket(daemon, tmp_path, monkeypatch):
+    from click.testing import CliRunner
+
+    from voicekey import client
+    from voicekey.cli import main
+
+    monkeypatch.setattr(client, "default_socket_path", lambda: daemon.path)
+    monkeypatch.setattr(daemon.app, "dump_flight", lambda: tmp_path / "flight.vkfr")
+    result = CliRunner().invoke(main, ["flight", "dump"])
+    assert result.exit_code == 0, result.output
+    assert f"saved to {tmp_path / 'flight.vkfr'}" in result.stdout
+
+    monkeypatch.setattr(client, "default_socket_path", lambda: tmp_path / "nobody.sock")
+    result = CliRunner().invoke(main, ["flight", "dump"])
+    assert result.exit_code == 1 and "doesn't appear to be running" in result.stderr
@@ -0,0 +1,102 @@
+"""Tests for cached device enumeration, hot-plug refresh and the preferred input."""
+
+import pytest
+from click.testing import CliRunner
+
+from voicekey import devices
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness import Harness, fake_sounddevice, platform
+from voicekey.harness.audio import synth_speech
+from voicekey.mockserver import ServerConfig
+from voicekey.recorder import Recorder
+
+
+@pytest.fixture
+def fake_audio():
+    platform.install()
+    fake_sounddevice.reset_devices()
+    yield fake_sounddevice
+    fake_sounddevice.reset_devices()
+    platform.uninstall()
+
+
+def record(recorder: Recorder, seconds: float = 0.1):
+    fake_sounddevice.play(synth_speech(seconds))
+    recorder.start()
+    fake_sounddevice.wait_finished(5)
+    return recorder.stop()
+
+
+def test_enumerates_once_and_refreshes_on_change(fake_audio):
+    manager = devices.DeviceManager()
+    assert [d.name for d in manager.inputs()] == ["Harness Microphone"]
+    assert manager.inputs()[0].default
+    for _ in range(5):
+        manager.resolve()
+    assert manager.refreshes == 1
+
+    fake_audio.add_device("USB Headset", samplerate=48000.0)
+    fake_audio.add_device("HDMI Out", inputs=0)
+    headset = manager.resolve("usb headset")
+    assert manager.refreshes == 2
+    assert (headset.name, headset.samplerate) == ("USB Headset", 48000.0)
+    assert [d.name for d in manager.inputs()] == ["Harness Microphone", "USB Headset"]
+
+
+def test_preferred_device_falls_back_to_default(fake_audio):
+    manager = devices.DeviceManager()
+    assert manager.resolve("Headset").name == "Harness Microphone"
+    fake_audio.add_device("Studio Mic", samplerates=(44100, 48000))
+    assert manager.resolve("studio", SAMPLE_RATE).name == "Harness Microphone"
+    assert manager.resolve("studio", 48000).name == "Studio Mic"
+
+
+def test_recorder_follows_plug_and_unplug(fake_audio):
+    recorder = Recorder(devices.DeviceManager(), device="Headset")
+    assert record(recorder)
+    assert recorder.input.name == "Harness Microphone"
+
+    fake_audio.add_device("Headset")
+    assert record(recorder)
+    assert recorder.input.name == "Headset"
+
+    fake_audio.remove_device("Headset")
+    assert record(recorder)
+    assert recorder.input.name == "Harness Microphone"
+
+
+def test_unplug_without_a_signal_retries_once(fake_audio, monkeypatch):
+    """Without a change listener, a failed open still re-reads the list."""
+    monkeypatch.setattr(devices, "watch", lambda sd, callback: False)
+    manager = devices.DeviceManager()
+    fake_audio.add_device("Headset")
+    fake_audio._initialize()
+    recorder = Recorder(manager, device="Headset")
+    assert record(recorder) and recorder.input.name == "Headset"
+
+    fake_audio.remove_device("Headset")
+    assert record(recorder)
+    assert recorder.input.name == "Harness Microphone"
+    assert manager.refreshes == 2
+
+
+def test_config_pin_applies_end_to_end(fake_audio):
+    fake_audio.add_device("Desk Mic")
+    fake_audio._initialize()  # plugged in before launch
+    with Harness(server=ServerConfig(latency=0, chunk_delay=0),
+                 cfg={"input_device": "desk mic"}) as harness:
+        harness.run_session(synth_speech(0.2))
+        assert harness.app.recorder.input.name == "Desk Mic"
+        assert fake_audio.stats["delivered_frames"] == SAMPLE_RATE // 5
+
+
+def test_devices_command_marks_the_chosen_input(fake_audio, monkeypatch):
+    from voicekey import config
+    from voicekey.cli import main
+
+    monkeypatch.setattr(devices, "_manager", devices.DeviceManager())
+    monkeypatch.setattr(config, "load", lambda: dict(config.DEFAULTS, input_device="Missing"))
+    result = CliRunner().invoke(main, ["devices"])
+    assert result.exit_code == 0
+    assert "* Harness Microphone (system default): 1 ch, 24000 Hz, 10–100 ms" in result.output
+    assert "'Missing' isn't available" in result.output
@@ -1,10 +1,11 @@
 """Tests for display module (banner, audio meter, streaming display)."""
 
+import threading
 import time
 
 from rich.text import Text
 
-from voicekey.display import AudioMeter, StreamingDisplay, print_banner
+from voicekey.display import BAR_WIDTH, STREAM_LINES, AudioMeter, StreamingDisplay, console, print_banner
 
 
 class TestPrintBanner:
@@ -87,33 +88,96 @@ class TestAudioMeter:
         assert "REC" in rendered.plain
 
 
+    def test_render_lights_cells_for_level(self):
+        meter = AudioMeter()
+        meter.update_level(0.5)
+        rendered = meter._render((meter._filled, 12))
+        assert rendered.plain.count("█") == BAR_WIDTH // 2
+        assert rendered.plain.endswith("  1.2s")
+
+    def test_render_reuses_precomputed_bars(self):
+        meter = AudioMeter()
+        first = meter._render((3, 0))
+        second = meter._render((3, 0))
+        assert first.plain == second.plain
+        assert first is not second  # copies, so appending the timer is safe
+
+    def test_update_level_wakes_only_on_visible_change(self):
+        meter = AudioMeter()
+        meter.update_level(0.001)  # rounds to zero cells
+        assert not meter._wake.is_set()
+        meter.update_level(0.5)
+        assert meter._wake.is_set()
+        meter._wake.clear()
+        meter.update_level(0.501)
+        assert not meter._wake.is_set()
+
+    def test_skips_redraw_when_frame_unchanged(self, monkeypatch):
+        """Redraws happen only when the bar or the tenths timer changes."""
+        meter = AudioMeter()
+        draws = []
+        monkeypatch.setattr(meter, "_frame_key", lambda: (meter._filled, 0))
+        real_render = meter._render
+        monkeypatch.setattr(meter, "_render", lambda key=None: draws.append(key) or real_render(key))
+        meter.start()
+        for _ in range(5):
+            meter.update_level(0.0)
+            time.sleep(0.02)
+        meter.update_level(0.9)
+        time.sleep(0.2)
+        meter.stop()
+        assert draws == [(0, 0), (int(0.9 * BAR_WIDTH), 0)]
+
+    def test_stop_is_prompt(self):
+        meter = AudioMeter()
+        meter.start()
+        time.sleep(0.05)
+        start = time.monotonic()
+        meter.stop()
+        assert time.monotonic() - start < 0.05
+
+
 class TestStreamingDisplay:
     """Tests for StreamingDisplay state management."""
 
     def test_append_accumulates_text(self):
         sd = StreamingDisplay()
-        sd._text = ""
         sd.append("hello ")
         sd.append("world")
-        assert sd._text == "hello world"
+        assert sd.text == "hello world"
 
     def test_render_empty_shows_transcribing(self):
         sd = StreamingDisplay()
-        sd._text = ""
         rendered = sd._render()
         assert "transcribing" in rendered.plain
 
     def test_render_with_text_shows_content(self):
         sd = StreamingDisplay()
-        sd._text = "hello world"
+        sd.append("hello world")
+        assert sd.text == "hello world"
         rendered = sd._render()
         assert "hello world" in rendered.plain
 
+    def test_transcript_is_not_parsed_as_markup(self):
+        sd = StreamingDisplay()
+        sd.append("[laughs] see [/] ")
+        assert sd.text == "[laughs] see [/] "
+        assert "[laughs] see [/]" in sd._render().plain
+
+    def test_render_draws_only_the_tail(self):
+        sd = StreamingDisplay()
+        for i in range(5000):
+            sd.append(f"word{i} ")
+        assert sd.text.startswith("word0 word1 ")
+        rendered = sd._render().plain
+        assert rendered.endswith("word4999 ▍")
+        assert "… word" in rendered and "word0 " not in rendered
+        assert len(rendered) <= console.width * STREAM_LINES
+
     def test_finish_prints_result(self, capsys):
         """finish() prints the final text with checkmark."""
         sd = StreamingDisplay()
-        sd._text = "test output"
-        sd._live = None
+        sd.append("test output")
         sd.finish()
         output = capsys.readouterr().out
         assert "test output" in output
@@ -121,8 +185,43 @@ class TestStreamingDisplay:
     def test_finish_empty_no_output(self, capsys):
         """finish() prints nothing for empty/whitespace text."""
         sd = StreamingDisplay()
-        sd._text = "   "
-        sd._live = None
+        sd.append("   ")
         sd.finish()
         output = capsys.readouterr().out
         assert output == ""
+
+    def test_append_does_not_render_inline(self, monkeypatch):
+        """Deltas are rendered on the display thread, never the caller's."""
+        sd = StreamingDisplay()
+        sd.start()
+        caller = threading.current_thread()
+        render_threads = []
+        real_render = sd._render
+        monkeypatch.setattr(sd, "_render", lambda: render_threads.append(threading.current_thread()) or real_render())
+        for i in range(50):
+            sd.append(f"w{i} ")
+        time.sleep(0.1)
+        sd.finish()
+        assert render_threads
+        assert caller not in render_threads
+
+    def test_frames_are_capped_and_coalesced(self, monkeypatch):
+        sd = StreamingDisplay()
+        sd.start()
+        frames = []
+        real_render = sd._render
+        monkeypatch.setattr(sd, "_render", lambda: frames.append(1) or real_render())
+        for i in range(2000):
+            sd.append("x ")
+        time.sleep(0.2)
+        sd.finish()
+        assert sd.text == "x " * 2000
+        assert 1 <= len(frames) <= 5
+
+    def test_finish_flushes_queued_deltas(self, capsys):
+        sd = StreamingDisplay()
+        sd.start()
+        for i in range(500):
+            sd.append(f"{i} ")
+        sd.finish()
+        assert sd.text == "".join(f"{i} " for i in range(500))
@@ -0,0 +1,117 @@
+"""Tests for the flight recorder and its binary dump format."""
+
+import numpy as np
+import pytest
+
+from voicekey import flight
+from voicekey.flight import FlightRecorder
+
+
+def _block(n=512, value=1000):
+    return np.full((n, 1), value, dtype=np.int16)
+
+
+def _session(rec, audio_blocks=2, text="hi"):
+    rec.begin_session()
+    rec.record(flight.HOTKEY, b"press")
+    for _ in range(audio_blocks):
+        rec.record_audio(_block())
+    rec.record(flight.HOTKEY, b"release")
+    rec.record_text(flight.SSE, text)
+    rec.record_text(flight.INSERT, text)
+    rec.end_session()
+
+
+class TestFlightRecorder:
+    def test_keeps_last_n_sessions(self):
+        rec = FlightRecorder(max_sessions=2)
+        for text in ("a", "b", "c"):
+            _session(rec, text=text)
+        inserted = [
+            [p for k, _, p in s.events if k == flight.INSERT][0] for s in rec.sessions()
+        ]
+        assert inserted == [b"b", b"c"]
+
+    def test_disabled_records_nothing(self):
+        rec = FlightRecorder(max_sessions=0)
+        _session(rec)
+        assert rec.sessions() == []
+        assert rec.nbytes == 0
+
+    def test_ignores_events_outside_session(self):
+        rec = FlightRecorder()
+        rec.record(flight.HOTKEY, b"press")
+        rec.record_audio(_block())
+        assert rec.nbytes == 0
+
+    def test_raw_keys_lead_in_to_the_next_session(self):
+        rec = FlightRecorder()
+        rec.record_key(0x3A, True)
+        rec.record_key(0x3A, False)   # debounced away: no session
+        rec._keys[0] = (rec._keys[0][0] - int(20e9), rec._keys[0][1])  # too long ago
+        rec.record_key(0x3A, True)
+        _session(rec)
+        rec.record_key(0x3D, True)
+        events = [(k, p) for k, _, p in rec.sessions()[0].events if k in (flight.KEY, flight.HOTKEY)]
+        assert events == [(flight.KEY, b"0x3a up"), (flight.KEY, b"0x3a down"),
+                          (flight.HOTKEY, b"press"), (flight.HOTKEY, b"release")]
+        offsets = [o for _, o, _ in rec.sessions()[0].events]
+        assert offsets == sorted(offsets)
+
+    def test_dump_keeps_keys_that_never_started_a_session(self, tmp_path):
+        rec = FlightRecorder()
+        _session(rec)
+        rec.record_key(0x3A, True)
+        rec.record_key(0x3A, False)
+        loaded = flight.load(rec.dump(tmp_path / "f.vkfr"))
+        assert len(loaded) == 2 and len(rec.sessions()) == 1
+        assert [p for _, _, p in loaded[1].events] == [b"0x3a down", b"0x3a up"]
+
+    def test_byte_ceiling_evicts_old_sessions(self):
+        rec = FlightRecorder(max_sessions=10, max_bytes=64 * 1024, compress_level=0)
+        for _ in range(10):
+            _session(rec, audio_blocks=10)  # ~10 KB each
+        assert rec.nbytes <= 64 * 1024
+        assert 1 < len(rec.sessions()) < 10
+
+    def test_oversized_session_truncates_audio(self):
+        rec = FlightRecorder(max_bytes=8 * 1024, compress_level=0)
+        _session(rec, audio_blocks=20)
+        session = rec.sessions()[0]
+        assert session.truncated
+        assert rec.nbytes <= 8 * 1024
+        # Non-audio events are still kept
+        assert any(k == flight.INSERT for k, _, _ in session.events)
+
+    def test_audio_compressed(self):
+        rec = FlightRecorder(compress_level=1)
+        _session(rec, audio_blocks=1)
+        kinds = [k for k, _, _ in rec.sessions()[0].events]
+        assert flight.AUDIO_ZLIB in kinds
+        assert rec.sessions()[0].audio() == _block().tobytes()
+
+
+class TestDumpFormat:
+    def test_roundtrip(self, tmp_path):
+        rec = FlightRecorder()
+        _session(rec, text="one")
+        _session(rec, text="two")
+        path = rec.dump(tmp_path / "f.vkfr")
+
+        loaded = flight.load(path)
+        assert len(loaded) == 2
+        for original, restored in zip(rec.sessions(), loaded):
+            assert restored.events == original.events
+            assert restored.started_at == original.started_at
+
+    def test_truncated_flag_roundtrip(self, tmp_path):
+        rec = FlightRecorder(max_bytes=4 * 1024, compress_level=0)
+        _session(rec, audio_blocks=10)
+        loaded = flight.load(rec.dump(tmp_path / "f.vkfr"))
+        assert loaded[0].truncated
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "junk.vkfr"
+        path.write_bytes(b"NOPE" + bytes(20))
+        with pytest.raises(ValueError):
+            flight.load(path)
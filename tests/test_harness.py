@@ -0,0 +1,76 @@
+"""Tests for the headless end-to-end harness."""
+
+import time
+import wave
+
+import numpy as np
+
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness import Harness, run_benchmark
+from voicekey.harness import fake_sounddevice
+from voicekey.harness.audio import load_wav, synth_speech
+from voicekey.mockserver import ServerConfig
+
+FAST = ServerConfig(latency=0.0, chunk_delay=0.0, transcript="hello there world")
+
+
+def test_session_pastes_server_transcript():
+    with Harness(server=FAST) as harness:
+        text = harness.run_session(synth_speech(0.5))
+    assert text == "hello there world"
+    assert len(harness.insertions) == 1
+
+
+def test_stage_timings_recorded():
+    with Harness(server=FAST) as harness:
+        harness.run_session(synth_speech(0.5))
+        hists = harness.app.stage_stats.hists
+    for stage in ("stream_open", "encode", "first_delta", "paste", "release_to_paste"):
+        assert hists[stage].count == 1, stage
+
+
+def test_realtime_playback_is_paced():
+    audio = synth_speech(0.3)
+    with Harness(server=FAST, speed=1.0) as harness:
+        start = time.monotonic()
+        harness.run_session(audio)
+        elapsed = time.monotonic() - start
+    assert elapsed >= 0.25
+
+
+def test_run_benchmark_report():
+    report = run_benchmark([synth_speech(0.5)], sessions=3, server=FAST)
+    assert report.sessions == 3
+    assert report.failures == 0
+    assert report.stages["release_to_paste"]["count"] == 3
+    assert report.cpu_seconds > 0
+    data = report.to_dict()
+    assert data["stages"]["paste"]["count"] == 3
+    assert "stage (ms)" in report.format()
+
+
+def test_fake_stream_delivers_all_samples():
+    received = []
+    fake_sounddevice.play(np.arange(1000, dtype=np.int16), speed=0, blocksize=300)
+    stream = fake_sounddevice.InputStream(callback=lambda b, n, t, s: received.append(b.copy()))
+    stream.start()
+    assert fake_sounddevice.wait_finished(1.0)
+    stream.stop()
+    assert [len(b) for b in received] == [300, 300, 300, 100]
+    np.testing.assert_array_equal(np.concatenate(received).ravel(), np.arange(1000))
+
+
+def test_load_wav_resamples_and_mixes(tmp_path):
+    path = tmp_path / "stereo.wav"
+    stereo = np.zeros((8000, 2), dtype=np.int16)
+    stereo[:, 0] = 1000
+    stereo[:, 1] = 3000
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(2)
+        wf.setsampwidth(2)
+        wf.setframerate(8000)
+        wf.writeframes(stereo.tobytes())
+
+    audio = load_wav(path)
+    assert len(audio) == SAMPLE_RATE
+    assert np.all(audio == 2000)
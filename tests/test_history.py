@@ -0,0 +1,106 @@
+"""Tests for the dictation history store and `voicekey history`."""
+
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from voicekey import history
+from voicekey.harness import Harness
+from voicekey.harness.audio import synth_speech
+from voicekey.history import History, match_query
+from voicekey.mockserver import ServerConfig
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = History(tmp_path / "history.db")
+    yield store
+    store.close()
+
+
+def test_add_is_batched_and_readable(store):
+    for i in range(1200):
+        store.add(f"entry {i}", audio_seconds=1.5, model="m", created_at=1000.0 + i)
+    assert store.flush(10)
+    assert store.count() == 1200
+    assert store.batches <= 5  # 512 per transaction at most, not one commit each
+    latest = store.recent(1)[0]
+    assert (latest.id, latest.text, latest.audio_seconds, latest.model) == (1200, "entry 1199", 1.5, "m")
+
+
+def test_add_never_waits_on_the_writer(store, monkeypatch):
+    gate = threading.Event()
+    connect = store._connect
+    monkeypatch.setattr(store, "_connect", lambda: gate.wait() and connect())
+    store.add("queued while the disk is slow")
+    assert store._queue.qsize() == 1
+    gate.set()
+    assert store.flush(5)
+    assert store.count() == 1
+
+
+def test_search_matches_all_words_with_prefix(store):
+    store.add("Send the quarterly budget to Dana")
+    store.add("Budget meeting moved to Thursday")
+    store.add("Café menu: crème brûlée")
+    store.flush()
+    assert [e.text for e in store.search("budget thurs")] == ["Budget meeting moved to Thursday"]
+    assert len(store.search("BUDGET")) == 2
+    assert store.search("creme brulee")[0].snippet == "Café menu: [crème] [brûlée]"
+    assert store.search('AND "( NEAR') == []  # FTS syntax is searched for literally
+
+
+def test_match_query_quotes_words():
+    assert match_query('say "hi" now') == '"say" """hi""" "now"*'
+    assert match_query("  ") == ""
+
+
+def test_pages_by_id(store):
+    for i in range(25):
+        store.add(f"note {i}")
+    store.flush()
+    first = store.search("note", limit=10)
+    second = store.search("note", limit=10, before=first[-1].id)
+    assert [e.id for e in first + second] == list(range(25, 5, -1))
+    assert [e.id for e in store.recent(3, before=4)] == [3, 2, 1]
+
+
+def test_pasted_transcripts_are_recorded(tmp_path, monkeypatch):
+    store = History(tmp_path / "history.db")
+    monkeypatch.setattr("voicekey.app.App.history", property(lambda self: store))
+    server = ServerConfig(latency=0, chunk_delay=0)
+    with Harness(server=server) as harness:
+        harness.run_session(synth_speech(1.0))
+    store.flush()
+    (entry,) = store.recent()
+    assert entry.text == server.transcript.strip()
+    assert entry.audio_seconds == pytest.approx(1.0)
+    store.close()
+
+
+def test_history_commands(tmp_path, monkeypatch):
+    from voicekey.cli import main
+
+    path = tmp_path / "history.db"
+    monkeypatch.setattr(history, "default_path", lambda: path)
+    store = History(path)
+    for i in range(3):
+        store.add(f"reminder number {i}", created_at=0)
+    store.close()
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["history", "search", "reminder", "-n", "2"])
+    assert result.exit_code == 0
+    assert "[reminder] number 2" in result.output
+    assert "--before 2" in result.output
+    assert runner.invoke(main, ["history", "search", "-n", "0"]).exit_code == 2
+
+    result = runner.invoke(main, ["history", "show", "1"])
+    assert "reminder number 0" in result.output
+    assert runner.invoke(main, ["history", "show", "9"]).exit_code == 1
+
+    pasted = []
+    monkeypatch.setattr("voicekey.inserter.insert_text", pasted.append)
+    assert runner.invoke(main, ["history", "reinsert", "3", "--delay", "0"]).exit_code == 0
+    assert pasted == ["reminder number 2"]
@@ -117,3 +117,195 @@ class TestDebounceLogic:
             listener.on_release()
 
         assert release_called == [1]
+
+
+class TestTapInstrumentation:
+    """Tests for _callback timing and tap-disabled handling with a fake Quartz."""
+
+    def _listener(self, monkeypatch, on_press=lambda: None, on_release=lambda: None):
+        from voicekey import hotkey
+        from tests.fakes import make_fake_quartz
+
+        fake = make_fake_quartz()
+        monkeypatch.setattr(hotkey, "Quartz", fake)
+        listener = HotkeyListener(on_press, on_release)
+        listener._tap = "tap"
+        return listener, fake
+
+    def _wait_for(self, predicate, timeout=1.0):
+        deadline = time.time() + timeout
+        while not predicate() and time.time() < deadline:
+            time.sleep(0.005)
+        return predicate()
+
+    def test_timeout_reenables_tap_and_counts(self, monkeypatch):
+        listener, fake = self._listener(monkeypatch)
+        listener._callback(None, fake.kCGEventTapDisabledByTimeout, None, None)
+        listener._callback(None, fake.kCGEventTapDisabledByTimeout, None, None)
+        assert listener.stats.disabled_by_timeout == 2
+        assert fake.enabled_calls == [("tap", True), ("tap", True)]
+
+    def test_user_input_disable_counted(self, monkeypatch):
+        listener, fake = self._listener(monkeypatch)
+        listener._callback(None, fake.kCGEventTapDisabledByUserInput, None, None)
+        assert listener.stats.disabled_by_user_input == 1
+        assert fake.enabled_calls == [("tap", True)]
+
+    def test_callback_duration_recorded(self, monkeypatch):
+        listener, fake = self._listener(monkeypatch)
+        event = (0x00, 0)
+        for _ in range(5):
+            assert listener._callback(None, fake.kCGEventFlagsChanged, event, None) is event
+        assert listener.stats.callback_us.count == 5
+
+    def test_release_runs_off_tap_thread(self, monkeypatch):
+        threads = []
+        listener, fake = self._listener(
+            monkeypatch, on_release=lambda: threads.append(threading.current_thread())
+        )
+        listener._option_down = True
+        listener._confirmed = True
+        listener._callback(None, fake.kCGEventFlagsChanged, (KEYCODE_LEFT_OPTION, 0), None)
+
+        assert self._wait_for(lambda: threads)
+        assert threads[0] is not threading.current_thread()
+
+    def test_slow_handler_flagged(self, monkeypatch):
+        from voicekey import hotkey
+
+        monkeypatch.setattr(hotkey, "HOTKEY_HANDLER_BUDGET", 0.001)
+        listener, fake = self._listener(monkeypatch, on_press=lambda: time.sleep(0.01))
+        listener._on_debounce()
+
+        assert self._wait_for(lambda: listener.stats.slow_handlers == 1)
+        assert "on_press" in listener.stats.last_slow
+        assert listener.stats.handler_us.count == 1
+
+    def test_handlers_stay_ordered(self, monkeypatch):
+        calls = []
+        listener, _ = self._listener(
+            monkeypatch,
+            on_press=lambda: (time.sleep(0.02), calls.append("press")),
+            on_release=lambda: calls.append("release"),
+        )
+        listener._dispatch(listener.on_press, "on_press")
+        listener._dispatch(listener.on_release, "on_release")
+        assert self._wait_for(lambda: len(calls) == 2)
+        assert calls == ["press", "release"]
+
+    def test_stats_roundtrip(self, monkeypatch):
+        from voicekey.hotkey import TapStats
+
+        listener, fake = self._listener(monkeypatch)
+        listener._callback(None, fake.kCGEventTapDisabledByTimeout, None, None)
+        restored = TapStats.from_dict(listener.stats.to_dict())
+        assert restored.disabled_by_timeout == 1
+        assert restored.callback_us.count == 1
+
+
+class TestRaces:
+    """The listener's key state under timer/tap races, and the stress harness."""
+
+    def _listener(self):
+        from voicekey.harness.hotkey_stress import VirtualClock
+
+        clock, queued = VirtualClock(), []
+        listener = HotkeyListener(lambda: None, lambda: None, timer=clock.timer)
+        listener._dispatch = lambda handler, name: queued.append(name)
+        return listener, clock, queued
+
+    def test_timer_that_woke_before_release_does_nothing(self):
+        listener, clock, queued = self._listener()
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, True)
+        clock.advance(1.0)  # timer wakes; cancel() can't stop it now
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, False)
+        clock.woken()[0].run()
+        assert queued == [] and listener._confirmed is False
+
+    def test_stale_timer_does_not_shorten_next_press(self):
+        listener, clock, queued = self._listener()
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, True)
+        clock.advance(1.0)
+        stale = clock.woken()[0]
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, False)
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, True)
+        stale.run()
+        assert queued == []
+        clock.advance(2.0)
+        clock.woken()[0].run()
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, False)
+        assert queued == ["on_press", "on_release"]
+
+    def test_raw_flag_changes_reported_before_debouncing(self):
+        listener, clock, queued = self._listener()
+        raw = []
+        listener.hotkey, listener.on_flags = "left_option", lambda *event: raw.append(event)
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, True)
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, True)    # repeated down, ignored
+        listener._on_flags_changed(KEYCODE_LEFT_OPTION, False)   # debounced away
+        listener._on_flags_changed(KEYCODE_RIGHT_OPTION, True)   # not the hotkey
+        listener._on_flags_changed(0x38, True)                   # Shift
+        assert queued == []
+        assert raw == [(KEYCODE_LEFT_OPTION, True), (KEYCODE_LEFT_OPTION, True),
+                       (KEYCODE_LEFT_OPTION, False), (KEYCODE_RIGHT_OPTION, True)]
+
+    def test_release_from_another_thread_waits_for_press(self):
+        from voicekey import config
+        from voicekey.app import App
+        from voicekey.harness.hotkey_stress import _Provider, _Recorder
+
+        problems = []
+        recorder = _Recorder(lambda ok, message: ok or problems.append(message))
+        start = recorder.start
+        recorder.start = lambda: (time.sleep(0.05), start())
+        provider = _Provider()
+        app = App(cfg=dict(config.DEFAULTS, display="null"), api_key="sk-test", recorder=recorder,
+                  provider=provider, inserter=lambda text, on_stage=None: None, persist_stats=False)
+        presser = threading.Thread(target=app.on_hotkey_press)
+        presser.start()
+        time.sleep(0.01)  # press is opening the stream
+        assert app.on_hotkey_release()
+        provider.release("done")
+        assert app.wait_idle(5) and app.last_text == "done"
+        assert problems == []
+
+    def test_stress_invariants_hold(self):
+        from voicekey.harness.hotkey_stress import run_stress
+
+        for seed in range(5):
+            report = run_stress(seed, events=3000)
+            assert report.violations == [], report.format()
+            assert report.accepted_presses == report.accepted_releases > 50
+            assert report.inserted > 0
+
+    def test_stress_is_reproducible(self):
+        from voicekey.harness.hotkey_stress import run_stress
+
+        a, b = run_stress(7, events=2000), run_stress(7, events=2000)
+        assert (a.steps, a.presses, a.accepted_presses, a.inserted) == \
+               (b.steps, b.presses, b.accepted_presses, b.inserted)
+
+    def test_stress_catches_stale_timer(self, monkeypatch):
+        from voicekey.harness.hotkey_stress import run_stress
+
+        def unguarded(self, generation=None):
+            self._confirmed = True
+            self._dispatch(self.on_press, "on_press")
+
+        monkeypatch.setattr(HotkeyListener, "_on_debounce", unguarded)
+        report = run_stress(0, events=2000)
+        assert any("isn't held" in v for v in report.violations)
+
+    def test_stress_command(self, tmp_path):
+        import json
+
+        from click.testing import CliRunner
+
+        from voicekey.cli import main
+
+        path = tmp_path / "stress.json"
+        result = CliRunner().invoke(main, ["hotkey-stress", "--seeds", "2", "--events", "500",
+                                           "--json", str(path)])
+        assert result.exit_code == 0, result.output
+        assert "all invariants held" in result.output
+        assert [r["seed"] for r in json.loads(path.read_text())] == [0, 1]
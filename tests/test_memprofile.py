@@ -0,0 +1,112 @@
+"""Tests for per-session memory profiling and the soak test."""
+
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from voicekey import memprofile
+from voicekey.harness import Harness, open_fds, thread_count
+from voicekey.harness.audio import synth_speech
+from voicekey.harness.soak import Limits, Sample, SoakReport, check, run_soak
+from voicekey.memprofile import MemoryProfiler
+from voicekey.mockserver import ServerConfig
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc already running")
+    profiler = MemoryProfiler(tmp_path / "memory.log", frames=4)
+    yield profiler
+    profiler.stop()
+
+
+def _frames(*filenames):
+    return tracemalloc.Traceback(tuple((name, 1) for name in filenames))
+
+
+def test_category_uses_innermost_match():
+    assert memprofile.category(_frames("/x/voicekey/app.py", "/x/site-packages/httpx/_client.py")) == "http"
+    assert memprofile.category(_frames("/x/voicekey/history.py", "/x/lib/json/encoder.py")) == "storage"
+    assert memprofile.category(_frames("/x/voicekey/app.py")) == "other"
+
+
+def test_category_matches_whole_path_components():
+    home = "/Users/richard/h2o/venv/lib/python3.11"
+    assert memprofile.category(_frames(f"{home}/json/encoder.py")) == "other"
+    assert memprofile.category(_frames(f"{home}/site-packages/voicekey/app.py")) == "other"
+    assert memprofile.category(_frames(f"{home}/site-packages/h2/connection.py")) == "http"
+    assert memprofile.category(_frames(f"{home}/site-packages/sounddevice.py")) == "recorder"
+    assert memprofile.category(_frames(f"{home}/ssl.py")) == "http"
+    assert memprofile.category(_frames(f"{home}/site-packages/objc/_convenience.py")) == "paste"
+
+
+def test_session_end_reports_what_was_kept(profiler, tmp_path):
+    kept = []
+    profiler.session_end()
+    kept.append(bytearray(2_000_000))
+    report = profiler.session_end()
+    assert report.session == 2
+    assert 1_900_000 < report.size_diff < 2_200_000
+    assert report.top[0].size_diff >= 2_000_000
+    assert "test_memprofile.py" in report.top[0].location
+    kept.clear()
+    report = profiler.session_end()
+    assert report.size_diff < -1_900_000 and abs(report.total_growth) < 200_000
+    assert (tmp_path / "memory.log").read_text().count("session ") == 3
+
+
+def test_app_reports_after_each_dictation(monkeypatch):
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc already running")
+    server = ServerConfig(latency=0, chunk_delay=0, transcript="one two")
+    with Harness(server=server, cfg={"memory_profile": True}) as harness:
+        printed = []
+        monkeypatch.setattr(harness.app.ui, "print", printed.append)
+        try:
+            harness.run_session(synth_speech(0.3))
+            assert harness.app.memory.sessions == 1 and harness.app.memory.path is None
+            assert any("memory:" in line for line in printed)
+        finally:
+            harness.app.memory.stop()
+
+
+def test_resource_counters():
+    assert open_fds() > 0 and thread_count() >= 1
+
+
+def _report(rss, threads=5, fds=7, failures=0):
+    samples = [Sample(i * 100, i, r, threads, fds) for i, r in enumerate(rss)]
+    samples[-1].threads, samples[-1].fds = threads + 5, fds
+    return SoakReport(sessions=samples[-1].session, failures=failures, wall_seconds=1.0,
+                      limits=Limits(), samples=samples)
+
+
+def test_check_flags_growth_and_slope():
+    assert check(_report([60.0] * 10, threads=5)) == ["threads rose from 5 to 10 (limit +4)"]
+    leaking = _report([60.0 + i * 0.5 for i in range(10)])
+    problems = check(leaking)
+    assert any("trending up 5.00 MB per 1000" in p for p in problems)
+    assert not any(p.startswith("RSS grew") for p in problems)
+    assert any(p.startswith("RSS grew 25.0") for p in check(_report([60.0, 85.0] + [60.0] * 8)))
+
+
+def test_short_soak_stays_within_limits():
+    report = run_soak(sessions=100, seconds=0.3, warmup=10, sample_every=20,
+                      limits=Limits(rss_slope_mb=1e9))  # too short for a trend
+    assert report.failures == 0 and report.violations == []
+    assert [s.session for s in report.samples] == [0, 20, 40, 60, 80, 100]
+    assert "OK: within limits" in report.format()
+
+
+def test_soak_command(tmp_path):
+    import json
+
+    from voicekey.cli import main
+
+    path = tmp_path / "soak.json"
+    result = CliRunner().invoke(main, ["soak", "--sessions", "20", "--seconds", "0.2",
+                                       "--max-rss-slope", "1e9", "--json", str(path)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(path.read_text())["sessions"] == 20
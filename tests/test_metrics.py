@@ -0,0 +1,137 @@
+"""Tests for latency histograms and the persisted stats file."""
+
+import json
+import threading
+
+from voicekey import metrics
+from voicekey.metrics import Histogram
+
+
+class TestHistogram:
+    def test_empty(self):
+        hist = Histogram()
+        assert hist.count == 0
+        assert hist.percentile(50) == 0
+        assert hist.mean == 0.0
+
+    def test_small_values_exact(self):
+        hist = Histogram()
+        for v in range(1, 11):
+            hist.record(v)
+        assert hist.percentile(50) == 5
+        assert hist.percentile(100) == 10
+        assert hist.max == 10
+
+    def test_percentiles_within_relative_error(self):
+        hist = Histogram()
+        for v in range(1, 100_001):
+            hist.record(v)
+        for p in (50, 90, 99):
+            exact = p * 1000
+            assert abs(hist.percentile(p) - exact) / exact < 0.07
+
+    def test_negative_clamped(self):
+        hist = Histogram()
+        hist.record(-5)
+        assert hist.max == 0
+
+    def test_merge(self):
+        a, b = Histogram(), Histogram()
+        a.record(10)
+        b.record(1000)
+        a.merge(b)
+        assert a.count == 2
+        assert a.max == 1000
+        assert a.total == 1010
+
+    def test_dict_roundtrip(self):
+        hist = Histogram()
+        for v in (3, 300, 30_000):
+            hist.record(v)
+        restored = Histogram.from_dict(json.loads(json.dumps(hist.to_dict())))
+        assert restored.count == 3
+        assert restored.percentile(99) == hist.percentile(99)
+
+
+class TestStatsFile:
+    def test_load_missing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(metrics, "_stats_path", lambda: tmp_path / "stats.json")
+        assert metrics.load() == {}
+
+    def test_save_section_keeps_others(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(metrics, "_stats_path", lambda: tmp_path / "stats.json")
+        metrics.save_section("a", {"x": 1})
+        metrics.save_section("b", {"y": 2})
+        assert metrics.load() == {"a": {"x": 1}, "b": {"y": 2}}
+
+    def test_concurrent_writers_keep_every_section(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(metrics, "_stats_path", lambda: tmp_path / "stats.json")
+
+        def writer(name):
+            for i in range(50):
+                metrics.save_section(name, {"i": i})
+
+        threads = [threading.Thread(target=writer, args=(f"s{n}",)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert metrics.load() == {f"s{n}": {"i": 49} for n in range(4)}
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["stats.json", "stats.json.lock"]
+
+    def test_load_corrupt(self, tmp_path, monkeypatch):
+        path = tmp_path / "stats.json"
+        path.write_text("{not json")
+        monkeypatch.setattr(metrics, "_stats_path", lambda: path)
+        assert metrics.load() == {}
+
+    def test_reset(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(metrics, "_stats_path", lambda: tmp_path / "stats.json")
+        metrics.save_section("a", {})
+        metrics.reset()
+        assert metrics.load() == {}
+
+
+class TestSessionTimer:
+    def test_intervals_only_for_marked_pairs(self):
+        session = metrics.SessionTimer()
+        session.marks.update({"press": 0, "release": 2_000_000, "encode_done": 2_500_000})
+        intervals = session.intervals()
+        assert intervals["recording"] == 2000
+        assert intervals["encode"] == 500
+        assert "connect" not in intervals
+
+    def test_mark_once_keeps_first(self):
+        session = metrics.SessionTimer()
+        session.mark_once("first_delta")
+        first = session.marks["first_delta"]
+        session.mark_once("first_delta")
+        assert session.marks["first_delta"] == first
+
+    def test_mark_overwrites(self):
+        session = metrics.SessionTimer()
+        session.marks["last_delta"] = 0
+        session.mark("last_delta")
+        assert session.marks["last_delta"] > 0
+
+    def test_every_interval_uses_known_stages(self):
+        for _, start, end in metrics.INTERVALS:
+            assert start in metrics.STAGES
+            assert end in metrics.STAGES
+
+
+class TestStageStats:
+    def test_add_and_roundtrip(self):
+        stats = metrics.StageStats()
+        session = metrics.SessionTimer()
+        session.marks.update({"release": 0, "paste_done": 800_000_000})
+        stats.add(session)
+        data = stats.to_dict()
+        assert list(data) == ["release_to_paste"]
+        restored = metrics.StageStats.from_dict(data)
+        assert restored.hists["release_to_paste"].count == 1
+        assert restored.hists["release_to_paste"].max == 800_000
+
+    def test_from_dict_ignores_unknown(self):
+        stats = metrics.StageStats.from_dict({"bogus": {"count": 1}})
+        assert "bogus" not in stats.hists
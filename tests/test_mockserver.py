@@ -0,0 +1,146 @@
+"""Tests for the local stand-in server and the load generator."""
+
+import random
+
+import httpx
+import pytest
+
+from voicekey.harness.audio import encode_wav, synth_speech
+from voicekey.loadgen import run_load
+from voicekey.mockserver import (
+    Distribution,
+    MockServer,
+    ServerConfig,
+    parse_multipart,
+    transcript_for,
+    wav_seconds,
+)
+from voicekey.providers.openai import OpenAIProvider
+
+WAV = encode_wav(synth_speech(2.0))
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**options):
+        options.setdefault("latency", 0)
+        options.setdefault("chunk_delay", 0)
+        server = MockServer(ServerConfig(**options)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+class TestDistribution:
+    def test_fixed(self):
+        assert Distribution("0.25").sample(random.Random(0)) == 0.25
+        assert Distribution(0.5).sample(random.Random(0)) == 0.5
+
+    def test_uniform_bounds(self):
+        dist = Distribution("uniform:0.1:0.2")
+        rng = random.Random(1)
+        assert all(0.1 <= dist.sample(rng) <= 0.2 for _ in range(100))
+
+    def test_never_negative(self):
+        dist = Distribution("normal:0:1")
+        rng = random.Random(2)
+        assert min(dist.sample(rng) for _ in range(200)) == 0.0
+
+    def test_seeded_is_deterministic(self):
+        dist = Distribution("lognormal:0.3:0.5")
+        a = [dist.sample(random.Random(7)) for _ in range(3)]
+        b = [dist.sample(random.Random(7)) for _ in range(3)]
+        assert a == b
+
+    @pytest.mark.parametrize("spec", ["bogus:1", "uniform:1", "exp:x"])
+    def test_rejects_bad_specs(self, spec):
+        with pytest.raises(ValueError):
+            Distribution(spec)
+
+
+class TestTranscripts:
+    def test_deterministic_per_audio(self):
+        assert transcript_for(WAV) == transcript_for(WAV)
+        assert transcript_for(WAV) != transcript_for(encode_wav(synth_speech(2.0, seed=1)))
+
+    def test_length_tracks_duration(self):
+        assert len(transcript_for(WAV).split()) == 5  # 2 s × 2.5 words/s
+
+    def test_wav_seconds(self):
+        assert wav_seconds(WAV) == pytest.approx(2.0)
+        assert wav_seconds(b"not a wav") == 0.0
+
+    def test_parse_multipart(self):
+        request = httpx.Request("POST", "http://x", files={"file": ("a.wav", b"abc\r\ndef")},
+                                data={"model": "m"})
+        body = request.read()
+        fields = parse_multipart(body, request.headers["Content-Type"])
+        assert fields == {"model": b"m", "file": b"abc\r\ndef"}
+
+
+class TestServer:
+    def test_streams_derived_transcript(self, serve):
+        server = serve(transcript="")
+        chunks = []
+        text = OpenAIProvider(base_url=server.url).transcribe(WAV, "sk", on_chunk=chunks.append)
+        assert text == transcript_for(WAV)
+        assert len(chunks) == 5
+
+    def test_words_per_chunk(self, serve):
+        server = serve(transcript="one two three four five", words_per_chunk=2)
+        chunks = []
+        OpenAIProvider(base_url=server.url).transcribe(WAV, "sk", on_chunk=chunks.append)
+        assert chunks == ["one two ", "three four ", "five"]
+
+    def test_injects_429_with_retry_after(self, serve):
+        server = serve(error_429=1.0, retry_after=3)
+        with pytest.raises(httpx.HTTPStatusError) as exc:
+            OpenAIProvider(base_url=server.url, max_retries=0).transcribe(WAV, "sk")
+        assert exc.value.response.status_code == 429
+        assert exc.value.response.headers["Retry-After"] == "3"
+        assert server.stats.rejected_429 == 1
+
+    def test_injects_500(self, serve):
+        server = serve(error_500=1.0)
+        with pytest.raises(httpx.HTTPStatusError):
+            OpenAIProvider(base_url=server.url, max_retries=0).transcribe(WAV, "sk")
+        assert server.stats.failed_500 == 1
+
+    def test_stall_stops_stream_early(self, serve):
+        server = serve(stall=1.0, stall_seconds=0.05, transcript="a b c")
+        text = OpenAIProvider(base_url=server.url).transcribe(WAV, "sk")
+        assert text == "a "
+        assert server.stats.stalled == 1
+
+    def test_stats_endpoint(self, serve):
+        server = serve()
+        OpenAIProvider(base_url=server.url).transcribe(WAV, "sk")
+        stats = httpx.get(server.url.removesuffix("/v1") + "/stats").json()
+        assert stats["requests"] == 1
+        assert stats["completed"] == 1
+
+
+class TestLoadgen:
+    def test_reports_throughput_and_percentiles(self, serve):
+        server = serve(transcript="")
+        report = run_load(server.url, [(WAV, 2.0)], requests=12, concurrency=4)
+        assert report.ok == 12
+        assert report.errors == {}
+        assert report.latency_us.count == 12
+        assert report.first_delta_us.count == 12
+        data = report.to_dict()
+        assert data["requests_per_second"] > 0
+        assert data["audio_seconds_per_second"] > 0
+        assert "throughput" in report.format()
+
+    def test_counts_errors_by_kind(self, serve):
+        server = serve(error_500=1.0)
+        report = run_load(server.url, [(WAV, 2.0)], requests=3, concurrency=2,
+                          provider=OpenAIProvider(base_url=server.url, max_retries=0))
+        assert report.ok == 0
+        assert report.errors == {"http_500": 3}
@@ -0,0 +1,123 @@
+"""Tests for provider discovery through entry points, using the dummy plugin in tests/plugins."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from voicekey import config, providers
+from voicekey.providers import plugins
+
+PLUGINS = Path(__file__).parent / "plugins"
+
+
+def _forget_dummy():
+    for name in [m for m in sys.modules if m.startswith("voicekey_dummy")]:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def installed(tmp_path, monkeypatch):
+    """The dummy plugin on sys.path, a scratch cache and no discovery or imports yet."""
+    monkeypatch.syspath_prepend(str(PLUGINS))
+    monkeypatch.setattr(plugins, "cache_path", lambda: tmp_path / "providers.json")
+    monkeypatch.setattr(plugins, "_discovery", None)
+    monkeypatch.setattr(providers, "PROVIDERS", {})
+    _forget_dummy()
+    yield tmp_path / "providers.json"
+    _forget_dummy()
+
+
+def test_discovery_reads_capabilities_without_importing(installed):
+    found = plugins.discover()
+    assert set(found.providers) == {"echo", "flac-only", "missing"}
+    echo = found.providers["echo"]
+    assert echo.streaming_input and echo.formats == ("wav", "flac") and echo.sample_rate == 16000
+    assert "voicekey_dummy.provider" not in sys.modules
+    assert len(found.errors) == 2
+    assert any(e.startswith("not-info:") and "not a ProviderInfo" in e for e in found.errors)
+    assert any(e.startswith("broken:") for e in found.errors)
+
+
+def test_provider_imported_on_first_use(installed):
+    assert providers.provider_info("echo").description == "Echoes a fixed transcript"
+    assert "voicekey_dummy.provider" not in sys.modules
+    provider = providers.get_provider("echo", transcript="hello")
+    assert provider.transcribe(b"", "key") == "hello"
+    assert "voicekey_dummy.provider" in sys.modules
+    assert providers.PROVIDERS["echo"] is type(provider)
+
+
+def test_unusable_providers(installed):
+    with pytest.raises(ValueError, match="doesn't accept WAV"):
+        providers.get_provider("flac-only")
+    with pytest.raises(ValueError, match="couldn't be loaded from voicekey_dummy.gone:Provider"):
+        providers.get_provider("missing")
+    with pytest.raises(ValueError, match=r"Unknown provider: 'nope'. Available: echo, flac-only, missing, openai"):
+        providers.get_provider("nope")
+
+
+def test_from_config_passes_options(installed):
+    provider = providers.from_config(dict(config.DEFAULTS, provider="echo", api_base="http://x"))
+    assert provider.options["base_url"] == "http://x" and "rate_limit" in provider.options
+
+
+def test_builtin_provider_never_scans(installed, monkeypatch):
+    def scan():
+        raise AssertionError("scanned entry points")
+
+    monkeypatch.setattr(plugins, "_scan", scan)
+    assert providers.provider_info("openai") is providers.OPENAI
+    assert type(providers.get_provider("openai")).__name__ == "OpenAIProvider"
+
+
+def test_discovery_is_cached_until_sys_path_changes(installed, monkeypatch, tmp_path):
+    scans = []
+    scan = plugins._scan
+    monkeypatch.setattr(plugins, "_scan", lambda: scans.append(1) or scan())
+
+    first = plugins.discover()
+    assert not first.cached and installed.exists()
+    assert plugins.discover() is first  # once per process
+
+    monkeypatch.setattr(plugins, "_discovery", None)
+    again = plugins.discover()
+    assert again.cached and again.providers == first.providers and again.errors == first.errors
+    assert len(scans) == 1
+
+    monkeypatch.setattr(plugins, "_discovery", None)
+    monkeypatch.syspath_prepend(str(tmp_path / "new-site"))
+    (tmp_path / "new-site").mkdir()
+    assert not plugins.discover().cached and len(scans) == 2
+    assert not plugins.discover(refresh=True).cached and len(scans) == 3
+
+
+def test_cache_write_uses_its_own_temp_file(installed):
+    (installed.parent / "providers.tmp").mkdir()  # the old fixed temp path, unusable
+    found = plugins.discover()
+    assert installed.exists()
+    assert not [p for p in installed.parent.iterdir() if p.suffix == ".tmp" and p.is_file()]
+    assert plugins._read_cache(json.loads(installed.read_text())["key"]).providers == found.providers
+
+
+def test_corrupt_cache_is_rescanned(installed):
+    installed.write_text("{not json")
+    assert not plugins.discover().cached
+    assert "echo" in plugins.discover().providers
+
+
+def test_providers_command(installed, monkeypatch):
+    from voicekey.cli import main
+
+    monkeypatch.setattr(config, "load", lambda: dict(config.DEFAULTS, provider="echo"))
+    result = CliRunner().invoke(main, ["providers"])
+    assert result.exit_code == 0, result.output
+    assert "* echo: wav/flac, 16000 Hz, streaming input (voicekey_dummy.provider)" in result.stdout
+    assert "  openai: wav, 24000 Hz (built in)" in result.stdout
+    assert "Skipped not-info" in result.stderr and "scanned: 3 found" in result.stderr
+
+    monkeypatch.setattr(plugins, "_discovery", None)  # as in a new process
+    assert "read from cache: 3 found" in CliRunner().invoke(main, ["providers"]).stderr
+    assert "scanned: 3 found" in CliRunner().invoke(main, ["providers", "--refresh"]).stderr
@@ -0,0 +1,221 @@
+"""Tests for provider rate limiting, backoff and retries."""
+
+import random
+import time
+
+import httpx
+import pytest
+
+from voicekey.harness.audio import encode_wav, synth_speech
+from voicekey.loadgen import run_load
+from voicekey.mockserver import MockServer, ServerConfig
+from voicekey.providers.openai import OpenAIProvider, _retry_after
+from voicekey.providers.ratelimit import (
+    AIMDLimiter,
+    Failure,
+    RateLimiter,
+    RetryPolicy,
+    TokenBucket,
+)
+
+from tests.test_transcriber import FakeClient, FakeStreamResponse, _make_sse_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Throttled(Exception):
+    pass
+
+
+def classify(exc):
+    return Failure(retryable=True, throttled=isinstance(exc, Throttled),
+                   retry_after=getattr(exc, "after", None))
+
+
+class TestTokenBucket:
+    def test_spaces_requests_after_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+        waits = [bucket.reserve() for _ in range(4)]
+        assert waits == pytest.approx([0, 0, 0.1, 0.2])
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=1, clock=clock)
+        bucket.reserve()
+        clock.now += 1.0
+        assert bucket.reserve() == 0
+
+    def test_pause_applies_even_without_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0, clock=clock)
+        bucket.pause(2.0)
+        assert bucket.reserve() == pytest.approx(2.0)
+        clock.now += 2.0
+        assert bucket.reserve() == 0
+
+
+class TestAIMD:
+    def test_halves_once_per_round_trip(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(initial=8, maximum=8, clock=clock)
+        starts = [limiter.acquire() for _ in range(4)]
+        clock.now += 1
+        for started in starts:
+            limiter.release(started, throttled=True)
+        assert limiter.limit == 4
+
+    def test_grows_additively_and_respects_bounds(self):
+        limiter = AIMDLimiter(initial=1, minimum=1, maximum=3)
+        for _ in range(20):
+            limiter.release(limiter.acquire())
+        assert limiter.limit == 3
+        for _ in range(5):
+            limiter.release(limiter.acquire(), throttled=True)
+            limiter._last_decrease = float("-inf")
+        assert limiter.limit == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    rng = random.Random(0)
+    delays = [policy.delay(5, None, rng) for _ in range(200)]
+    assert 0 <= min(delays) and max(delays) <= 4.0
+    assert len(set(delays)) > 100
+    assert 3.0 <= policy.delay(0, 3.0, rng) <= 4.0
+
+
+class TestRateLimiter:
+    def make(self, **policy):
+        clock = FakeClock()
+        return RateLimiter(policy=RetryPolicy(**policy), seed=1, clock=clock, sleep=clock.sleep), clock
+
+    def test_retries_then_succeeds_honouring_retry_after(self):
+        limiter, clock = self.make()
+        outcomes = [Throttled(), Throttled(), "ok"]
+
+        def fn():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                outcome.after = 2.0
+                raise outcome
+            return outcome
+
+        assert limiter.call(fn, classify) == "ok"
+        assert all(s >= 2.0 for s in clock.sleeps if s)
+        snap = limiter.snapshot()
+        assert snap["requests"] == 3 and snap["throttled"] == 2 and snap["retries"] == 2
+        assert snap["concurrency_limit"] < 8
+
+    def test_gives_up_past_budget(self):
+        limiter, clock = self.make(budget=5.0, max_attempts=10)
+
+        def fn():
+            e = Throttled()
+            e.after = 2.0
+            raise e
+
+        with pytest.raises(Throttled):
+            limiter.call(fn, classify)
+        assert clock.now - 100.0 <= 5.0
+        assert limiter.stats.gave_up == 1
+
+    def test_no_retry_when_unsafe_or_not_retryable(self):
+        limiter, _ = self.make()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise Throttled()
+
+        with pytest.raises(Throttled):
+            limiter.call(fn, classify, can_retry=lambda: False)
+        with pytest.raises(Throttled):
+            limiter.call(fn, lambda e: Failure(retryable=False))
+        assert len(calls) == 2
+        assert limiter.stats.retries == 0
+
+
+def test_retry_after_parsing():
+    assert _retry_after(httpx.Headers({"Retry-After": "3"})) == 3.0
+    assert _retry_after(httpx.Headers({"Retry-After": " 0.5 "})) == 0.5
+    assert _retry_after(httpx.Headers({"Retry-After": "-1"})) == 0.0
+    assert _retry_after(httpx.Headers({"Retry-After": "inf"})) is None
+    assert _retry_after(httpx.Headers({"retry-after-ms": "250", "Retry-After": "1"})) == 0.25
+    assert _retry_after(httpx.Headers({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert _retry_after(httpx.Headers({"Retry-After": "soon"})) is None
+    assert _retry_after(httpx.Headers({})) is None
+
+
+def test_provider_retries_429_before_first_delta(monkeypatch):
+    responses = [
+        FakeStreamResponse([], status_code=429, headers={"retry-after-ms": "10"}),
+        FakeStreamResponse(_make_sse_response(["hello"])),
+    ]
+
+    class SequenceClient(FakeClient):
+        def stream(self, method, url, **kwargs):
+            return responses.pop(0)
+
+    monkeypatch.setattr(httpx, "Client", lambda **kw: SequenceClient(None))
+    provider = OpenAIProvider()
+    assert provider.transcribe(b"wav", "sk-test") == "hello"
+    assert provider.limiter.stats.throttled == 1
+
+
+def test_provider_does_not_retry_after_text_was_delivered(monkeypatch):
+    calls = []
+
+    class CutOff(FakeStreamResponse):
+        def iter_bytes(self):
+            yield from super().iter_bytes()
+            raise httpx.ReadError("connection reset")
+
+    class CountingClient(FakeClient):
+        def stream(self, method, url, **kwargs):
+            calls.append(url)
+            return CutOff(_make_sse_response(["partial "])[:2])
+
+    monkeypatch.setattr(httpx, "Client", lambda **kw: CountingClient(None))
+    chunks = []
+    with pytest.raises(httpx.ReadError):
+        OpenAIProvider().transcribe(b"wav", "sk-test", on_chunk=chunks.append)
+    assert chunks == ["partial "]
+    assert len(calls) == 1
+
+
+def test_recovers_from_server_rps_ceiling():
+    server = MockServer(ServerConfig(latency=0.01, chunk_delay=0, max_rps=40)).start()
+    wav = encode_wav(synth_speech(0.5))
+
+    def load(**options):
+        provider = OpenAIProvider(base_url=server.url, **options)
+        before = server.stats.rejected_429
+        report = run_load(server.url, [(wav, 0.5)], requests=60, concurrency=8, provider=provider)
+        return report, provider.limiter.stats, server.stats.rejected_429 - before
+
+    try:
+        report, _, rejected = load(max_retries=0)
+        assert report.errors["http_429"] == rejected > 0
+
+        report, stats, rejected = load(max_retries=8)
+        assert report.ok == 60
+        assert stats.throttled == stats.retries == rejected > 0
+
+        time.sleep(1.0)  # let the server's bucket refill
+        report, stats, rejected = load(rate_limit=30)  # configured under the ceiling
+        assert report.ok == 60
+        assert rejected == 0
+    finally:
+        server.stop()
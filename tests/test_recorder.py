@@ -8,6 +8,10 @@ import numpy as np
 
 from voicekey.recorder import Recorder
 from voicekey.constants import SAMPLE_RATE, CHANNELS
+from voicekey.harness.audio import encode_wav, synth_speech
+from voicekey.mockserver import MockServer, ServerConfig, transcript_for
+from voicekey.providers.openai import OpenAIProvider
+from voicekey.wav import WavPayload
 
 
 class TestEncodeWav:
@@ -98,3 +102,53 @@ class TestRecorderState:
         max_signal = np.full((1024, 1), 32767, dtype=np.int16)
         recorder._callback(max_signal, 1024, None, None)
         assert recorder.rms <= 1.0
+
+    def test_callback_pushes_level(self):
+        """on_level receives the RMS of every block."""
+        recorder = Recorder()
+        levels = []
+        recorder.on_level = levels.append
+        recorder._callback(np.full((512, 1), 8192, dtype=np.int16), 512, None, None)
+        recorder._callback(np.zeros((512, 1), dtype=np.int16), 512, None, None)
+        assert len(levels) == 2
+        assert levels[0] > 0.0 and levels[1] == 0.0
+
+
+class TestWavPayload:
+    """Tests for the zero-copy WAV payload returned by stop()."""
+
+    def blocks(self, sizes):
+        rng = np.random.default_rng(0)
+        return [rng.integers(-32768, 32767, (n, 1), dtype=np.int16) for n in sizes]
+
+    def test_stop_returns_payload_matching_encode_wav(self):
+        """stop() returns a payload byte-identical to encoding the concatenated blocks."""
+        recorder = Recorder()
+        blocks = self.blocks([512, 512, 100])
+        for block in blocks:
+            recorder._callback(block, len(block), None, None)
+        payload = recorder.stop()
+        assert isinstance(payload, WavPayload)
+        expected = Recorder._encode_wav(np.concatenate(blocks))
+        assert len(payload) == len(expected)
+        assert bytes(payload) == expected
+
+    def test_chunks_reassemble_and_reference_large_blocks(self):
+        """Chunks join to the whole file; big blocks pass through as views."""
+        blocks = self.blocks([10, 40_000, 3, 3, 20_000])
+        payload = WavPayload(blocks)
+        chunks = list(payload.chunks(size=16_384))
+        assert b"".join(chunks) == bytes(payload)
+        assert any(isinstance(c, memoryview) for c in chunks)
+        assert len(chunks) == 4  # header + 10 samples, view, 3 + 3 samples, view
+
+    def test_streams_to_stand_in_with_content_length(self):
+        """A payload uploads through the provider and arrives intact."""
+        audio = synth_speech(3.0)
+        payload = WavPayload(list(audio.reshape(-1, 480, 1)))
+        server = MockServer(ServerConfig(latency=0, chunk_delay=0, transcript="")).start()
+        try:
+            text = OpenAIProvider(base_url=server.url).transcribe(payload, "sk-test")
+        finally:
+            server.stop()
+        assert text == transcript_for(encode_wav(audio))
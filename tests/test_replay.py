@@ -0,0 +1,93 @@
+"""Tests for replaying flight recordings through App with fake backends."""
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from voicekey import config, flight, vocab
+from voicekey.flight import FlightRecorder
+from voicekey.replay import ReplayProvider, replay_session
+from voicekey.vocab import Vocabulary
+
+
+def _recorded_session(deltas, inserted, blocks=3, rec=None):
+    rec = rec or FlightRecorder()
+    rec.begin_session()
+    rec.record(flight.HOTKEY, b"press")
+    for _ in range(blocks):
+        rec.record_audio(np.full((480, 1), 2000, dtype=np.int16))
+    rec.record(flight.HOTKEY, b"release")
+    for delta in deltas:
+        rec.record_text(flight.SSE, delta)
+    rec.record_text(flight.INSERT, inserted)
+    rec.end_session()
+    return rec.sessions()[-1]
+
+
+def test_replay_reproduces_insertion():
+    session = _recorded_session(["Hello ", "world"], "Hello world")
+    result = replay_session(session)
+    assert result.replayed == "Hello world"
+    assert result.matches
+    assert abs(result.audio_seconds - 3 * 480 / 24000) < 1e-9
+
+
+def test_replay_detects_mismatch():
+    """A session whose recorded insertion differs from its deltas is flagged."""
+    session = _recorded_session(["Hello"], "Hello there")
+    result = replay_session(session)
+    assert not result.matches
+
+
+def test_replay_is_deterministic():
+    session = _recorded_session(["a ", "b ", "c"], "a b c")
+    results = {replay_session(session).replayed for _ in range(3)}
+    assert results == {"a b c"}
+
+
+def test_replay_provider_raises_recorded_error():
+    chunks = []
+    provider = ReplayProvider(["partial"], error="boom")
+    with pytest.raises(RuntimeError, match="boom"):
+        provider.transcribe(b"", "", on_chunk=chunks.append)
+    assert chunks == ["partial"]
+
+
+def test_replay_applies_the_vocabulary():
+    session = _recorded_session(["teh ", "cat"], "the cat")
+    assert not replay_session(session).matches
+    result = replay_session(session, vocabulary=Vocabulary([("teh", "the")]))
+    assert result.replayed == "the cat" and result.matches and not result.live
+
+
+def test_replay_with_a_provider_transcribes_the_audio():
+    heard = []
+
+    class Provider:
+        def transcribe(self, wav_bytes, api_key, model="", language="", on_chunk=None, on_stage=None):
+            heard.append((len(wav_bytes), api_key))
+            return "Hello there"
+
+    session = _recorded_session(["Hello ", "world"], "Hello world")
+    result = replay_session(session, provider=Provider(), api_key="sk-test")
+    assert result.live and result.replayed == "Hello there" and not result.matches
+    assert heard == [(44 + 3 * 480 * 2, "sk-test")]
+
+
+def test_replay_command_uses_the_configured_vocabulary(tmp_path, monkeypatch):
+    from voicekey.cli import main
+
+    rec = FlightRecorder()
+    _recorded_session(["teh ", "cat"], "the cat", rec=rec)
+    _recorded_session(["teh ", "dog"], "teh dog", rec=rec)
+    path = rec.dump(tmp_path / "flight.vkfr")
+    (tmp_path / "vocabulary.txt").write_text("teh => the\n")
+    monkeypatch.setattr(config, "load", lambda: dict(config.DEFAULTS))
+    monkeypatch.setattr(vocab, "default_path", lambda: tmp_path / "vocabulary.txt")
+
+    result = CliRunner().invoke(main, ["flight", "replay", str(path)])
+    assert result.exit_code == 1
+    assert "session 0: 0.1s audio, ok" in result.stdout
+    assert "session 1: 0.1s audio, MISMATCH" in result.stdout
+    assert "replayed: 'the dog'" in result.stdout
+    assert "the recorded responses, 1 vocabulary entries" in result.stderr
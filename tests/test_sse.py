@@ -0,0 +1,91 @@
+"""Tests for the incremental SSE decoder."""
+
+import json
+import random
+
+from voicekey.providers.sse import Event, SSEDecoder, iter_events
+
+
+def decode(*chunks: bytes) -> list[Event]:
+    return list(iter_events(chunks))
+
+
+def test_single_and_multi_line_events():
+    events = decode(b"data: one\n\ndata: two\ndata:  three\n\n")
+    assert [e.data for e in events] == ["one", "two\n three"]
+    assert events[0].event == "message"
+
+
+def test_fields_comments_and_line_endings():
+    body = b": keep-alive\r\nevent: delta\r\nid: 7\r\nretry: 1500\rdata: x\r\n\r\ndata: y\n\n"
+    first, second = decode(body)
+    assert (first.event, first.id, first.retry, first.data) == ("delta", "7", 1500, "x")
+    # The event type resets after each dispatch; id and retry persist.
+    assert (second.event, second.id, second.retry) == ("message", "7", 1500)
+
+
+def test_ignores_invalid_fields_and_blank_runs():
+    events = decode(b"\n\nid: a\0b\nretry: soon\nunknown: 1\ndata\n\nevent: x\n\n")
+    assert events == [Event(data="")]
+
+
+def test_done_sentinel():
+    (event,) = decode(b"data: [DONE]\n\n")
+    assert event.done
+
+
+def test_split_crlf_and_utf8():
+    decoder = SSEDecoder()
+    body = "data: café\r\n\r\n".encode()
+    out = []
+    for i in range(len(body)):
+        out += decoder.feed(body[i:i + 1])
+    assert [e.data for e in out] == ["café"]
+    assert decoder.close() == []
+
+
+def test_unterminated_final_event_is_flushed():
+    assert [e.data for e in decode(b"data: a\n\ndata: tail")] == ["a", "tail"]
+
+
+def test_cr_only_stream_dispatches_as_it_arrives():
+    decoder = SSEDecoder()
+    assert [e.data for e in decoder.feed(b"data: a\r\r")] == ["a"]
+    assert decoder.feed(b"data: b\r") == []
+    assert [e.data for e in decoder.feed(b"\r")] == ["b"]
+    assert decoder._pending == b""
+    assert [e.data for e in decode(b"data: a\r\n\r\n", b"data: [DONE]\r\n\r")] == ["a", "[DONE]"]
+
+
+def _random_stream(rng: random.Random, newlines: list[str]) -> tuple[bytes, list[Event]]:
+    words = ["Let's ", "naïve ", "café ", "日本語 ", "🙂 ", "ship."]
+    parts, expected = [], []
+    for i in range(300):
+        newline = rng.choice(newlines)
+        data = [json.dumps({"text": rng.choice(words)}, ensure_ascii=False)]
+        lines = [f"data: {data[0]}"]
+        event = "message"
+        if rng.random() < 0.3:
+            event = f"e{i}"
+            lines.insert(0, f"event: {event}")
+        if rng.random() < 0.2:
+            data.append(rng.choice(words))
+            lines.append(f"data: {data[-1]}")
+        if rng.random() < 0.2:
+            lines.insert(0, ": comment")
+        parts.append(newline.join(lines) + newline * 2)
+        expected.append(Event("\n".join(data), event))
+    # End on a lone line ending with no blank line after it, as a server that just closes would.
+    parts[-1] = parts[-1][:-len(newline)]
+    return "".join(parts).encode(), expected
+
+
+def test_random_splits_match_expected_events():
+    rng = random.Random(7)
+    for newlines in (["\n", "\r\n", "\r"], ["\r"], ["\r\n"]):
+        body, expected = _random_stream(rng, newlines)
+        assert decode(body) == expected
+        for _ in range(50):
+            cuts = sorted(rng.sample(range(1, len(body)), rng.randint(1, 400)))
+            chunks = [body[a:b] for a, b in zip([0, *cuts], [*cuts, len(body)])]
+            assert decode(*chunks) == expected
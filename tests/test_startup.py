@@ -0,0 +1,115 @@
+"""Tests for the startup profiler and lazy startup path."""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from voicekey.startup import StartupProfiler
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    """A throwaway package: pkg imports pkg.child."""
+    pkg = tmp_path / "vk_profiled_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("import time\ntime.sleep(0.01)\nfrom . import child\n")
+    (pkg / "child.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in ("vk_profiled_pkg", "vk_profiled_pkg.child"):
+        sys.modules.pop(name, None)
+
+
+def test_times_imports_with_self_and_cumulative(modules):
+    profiler = StartupProfiler()
+    profiler.enable()
+    try:
+        with profiler.phase("load"):
+            import vk_profiled_pkg  # noqa: F401
+    finally:
+        profiler.disable()
+    records = {r.name: r for r in profiler.imports}
+    parent, child = records["vk_profiled_pkg"], records["vk_profiled_pkg.child"]
+    assert parent.depth == 0 and child.depth == 1
+    assert parent.phase == child.phase == "load"
+    assert child.cumulative_ms >= 20
+    assert parent.cumulative_ms >= parent.self_ms + child.cumulative_ms - 1
+    assert 10 <= parent.self_ms < parent.cumulative_ms
+    assert sys.modules["vk_profiled_pkg"].__loader__.__class__.__name__ != "_TimedLoader"
+
+
+def test_report_lists_phases_and_slowest_imports(modules):
+    profiler = StartupProfiler()
+    profiler.enable()
+    try:
+        profiler.checkpoint()
+        with profiler.phase("load"):
+            import vk_profiled_pkg  # noqa: F401
+    finally:
+        profiler.disable()
+    report = profiler.report()
+    assert "cli import" in report
+    assert "load" in report
+    assert "vk_profiled_pkg " in report
+    assert "vk_profiled_pkg.child" not in report  # only top-level imports listed
+    assert "cli import" not in profiler.report(phases=["load"])
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StartupProfiler()
+    with profiler.phase("x"):
+        pass
+    profiler.checkpoint()
+    assert profiler.phases == [] and profiler.imports == []
+
+
+def _fresh_modules(code: str) -> set[str]:
+    script = textwrap.dedent(code) + "\nimport sys\nprint(' '.join(sys.modules))\n"
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    )
+    return set(out.stdout.split())
+
+
+def test_config_command_skips_keychain_and_app():
+    loaded = _fresh_modules("""
+        from click.testing import CliRunner
+        from voicekey.cli import main
+        CliRunner().invoke(main, ["config"])
+    """)
+    assert "voicekey.cli" in loaded
+    assert not {"keyring", "voicekey.app", "numpy", "httpx"} & loaded
+
+
+def test_app_loads_audio_and_http_only_when_warmed_up():
+    init_code = textwrap.dedent("""
+        from voicekey.harness import platform
+        platform.install()
+        from voicekey import config
+        from voicekey.app import App
+        app = App(cfg=dict(config.DEFAULTS, display="null"), api_key="sk", persist_stats=False)
+    """)
+    loaded = _fresh_modules(init_code)
+    assert not {"voicekey.recorder", "voicekey.inserter", "voicekey.providers.openai",
+                "voicekey.hotkey", "httpx"} & loaded
+    warmed = _fresh_modules(init_code + "app.warm_up()\n")
+    assert {"voicekey.recorder", "voicekey.inserter", "voicekey.providers.openai"} <= warmed
+
+
+def test_injected_recorder_is_wired_up():
+    from voicekey import config
+    from voicekey.app import App
+
+    class FakeRecorder:
+        on_frame = on_level = None
+
+    recorder = FakeRecorder()
+    app = App(cfg=dict(config.DEFAULTS, display="null"), api_key="sk", recorder=recorder,
+              persist_stats=False)
+    assert app.recorder is recorder
+    assert recorder.on_frame == app.flight.record_audio
+    assert recorder.on_level == app._meter.update_level
@@ -0,0 +1,80 @@
+"""Tests for pitch-preserving time compression and its speech-rate cap."""
+
+import random
+
+import numpy as np
+import pytest
+
+from voicekey.constants import SAMPLE_RATE
+from voicekey.harness import Harness
+from voicekey.harness.audio import synth_speech
+from voicekey.harness.tones import VOCABULARY, recognize, synth_words
+from voicekey.mockserver import ServerConfig
+from voicekey.timestretch import compress, effective_speed, syllable_rate
+
+WORDS = random.Random(3).choices(VOCABULARY, k=24)
+
+
+def dominant_hz(audio: np.ndarray) -> float:
+    spectrum = np.abs(np.fft.rfft(audio * np.hanning(len(audio))))
+    return np.fft.rfftfreq(len(audio), 1 / SAMPLE_RATE)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize("speed", [1.2, 1.5, 2.0])
+def test_shortens_without_changing_pitch(speed):
+    t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+    tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    out = compress(tone, speed)
+    assert len(out) == round(len(tone) / speed)
+    assert dominant_hz(out) == pytest.approx(440, abs=2)
+    # Frames are spliced in phase: no step bigger than the sine's own slope.
+    slope = 8000 * 2 * np.pi * 440 / SAMPLE_RATE
+    assert np.abs(np.diff(out[1000:-1000].astype(float))).max() < slope * 1.05
+
+
+@pytest.mark.parametrize("rate", [22050, 44100])
+def test_frame_length_not_a_multiple_of_the_decimation(rate):
+    t = np.arange(rate * 2) / rate
+    tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    out = compress(tone, 1.5, rate=rate)
+    assert len(out) == round(len(tone) / 1.5)
+    spectrum = np.abs(np.fft.rfft(out * np.hanning(len(out))))
+    assert np.fft.rfftfreq(len(out), 1 / rate)[np.argmax(spectrum)] == pytest.approx(440, abs=2)
+
+
+def test_speed_one_and_short_clips_pass_through():
+    audio = synth_speech(0.5)
+    np.testing.assert_array_equal(compress(audio, 1.0), audio)
+    assert len(compress(audio[:100], 1.5)) == 100
+
+
+def test_syllable_rate():
+    assert syllable_rate(synth_speech(6.0)) == pytest.approx(3.5, abs=0.3)
+    assert syllable_rate(compress(synth_speech(6.0), 1.5)) == pytest.approx(5.25, abs=0.5)
+    assert syllable_rate(np.zeros(SAMPLE_RATE, dtype=np.int16)) == 0.0
+
+
+def test_effective_speed_caps_fast_talkers():
+    assert effective_speed(1.5, measured_rate=4.0, max_rate=8.0) == 1.5
+    assert effective_speed(1.5, measured_rate=6.4, max_rate=8.0) == pytest.approx(1.25)
+    assert effective_speed(1.5, measured_rate=9.0, max_rate=8.0) == 1.0
+    assert effective_speed(1.5, measured_rate=9.0, max_rate=0) == 1.5
+    assert effective_speed(0.8, measured_rate=4.0) == 1.0
+
+
+@pytest.mark.parametrize("speed", [1.0, 1.25, 1.5])
+def test_tone_transcripts_survive_compression(speed):
+    assert recognize(compress(synth_words(WORDS), speed)) == WORDS
+
+
+def test_transcripts_match_across_speed_factors_end_to_end():
+    """The app compresses before upload; the stand-in hears the same words from less audio."""
+    audio = synth_words(WORDS)
+    server = ServerConfig(latency=0, chunk_delay=0, engine="tones")
+    results = {}
+    for speed in (1.0, 1.5):
+        with Harness(server=server, cfg={"speedup": speed, "speedup_max_rate": 0}) as harness:
+            text = harness.run_session(audio)
+            results[speed] = (text, harness.server.stats.bytes_received)
+    assert results[1.5][0] == results[1.0][0] == " ".join(WORDS)
+    assert results[1.5][1] < results[1.0][1] * 0.7
@@ -0,0 +1,105 @@
+"""Tests for the Trace Event Format tracer."""
+
+import json
+import threading
+
+from voicekey.tracing import Tracer
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_disabled_span_is_noop():
+    tracer = Tracer()
+    with tracer.span("work"):
+        pass
+    tracer.instant("mark")
+    assert len(tracer._ring) == 0
+
+
+def test_spans_written_as_complete_events(tmp_path):
+    tracer = Tracer()
+    path = tracer.enable(tmp_path / "trace.json")
+    with tracer.span("work", size=3):
+        pass
+    tracer.instant("mark")
+    tracer.close()
+
+    events = _load(path)
+    work = [e for e in events if e["name"] == "work"]
+    assert len(work) == 1
+    assert work[0]["ph"] == "X"
+    assert work[0]["dur"] >= 0
+    assert work[0]["args"] == {"size": 3}
+    assert work[0]["tid"] == threading.get_native_id()
+    assert any(e["ph"] == "i" and e["name"] == "mark" for e in events)
+
+
+def test_thread_names_emitted(tmp_path):
+    tracer = Tracer()
+    path = tracer.enable(tmp_path / "trace.json")
+
+    def worker():
+        with tracer.span("in_thread"):
+            pass
+
+    t = threading.Thread(target=worker, name="consumer")
+    t.start()
+    t.join()
+    tracer.close()
+
+    events = _load(path)
+    names = {e["args"]["name"] for e in events if e["ph"] == "M" and e["name"] == "thread_name"}
+    assert "consumer" in names
+    span = next(e for e in events if e["name"] == "in_thread")
+    assert span["tid"] != threading.get_native_id()
+
+
+def test_ring_is_bounded(tmp_path):
+    tracer = Tracer(capacity=10)
+    path = tracer.enable(tmp_path / "trace.json")
+    for i in range(100):
+        tracer.instant("e", i=i)
+    assert len(tracer._ring) == 10
+    tracer.close()
+
+    kept = [e["args"]["i"] for e in _load(path) if e["name"] == "e"]
+    assert kept == list(range(90, 100))
+
+
+def test_close_keeps_events_the_writer_is_still_writing(tmp_path):
+    tracer = Tracer()
+    path = tracer.enable(tmp_path / "trace.json")
+    encoding = threading.Event()
+    encode = tracer._encode
+
+    def slow_encode(item):
+        if threading.current_thread().name == "trace-writer":
+            encoding.set()
+            threading.Event().wait(0.1)
+        return encode(item)
+
+    tracer._encode = slow_encode
+    tracer.instant("taken by the writer")
+    tracer.flush()
+    assert encoding.wait(5)
+    tracer.instant("left in the ring")
+    tracer.close()
+    names = [e["name"] for e in _load(path)]
+    assert "taken by the writer" in names and "left in the ring" in names
+
+
+def test_flush_appends_incrementally(tmp_path):
+    tracer = Tracer()
+    path = tracer.enable(tmp_path / "trace.json")
+    tracer.instant("first")
+    tracer._drain()
+    partial = path.read_text()
+    assert partial.startswith("[\n")
+    assert '"first"' in partial
+    tracer.instant("second")
+    tracer.close()
+    names = [e["name"] for e in _load(path)]
+    assert "first" in names and "second" in names
@@ -6,36 +6,55 @@ from unittest.mock import MagicMock
 import httpx
 import pytest
 
+from voicekey.mockserver import parse_multipart
 from voicekey.providers.openai import OpenAIProvider
 from voicekey.constants import DEFAULT_MODEL, OPENAI_API_BASE
 
 
 def _make_sse_response(chunks: list[str], done: bool = True) -> list[str]:
-    """Build SSE lines from text chunks."""
+    """Build SSE lines from text chunks, each event followed by a blank line."""
     lines = []
     for chunk in chunks:
         event = {"text": chunk}
-        lines.append(f"data: {json.dumps(event)}")
+        lines += [f"data: {json.dumps(event)}", ""]
     if done:
-        lines.append("data: [DONE]")
+        lines += ["data: [DONE]", ""]
     return lines
 
 
+def _form(call: dict) -> dict[str, str]:
+    """The multipart fields a recorded stream() call would have sent."""
+    body = b"".join(call["content"])
+    assert len(body) == int(call["headers"]["Content-Length"])
+    return {k: v.decode() for k, v in parse_multipart(body, call["headers"]["Content-Type"]).items()}
+
+
 class FakeStreamResponse:
     """Fake httpx streaming response."""
 
-    def __init__(self, lines: list[str], status_code: int = 200):
+    def __init__(self, lines: list[str], status_code: int = 200, headers: dict | None = None):
         self._lines = lines
         self.status_code = status_code
+        self.headers = httpx.Headers(headers or {})
+
+    @property
+    def is_error(self):
+        return self.status_code >= 400
+
+    def read(self):
+        return b""
 
     def raise_for_status(self):
         if self.status_code >= 400:
             raise httpx.HTTPStatusError(
-                "error", request=MagicMock(), response=MagicMock(status_code=self.status_code)
+                "error", request=MagicMock(), response=self
             )
 
-    def iter_lines(self):
-        yield from self._lines
+    def iter_bytes(self):
+        # Small reads, so events arrive split across chunks.
+        body = "".join(line + "\n" for line in self._lines).encode()
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
 
     def __enter__(self):
         return self
@@ -61,6 +80,9 @@ class FakeClient:
     def __exit__(self, *args):
         pass
 
+    def close(self):
+        self.closed = True
+
 
 def test_transcribe_returns_full_text(monkeypatch):
     """transcribe() assembles all streamed chunks into final text."""
@@ -98,9 +120,11 @@ def test_transcribe_sends_correct_request(monkeypatch):
     assert call["method"] == "POST"
     assert call["url"] == f"{OPENAI_API_BASE}/audio/transcriptions"
     assert call["headers"]["Authorization"] == "Bearer sk-mykey"
-    assert call["data"]["model"] == "gpt-4o-transcribe"
-    assert call["data"]["language"] == "en"
-    assert call["data"]["stream"] == "true"
+    form = _form(call)
+    assert form["model"] == "gpt-4o-transcribe"
+    assert form["language"] == "en"
+    assert form["stream"] == "true"
+    assert form["file"] == "audiobytes"
 
 
 def test_transcribe_default_model(monkeypatch):
@@ -111,7 +135,7 @@ def test_transcribe_default_model(monkeypatch):
 
     provider = OpenAIProvider()
     provider.transcribe(b"wav", "sk-test")
-    assert fake_client.last_call["data"]["model"] == DEFAULT_MODEL
+    assert _form(fake_client.last_call)["model"] == DEFAULT_MODEL
 
 
 def test_transcribe_omits_language_when_empty(monkeypatch):
@@ -122,16 +146,20 @@ def test_transcribe_omits_language_when_empty(monkeypatch):
 
     provider = OpenAIProvider()
     provider.transcribe(b"wav", "sk-test", language="")
-    assert "language" not in fake_client.last_call["data"]
+    assert "language" not in _form(fake_client.last_call)
 
 
 def test_transcribe_handles_empty_events(monkeypatch):
     """transcribe() skips events without text field."""
     lines = [
         "data: {}",
+        "",
         'data: {"text": ""}',
+        "",
         'data: {"text": "valid"}',
+        "",
         "data: [DONE]",
+        "",
     ]
     fake_client = FakeClient(FakeStreamResponse(lines))
     monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
@@ -147,8 +175,11 @@ def test_transcribe_handles_non_data_lines(monkeypatch):
         ": comment",
         "",
         "event: transcript",
+        "id: 1",
         'data: {"text": "hello"}',
+        "",
         "data: [DONE]",
+        "",
     ]
     fake_client = FakeClient(FakeStreamResponse(lines))
     monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
@@ -162,8 +193,11 @@ def test_transcribe_handles_malformed_json(monkeypatch):
     """transcribe() skips malformed JSON data lines."""
     lines = [
         "data: not-json",
+        "",
         'data: {"text": "ok"}',
+        "",
         "data: [DONE]",
+        "",
     ]
     fake_client = FakeClient(FakeStreamResponse(lines))
     monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
@@ -181,3 +215,86 @@ def test_transcribe_raises_on_http_error(monkeypatch):
     provider = OpenAIProvider()
     with pytest.raises(httpx.HTTPStatusError):
         provider.transcribe(b"wav", "sk-bad")
+
+
+def test_transcribe_reports_stages(monkeypatch):
+    """transcribe() maps httpcore trace events onto on_stage callbacks."""
+    lines = _make_sse_response(["hi"])
+
+    class TracingClient(FakeClient):
+        def stream(self, method, url, **kwargs):
+            trace = kwargs.get("extensions", {}).get("trace")
+            if trace:
+                trace("connection.connect_tcp.complete", {})
+                trace("http11.send_request_headers.started", {})
+                trace("http11.send_request_body.complete", {})
+            return super().stream(method, url, **kwargs)
+
+    fake_client = TracingClient(FakeStreamResponse(lines))
+    monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
+
+    stages = []
+    OpenAIProvider().transcribe(b"wav", "sk-test", on_stage=stages.append)
+    assert stages == ["connected", "request_sent"]
+
+
+def test_transcribe_without_on_stage_sends_no_trace(monkeypatch):
+    """No trace extension is installed unless on_stage is given."""
+    fake_client = FakeClient(FakeStreamResponse(_make_sse_response(["hi"])))
+    monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
+
+    OpenAIProvider().transcribe(b"wav", "sk-test")
+    assert fake_client.last_call["extensions"] == {}
+
+
+def test_transcribe_uses_custom_base_url(monkeypatch):
+    """base_url points requests at an OpenAI-compatible server."""
+    fake_client = FakeClient(FakeStreamResponse(_make_sse_response(["ok"])))
+    monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
+
+    OpenAIProvider(base_url="http://127.0.0.1:8000/v1/").transcribe(b"wav", "sk-test")
+    assert fake_client.last_call["url"] == "http://127.0.0.1:8000/v1/audio/transcriptions"
+
+
+def test_client_is_reused_across_calls(monkeypatch):
+    """One pooled httpx.Client serves every call until close()."""
+    made = []
+
+    def make_client(**kw):
+        made.append(FakeClient(FakeStreamResponse(_make_sse_response(["hi"]))))
+        return made[-1]
+
+    monkeypatch.setattr(httpx, "Client", make_client)
+    provider = OpenAIProvider()
+    provider.transcribe(b"wav", "sk-test")
+    provider.transcribe(b"wav", "sk-test")
+    assert len(made) == 1
+    provider.close()
+    assert made[0].closed
+    provider.transcribe(b"wav", "sk-test")
+    assert len(made) == 2
+
+
+def test_transcribe_handles_openai_delta_events(monkeypatch):
+    """Typed delta events stream; the closing done event doesn't repeat them."""
+    events = [
+        {"type": "transcript.text.delta", "delta": "Hello"},
+        {"type": "transcript.text.delta", "delta": " world"},
+        {"type": "transcript.text.done", "text": "Hello world"},
+    ]
+    lines = [line for e in events for line in (f"data: {json.dumps(e)}", "")]
+    fake_client = FakeClient(FakeStreamResponse(lines))
+    monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
+
+    chunks = []
+    result = OpenAIProvider().transcribe(b"wav", "sk-test", on_chunk=chunks.append)
+    assert chunks == ["Hello", " world"]
+    assert result == "Hello world"
+
+
+def test_transcribe_falls_back_to_done_text(monkeypatch):
+    """A stream with only the done event still yields its transcript."""
+    lines = [f'data: {json.dumps({"type": "transcript.text.done", "text": "only"})}', ""]
+    fake_client = FakeClient(FakeStreamResponse(lines))
+    monkeypatch.setattr(httpx, "Client", lambda **kw: fake_client)
+    assert OpenAIProvider().transcribe(b"wav", "sk-test") == "only"
@@ -0,0 +1,99 @@
+"""Tests for display backend selection and the log/null backends."""
+
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from voicekey import ui
+
+
+class _Stdout(io.StringIO):
+    def __init__(self, tty: bool):
+        super().__init__()
+        self._tty = tty
+
+    def isatty(self):
+        return self._tty
+
+
+class TestGetDisplay:
+    def test_auto_uses_rich_on_a_terminal(self, monkeypatch):
+        monkeypatch.setattr(sys, "stdout", _Stdout(tty=True))
+        assert ui.get_display("auto").name == "rich"
+
+    def test_auto_uses_log_lines_without_a_terminal(self, monkeypatch):
+        monkeypatch.setattr(sys, "stdout", _Stdout(tty=False))
+        assert ui.get_display("auto").name == "log"
+
+    @pytest.mark.parametrize("name", ["rich", "log", "null"])
+    def test_explicit(self, name):
+        assert ui.get_display(name).name == name
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="Unknown display"):
+            ui.get_display("fancy")
+
+
+class TestLogDisplay:
+    def test_strips_markup_but_not_bracketed_text(self):
+        out = io.StringIO()
+        ui.LogDisplay(out).print("  [red]Error:[/] [Errno 61] Connection refused")
+        assert out.getvalue().endswith(" Error: [Errno 61] Connection refused\n")
+
+    def test_one_timestamped_line_per_line(self):
+        out = io.StringIO()
+        ui.LogDisplay(out).print("\n  [red]✗[/] Failed\n  [dim]Grant access[/]\n")
+        lines = out.getvalue().splitlines()
+        assert [line[20:] for line in lines] == ["✗ Failed", "Grant access"]
+
+    def test_blank_print_writes_nothing(self):
+        out = io.StringIO()
+        ui.LogDisplay(out).print()
+        assert out.getvalue() == ""
+
+    def test_stream_logs_word_count_not_text(self):
+        out = io.StringIO()
+        stream = ui.LogDisplay(out).stream()
+        stream.start()
+        stream.append("secret ")
+        stream.append("words here")
+        stream.finish()
+        assert stream.text == "secret words here"
+        assert out.getvalue().endswith("transcribed 3 words\n")
+        assert "secret" not in out.getvalue()
+
+    def test_banner(self):
+        out = io.StringIO()
+        ui.LogDisplay(out).banner({"model": "m"}, accessibility=False, microphone=True)
+        assert "model=m" in out.getvalue()
+        assert "accessibility=NOT granted" in out.getvalue()
+
+
+def test_null_display_is_silent(capsys):
+    display = ui.NullDisplay()
+    display.print("[red]hi[/]")
+    display.banner({}, True, True)
+    meter = display.meter()
+    meter.start()
+    meter.update_level(0.5)
+    meter.stop()
+    assert capsys.readouterr().out == ""
+
+
+def test_headless_app_never_loads_rich_display():
+    code = (
+        "import sys\n"
+        "from voicekey.harness import platform\n"
+        "platform.install()\n"
+        "from voicekey import config\n"
+        "from voicekey.app import App\n"
+        "App(cfg=dict(config.DEFAULTS, display='log', flight_sessions=0),"
+        " api_key='sk', persist_stats=False)\n"
+        "print('voicekey.display' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+    assert out.stdout.strip() == "False", out.stderr
@@ -0,0 +1,105 @@
+"""Tests for custom vocabulary replacement and `voicekey vocab`."""
+
+import random
+
+import pytest
+from click.testing import CliRunner
+
+from voicekey import config
+from voicekey.app import App
+from voicekey.harness import Harness
+from voicekey.harness.audio import synth_speech
+from voicekey.mockserver import ServerConfig
+from voicekey.vocab import Rewriter, Vocabulary
+
+TEXT = ("Um, gonna put post gress on kubernetes. Go Lang and go lang, node.js said ai "
+        "um twice in new york city and new york  times. Gonna post")
+
+
+@pytest.fixture
+def vocabulary():
+    return Vocabulary([
+        ("post gress", "PostgreSQL"), ("kubernetes", "Kubernetes"), ("Go Lang", "Go"),
+        ("gonna", "going to"), ("um", ""), ("node.js", "Node.js"), ("ai", "AI"),
+        ("new york city", "NYC"), ("new york", "NY"),
+    ])
+
+
+def test_rules(vocabulary):
+    assert vocabulary.apply(TEXT) == (
+        ", going to put PostgreSQL on Kubernetes. Go and go lang, Node.js said AI "
+        "twice in NYC and NY  times. Going to post")
+    assert vocabulary.apply("Said the AIs") == "Said the AIs"  # whole words only
+    assert vocabulary.apply("") == ""
+
+
+def test_later_entries_override(vocabulary):
+    vocabulary.add("ai", "A.I.")
+    vocabulary.add("AI", "AI")
+    assert vocabulary.apply("ai AI Ai") == "A.I. AI A.I."
+    assert vocabulary.size == 9
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_streaming_matches_whole_text(vocabulary, seed):
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(TEXT)), rng.randint(1, 40)))
+    rewriter = Rewriter(vocabulary)
+    parts = [rewriter.feed(TEXT[a:b]) for a, b in zip([0] + cuts, cuts + [len(TEXT)])]
+    assert "".join(parts) + rewriter.finish() == vocabulary.apply(TEXT)
+
+
+def test_streaming_holds_back_only_what_may_change(vocabulary):
+    rewriter = Rewriter(vocabulary)
+    assert rewriter.feed("we use post") == "we use"  # could be "post gress"
+    assert rewriter.feed(" gress and new") == " PostgreSQL and"
+    assert rewriter.feed(" york ci") == ""   # "new york" or "new york city"?
+    assert rewriter.feed("ty, ok") == " NYC,"
+    assert rewriter.finish() == " ok"
+
+
+def test_file_format(tmp_path):
+    path = tmp_path / "vocabulary.txt"
+    path.write_text("# names\nKubernetes\n\npost gress => PostgreSQL\num =>\n")
+    vocabulary = Vocabulary.from_file(path)
+    assert vocabulary.size == 3 and not vocabulary.stale()
+    assert vocabulary.apply("um KUBERNETES on post  gress") == " Kubernetes on PostgreSQL"
+    path.write_text("=> nothing\n")
+    assert vocabulary.stale()
+    with pytest.raises(ValueError, match=r"vocabulary.txt:1:"):
+        Vocabulary.from_file(path)
+    assert not Vocabulary.missing(tmp_path / "new.txt").stale()
+    assert Vocabulary.missing(path).stale()
+
+
+def test_dictation_is_corrected(tmp_path, monkeypatch):
+    path = tmp_path / "vocabulary.txt"
+    path.write_text("brown => Brown\nlazy dog => LazyDog\n")
+    server = ServerConfig(latency=0, chunk_delay=0, transcript="The quick brown fox jumps over the lazy dog")
+    with Harness(server=server, cfg={"vocabulary": str(path)}) as harness:
+        harness.run_session(synth_speech(0.5))
+        assert harness.app.last_text == "The quick Brown fox jumps over the LazyDog"
+
+        path.write_text("quick => slow\n")
+        monkeypatch.setattr(config, "load", lambda: dict(harness.app.cfg))
+        harness.app.reload_config()
+        harness.run_session(synth_speech(0.5))
+        assert harness.app.last_text == "The slow brown fox jumps over the lazy dog"
+
+
+def test_default_file_is_not_read_without_persistence():
+    app = App(cfg=dict(config.DEFAULTS), api_key="sk-test", persist_stats=False)
+    assert app.vocabulary.size == 0 and app.vocabulary.path is None
+
+
+def test_vocab_command(tmp_path, monkeypatch):
+    from voicekey.cli import main
+
+    path = tmp_path / "vocabulary.txt"
+    monkeypatch.setattr(config, "load", lambda: dict(config.DEFAULTS, vocabulary=str(path)))
+    runner = CliRunner()
+    assert runner.invoke(main, ["vocab"]).exit_code == 1
+    path.write_text("jason => JSON\n")
+    result = runner.invoke(main, ["vocab", "parse the jason"])
+    assert result.exit_code == 0
+    assert "1 entries" in result.output and "parse the JSON" in result.output
@@ -0,0 +1,81 @@
+"""Tests for the audio worker process and its shared-memory ring."""
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from voicekey.harness import Harness, fake_sounddevice, platform
+from voicekey.harness.audio import synth_speech
+from voicekey.mockserver import ServerConfig
+from voicekey.recorder import Recorder
+from voicekey.worker import _DATA_OFFSET, _Ring
+
+FAST = ServerConfig(latency=0, chunk_delay=0)
+
+
+@pytest.fixture
+def ring():
+    shm = shared_memory.SharedMemory(create=True, size=_DATA_OFFSET + 2 * 100)
+    ring = _Ring(shm, 100)
+    yield ring
+    ring.samples = None
+    shm.close()
+    shm.unlink()
+
+
+def test_ring_wraps(ring):
+    ring.write(np.arange(80, dtype=np.int16))
+    ring.write(np.arange(80, 140, dtype=np.int16))
+    assert ring.header()[0] == 140
+    out, missed = ring.read(60, 140)
+    np.testing.assert_array_equal(out, np.arange(60, 140))
+    assert missed == 0
+
+
+def test_ring_reports_overwritten_samples(ring):
+    for start in range(0, 250, 50):
+        ring.write(np.arange(start, start + 50, dtype=np.int16))
+    out, missed = ring.read(0, 250)
+    assert missed == 150
+    np.testing.assert_array_equal(out, np.arange(150, 250))
+
+
+def test_dictation_through_worker():
+    with Harness(server=FAST, cfg={"audio_worker": True, "flight_sessions": 1}) as harness:
+        levels = []
+        harness.app.recorder.on_level = levels.append
+        assert harness.run_session(synth_speech(1.0)) == FAST.transcript.strip()
+        assert harness.worker.stats()["device"]["delivered_frames"] == 24000
+        assert max(levels) > 0
+        assert harness.server.stats.requests == 1
+        # A second session reuses the same worker and provider.
+        assert harness.run_session(synth_speech(0.5)) == FAST.transcript.strip()
+        assert harness.worker.stats()["recordings_held"] == 0
+    assert not harness.worker.process.is_alive()
+
+
+def test_worker_audio_reaches_flight_recorder():
+    with Harness(server=FAST, cfg={"audio_worker": True, "flight_sessions": 1}) as harness:
+        audio = synth_speech(1.0)
+        harness.run_session(audio)
+        assert harness.app.recorder.missed_samples == 0
+        assert harness.app.flight.sessions()[-1].audio() == audio.tobytes()
+
+
+def test_late_callback_drops_audio_and_counts_overflows():
+    """A callback slower than real time loses input, as PortAudio would."""
+    platform.install()
+    try:
+        recorder = Recorder()
+        recorder.on_frame = lambda block: time.sleep(0.05)  # 20 ms of audio per 50 ms
+        fake_sounddevice.play(synth_speech(0.5), speed=1.0)
+        recorder.start()
+        fake_sounddevice.wait_finished(5)
+        recorder.stop()
+    finally:
+        platform.uninstall()
+    assert fake_sounddevice.stats["dropped_frames"] > 0
+    # The last overflow can hit the end of the clip, with no callback left to report it.
+    assert 0 < recorder.overflows <= fake_sounddevice.stats["overflows"]